@@ -97,17 +97,24 @@ def main() -> int:  # noqa: D103
     print(sinfo.tf_world_to_camera)
     print("---------------------------------------")
 
+    window_name = "Image Stream"
+    t = -1
     while True:
-        observation = camera_frontend.get_latest_observation()
-        if args.pylon:
-            image = utils.convert_image(observation.image)
-        else:
-            image = observation.image
-        window_name = "Image Stream"
-        cv2.imshow(window_name, image)
+        # only process new frames (with a timeout to keep the GUI responsive)
+        t_new = trifinger_cameras.camera.wait_for_new_observation(
+            camera_data, t, timeout_s=0.1
+        )
+        if t_new is not None:
+            t = t_new
+            observation = camera_frontend.get_observation(t)
+            if args.pylon:
+                image = utils.convert_image(observation.image)
+            else:
+                image = observation.image
+            cv2.imshow(window_name, image)
 
         # stop if either "q" or ESC is pressed
-        if cv2.waitKey(3) in [ord("q"), 27]:  # 27 = ESC
+        if cv2.waitKey(1) in [ord("q"), 27]:  # 27 = ESC
             break
 
     if args.record:
@@ -31,11 +31,23 @@ def main() -> None:  # noqa: D103
             process.  Otherwise run the backend locally.
         """,
     )
+    argparser.add_argument(
+        "--preview",
+        action="store_true",
+        help="""Show the low-resolution previews published by a backend in another
+            process (implies --multi-process, the backend needs to be started
+            with --preview).
+        """,
+    )
     args = argparser.parse_args()
 
     camera_names = ["camera60", "camera180", "camera300"]
 
-    if args.multi_process:
+    if args.preview:
+        camera_data = trifinger_cameras.tricamera_preview.MultiProcessData(
+            "tricamera_preview", False
+        )
+    elif args.multi_process:
         camera_data = trifinger_cameras.tricamera.MultiProcessData("tricamera", False)
     else:
         camera_data = trifinger_cameras.tricamera.SingleProcessData()
@@ -44,7 +56,10 @@ def main() -> None:  # noqa: D103
             camera_driver, camera_data
         )
 
-    camera_frontend = trifinger_cameras.tricamera.Frontend(camera_data)
+    if args.preview:
+        camera_frontend = trifinger_cameras.tricamera_preview.Frontend(camera_data)
+    else:
+        camera_frontend = trifinger_cameras.tricamera.Frontend(camera_data)
     observations_timestamps_list = []
 
     print("=== Camera Info: ===")
@@ -53,7 +68,11 @@ def main() -> None:  # noqa: D103
     while True:
         observation = camera_frontend.get_latest_observation()
         for i, name in enumerate(camera_names):
-            cv2.imshow(name, utils.convert_image(observation.cameras[i].image))
+            image = observation.cameras[i].image
+            # preview images are already demosaiced
+            if not args.preview:
+                image = utils.convert_image(image)
+            cv2.imshow(name, image)
 
         # stop if either "q" or ESC is pressed
         if cv2.waitKey(3) in [ord("q"), 27]:  # 27 = ESC
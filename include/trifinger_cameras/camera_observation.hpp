@@ -10,27 +10,84 @@
 #include <opencv2/opencv.hpp>
 #include <serialization_utils/cereal_cvmat.hpp>
 
+#include <trifinger_cameras/camera_parameters.hpp>
+
 namespace trifinger_cameras
 {
 /**
  * @brief Observation structure to store cv::Mat images with corresponding
  * timestamps.
  *
+ * The image size of default-constructed observations is determined at run
+ * time (see @ref get_default_image_size).  This is needed for shared memory
+ * time series to work correctly, as they determine the (fixed) serialized
+ * size of the observations by serializing a default-constructed instance.
  */
 struct CameraObservation
 {
-    // image size needs to be hard-coded here for shared memory time series to
-    // work correctly (serialized size must be fixed).
+    /**
+     * @brief Tag type to construct an observation without allocating an image.
+     *
+     * See @ref CameraObservation(NoImageAllocation).
+     */
+    struct NoImageAllocation
+    {
+    };
+
+    //! Default image width, used if nothing else is configured.
     static constexpr size_t width = 540;
+    //! Default image height, used if nothing else is configured.
     static constexpr size_t height = 540;
 
     cv::Mat image;
     double timestamp;
 
-    CameraObservation() : image(height, width, CV_8UC1), timestamp(0)
+    //! Create observation with image of the default size.
+    CameraObservation() : image(get_default_image_size(), CV_8UC1), timestamp(0)
+    {
+    }
+
+    //! Create observation with image of the given size.
+    CameraObservation(size_t image_width, size_t image_height)
+        : image(image_height, image_width, CV_8UC1), timestamp(0)
+    {
+    }
+
+    //! Create observation with image of the size specified in the camera info.
+    explicit CameraObservation(const CameraInfo& info)
+        : CameraObservation(info.image_width, info.image_height)
     {
     }
 
+    /**
+     * @brief Create observation with an empty image.
+     *
+     * Use this instead of the default constructor if the image is set
+     * afterwards anyway (e.g. to a buffer from an @ref ImageBufferPool), to
+     * avoid allocating an image buffer that is not used.
+     */
+    explicit CameraObservation(NoImageAllocation) : timestamp(0)
+    {
+    }
+
+    /**
+     * @brief Get the image size of default-constructed observations.
+     *
+     * Unless set via @ref set_default_image_size, the size is loaded from the
+     * ``camera_observation`` section of the configuration file (see @ref
+     * Settings) on first use.  If not configured, it defaults to @ref width x
+     * @ref height.
+     */
+    static cv::Size get_default_image_size();
+
+    /**
+     * @brief Set the image size of default-constructed observations.
+     *
+     * This needs to be called before creating multi-process sensor data and
+     * has to be set to the same value in all processes that access the data.
+     */
+    static void set_default_image_size(const cv::Size& size);
+
     template <class Archive>
     void serialize(Archive& archive)
     {
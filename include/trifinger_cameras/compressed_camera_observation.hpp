@@ -0,0 +1,144 @@
+/**
+ * @file
+ * @brief Camera observations with losslessly compressed images.
+ * @copyright 2020, Max Planck Gesellschaft. All rights reserved.
+ * @license BSD 3-clause
+ */
+#pragma once
+
+#include <array>
+#include <cstdint>
+#include <vector>
+
+#include <cereal/cereal.hpp>
+#include <cereal/types/array.hpp>
+
+#include <trifinger_cameras/camera_observation.hpp>
+#include <trifinger_cameras/tricamera_observation.hpp>
+
+namespace trifinger_cameras
+{
+/**
+ * @brief Camera observation with losslessly compressed image.
+ *
+ * The image is compressed to PNG (using the fastest compression level) and
+ * only decompressed on demand (see @ref decompress).
+ *
+ * Like for CameraObservation, the serialized size needs to be fixed for shared
+ * memory time series to work.  Therefore the compressed data is stored in a
+ * buffer of fixed capacity, which is determined at construction time.  If the
+ * compressed image does not fit into the buffer, the raw image is stored
+ * instead.  With the default capacity (see @ref get_default_capacity), the raw
+ * image always fits, so a frame that does not compress well (e.g. due to
+ * noise) cannot stop a backend.  With a smaller capacity, compressing such an
+ * image fails; images are never stored lossy.
+ */
+struct CompressedCameraObservation
+{
+    //! Encoding of the image data.
+    enum class Encoding : uint8_t
+    {
+        //! Uncompressed single-channel 8-bit image.
+        RAW = 0,
+        //! PNG-compressed image.
+        PNG = 1,
+    };
+
+    //! Timestamp when the image was acquired.
+    double timestamp = 0;
+    //! Width of the (uncompressed) image.
+    int image_width = 0;
+    //! Height of the (uncompressed) image.
+    int image_height = 0;
+    //! Encoding of @ref data.
+    Encoding encoding = Encoding::RAW;
+    //! Number of bytes of @ref data that are actually used.
+    uint32_t data_size = 0;
+    //! Buffer with the encoded image.  Its size is the capacity of the buffer.
+    std::vector<uint8_t> data;
+
+    //! Create observation with the default buffer capacity.
+    CompressedCameraObservation();
+
+    //! Create observation with the given buffer capacity (in bytes).
+    explicit CompressedCameraObservation(size_t capacity);
+
+    //! Create observation from the given uncompressed observation.
+    explicit CompressedCameraObservation(const CameraObservation& observation);
+
+    /**
+     * @brief Get the default buffer capacity.
+     *
+     * This is the size of a raw image of the default size (see
+     * CameraObservation::get_default_image_size), scaled by the
+     * ``compressed_capacity_ratio`` setting (see @ref Settings).
+     */
+    static size_t get_default_capacity();
+
+    /**
+     * @brief Compress the given observation.
+     *
+     * @throws std::invalid_argument if the image is not a single-channel 8-bit
+     *     image.
+     * @throws std::length_error if neither the compressed nor the raw image
+     *     fits into the buffer (only possible if the capacity is smaller than
+     *     the raw image).  The observation is not modified in this case.
+     */
+    void compress(const CameraObservation& observation);
+
+    //! Get the decompressed image.
+    cv::Mat decompress() const;
+
+    //! Get the corresponding uncompressed observation.
+    CameraObservation to_camera_observation() const;
+
+    template <class Archive>
+    void save(Archive& archive) const
+    {
+        uint32_t capacity = data.size();
+        archive(timestamp,
+                image_width,
+                image_height,
+                encoding,
+                data_size,
+                capacity,
+                cereal::binary_data(data.data(), capacity));
+    }
+
+    template <class Archive>
+    void load(Archive& archive)
+    {
+        uint32_t capacity;
+        archive(timestamp,
+                image_width,
+                image_height,
+                encoding,
+                data_size,
+                capacity);
+        data.resize(capacity);
+        archive(cereal::binary_data(data.data(), capacity));
+    }
+};
+
+//! An array of three CompressedCameraObservation(s)
+struct CompressedTriCameraObservation
+{
+    std::array<CompressedCameraObservation, 3> cameras;
+
+    CompressedTriCameraObservation() = default;
+
+    //! Compress the given observation.
+    explicit CompressedTriCameraObservation(
+        const TriCameraObservation& observation);
+
+    //! Get the corresponding uncompressed observation.
+    TriCameraObservation decompress() const;
+
+    template <class Archive>
+    void serialize(Archive& archive)
+    {
+        archive(cameras);
+    }
+};
+
+}  // namespace trifinger_cameras
@@ -0,0 +1,48 @@
+/**
+ * @file
+ * @brief Wrapper around a TriCamera driver that compresses the observations.
+ * @copyright 2020, Max Planck Gesellschaft. All rights reserved.
+ * @license BSD 3-clause
+ */
+#pragma once
+
+#include <memory>
+
+#include <robot_interfaces/sensors/sensor_driver.hpp>
+#include <trifinger_cameras/compressed_camera_observation.hpp>
+#include <trifinger_cameras/tricamera_observation.hpp>
+
+namespace trifinger_cameras
+{
+/**
+ * @brief Driver providing compressed observations of another TriCamera driver.
+ *
+ * Wraps any driver with TriCameraObservation and compresses the images of the
+ * observations it provides (the three images are compressed in parallel).
+ * This can be used to run a sensor backend with CompressedTriCameraObservation,
+ * to reduce the amount of data that is copied to and from shared memory.
+ */
+class CompressingTriCameraDriver
+    : public robot_interfaces::SensorDriver<CompressedTriCameraObservation,
+                                            TriCameraInfo>
+{
+public:
+    typedef robot_interfaces::SensorDriver<TriCameraObservation, TriCameraInfo>
+        WrappedDriver;
+
+    /**
+     * @param driver The driver whose observations are compressed.
+     */
+    CompressingTriCameraDriver(std::shared_ptr<WrappedDriver> driver);
+
+    //! Get the sensor info of the wrapped driver.
+    TriCameraInfo get_sensor_info() override;
+
+    //! Get observation from the wrapped driver and compress it.
+    CompressedTriCameraObservation get_observation() override;
+
+private:
+    std::shared_ptr<WrappedDriver> driver_;
+};
+
+}  // namespace trifinger_cameras
@@ -0,0 +1,73 @@
+/**
+ * @file
+ * @brief Pool of recyclable image buffers for camera observations.
+ * @copyright 2020, Max Planck Gesellschaft. All rights reserved.
+ * @license BSD 3-clause
+ */
+#pragma once
+
+#include <mutex>
+#include <vector>
+
+#include <opencv2/core.hpp>
+
+namespace trifinger_cameras
+{
+/**
+ * @brief Pool of image buffers that are reused once they are not referenced
+ * anymore.
+ *
+ * Drivers create a new image for every observation.  Instead of allocating a
+ * new buffer each time, they can get one from the pool.  The pool keeps a
+ * reference to all buffers it handed out and recycles a buffer once all other
+ * references to it (i.e. all observations using it and all their copies) are
+ * released.  This is determined using the reference counter of ``cv::Mat``, so
+ * no explicit release is needed.
+ *
+ * Note that a buffer is not recycled as long as any ``cv::Mat`` header refers
+ * to it.  For example, observations that are stored in a single-process time
+ * series keep their buffer until they are dropped from the time series.  If
+ * all buffers are in use and the pool reached its maximum size, a new
+ * (unpooled) image is allocated.
+ *
+ * Getting buffers is thread-safe.
+ */
+class ImageBufferPool
+{
+public:
+    //! Default for the maximum number of buffers in the pool.
+    static constexpr size_t DEFAULT_MAX_BUFFERS = 16;
+
+    /**
+     * @param max_buffers Maximum number of buffers kept in the pool.
+     */
+    explicit ImageBufferPool(size_t max_buffers = DEFAULT_MAX_BUFFERS);
+
+    /**
+     * @brief Get an image buffer of the given size and type.
+     *
+     * The content of the returned image is undefined (it may contain data of a
+     * previous frame).
+     *
+     * @param size Size of the image.
+     * @param type OpenCV type of the image (e.g. ``CV_8UC1``).
+     * @return Image that is not referenced anywhere else.
+     */
+    cv::Mat acquire(const cv::Size& size, int type);
+
+    //! Number of buffers currently held by the pool (in use or not).
+    size_t size() const;
+
+    //! Number of buffers that are currently not in use.
+    size_t num_available() const;
+
+private:
+    size_t max_buffers_;
+    std::vector<cv::Mat> buffers_;
+    mutable std::mutex mutex_;
+
+    //! Check if the buffer is only referenced by the pool.
+    static bool is_available(const cv::Mat& buffer);
+};
+
+}  // namespace trifinger_cameras
@@ -6,9 +6,16 @@
  */
 #pragma once
 
+#include <array>
+#include <atomic>
+#include <condition_variable>
+#include <mutex>
+#include <thread>
+
 #include <robot_interfaces/sensors/sensor_driver.hpp>
 #include <trifinger_cameras/camera_observation.hpp>
 #include <trifinger_cameras/camera_parameters.hpp>
+#include <trifinger_cameras/image_buffer_pool.hpp>
 
 namespace trifinger_cameras
 {
@@ -19,18 +26,83 @@ class OpenCVDriver
     : public robot_interfaces::SensorDriver<CameraObservation, CameraInfo>
 {
 public:
-    OpenCVDriver(int device_id);
+    /**
+     * @param device_id Index of the video capture device.
+     * @param background_capture If true, frames are continuously read from the
+     *     device in a separate thread and @ref get_observation returns the
+     *     newest one.  This avoids that the latency of the device read adds to
+     *     the latency of the observations and prevents frames from piling up
+     *     in the device buffer if the consumer is slow.
+     */
+    OpenCVDriver(int device_id, bool background_capture = false);
+
+    ~OpenCVDriver();
 
     /**
      * @brief Grab a single frame along with its timestamp.
      *
+     * If background capture is enabled, this waits until a frame is available
+     * that is newer than the one returned by the previous call and returns it.
+     * In this case, the timestamp is the time at which the frame was read from
+     * the device, not the time at which it is returned.
+     *
+     * The image of the returned observation is never modified by the driver
+     * afterwards, so observations can be kept (e.g. in a time series) without
+     * copying them.
+     *
      * @return Image frame consisting of an image matrix and the time at
      * which it was grabbed.
      */
     CameraObservation get_observation();
 
 private:
+    //! Number of frames in the ring buffer used for background capture.
+    static constexpr size_t CAPTURE_RING_SIZE = 3;
+
     cv::VideoCapture video_capture_;
+
+    //! Thread reading frames from the device (if background capture is
+    //! enabled).
+    std::thread capture_thread_;
+    //! Signals the capture thread to stop.
+    std::atomic<bool> stop_capture_thread_ = false;
+
+    //! Buffers for the images of the observations.
+    ImageBufferPool image_pool_;
+
+    //! Observations to which the capture thread writes.
+    std::array<CameraObservation, CAPTURE_RING_SIZE> capture_ring_ = {
+        CameraObservation(CameraObservation::NoImageAllocation{}),
+        CameraObservation(CameraObservation::NoImageAllocation{}),
+        CameraObservation(CameraObservation::NoImageAllocation{})};
+    //! Mutex protecting the members related to @ref capture_ring_.
+    std::mutex capture_mutex_;
+    //! Notifies about new frames in @ref capture_ring_.
+    std::condition_variable capture_cond_;
+    //! Position of the newest frame in @ref capture_ring_.
+    size_t newest_capture_index_ = 0;
+    //! Number of frames captured so far.
+    size_t capture_count_ = 0;
+    //! Value of @ref capture_count_ at the last call of @ref get_observation.
+    size_t last_returned_capture_count_ = 0;
+    //! Set if reading from the device failed in the capture thread.
+    bool capture_failed_ = false;
+
+    //! Buffer for the frame read from the device (before resizing).
+    cv::Mat capture_buffer_;
+
+    /**
+     * @brief Read a frame from the device into the given observation.
+     *
+     * The image of the observation is replaced by a buffer from @ref
+     * image_pool_, so previously returned observations are not modified.
+     *
+     * @return False if reading failed.
+     */
+    bool read_frame(CameraObservation* observation);
+
+    //! Loop of @ref capture_thread_.
+    void capture_loop();
 };
 
 }  // namespace trifinger_cameras
@@ -6,11 +6,19 @@
  */
 #pragma once
 
+#include <atomic>
+#include <condition_variable>
+#include <exception>
+#include <mutex>
+#include <optional>
+#include <thread>
+
 #include <pybind11/embed.h>
 
 #include <robot_interfaces/finger_types.hpp>
 #include <robot_interfaces/sensors/sensor_driver.hpp>
 #include <trifinger_cameras/camera_parameters.hpp>
+#include <trifinger_cameras/image_buffer_pool.hpp>
 #include <trifinger_cameras/settings.hpp>
 #include <trifinger_cameras/tricamera_observation.hpp>
 
@@ -28,6 +36,8 @@ public:
         bool render_images = true,
         Settings settings = Settings());
 
+    ~PyBulletTriCameraDriver();
+
     /**
      * @brief Get the camera parameters (image size and calibration
      * coefficients).
@@ -39,6 +49,11 @@ public:
 
     /**
      * @brief Get the latest observation from the three cameras
+     *
+     * If ``pipelined_rendering`` is enabled in the settings, the observation
+     * has been rendered in the background and this only waits until it is
+     * ready.
+     *
      * @return TricameraObservation
      */
     trifinger_cameras::TriCameraObservation get_observation() override;
@@ -63,8 +78,54 @@ private:
     //! Number of robot time steps after which the next frame should be fetched.
     int frame_rate_in_robot_steps_;
 
+    //! Time without robot progress after which the robot is considered stalled.
+    double robot_stall_timeout_s_;
+
+    //! Set while the robot is considered to be stalled (see @ref
+    //! wait_for_robot).
+    bool robot_stalled_ = false;
+
     //! Sensor info for the cameras.
     TriCameraInfo sensor_info_ = {};
+
+    //! Buffers for the images of the observations.
+    ImageBufferPool image_pool_;
+
+    //! If set, images are rendered in @ref render_thread_.
+    bool pipelined_rendering_;
+
+    //! Thread for rendering in the background (if pipelined rendering is
+    //! enabled).
+    std::thread render_thread_;
+    //! Signals the render thread to stop.
+    std::atomic<bool> stop_render_thread_ = false;
+    //! Mutex protecting @ref rendered_observation_ and @ref render_exception_.
+    std::mutex render_mutex_;
+    //! Notifies about changes of @ref rendered_observation_.
+    std::condition_variable render_cond_;
+    //! Queue of depth one to hand over rendered observations from the render
+    //! thread.
+    std::optional<TriCameraObservation> rendered_observation_;
+    //! Exception that occurred in the render thread (rethrown in
+    //! @ref get_observation).
+    std::exception_ptr render_exception_;
+
+    /**
+     * @brief Wait until the robot reached the time step of the next frame.
+     *
+     * Blocks on the robot observation time series until the robot reaches the
+     * time index ``last_update_robot_time_index_ +
+     * frame_rate_in_robot_steps_``.  If the robot does not make any progress
+     * for ``robot_stall_timeout_s_``, it is considered to be stalled and the
+     * method returns without reaching the target, to avoid a dead-lock.
+     */
+    void wait_for_robot();
+
+    //! Synchronise with the robot and render a new observation.
+    TriCameraObservation acquire_observation();
+
+    //! Loop of @ref render_thread_.
+    void render_loop();
 };
 
 }  // namespace trifinger_cameras
@@ -26,6 +26,7 @@
 #include <robot_interfaces/sensors/sensor_driver.hpp>
 #include <trifinger_cameras/camera_observation.hpp>
 #include <trifinger_cameras/camera_parameters.hpp>
+#include <trifinger_cameras/image_buffer_pool.hpp>
 #include <trifinger_cameras/settings.hpp>
 
 namespace trifinger_cameras
@@ -107,6 +108,8 @@ private:
     Pylon::PylonAutoInitTerm auto_init_term_;
     Pylon::CInstantCamera camera_;
     Pylon::CImageFormatConverter format_converter_;
+    //! Buffers for the images of the observations.
+    ImageBufferPool image_pool_;
 
     /**
      * @brief Base constructor to be called by public constructors.
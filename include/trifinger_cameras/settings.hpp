@@ -14,6 +14,48 @@
 
 namespace trifinger_cameras
 {
+//! Settings concerning the camera observations.
+struct CameraObservationSettings
+{
+    //! Name of the corresponding section in the config file
+    static constexpr std::string_view CONFIG_SECTION = "camera_observation";
+
+    /**
+     * @brief Width of the images in default-constructed camera observations.
+     *
+     * Observations in multi-process sensor data need to have a fixed size, so
+     * this needs to match with the image size provided by the cameras if
+     * multi-process data is used.  All processes accessing the data need to
+     * use the same value.
+     */
+    unsigned int image_width = 540;
+
+    //! Height of the images in default-constructed camera observations.
+    unsigned int image_height = 540;
+
+    /**
+     * @brief Capacity of the image buffer of compressed camera observations,
+     * relative to the size of the raw image.
+     *
+     * Compressed observations need a buffer of fixed size for the same reason
+     * as above.  With values below 1, the shared memory footprint is reduced
+     * but compressing an image that cannot be compressed sufficiently fails
+     * (see CompressedCameraObservation::compress).  With 1, images that cannot
+     * be compressed are stored raw.
+     */
+    float compressed_capacity_ratio = 1.0;
+
+    //! Width of the images in preview observations.
+    unsigned int preview_image_width = 180;
+
+    //! Height of the images in preview observations.
+    unsigned int preview_image_height = 180;
+
+    //! Load from TOML table, using default values for unspecified parameters.
+    static std::shared_ptr<CameraObservationSettings> load_from_toml(
+        const toml::table& config);
+};
+
 //! Settings of the PylonDriver.
 struct PylonDriverSettings
 {
@@ -43,13 +85,55 @@ struct TriCameraDriverSettings
      * Important: This must not be higher than ``AcquisitionFrameRate`` which is
      * defined in the Pylon settings file.
      */
-    float frame_rate_fps;
+    float frame_rate_fps = 10.0;
 
     //! Load from TOML table, using default values for unspecified parameters.
     static std::shared_ptr<TriCameraDriverSettings> load_from_toml(
         const toml::table& config);
 };
 
+//! Settings of the PyBulletTriCameraDriver.
+struct PyBulletTriCameraDriverSettings
+{
+    //! Name of the corresponding section in the config file
+    static constexpr std::string_view CONFIG_SECTION =
+        "pybullet_tricamera_driver";
+
+    /**
+     * @brief Time in seconds without any new robot step after which the robot
+     * is considered to be stalled.
+     *
+     * The driver waits for the robot to reach the time step of the next frame.
+     * If the robot does not make any progress for this amount of time, the
+     * driver stops waiting and renders a frame of the current state.  Thus
+     * camera observations are still provided at a rate of ``1 /
+     * robot_stall_timeout_s`` when the robot is not running.
+     */
+    float robot_stall_timeout_s = 0.1;
+
+    /**
+     * @brief Render images in a background thread.
+     *
+     * If enabled, rendering of the next frame is started in a separate thread
+     * as soon as the previous frame was returned by the driver.  This way the
+     * rendering runs in parallel to the processing of the previous observation
+     * in the back end, so the achievable frame rate is bounded by the render
+     * throughput rather than by render latency plus robot synchronisation.
+     */
+    bool pipelined_rendering = false;
+
+    /**
+     * @brief Render the three cameras in parallel in separate worker processes.
+     *
+     * See :py:mod:`trifinger_cameras.pybullet_render_workers`.
+     */
+    bool multi_process_rendering = false;
+
+    //! Load from TOML table, using default values for unspecified parameters.
+    static std::shared_ptr<PyBulletTriCameraDriverSettings> load_from_toml(
+        const toml::table& config);
+};
+
 /**
  * @brief Central class for loading settings.
  *
@@ -85,6 +169,10 @@ public:
     //! Load configuration from the specified file.
     Settings(const std::filesystem::path& file);
 
+    //! Get settings for the camera observations.
+    std::shared_ptr<const CameraObservationSettings>
+    get_camera_observation_settings();
+
     //! Get settings for the PylonDriver.
     std::shared_ptr<const PylonDriverSettings> get_pylon_driver_settings();
 
@@ -92,10 +180,17 @@ public:
     std::shared_ptr<const TriCameraDriverSettings>
     get_tricamera_driver_settings();
 
+    //! Get settings for the PyBulletTriCameraDriver.
+    std::shared_ptr<const PyBulletTriCameraDriverSettings>
+    get_pybullet_tricamera_driver_settings();
+
 private:
     toml::table config_;
+    std::shared_ptr<CameraObservationSettings> camera_observation_settings_;
     std::shared_ptr<PylonDriverSettings> pylon_driver_settings_;
     std::shared_ptr<TriCameraDriverSettings> tricamera_driver_settings_;
+    std::shared_ptr<PyBulletTriCameraDriverSettings>
+        pybullet_tricamera_driver_settings_;
 
     void parse_file(const std::filesystem::path& file);
 };
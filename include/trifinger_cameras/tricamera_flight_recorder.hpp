@@ -0,0 +1,149 @@
+/**
+ * @file
+ * @brief Continuous recording of TriCamera data with triggered dumps.
+ * @copyright 2020, Max Planck Gesellschaft. All rights reserved.
+ * @license BSD 3-clause
+ */
+#pragma once
+
+#include <condition_variable>
+#include <deque>
+#include <future>
+#include <memory>
+#include <mutex>
+#include <string>
+#include <vector>
+
+#include <robot_interfaces/sensors/sensor_data.hpp>
+
+#include <trifinger_cameras/camera_parameters.hpp>
+#include <trifinger_cameras/tricamera_logger.hpp>
+#include <trifinger_cameras/tricamera_observation.hpp>
+#include <trifinger_cameras/tricamera_recording_thread.hpp>
+
+namespace trifinger_cameras
+{
+/**
+ * @brief Keeps the last seconds of TriCamera data in memory and saves parts of
+ * it to HDF5 files on request.
+ *
+ * Other than the TriCameraLogger, which records into a linear buffer between
+ * start and stop, the flight recorder continuously records into a ring buffer
+ * holding the observations of the last ``buffer_duration_s`` seconds.  When
+ * something interesting happens, @ref trigger_dump saves the observations
+ * around that moment to a file.  This allows running for a long time while
+ * only storing the relevant parts of the data.
+ *
+ * Recording continues while dumps are written (this is done in background
+ * threads).  Observations are selected based on the timestamp of the first
+ * camera (i.e. the time at which the frame was acquired).
+ *
+ * Note that all observations of the ring buffer are held in memory, so the
+ * memory usage is roughly ``buffer_duration_s * frame_rate * 3 * image
+ * size``.
+ */
+class TriCameraFlightRecorder
+{
+public:
+    typedef std::shared_ptr<
+        robot_interfaces::SensorData<TriCameraObservation, TriCameraInfo>>
+        DataPtr;
+
+    /**
+     * @brief Start recording.
+     *
+     * @param sensor_data Sensor data of the cameras.
+     * @param buffer_duration_s Duration (in seconds) of the ring buffer.
+     */
+    TriCameraFlightRecorder(DataPtr sensor_data, double buffer_duration_s);
+
+    // not copyable because of the recording thread
+    TriCameraFlightRecorder(const TriCameraFlightRecorder &) = delete;
+    TriCameraFlightRecorder &operator=(const TriCameraFlightRecorder &) =
+        delete;
+
+    /**
+     * @brief Stop recording.
+     *
+     * Dumps that are still waiting for observations after the trigger are
+     * saved with the observations recorded so far.  Waits until all dumps are
+     * written.
+     */
+    ~TriCameraFlightRecorder();
+
+    /**
+     * @brief Save the observations around the current time to a HDF5 file.
+     *
+     * Saves all observations from ``pre_seconds`` before until
+     * ``post_seconds`` after the call.  The function returns immediately, the
+     * file is written in the background once the time ``post_seconds`` has
+     * passed.  Use the returned handle to wait for it.
+     *
+     * @param filename Path to the output file.  Existing files will be
+     *     overwritten.
+     * @param pre_seconds Duration before the trigger that is saved.  Must not
+     *     be longer than the duration of the ring buffer.
+     * @param post_seconds Duration after the trigger that is saved.
+     * @return Handle to monitor the progress and wait for completion.  The
+     *     number of frames is only known once all observations after the
+     *     trigger are recorded (it is zero until then).
+     */
+    TriCameraLogSaveHandle trigger_dump(const std::string &filename,
+                                        double pre_seconds,
+                                        double post_seconds);
+
+    //! Number of observations that are currently in the ring buffer.
+    size_t get_num_buffered_frames() const;
+
+    //! Number of observations that have been recorded so far.
+    size_t get_num_recorded_frames() const;
+
+    //! Duration of the ring buffer in seconds.
+    double get_buffer_duration() const;
+
+    /**
+     * @brief Wait until all triggered dumps are written.
+     *
+     * This includes waiting for the observations after the trigger, so it
+     * blocks until they are recorded.
+     */
+    void wait_for_pending_dumps();
+
+private:
+    //! Dump that is still collecting observations after the trigger.
+    struct PendingDump
+    {
+        double start_time;
+        double end_time;
+        TriCameraInfo info;
+        std::vector<StampedTriCameraObservation> observations;
+        std::shared_ptr<TriCameraLogSaveHandle::State> state;
+        std::shared_ptr<std::promise<void>> promise;
+    };
+
+    DataPtr sensor_data_;
+    double buffer_duration_s_;
+
+    //! Observations of the last @ref buffer_duration_s_ seconds.
+    std::deque<StampedTriCameraObservation> buffer_;
+    //! Dumps that wait for the observations after their trigger.
+    std::vector<PendingDump> pending_dumps_;
+    //! Protects @ref buffer_ and @ref pending_dumps_.
+    mutable std::mutex buffer_mutex_;
+    //! Notifies about changes of @ref pending_dumps_.
+    std::condition_variable pending_dumps_cond_;
+
+    //! Futures of the dumps that are written in the background.
+    std::vector<std::future<void>> writes_;
+    std::mutex writes_mutex_;
+
+    std::unique_ptr<TriCameraRecordingThread> recording_thread_;
+
+    //! Add observation to the buffer and to the pending dumps.
+    void add_observation(StampedTriCameraObservation &&observation);
+
+    //! Start writing the dump to its file in the background.
+    void start_writing(PendingDump &&dump);
+};
+
+}  // namespace trifinger_cameras
@@ -0,0 +1,122 @@
+/**
+ * @file
+ * @brief Sequential reader for binary TriCamera log files.
+ * @copyright 2020, Max Planck Gesellschaft. All rights reserved.
+ * @license BSD 3-clause
+ */
+#pragma once
+
+#include <array>
+#include <cstdint>
+#include <fstream>
+#include <istream>
+#include <memory>
+#include <string>
+#include <vector>
+
+#include <boost/iostreams/filtering_stream.hpp>
+#include <cereal/archives/binary.hpp>
+
+#include <trifinger_cameras/tricamera_logger.hpp>
+#include <trifinger_cameras/tricamera_observation.hpp>
+
+namespace trifinger_cameras
+{
+/**
+ * @brief Reads a binary TriCamera log one observation at a time.
+ *
+ * Reads the files written by robot_interfaces::SensorLogger::stop_and_save.
+ * Other than robot_interfaces::SensorLogReader, which loads the whole log into
+ * memory, the observations are read sequentially, so memory usage does not
+ * depend on the length of the log.
+ *
+ * The log consists of the format version and the list of (timestamp,
+ * observation) tuples recorded by the logger, serialized with cereal and
+ * optionally compressed with gzip.
+ */
+class TriCameraLogStreamReader
+{
+public:
+    //! Timestamps of an observation (see @ref read_timestamps).
+    struct Timestamps
+    {
+        //! Time at which the observation was added to the sensor data.
+        double timeseries_timestamp;
+        //! Timestamps of the cameras.
+        std::array<double, 3> camera_timestamps;
+    };
+
+    //! Format version of the log files written by the SensorLogger.
+    static constexpr std::uint32_t FORMAT_VERSION = 2;
+
+    /**
+     * @param filename Path to the log file.
+     *
+     * @throws std::runtime_error If the file cannot be opened or has an
+     *     unsupported format.
+     */
+    explicit TriCameraLogStreamReader(const std::string &filename);
+
+    //! Total number of observations in the log.
+    size_t size() const;
+
+    //! Number of observations that have been read so far.
+    size_t num_read() const;
+
+    //! True if the log is gzip-compressed.
+    bool is_compressed() const;
+
+    /**
+     * @brief Read the next observation.
+     *
+     * @throws std::out_of_range If all observations have been read.
+     */
+    StampedTriCameraObservation read();
+
+    /**
+     * @brief Read only the timestamps of the next observation.
+     *
+     * The image data is skipped without decoding it.  For uncompressed logs,
+     * it is not even read from disk.
+     *
+     * @throws std::out_of_range If all observations have been read.
+     */
+    Timestamps read_timestamps();
+
+    /**
+     * @brief Size of the images of the last observation that was read.
+     *
+     * Width and height of the image of the first camera.  Zero if nothing
+     * has been read yet.
+     */
+    std::array<int, 2> get_image_size() const;
+
+private:
+    std::ifstream file_;
+    boost::iostreams::filtering_istream decompressed_;
+    //! Stream from which the archive reads (file or decompressed stream).
+    std::istream *stream_;
+    std::unique_ptr<cereal::BinaryInputArchive> archive_;
+    bool is_compressed_ = false;
+    std::uint64_t num_observations_ = 0;
+    size_t num_read_ = 0;
+    std::array<int, 2> image_size_ = {0, 0};
+
+    void check_not_at_end() const;
+};
+
+/**
+ * @brief Read all timestamps of a binary TriCamera log, skipping the images.
+ *
+ * @param filename Path to the log file.
+ * @param[out] timeseries_timestamps Timestamps of when the observations were
+ *     added to the sensor data.
+ * @param[out] camera_timestamps Timestamps of the cameras (one array per
+ *     observation).
+ */
+void read_tricamera_log_timestamps(
+    const std::string &filename,
+    std::vector<double> *timeseries_timestamps,
+    std::vector<std::array<double, 3>> *camera_timestamps);
+
+}  // namespace trifinger_cameras
@@ -0,0 +1,45 @@
+/**
+ * @file
+ * @brief Streaming conversion of binary TriCamera logs to HDF5.
+ * @copyright 2020, Max Planck Gesellschaft. All rights reserved.
+ * @license BSD 3-clause
+ */
+#pragma once
+
+#include <functional>
+#include <string>
+
+#include <trifinger_cameras/camera_parameters.hpp>
+
+namespace trifinger_cameras
+{
+/**
+ * @brief Convert a binary TriCamera log to a TriCamera HDF5 file.
+ *
+ * The log is read one observation at a time and each observation is written
+ * right away, so memory usage does not depend on the length of the log.  The
+ * compression of the images (which is by far the most expensive part) is
+ * done in parallel by several worker threads.  The compressed chunks are then
+ * written directly to the HDF5 file, bypassing the (single-threaded)
+ * compression filter of the HDF5 library.  The resulting file is the same as
+ * the one written by TriCameraLogger::stop_and_save_hdf5.
+ *
+ * @param logfile Path to the binary log file.
+ * @param outfile Path to the output file.  Existing files will be
+ *     overwritten.
+ * @param info Camera information that is stored in the file.  The image size
+ *     needs to match the images in the log.
+ * @param num_threads Number of threads used for compression.  Use the number
+ *     of CPU cores if zero.
+ * @param progress_callback If set, it is called after each written
+ *     observation with the number of written observations and the total
+ *     number of observations.
+ */
+void convert_tricamera_log_to_hdf5(
+    const std::string &logfile,
+    const std::string &outfile,
+    const TriCameraInfo &info,
+    unsigned int num_threads = 0,
+    const std::function<void(size_t, size_t)> &progress_callback = nullptr);
+
+}  // namespace trifinger_cameras
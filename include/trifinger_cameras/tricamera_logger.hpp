@@ -1,5 +1,14 @@
 #pragma once
 
+#include <atomic>
+#include <future>
+#include <memory>
+#include <mutex>
+#include <string>
+#include <tuple>
+#include <vector>
+
+#include <opencv2/hdf/hdf5.hpp>
 #include <robot_interfaces/sensors/sensor_logger.hpp>
 
 #include <trifinger_cameras/camera_parameters.hpp>
@@ -7,19 +16,214 @@
 
 namespace trifinger_cameras
 {
+//! Observation with the timestamp of when it was added to the sensor data.
+typedef std::tuple<double, TriCameraObservation> StampedTriCameraObservation;
+
+//! Name of the image dataset in TriCamera HDF5 files.
+inline const std::string TRICAMERA_HDF5_DS_IMAGES = "images";
+//! Name of the dataset with the camera timestamps in TriCamera HDF5 files.
+inline const std::string TRICAMERA_HDF5_DS_CAMERA_TIMESTAMPS = "timestamps";
+//! Name of the dataset with the sensor data timestamps in TriCamera HDF5 files.
+inline const std::string TRICAMERA_HDF5_DS_TIMESERIES_TIMESTAMPS =
+    "sensor_data_timestamps";
+//! Level of the gzip compression of the images in TriCamera HDF5 files.
+constexpr int TRICAMERA_HDF5_COMPRESSION_LEVEL = 4;
+
+/**
+ * @brief Create a TriCamera HDF5 file with empty datasets.
+ *
+ * Writes the attributes and camera information and creates the datasets for
+ * the observations (see the documentation of the TriCameraLogger HDF5 format).
+ * The images are stored in chunks of one observation (i.e. the images of all
+ * three cameras), compressed with gzip.
+ *
+ * @param filename Path to the output file.  Existing files will be
+ *     overwritten.
+ * @param info Camera information that is stored in the file.  If the frame
+ *     rate is NaN (i.e. unknown), it is not stored.
+ * @param num_frames Number of observations for which the datasets are
+ *     created.
+ * @param image_width Width of the images.
+ * @param image_height Height of the images.
+ * @return The opened file.
+ */
+cv::Ptr<cv::hdf::HDF5> create_tricamera_hdf5(const std::string &filename,
+                                             const TriCameraInfo &info,
+                                             int num_frames,
+                                             int image_width,
+                                             int image_height);
+
+/**
+ * @brief Save TriCamera observations to a HDF5 file.
+ *
+ * See the documentation of the TriCameraLogger HDF5 format for the structure
+ * of the file.
+ *
+ * @param filename Path to the output file.  Existing files will be
+ *     overwritten.
+ * @param observations The observations that are saved.  Must not be empty.
+ * @param info Camera information that is stored in the file.
+ * @param num_frames_written If set, it is updated with the number of
+ *     observations that have been written so far.
+ */
+void save_tricamera_observations_hdf5(
+    const std::string &filename,
+    const std::vector<StampedTriCameraObservation> &observations,
+    const TriCameraInfo &info,
+    std::atomic<size_t> *num_frames_written = nullptr);
+
+/**
+ * @brief Handle to a log file that is saved in the background.
+ *
+ * Returned by @ref TriCameraLogger::stop_and_save_hdf5_async.  Can be used to
+ * monitor the progress and to wait until the file is written.
+ */
+class TriCameraLogSaveHandle
+{
+public:
+    //! Path of the file that is written.
+    const std::string &get_filename() const;
+
+    /**
+     * @brief Total number of frames that are saved.
+     *
+     * For dumps of the TriCameraFlightRecorder, this is zero until all
+     * observations after the trigger are recorded.
+     */
+    size_t get_num_frames() const;
+
+    //! Number of frames that have been written so far.
+    size_t get_num_frames_written() const;
+
+    //! Fraction of the frames that have been written so far (in [0, 1]).
+    double get_progress() const;
+
+    //! Check if saving is finished (successfully or with an error).
+    bool is_done() const;
+
+    /**
+     * @brief Wait until saving is finished.
+     *
+     * @param timeout_s Maximum time to wait in seconds.  Wait indefinitely if
+     *     negative.
+     * @return True if saving is finished, false if the timeout expired.
+     */
+    bool wait(double timeout_s = -1) const;
+
+    /**
+     * @brief Wait until saving is finished and rethrow errors that occurred.
+     */
+    void get() const;
+
+private:
+    friend class TriCameraLogger;
+    friend class TriCameraFlightRecorder;
+
+    struct State
+    {
+        std::string filename;
+        std::atomic<size_t> num_frames{0};
+        std::atomic<size_t> num_frames_written{0};
+    };
+
+    std::shared_ptr<State> state_;
+    std::shared_future<void> future_;
+
+    TriCameraLogSaveHandle(std::shared_ptr<State> state,
+                           std::shared_future<void> future);
+};
+
 /**
  * @brief Logger for TriCamera observations with option to save to HDF5 file.
  *
  * Extends the generic robot_interfaces::SensorLogger with a method @ref
  * stop_and_save_hdf5, which saves the data to an HDF5 file instead of the
- * native binary format.
+ * native binary format, and @ref stop_and_save_hdf5_async, which does the
+ * same in the background.
+ *
+ * The size of the buffer can be given as number of frames or as memory
+ * budget in bytes (see @ref MemoryBudget) and the current usage of the
+ * buffer can be monitored with @ref get_buffer_usage.
  */
 class TriCameraLogger
     : public robot_interfaces::SensorLogger<TriCameraObservation, TriCameraInfo>
 {
 public:
-    using robot_interfaces::SensorLogger<TriCameraObservation,
-                                         TriCameraInfo>::SensorLogger;
+    typedef robot_interfaces::SensorLogger<TriCameraObservation, TriCameraInfo>
+        Base;
+
+    //! Size of the buffer given as memory budget in bytes.
+    struct MemoryBudget
+    {
+        size_t bytes;
+    };
+
+    //! Usage of the logger buffer.
+    struct BufferUsage
+    {
+        //! Number of frames in the buffer.
+        size_t num_frames;
+        //! Maximum number of frames in the buffer.
+        size_t capacity_frames;
+        //! Fraction of the buffer that is used (in [0, 1]).
+        double fill_level;
+        //! Memory used by the frames in the buffer (in bytes).
+        size_t bytes_used;
+        //! Memory needed by a full buffer (in bytes).
+        size_t bytes_capacity;
+        //! Number of frames that were not logged because the buffer was full.
+        size_t frames_dropped;
+    };
+
+    /**
+     * @param sensor_data Sensor data of the cameras.
+     * @param buffer_limit Maximum number of frames that are logged.
+     */
+    TriCameraLogger(DataPtr sensor_data, size_t buffer_limit);
+
+    /**
+     * @brief Create logger with a buffer that fits in the given memory budget.
+     *
+     * The memory needed per frame is determined based on the image sizes in
+     * the sensor info (see @ref get_bytes_per_frame), so this blocks until the
+     * sensor info is available.
+     *
+     * @param sensor_data Sensor data of the cameras.
+     * @param memory_budget Maximum memory used by the buffer.
+     */
+    TriCameraLogger(DataPtr sensor_data, MemoryBudget memory_budget);
+
+    //! Waits until all files that are saved in the background are written.
+    ~TriCameraLogger();
+
+    /**
+     * @brief Memory needed to log one frame with the given camera info (in
+     * bytes).
+     *
+     * This is the size of the images plus the overhead of the observation
+     * structure.
+     */
+    static size_t get_bytes_per_frame(const TriCameraInfo &info);
+
+    //! Start logging, beginning with the newest observation.
+    void start();
+
+    //! Stop logging.
+    void stop();
+
+    //! Stop logging and save logged messages to a file (native format).
+    void stop_and_save(const std::string &filename);
+
+    /**
+     * @brief Get the current usage of the buffer.
+     *
+     * Refers to the data logged since the last call of @ref start.  While
+     * logging, the values are derived from the time indices of the sensor
+     * data, so the number of frames may slightly overestimate the actual
+     * fill level if the logger lags behind.
+     */
+    BufferUsage get_buffer_usage() const;
+
     /**
      * @brief Stop logging and save logged messages to a HDF5 file.
      *
@@ -27,5 +231,51 @@ public:
      *     overwritten.
      */
     void stop_and_save_hdf5(const std::string &filename);
+
+    /**
+     * @brief Stop logging and save logged messages to a HDF5 file in the
+     * background.
+     *
+     * The logged messages are moved to a background thread, which writes them
+     * to the file, and the logger gets a fresh, empty buffer.  This means
+     * that logging can be restarted (using @ref start) right away, without
+     * waiting for the file to be written.  Note that the memory of the old
+     * buffer is only released once the file is written, so while logging
+     * during a pending save, up to two full buffers are held in memory.
+     *
+     * Errors that occur while writing the file are rethrown by @ref
+     * TriCameraLogSaveHandle::get.
+     *
+     * @param filename Path to the output file.  Existing files will be
+     *     overwritten.
+     * @return Handle to monitor the progress and wait for completion.
+     */
+    TriCameraLogSaveHandle stop_and_save_hdf5_async(
+        const std::string &filename);
+
+    //! Wait until all files that are saved in the background are written.
+    void wait_for_pending_saves();
+
+private:
+    //! Maximum number of frames in the buffer.
+    size_t buffer_limit_;
+    //! Memory per frame (see @ref get_bytes_per_frame).  Determined on first
+    //! use, as the sensor info may not be available at construction.
+    mutable std::atomic<size_t> bytes_per_frame_ = 0;
+    //! Time index at which logging was started (EMPTY if nothing is logged).
+    std::atomic<time_series::Index> start_timeindex_ = time_series::EMPTY;
+    //! Newest time index when logging was stopped (EMPTY while logging).
+    std::atomic<time_series::Index> stop_timeindex_ = time_series::EMPTY;
+
+    //! Futures of the saves that are running in the background.
+    std::vector<std::shared_future<void>> pending_saves_;
+    std::mutex pending_saves_mutex_;
+
+    /**
+     * @brief Stop logging and take the logged messages out of the logger.
+     *
+     * The logger's buffer is replaced by an empty one with the same capacity.
+     */
+    std::vector<StampedTriCameraObservation> stop_and_take_buffer();
 };
 }  // namespace trifinger_cameras
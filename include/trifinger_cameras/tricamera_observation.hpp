@@ -18,6 +18,26 @@ struct TriCameraObservation
 {
     std::array<CameraObservation, 3> cameras;
 
+    //! Create observation with images of the default size.
+    TriCameraObservation() = default;
+
+    //! Create observation with image sizes specified in the camera info.
+    explicit TriCameraObservation(const TriCameraInfo& info)
+        : cameras{CameraObservation(info.camera[0]),
+                  CameraObservation(info.camera[1]),
+                  CameraObservation(info.camera[2])}
+    {
+    }
+
+    //! Create observation with empty images (see
+    //! CameraObservation::NoImageAllocation).
+    explicit TriCameraObservation(CameraObservation::NoImageAllocation tag)
+        : cameras{CameraObservation(tag),
+                  CameraObservation(tag),
+                  CameraObservation(tag)}
+    {
+    }
+
     template <class Archive>
     void serialize(Archive& archive)
     {
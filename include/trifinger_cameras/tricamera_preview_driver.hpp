@@ -0,0 +1,67 @@
+/**
+ * @file
+ * @brief Driver providing previews of the frames of another TriCamera backend.
+ * @copyright 2020, Max Planck Gesellschaft. All rights reserved.
+ * @license BSD 3-clause
+ */
+#pragma once
+
+#include <memory>
+
+#include <robot_interfaces/sensors/sensor_data.hpp>
+#include <robot_interfaces/sensors/sensor_driver.hpp>
+#include <robot_interfaces/sensors/sensor_frontend.hpp>
+#include <trifinger_cameras/tricamera_observation.hpp>
+#include <trifinger_cameras/tricamera_preview_observation.hpp>
+
+namespace trifinger_cameras
+{
+/**
+ * @brief Driver that creates low-resolution colour previews of the frames of
+ * a TriCamera backend.
+ *
+ * Instead of accessing the cameras directly, this driver reads the
+ * full-resolution observations from the sensor data of a running TriCamera
+ * backend, demosaics them and scales them down to the preview size (see
+ * TriCameraPreviewObservation::get_default_image_size).  Run it with a
+ * separate backend to publish a preview time series alongside the full frames.
+ */
+class TriCameraPreviewDriver
+    : public robot_interfaces::SensorDriver<TriCameraPreviewObservation,
+                                            TriCameraInfo>
+{
+public:
+    typedef std::shared_ptr<
+        robot_interfaces::SensorData<TriCameraObservation, TriCameraInfo>>
+        FullDataPtr;
+
+    /**
+     * @param full_data Sensor data of the backend providing the full-resolution
+     *     observations.
+     */
+    TriCameraPreviewDriver(FullDataPtr full_data);
+
+    /**
+     * @brief Get the sensor info of the full-resolution data, adjusted to the
+     * preview image size.
+     */
+    TriCameraInfo get_sensor_info() override;
+
+    /**
+     * @brief Wait for the next full-resolution observation and return its
+     * preview.
+     *
+     * If previews are created slower than new frames arrive, frames are
+     * skipped (i.e. always the newest frame is used).
+     */
+    TriCameraPreviewObservation get_observation() override;
+
+private:
+    robot_interfaces::SensorFrontend<TriCameraObservation, TriCameraInfo>
+        frontend_;
+
+    //! Time index of the next frame that is expected.
+    time_series::Index next_timeindex_ = 0;
+};
+
+}  // namespace trifinger_cameras
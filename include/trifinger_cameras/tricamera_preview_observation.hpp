@@ -0,0 +1,47 @@
+/**
+ * @file
+ * @brief Observation with low-resolution colour previews of the three cameras.
+ * @copyright 2020, Max Planck Gesellschaft. All rights reserved.
+ * @license BSD 3-clause
+ */
+#pragma once
+
+#include <array>
+
+#include "camera_observation.hpp"
+
+namespace trifinger_cameras
+{
+/**
+ * @brief Downsampled, demosaiced (BGR) images of the three cameras.
+ *
+ * Meant for consumers that only need small previews (e.g. monitoring tools),
+ * so they don't need to access the full-resolution Bayer images.  See
+ * TriCameraPreviewDriver.
+ */
+struct TriCameraPreviewObservation
+{
+    //! Observations of the three cameras.  The images are of type CV_8UC3.
+    std::array<CameraObservation, 3> cameras;
+
+    //! Create observation with BGR images of the default preview size.
+    TriCameraPreviewObservation();
+
+    /**
+     * @brief Get the image size of default-constructed preview observations.
+     *
+     * The size is loaded from the ``camera_observation`` section of the
+     * configuration file (see @ref Settings) on first use.  As for
+     * CameraObservation, it needs to be the same in all processes accessing
+     * multi-process data.
+     */
+    static cv::Size get_default_image_size();
+
+    template <class Archive>
+    void serialize(Archive& archive)
+    {
+        archive(cameras);
+    }
+};
+
+}  // namespace trifinger_cameras
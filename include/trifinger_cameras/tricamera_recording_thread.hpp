@@ -0,0 +1,88 @@
+/**
+ * @file
+ * @brief Thread passing all TriCamera observations to a callback.
+ * @copyright 2020, Max Planck Gesellschaft. All rights reserved.
+ * @license BSD 3-clause
+ */
+#pragma once
+
+#include <atomic>
+#include <functional>
+#include <memory>
+#include <thread>
+
+#include <robot_interfaces/sensors/sensor_data.hpp>
+
+#include <trifinger_cameras/camera_parameters.hpp>
+#include <trifinger_cameras/tricamera_logger.hpp>
+#include <trifinger_cameras/tricamera_observation.hpp>
+
+namespace trifinger_cameras
+{
+//! Camera timestamp (of the first camera) of the observation.
+double get_camera_timestamp(const StampedTriCameraObservation &observation);
+
+/**
+ * @brief Records all observations of the sensor data in a background thread.
+ *
+ * Recording starts with the newest observation at the time of construction.
+ * Each observation is passed to the callback (together with the timestamp of
+ * when it was added to the sensor data), in the order of their time indices.
+ * If recording falls so far behind that observations are not in the sensor
+ * data anymore, they are skipped and counted as dropped.
+ *
+ * Used by the recorders that need every observation (TriCameraFlightRecorder
+ * and TriCameraSegmentedLogger).
+ */
+class TriCameraRecordingThread
+{
+public:
+    typedef std::shared_ptr<
+        robot_interfaces::SensorData<TriCameraObservation, TriCameraInfo>>
+        DataPtr;
+    typedef std::function<void(StampedTriCameraObservation &&)> Callback;
+
+    /**
+     * @brief Start recording.
+     *
+     * @param sensor_data Sensor data of the cameras.
+     * @param callback Called in the recording thread for each observation.
+     */
+    TriCameraRecordingThread(DataPtr sensor_data, Callback callback);
+
+    // not copyable because of the thread
+    TriCameraRecordingThread(const TriCameraRecordingThread &) = delete;
+    TriCameraRecordingThread &operator=(const TriCameraRecordingThread &) =
+        delete;
+
+    //! Stops recording (see @ref stop).
+    ~TriCameraRecordingThread();
+
+    /**
+     * @brief Stop recording and wait until the thread is finished.
+     *
+     * The callback is not called anymore once this returns.
+     */
+    void stop();
+
+    //! Number of observations that have been recorded so far.
+    size_t get_num_recorded_frames() const;
+
+    //! Number of observations that were dropped because recording was too
+    //! slow.
+    size_t get_num_dropped_frames() const;
+
+private:
+    DataPtr sensor_data_;
+    Callback callback_;
+
+    std::thread thread_;
+    std::atomic<bool> stop_thread_ = false;
+    std::atomic<size_t> num_recorded_frames_ = 0;
+    std::atomic<size_t> num_dropped_frames_ = 0;
+
+    //! Loop of @ref thread_.
+    void loop(time_series::Index start_timeindex);
+};
+
+}  // namespace trifinger_cameras
@@ -0,0 +1,198 @@
+/**
+ * @file
+ * @brief Logger writing TriCamera data to a sequence of HDF5 files.
+ * @copyright 2020, Max Planck Gesellschaft. All rights reserved.
+ * @license BSD 3-clause
+ */
+#pragma once
+
+#include <condition_variable>
+#include <deque>
+#include <exception>
+#include <filesystem>
+#include <memory>
+#include <mutex>
+#include <string>
+#include <thread>
+#include <vector>
+
+#include <robot_interfaces/sensors/sensor_data.hpp>
+
+#include <trifinger_cameras/camera_parameters.hpp>
+#include <trifinger_cameras/tricamera_logger.hpp>
+#include <trifinger_cameras/tricamera_observation.hpp>
+#include <trifinger_cameras/tricamera_recording_thread.hpp>
+
+namespace trifinger_cameras
+{
+/**
+ * @brief Logger for long recordings, which splits the data into segments.
+ *
+ * Records all observations of the sensor data and splits them into segments
+ * of limited duration and/or size.  Each segment is written to a separate,
+ * self-contained HDF5 file (same format as written by
+ * TriCameraLogger::stop_and_save_hdf5) in a background thread, while
+ * recording continues.  Observations are assigned to segments one by one, so
+ * no frames are lost at segment boundaries.
+ *
+ * For an output path ``<dir>/<name>.hdf5``, the segments are written to
+ * ``<dir>/<name>_0000.hdf5``, ``<dir>/<name>_0001.hdf5``, etc.  A manifest
+ * ``<dir>/<name>_manifest.json`` lists the segments.  It is updated after
+ * every written segment, so after a crash it contains all segments that were
+ * completed until then.
+ *
+ * Finished segments are kept in memory until they are written.  To bound the
+ * memory usage, at most ``max_pending_segments`` segments wait to be written.
+ * If writing is slower than recording, recording stalls until a segment has
+ * been written.  Observations that are overwritten in the sensor data in the
+ * meantime are dropped and counted (see @ref get_num_dropped_frames and
+ * ``frames_dropped`` in the manifest).
+ *
+ * Each call of @ref start begins a new recording: the segment numbers, the
+ * list of segments and the frame counters start from zero again, so the
+ * files of a previous recording with the same output path are overwritten.
+ */
+class TriCameraSegmentedLogger
+{
+public:
+    typedef std::shared_ptr<
+        robot_interfaces::SensorData<TriCameraObservation, TriCameraInfo>>
+        DataPtr;
+
+    //! Information about a segment that has been written.
+    struct Segment
+    {
+        //! Path of the segment file.
+        std::filesystem::path filename;
+        //! Number of observations in the segment.
+        size_t num_frames;
+        //! Camera timestamp of the first observation.
+        double first_timestamp;
+        //! Camera timestamp of the last observation.
+        double last_timestamp;
+    };
+
+    /**
+     * @param sensor_data Sensor data of the cameras.
+     * @param output_path Base path of the output files (see class
+     *     description).  Existing files will be overwritten.
+     * @param segment_seconds Maximum duration of a segment in seconds (based
+     *     on the camera timestamps).  Not limited if zero.
+     * @param segment_max_bytes Maximum size of the image data of a segment in
+     *     bytes.  This is the uncompressed size, so the actual files are
+     *     smaller.  Not limited if zero.
+     * @param max_pending_segments Maximum number of finished segments that are
+     *     kept in memory while waiting to be written (see class description).
+     */
+    TriCameraSegmentedLogger(DataPtr sensor_data,
+                             const std::filesystem::path &output_path,
+                             double segment_seconds,
+                             size_t segment_max_bytes,
+                             size_t max_pending_segments = 2);
+
+    // not copyable because of the threads
+    TriCameraSegmentedLogger(const TriCameraSegmentedLogger &) = delete;
+    TriCameraSegmentedLogger &operator=(const TriCameraSegmentedLogger &) =
+        delete;
+
+    //! Stops logging (see @ref stop).
+    ~TriCameraSegmentedLogger();
+
+    /**
+     * @brief Start a new recording, beginning with the newest observation.
+     *
+     * Segments of a previous recording are forgotten (see class
+     * description).  Does nothing if logging is already running.
+     */
+    void start();
+
+    /**
+     * @brief Stop logging and wait until all segments are written.
+     *
+     * @throws std::exception Errors that occurred while writing segments are
+     *     rethrown here.
+     */
+    void stop();
+
+    //! Segments that have been written so far.
+    std::vector<Segment> get_segments() const;
+
+    //! Path of the manifest file.
+    std::filesystem::path get_manifest_path() const;
+
+    //! Number of observations that have been recorded so far (in the current
+    //! or last recording).
+    size_t get_num_recorded_frames() const;
+
+    /**
+     * @brief Number of observations that were dropped.
+     *
+     * Observations are dropped if the logger falls so far behind that they
+     * are not in the sensor data anymore when it gets to them (e.g. because
+     * recording stalled while waiting for segments to be written).
+     */
+    size_t get_num_dropped_frames() const;
+
+private:
+    //! Observations of one segment that are waiting to be written.
+    struct PendingSegment
+    {
+        size_t index;
+        TriCameraInfo info;
+        std::vector<StampedTriCameraObservation> observations;
+    };
+
+    DataPtr sensor_data_;
+    std::filesystem::path output_path_;
+    double segment_seconds_;
+    size_t segment_max_bytes_;
+    size_t max_pending_segments_;
+
+    //! Records the observations (null before the first @ref start).
+    std::unique_ptr<TriCameraRecordingThread> recording_thread_;
+    //! Whether logging is running.
+    bool is_running_ = false;
+
+    //! Observations of the segment that is currently recorded.
+    PendingSegment current_segment_;
+    //! Size of the image data in @ref current_segment_.
+    size_t current_segment_bytes_ = 0;
+    //! Index of the next segment.
+    size_t next_segment_index_ = 0;
+
+    std::thread write_thread_;
+    //! Segments that wait to be written (at most @ref max_pending_segments_).
+    std::deque<PendingSegment> write_queue_;
+    //! Set when no more segments are added to @ref write_queue_.
+    bool write_queue_closed_ = false;
+    //! Segments that have been written.
+    std::vector<Segment> segments_;
+    //! Error that occurred in the write thread.
+    std::exception_ptr write_exception_;
+    //! Protects @ref write_queue_, @ref write_queue_closed_, @ref segments_
+    //! and @ref write_exception_.
+    mutable std::mutex write_mutex_;
+    //! Notifies about changes of @ref write_queue_.
+    std::condition_variable write_cond_;
+
+    //! Loop of @ref write_thread_.
+    void write_loop();
+
+    //! Add an observation to the current segment, starting a new one if needed.
+    void add_observation(StampedTriCameraObservation &&observation);
+
+    /**
+     * @brief Pass the current segment to the write thread and start a new one.
+     *
+     * Blocks while @ref write_queue_ is full.
+     */
+    void finish_current_segment();
+
+    //! Path of the file of the segment with the given index.
+    std::filesystem::path get_segment_path(size_t index) const;
+
+    //! Write the manifest file (needs to be called with @ref write_mutex_).
+    void write_manifest(bool complete) const;
+};
+
+}  // namespace trifinger_cameras
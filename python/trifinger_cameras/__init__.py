@@ -2,6 +2,8 @@
 # F401 = unused import, F403 = complaint about `import *`.
 from . import py_camera_types as camera  # noqa: F401
 from . import py_tricamera_types as tricamera  # noqa: F401
+from . import py_compressed_tricamera_types as compressed_tricamera  # noqa: F401
+from . import py_tricamera_preview_types as tricamera_preview  # noqa: F401
 
 #: Names of the TriFinger cameras in the order in which they are usually handled.
 CAMERA_NAMES = ("camera60", "camera180", "camera300")
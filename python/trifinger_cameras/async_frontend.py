@@ -0,0 +1,198 @@
+"""asyncio-compatible access to camera observations.
+
+:class:`AsyncFrontend` wraps the ``Frontend`` of one of the camera modules (e.g.
+:mod:`trifinger_cameras.tricamera`) and provides coroutines to wait for new
+observations.
+
+Waiting is done in a dedicated thread of each frontend, which blocks on the
+notification of the time series (with the GIL released) instead of polling.  The
+event loop is thus not blocked and many camera streams can be served by one event
+loop.
+
+Example:
+
+.. code-block:: python
+
+    camera_data = trifinger_cameras.tricamera.MultiProcessData("tricamera", False)
+    frontend = AsyncFrontend(trifinger_cameras.tricamera, camera_data)
+
+    async for t, observation in frontend:
+        ...
+"""
+
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import types
+import typing
+
+#: Maximum duration (in seconds) the waiting thread blocks at once.  Waits without
+#: timeout are split into chunks of this length, so that the thread can be stopped
+#: when the frontend is closed.
+_WAIT_CHUNK_S = 1.0
+
+
+class AsyncFrontend:
+    """asyncio wrapper around the frontend of a camera module.
+
+    Observations are returned in the order of their time indices, starting with the
+    newest one at the time of the first call of :meth:`next_observation`.  If the
+    consumer is too slow and ``skip_to_latest`` is set, it jumps to the newest
+    observation instead of returning all intermediate ones.
+
+    Without ``skip_to_latest``, a consumer that is too slow may fall behind the
+    buffer of the sensor data (overrun, i.e. the next observation was already
+    overwritten).  In this case, :meth:`next_observation` continues with the oldest
+    observation that is still in the buffer and the skipped observations are
+    counted in :attr:`num_overrun_frames`.
+    """
+
+    def __init__(
+        self,
+        camera_module: types.ModuleType,
+        sensor_data: typing.Any,
+        skip_to_latest: bool = False,
+    ) -> None:
+        """
+        Args:
+            camera_module: Module providing the bindings for the sensor type, e.g.
+                :mod:`trifinger_cameras.camera` or :mod:`trifinger_cameras.tricamera`.
+            sensor_data: Sensor data of the camera (e.g. ``MultiProcessData``) from
+                the same module.
+            skip_to_latest: If true, :meth:`next_observation` always returns the
+                newest observation (skipping observations that arrived since the
+                last call).
+        """
+        self._sensor_data = sensor_data
+        self._wait_for_timeindex = camera_module.wait_for_timeindex
+        self._get_timeindex_range = camera_module.get_timeindex_range
+        self._skip_to_latest = skip_to_latest
+
+        #: The underlying (blocking) frontend.
+        self.frontend = camera_module.Frontend(sensor_data)
+
+        #: Number of observations that were skipped by :meth:`next_observation`
+        #: because they were overwritten in the buffer before they were read.
+        self.num_overrun_frames = 0
+
+        self._next_timeindex: typing.Optional[int] = None
+        self._closed = False
+        # use a dedicated thread, so waiting does not occupy threads of the
+        # default executor of the event loop
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="AsyncFrontend"
+        )
+
+    def close(self) -> None:
+        """Stop the waiting thread.  Pending waits are aborted."""
+        self._closed = True
+        self._executor.shutdown(wait=False)
+
+    def __del__(self) -> None:
+        # may not be set if __init__ failed
+        if hasattr(self, "_executor"):
+            self.close()
+
+    def _wait(self, timeindex: int, timeout_s: typing.Optional[float]) -> bool:
+        """Wait for the time index (executed in the waiting thread)."""
+        if timeout_s is not None:
+            return self._wait_for_timeindex(self._sensor_data, timeindex, timeout_s)
+
+        while not self._closed:
+            if self._wait_for_timeindex(self._sensor_data, timeindex, _WAIT_CHUNK_S):
+                return True
+        return False
+
+    async def wait_for_timeindex(
+        self, timeindex: int, timeout_s: typing.Optional[float] = None
+    ) -> None:
+        """Wait until the observation with the given time index is available.
+
+        Args:
+            timeindex: Time index to wait for.
+            timeout_s: Timeout in seconds.  Wait indefinitely if None.
+
+        Raises:
+            asyncio.TimeoutError: If the timeout expired.
+            RuntimeError: If the frontend is closed while waiting.
+        """
+        if self._closed:
+            msg = "AsyncFrontend is closed."
+            raise RuntimeError(msg)
+
+        loop = asyncio.get_running_loop()
+        reached = await loop.run_in_executor(
+            self._executor, self._wait, timeindex, timeout_s
+        )
+        if not reached:
+            if self._closed:
+                msg = "AsyncFrontend was closed while waiting."
+                raise RuntimeError(msg)
+            raise asyncio.TimeoutError()
+
+    async def get_observation(
+        self, timeindex: int, timeout_s: typing.Optional[float] = None
+    ) -> typing.Any:
+        """Get the observation with the given time index, waiting if needed.
+
+        See :meth:`wait_for_timeindex` for the arguments and possible exceptions.
+        """
+        await self.wait_for_timeindex(timeindex, timeout_s)
+        return self.frontend.get_observation(timeindex)
+
+    async def next_observation(
+        self, timeout_s: typing.Optional[float] = None
+    ) -> tuple[int, typing.Any]:
+        """Wait for the next observation.
+
+        If the next observation is not in the buffer anymore (overrun), the oldest
+        observation in the buffer is returned instead (see
+        :attr:`num_overrun_frames`).
+
+        Args:
+            timeout_s: Timeout in seconds.  Wait indefinitely if None.
+
+        Returns:
+            Tuple of time index and observation.
+
+        Raises:
+            asyncio.TimeoutError: If the timeout expired.
+        """
+        if self._next_timeindex is None:
+            # start with the newest observation (waits for the first one if
+            # there is none yet)
+            await self.wait_for_timeindex(0, timeout_s)
+            self._next_timeindex = self.frontend.get_current_timeindex()
+
+        t = self._next_timeindex
+        await self.wait_for_timeindex(t, timeout_s)
+        if self._skip_to_latest:
+            t = max(t, self.frontend.get_current_timeindex())
+
+        t, observation = self._get_buffered_observation(t)
+        self._next_timeindex = t + 1
+
+        return t, observation
+
+    def _get_buffered_observation(self, timeindex: int) -> tuple[int, typing.Any]:
+        """Get the observation or the oldest one, if it is not in the buffer anymore."""
+        while True:
+            oldest, _ = self._get_timeindex_range(self._sensor_data)
+            if timeindex < oldest:
+                self.num_overrun_frames += oldest - timeindex
+                timeindex = oldest
+            try:
+                return timeindex, self.frontend.get_observation(timeindex)
+            except ValueError:
+                # The observation may have been overwritten since the check above
+                # (the time series raises ValueError for too old time indices), so
+                # try again in this case.
+                if self._get_timeindex_range(self._sensor_data)[0] <= timeindex:
+                    raise
+
+    def __aiter__(self) -> AsyncFrontend:
+        return self
+
+    async def __anext__(self) -> tuple[int, typing.Any]:
+        return await self.next_observation()
@@ -0,0 +1,219 @@
+"""Lag and drop statistics of camera data consumers.
+
+:class:`MonitoredFrontend` wraps the frontend of a camera module and keeps track of
+which observations are consumed.  From this it derives how far the consumer lags
+behind the newest observation, how many frames it skipped and how often it fell
+behind the ring buffer of the sensor data (overrun, i.e. the requested observation
+was not in the buffer anymore).
+
+The statistics of each consumer are published in a small file in
+:data:`STATS_DIRECTORY` (memory-mapped, so updating it is cheap), so that they can
+be inspected live for all consumers using the ``camera_consumer_stats`` executable.
+"""
+
+from __future__ import annotations
+
+import itertools
+import os
+import pathlib
+import sys
+import tempfile
+import time
+import types
+import typing
+
+import numpy as np
+
+#: Directory in which consumers publish their statistics.
+STATS_DIRECTORY = pathlib.Path(
+    "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir(),
+    "trifinger_cameras_consumer_stats",
+)
+
+#: Layout of the published statistics.
+STATS_DTYPE = np.dtype(
+    [
+        ("pid", np.int64),
+        ("update_time", np.float64),
+        ("newest_timeindex", np.int64),
+        ("consumed_timeindex", np.int64),
+        ("frames_consumed", np.int64),
+        ("frames_skipped", np.int64),
+        ("overrun_events", np.int64),
+    ]
+)
+
+_instance_counter = itertools.count()
+
+
+class MonitoredFrontend:
+    """Frontend wrapper that records lag and drop statistics of the consumer.
+
+    Provides the same methods as the wrapped frontend.  Only
+    :meth:`get_observation` and :meth:`get_latest_observation` are instrumented,
+    all other attributes are forwarded to the frontend.
+    """
+
+    def __init__(
+        self,
+        camera_module: types.ModuleType,
+        sensor_data: typing.Any,
+        stream_name: str,
+        consumer_name: typing.Optional[str] = None,
+        publish: bool = True,
+    ) -> None:
+        """
+        Args:
+            camera_module: Module providing the bindings for the sensor type, e.g.
+                :mod:`trifinger_cameras.tricamera`.
+            sensor_data: Sensor data of the camera from the same module.
+            stream_name: Name of the stream (e.g. the shared memory ID of the
+                sensor data).  Used to group the consumers in the published
+                statistics.
+            consumer_name: Name of the consumer.  Defaults to the name of the
+                executed script.
+            publish: Whether to publish the statistics in :data:`STATS_DIRECTORY`.
+        """
+        self._sensor_data = sensor_data
+        self._get_timeindex_range = camera_module.get_timeindex_range
+
+        #: The wrapped frontend.
+        self.frontend = camera_module.Frontend(sensor_data)
+
+        if consumer_name is None:
+            consumer_name = pathlib.Path(sys.argv[0]).stem
+            # e.g. "-c" if executed via `python -c`
+            if not consumer_name or consumer_name.startswith("-"):
+                consumer_name = "python"
+
+        self._stats_file: typing.Optional[pathlib.Path] = None
+        if publish:
+            STATS_DIRECTORY.mkdir(parents=True, exist_ok=True)
+            # "." is used as separator in the file name
+            self._stats_file = STATS_DIRECTORY / "{}.{}.{}.{}".format(
+                stream_name.replace(".", "_"),
+                consumer_name.replace(".", "_"),
+                os.getpid(),
+                next(_instance_counter),
+            )
+            self._stats_array = np.memmap(
+                self._stats_file, dtype=STATS_DTYPE, mode="w+", shape=(1,)
+            )
+        else:
+            self._stats_array = np.zeros(1, dtype=STATS_DTYPE)
+        # view on the single record, writing to it updates the array
+        self._stats = self._stats_array[0]
+
+        self._stats["pid"] = os.getpid()
+        self._stats["update_time"] = time.time()
+        self._stats["newest_timeindex"] = -1
+        self._stats["consumed_timeindex"] = -1
+
+    def __getattr__(self, name: str) -> typing.Any:
+        return getattr(self.frontend, name)
+
+    def close(self) -> None:
+        """Remove the published statistics."""
+        if self._stats_file is not None:
+            self._stats_file.unlink(missing_ok=True)
+            self._stats_file = None
+
+    def __del__(self) -> None:
+        # may not be set if __init__ failed
+        if hasattr(self, "_stats_file"):
+            self.close()
+
+    @property
+    def stats(self) -> dict[str, typing.Any]:
+        """Current statistics of the consumer.
+
+        - ``newest_timeindex``: Newest time index in the sensor data at the time of
+          the last access.
+        - ``consumed_timeindex``: Time index of the last consumed observation.
+        - ``lag``: Difference between the two above.
+        - ``frames_consumed``: Number of observations consumed so far.
+        - ``frames_skipped``: Number of observations that were skipped (i.e. not
+          consumed) between consumed ones.
+        - ``overrun_events``: Number of times an observation was requested that
+          was not in the buffer anymore.
+        """
+        stats = {name: self._stats[name].item() for name in STATS_DTYPE.names}
+        stats["lag"] = stats["newest_timeindex"] - stats["consumed_timeindex"]
+        return stats
+
+    def _record(self, timeindex: int, oldest: int, newest: int) -> None:
+        """Record the consumption of the given time index."""
+        stats = self._stats
+
+        if oldest >= 0 and timeindex < oldest:
+            stats["overrun_events"] += 1
+
+        last = stats["consumed_timeindex"]
+        if last >= 0 and timeindex > last + 1:
+            stats["frames_skipped"] += timeindex - last - 1
+
+        stats["newest_timeindex"] = max(newest, timeindex)
+        stats["consumed_timeindex"] = timeindex
+        stats["frames_consumed"] += 1
+        stats["update_time"] = time.time()
+
+    def get_observation(self, timeindex: int) -> typing.Any:
+        """Get the observation with the given time index (see ``Frontend``)."""
+        oldest, newest = self._get_timeindex_range(self._sensor_data)
+        # record before accessing the observation, so that overruns are also
+        # counted if the access fails
+        self._record(timeindex, oldest, newest)
+        return self.frontend.get_observation(timeindex)
+
+    def get_latest_observation(self) -> typing.Any:
+        """Get the newest observation (see ``Frontend``)."""
+        # go through the time index, so it is known which observation is consumed
+        timeindex = self.frontend.get_current_timeindex()
+        return self.get_observation(timeindex)
+
+
+def read_published_stats(
+    directory: pathlib.Path = STATS_DIRECTORY,
+) -> list[dict[str, typing.Any]]:
+    """Read the statistics published by all consumers.
+
+    Args:
+        directory: Directory in which the statistics are published.
+
+    Returns:
+        List with the statistics of each consumer (see :attr:`MonitoredFrontend.
+        stats`), additionally containing ``stream``, ``consumer``, ``alive``
+        (whether the consumer process is still running) and ``file`` (path of the
+        file with the statistics).
+    """
+    result = []
+    for stats_file in sorted(directory.glob("*.*.*.*")):
+        try:
+            data = np.fromfile(stats_file, dtype=STATS_DTYPE, count=1)
+        except OSError:
+            # file was removed in the meantime
+            continue
+        if len(data) != 1:
+            continue
+
+        stream, consumer = stats_file.name.split(".")[:2]
+        stats = {name: data[0][name].item() for name in STATS_DTYPE.names}
+        stats["lag"] = stats["newest_timeindex"] - stats["consumed_timeindex"]
+        stats["stream"] = stream
+        stats["consumer"] = consumer
+        stats["alive"] = _is_process_alive(stats["pid"])
+        stats["file"] = stats_file
+        result.append(stats)
+
+    return result
+
+
+def _is_process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # process exists but belongs to another user
+        return True
+    return True
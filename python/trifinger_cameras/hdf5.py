@@ -1,5 +1,7 @@
 """Utilities for working with HDF5 camera log files."""
 
+import os
+import pathlib
 from collections.abc import Container
 from typing import Iterable, Sequence
 
@@ -32,9 +34,15 @@ def verify_tricamera_hdf5(h5file: h5py.File, supported_formats: Container[int])
 
 
 def init_tricamera_hdf5(
-    h5: h5py.File, camera_params: Sequence[CameraCalibrationFile], n_frames: int
+    h5: h5py.File,
+    camera_params: Sequence[CameraCalibrationFile],
+    n_frames: int,
+    frame_rate_fps: float | None = None,
 ) -> None:
-    """Create attributes and datasets in the given HDF5 file."""
+    """Create attributes and datasets in the given HDF5 file.
+
+    The frame rate is only stored if ``frame_rate_fps`` is set.
+    """
     if len(camera_params) != len(CAMERA_NAMES):
         msg = "Length of `camera_params` doesn't match expected number of cameras"
         raise ValueError(msg)
@@ -54,6 +62,8 @@ def init_tricamera_hdf5(
     calib_group = h5.create_group("camera_info")
     for i, params in enumerate(camera_params):
         cam_group = calib_group.create_group(CAMERA_NAMES[i])
+        if frame_rate_fps is not None:
+            cam_group.attrs["frame_rate_fps"] = frame_rate_fps
         cam_group.create_dataset(
             "camera_matrix", data=params.get_array("camera_matrix")
         )
@@ -94,11 +104,166 @@ def write_tricamera_hdf5(
     camera_params: Sequence[CameraCalibrationFile],
     n_frames: int,
     stamped_observations: Iterable[tuple[TriCameraObservation, int]],
+    frame_rate_fps: float | None = None,
 ) -> None:
-    init_tricamera_hdf5(h5, camera_params, n_frames)
+    init_tricamera_hdf5(h5, camera_params, n_frames, frame_rate_fps)
 
     for i_obs, (observation, data_timestamp) in enumerate(stamped_observations):
         cameras = observation.cameras
         h5["images"][i_obs] = [camera.image for camera in cameras]
         h5["timestamps"][i_obs] = [camera.timestamp for camera in cameras]
         h5["sensor_data_timestamps"][i_obs] = data_timestamp
+
+
+#: Datasets with one entry per observation, which are concatenated by
+#: :func:`create_tricamera_vds`.
+OBSERVATION_DATASETS = ("images", "timestamps", "sensor_data_timestamps")
+
+#: Root attributes that need to be the same in all files combined by
+#: :func:`create_tricamera_vds`.
+_VDS_COMPATIBLE_ATTRS = ("magic", "format_version", "num_cameras")
+
+
+def create_tricamera_vds(
+    output_file: str | os.PathLike,
+    input_files: Sequence[str | os.PathLike],
+    relative_paths: bool = True,
+) -> None:
+    """Combine several TriCamera HDF5 files into one virtual file.
+
+    Creates an HDF5 file with virtual datasets ``images``, ``timestamps`` and
+    ``sensor_data_timestamps``, which concatenate the datasets of the input files in
+    the given order.  The data is not copied, it is read from the input files on
+    access, so the output file is small but needs the input files to be available.
+
+    The virtual file has the same structure as a regular TriCamera HDF5 file (with the
+    attributes and ``camera_info`` of the first input file), so it can be used with
+    code that reads single files.  Additionally it contains:
+
+    - ``source_files``: Paths of the input files (relative to the output file if
+      ``relative_paths`` is set).
+    - ``source_file_offsets``: Index of the first observation of each input file,
+      followed by the total number of observations (so observations
+      ``source_file_offsets[i]:source_file_offsets[i + 1]`` are from file ``i``).
+      See :func:`get_source_file_index`.
+    - ``source_camera_info/<camera_name>/<name>``: The camera info of all input
+      files, stacked along the first dimension (e.g. ``camera_matrix`` has shape
+      ``(n_files, 3, 3)``).
+
+    Args:
+        output_file: Path of the virtual file that is created.  Existing files will be
+            overwritten.
+        input_files: Paths of the TriCamera HDF5 files that are combined.
+        relative_paths: If set, the input files are referenced with paths relative to
+            the output file, so the files can be moved together to another location.
+
+    Raises:
+        ValueError: If an input file is not a TriCamera HDF5 file or the files are not
+            compatible (e.g. different image sizes).
+    """
+    if not input_files:
+        msg = "No input files given."
+        raise ValueError(msg)
+
+    output_file = pathlib.Path(output_file)
+    input_files = [pathlib.Path(f) for f in input_files]
+
+    # collect metadata of all files first, so the layouts can be created with the
+    # final size
+    lengths = []
+    shapes: dict[str, tuple[int, ...]] = {}
+    dtypes: dict[str, np.dtype] = {}
+    first_attrs: dict = {}
+    camera_info: dict[str, list[np.ndarray]] = {}
+    for i, input_file in enumerate(input_files):
+        with h5py.File(input_file, "r") as h5:
+            try:
+                verify_tricamera_hdf5(h5, supported_formats=(2,))
+            except ValueError as e:
+                msg = f"{input_file}: {e}"
+                raise ValueError(msg) from e
+
+            if i == 0:
+                first_attrs = dict(h5.attrs)
+                for name in OBSERVATION_DATASETS:
+                    shapes[name] = h5[name].shape[1:]
+                    dtypes[name] = h5[name].dtype
+
+            for name in OBSERVATION_DATASETS:
+                if h5[name].shape[1:] != shapes[name]:
+                    msg = (
+                        f"{input_file}: Shape of {name} {h5[name].shape[1:]} does not"
+                        f" match the first file {shapes[name]}."
+                    )
+                    raise ValueError(msg)
+            for attr in _VDS_COMPATIBLE_ATTRS:
+                if h5.attrs[attr] != first_attrs[attr]:
+                    msg = f"{input_file}: Attribute {attr} does not match first file."
+                    raise ValueError(msg)
+
+            lengths.append(len(h5["images"]))
+
+            for camera_name, group in h5["camera_info"].items():
+                for name, dataset in group.items():
+                    key = f"{camera_name}/{name}"
+                    camera_info.setdefault(key, []).append(dataset[()])
+                key = f"{camera_name}/frame_rate_fps"
+                camera_info.setdefault(key, []).append(
+                    group.attrs.get("frame_rate_fps", np.nan)
+                )
+
+    offsets = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+    n_total = int(offsets[-1])
+
+    layouts = {
+        name: h5py.VirtualLayout(shape=(n_total, *shapes[name]), dtype=dtypes[name])
+        for name in OBSERVATION_DATASETS
+    }
+    source_paths = []
+    for input_file, start, end in zip(input_files, offsets[:-1], offsets[1:]):
+        if relative_paths:
+            source_path = os.path.relpath(
+                input_file.resolve(), output_file.resolve().parent
+            )
+        else:
+            source_path = str(input_file.resolve())
+        source_paths.append(source_path)
+
+        for name, layout in layouts.items():
+            layout[start:end] = h5py.VirtualSource(
+                source_path, name, shape=(end - start, *shapes[name])
+            )
+
+    with h5py.File(output_file, "w") as h5:
+        h5.attrs.update(first_attrs)
+        for name, layout in layouts.items():
+            h5.create_virtual_dataset(name, layout)
+
+        h5.create_dataset("source_files", data=[p.encode() for p in source_paths])
+        h5.create_dataset("source_file_offsets", data=offsets)
+
+        with h5py.File(input_files[0], "r") as first:
+            first.copy(first["camera_info"], h5, "camera_info")
+        for key, values in camera_info.items():
+            h5.create_dataset(f"source_camera_info/{key}", data=np.stack(values))
+
+
+def get_source_file_index(h5file: h5py.File, index: int) -> tuple[int, int]:
+    """Get the source file of an observation in a virtual file.
+
+    Args:
+        h5file: Virtual file created by :func:`create_tricamera_vds`.
+        index: Index of the observation in the virtual file.
+
+    Returns:
+        Tuple ``(file_index, local_index)``, where ``file_index`` is the index of the
+        source file (in ``source_files``) and ``local_index`` the index of the
+        observation within that file.
+    """
+    offsets = h5file["source_file_offsets"][()]
+    if not 0 <= index < offsets[-1]:
+        msg = f"Index {index} out of range for {offsets[-1]} observations."
+        raise IndexError(msg)
+
+    file_index = int(np.searchsorted(offsets, index, side="right")) - 1
+    return file_index, index - int(offsets[file_index])
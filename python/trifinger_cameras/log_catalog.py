@@ -0,0 +1,398 @@
+"""Catalog of TriCamera log files for fast metadata queries.
+
+:class:`LogCatalog` scans directories for TriCamera logs (binary logs and HDF5 files)
+and stores their metadata in a SQLite database: duration, frame rate, statistics of
+the frame intervals and a hash of the camera calibration.  Only the timestamps are
+read from the logs, never the images.  Indexing is incremental, files are only
+(re-)indexed if they are new or their modification time or size changed.
+
+The executable ``tricamera_log_catalog`` provides a command line interface for
+indexing and querying.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import datetime
+import hashlib
+import json
+import os
+import pathlib
+import sqlite3
+import typing
+
+import h5py
+import numpy as np
+
+from . import CAMERA_NAMES
+from .camera_calibration_file import CameraCalibrationFile
+from .log_timestamps import HDF5_SUFFIXES, read_log_timestamps
+
+#: Calibration parameters that are included in the calibration hash.
+CALIBRATION_FIELDS = ("camera_matrix", "distortion_coefficients", "tf_world_to_camera")
+
+#: Intervals longer than this factor times the median interval are counted as gaps.
+GAP_FACTOR = 1.5
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS logs (
+    path TEXT PRIMARY KEY,
+    format TEXT NOT NULL,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL,
+    num_frames INTEGER NOT NULL,
+    start_time REAL,
+    end_time REAL,
+    duration REAL,
+    fps REAL,
+    interval_mean REAL,
+    interval_std REAL,
+    interval_min REAL,
+    interval_max REAL,
+    num_gaps INTEGER,
+    max_camera_offset REAL,
+    calibration_hash TEXT REFERENCES calibrations(hash)
+);
+CREATE INDEX IF NOT EXISTS logs_start_time ON logs(start_time);
+CREATE INDEX IF NOT EXISTS logs_calibration ON logs(calibration_hash);
+
+CREATE TABLE IF NOT EXISTS calibrations (
+    hash TEXT PRIMARY KEY,
+    camera_info TEXT NOT NULL
+);
+
+-- files that could not be indexed (not retried until they change)
+CREATE TABLE IF NOT EXISTS errors (
+    path TEXT PRIMARY KEY,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL,
+    message TEXT NOT NULL
+);
+"""
+
+
+@dataclasses.dataclass
+class IndexStats:
+    """Statistics of a :meth:`LogCatalog.index` run."""
+
+    #: Number of files that were (re-)indexed.
+    indexed: int = 0
+    #: Number of files that were unchanged since the last run.
+    unchanged: int = 0
+    #: Number of files that could not be indexed.
+    failed: int = 0
+    #: Number of entries removed because the files don't exist anymore.
+    removed: int = 0
+
+
+def calibration_hash(camera_info: typing.Mapping[str, typing.Mapping]) -> str:
+    """Compute a hash identifying a camera calibration.
+
+    Args:
+        camera_info: Mapping from camera name to a mapping with the parameters in
+            :data:`CALIBRATION_FIELDS` (e.g. the ``camera_info`` group of a TriCamera
+            HDF5 file).
+
+    Returns:
+        SHA-256 hash (hex string) of the parameters of all cameras.
+    """
+    h = hashlib.sha256()
+    for camera_name in CAMERA_NAMES:
+        for field in CALIBRATION_FIELDS:
+            value = np.ascontiguousarray(camera_info[camera_name][field], np.float64)
+            h.update(value.tobytes())
+    return h.hexdigest()
+
+
+def calibration_hash_from_files(
+    calibration_files: typing.Sequence[str | os.PathLike],
+) -> str:
+    """Compute the calibration hash from the camera calibration YAML files.
+
+    Args:
+        calibration_files: Calibration files of the cameras in the order of
+            :data:`~trifinger_cameras.CAMERA_NAMES`.
+    """
+    camera_info = {
+        name: CameraCalibrationFile(str(path))
+        for name, path in zip(CAMERA_NAMES, calibration_files, strict=True)
+    }
+    return calibration_hash(camera_info)
+
+
+def _read_hdf5_calibration(path: pathlib.Path) -> dict[str, dict[str, np.ndarray]]:
+    """Read the calibration of an HDF5 log."""
+    with h5py.File(path, "r") as h5:
+        return {
+            name: {
+                field: h5["camera_info"][name][field][()]
+                for field in CALIBRATION_FIELDS
+            }
+            for name in CAMERA_NAMES
+        }
+
+
+def _timestamp_summary(camera_timestamps: np.ndarray) -> dict[str, typing.Any]:
+    """Summarize the camera timestamps of a log."""
+    n = len(camera_timestamps)
+    summary: dict[str, typing.Any] = {"num_frames": n}
+    if n == 0:
+        return summary
+
+    stamps = camera_timestamps[:, 0]
+    summary["start_time"] = float(stamps[0])
+    summary["end_time"] = float(stamps[-1])
+    summary["duration"] = float(stamps[-1] - stamps[0])
+    summary["max_camera_offset"] = float(np.ptp(camera_timestamps, axis=1).max())
+
+    if n > 1:
+        intervals = np.diff(stamps)
+        summary["fps"] = (n - 1) / summary["duration"] if summary["duration"] else None
+        summary["interval_mean"] = float(intervals.mean())
+        summary["interval_std"] = float(intervals.std())
+        summary["interval_min"] = float(intervals.min())
+        summary["interval_max"] = float(intervals.max())
+        summary["num_gaps"] = int(
+            np.count_nonzero(intervals > GAP_FACTOR * np.median(intervals))
+        )
+
+    return summary
+
+
+class LogCatalog:
+    """SQLite catalog of TriCamera logs.
+
+    Can be used as context manager to close the database at the end.
+    """
+
+    def __init__(self, db_path: str | os.PathLike) -> None:
+        """
+        Args:
+            db_path: Path to the database file.  It is created if it doesn't exist.
+        """
+        self.db = sqlite3.connect(db_path)
+        self.db.row_factory = sqlite3.Row
+        self.db.executescript(_SCHEMA)
+
+    def __enter__(self) -> LogCatalog:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the database."""
+        self.db.close()
+
+    def index(
+        self,
+        root: str | os.PathLike,
+        binary_pattern: str = "*.dat",
+        binary_calibration_files: typing.Optional[
+            typing.Sequence[str | os.PathLike]
+        ] = None,
+        progress: typing.Optional[typing.Callable[[pathlib.Path], None]] = None,
+    ) -> IndexStats:
+        """Index all logs in the directory tree.
+
+        HDF5 logs are identified by the suffix ``.hdf5`` or ``.h5``, binary logs by
+        ``binary_pattern``.  Files that are already in the catalog with the same
+        modification time and size are skipped and entries of files below ``root``
+        that don't exist anymore are removed.
+
+        Args:
+            root: Directory that is scanned recursively.
+            binary_pattern: Glob pattern of binary log files.
+            binary_calibration_files: Calibration files (in the order of
+                :data:`~trifinger_cameras.CAMERA_NAMES`) that are associated with
+                binary logs, as these don't contain the calibration themselves.  If
+                not set, binary logs have no calibration in the catalog.
+            progress: Called with the path of each file before it is indexed.
+
+        Returns:
+            Statistics of the run.
+        """
+        root = pathlib.Path(root).resolve()
+        stats = IndexStats()
+
+        binary_hash = None
+        if binary_calibration_files is not None:
+            binary_hash = self._add_calibration(
+                {
+                    name: {
+                        field: CameraCalibrationFile(str(path))[field]
+                        for field in CALIBRATION_FIELDS
+                    }
+                    for name, path in zip(
+                        CAMERA_NAMES, binary_calibration_files, strict=True
+                    )
+                }
+            )
+
+        files: dict[pathlib.Path, str] = {}
+        for suffix in HDF5_SUFFIXES:
+            files.update((p, "hdf5") for p in root.rglob(f"*{suffix}"))
+        files.update((p, "binary") for p in root.rglob(binary_pattern))
+
+        known = {
+            row["path"]: (row["mtime"], row["size"])
+            for row in self.db.execute(
+                "SELECT path, mtime, size FROM logs UNION ALL"
+                " SELECT path, mtime, size FROM errors"
+            )
+        }
+
+        for path in sorted(files):
+            if not path.is_file():
+                continue
+            stat = path.stat()
+            if known.get(str(path)) == (stat.st_mtime, stat.st_size):
+                stats.unchanged += 1
+                continue
+
+            if progress:
+                progress(path)
+
+            try:
+                camera_timestamps, _ = read_log_timestamps(path)
+                if files[path] == "hdf5":
+                    calib_hash = self._add_calibration(_read_hdf5_calibration(path))
+                else:
+                    calib_hash = binary_hash
+            except Exception as e:
+                with self.db:
+                    self.db.execute("DELETE FROM logs WHERE path = ?", (str(path),))
+                    self.db.execute(
+                        "INSERT OR REPLACE INTO errors VALUES (?, ?, ?, ?)",
+                        (str(path), stat.st_mtime, stat.st_size, str(e)),
+                    )
+                stats.failed += 1
+                continue
+
+            entry = {
+                "path": str(path),
+                "format": files[path],
+                "mtime": stat.st_mtime,
+                "size": stat.st_size,
+                "calibration_hash": calib_hash,
+                **_timestamp_summary(camera_timestamps),
+            }
+            columns = ", ".join(entry)
+            placeholders = ", ".join(f":{key}" for key in entry)
+            # commit per file, so an interrupted run keeps what was indexed so far
+            with self.db:
+                self.db.execute("DELETE FROM errors WHERE path = ?", (str(path),))
+                self.db.execute(
+                    f"INSERT OR REPLACE INTO logs ({columns}) VALUES ({placeholders})",
+                    entry,
+                )
+            stats.indexed += 1
+
+        # remove entries of files that were deleted
+        with self.db:
+            for table in ("logs", "errors"):
+                rows = self.db.execute(
+                    f"SELECT path FROM {table} WHERE path LIKE ? || '%'",
+                    (str(root) + os.sep,),
+                ).fetchall()
+                for row in rows:
+                    if not os.path.exists(row["path"]):
+                        self.db.execute(
+                            f"DELETE FROM {table} WHERE path = ?", (row["path"],)
+                        )
+                        if table == "logs":
+                            stats.removed += 1
+
+        return stats
+
+    def query(
+        self,
+        calibration: typing.Optional[str] = None,
+        since: typing.Optional[datetime.datetime] = None,
+        until: typing.Optional[datetime.datetime] = None,
+        min_fps: typing.Optional[float] = None,
+        min_duration: typing.Optional[float] = None,
+        log_format: typing.Optional[str] = None,
+    ) -> list[dict[str, typing.Any]]:
+        """Find logs matching all given criteria.
+
+        Args:
+            calibration: Calibration hash (or a prefix of it).
+            since: Only logs that started at or after this time.
+            until: Only logs that started before this time.
+            min_fps: Minimum average frame rate.
+            min_duration: Minimum duration in seconds.
+            log_format: Either "hdf5" or "binary".
+
+        Returns:
+            The matching logs (with all columns of the catalog), sorted by start time.
+        """
+        conditions = []
+        params: list[typing.Any] = []
+        if calibration is not None:
+            conditions.append("calibration_hash LIKE ? || '%'")
+            params.append(calibration)
+        if since is not None:
+            conditions.append("start_time >= ?")
+            params.append(since.timestamp())
+        if until is not None:
+            conditions.append("start_time < ?")
+            params.append(until.timestamp())
+        if min_fps is not None:
+            conditions.append("fps >= ?")
+            params.append(min_fps)
+        if min_duration is not None:
+            conditions.append("duration >= ?")
+            params.append(min_duration)
+        if log_format is not None:
+            conditions.append("format = ?")
+            params.append(log_format)
+
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        rows = self.db.execute(
+            f"SELECT * FROM logs {where} ORDER BY start_time, path", params
+        )
+        return [dict(row) for row in rows]
+
+    def calibrations(self) -> list[dict[str, typing.Any]]:
+        """List the calibrations with the number of logs and their time range."""
+        rows = self.db.execute(
+            "SELECT calibration_hash AS hash, COUNT(*) AS num_logs,"
+            " MIN(start_time) AS first_start_time, MAX(start_time) AS last_start_time"
+            " FROM logs GROUP BY calibration_hash ORDER BY first_start_time"
+        )
+        return [dict(row) for row in rows]
+
+    def get_calibration(self, calib_hash: str) -> dict[str, dict[str, np.ndarray]]:
+        """Get the calibration parameters for the given hash."""
+        row = self.db.execute(
+            "SELECT camera_info FROM calibrations WHERE hash = ?", (calib_hash,)
+        ).fetchone()
+        if row is None:
+            raise KeyError(calib_hash)
+        return {
+            name: {field: np.array(value) for field, value in params.items()}
+            for name, params in json.loads(row["camera_info"]).items()
+        }
+
+    def errors(self) -> list[dict[str, typing.Any]]:
+        """List the files that could not be indexed."""
+        return [dict(row) for row in self.db.execute("SELECT * FROM errors")]
+
+    def _add_calibration(
+        self, camera_info: typing.Mapping[str, typing.Mapping[str, np.ndarray]]
+    ) -> str:
+        calib_hash = calibration_hash(camera_info)
+        data = {
+            name: {
+                field: np.asarray(camera_info[name][field], np.float64).tolist()
+                for field in CALIBRATION_FIELDS
+            }
+            for name in CAMERA_NAMES
+        }
+        with self.db:
+            self.db.execute(
+                "INSERT OR IGNORE INTO calibrations VALUES (?, ?)",
+                (calib_hash, json.dumps(data)),
+            )
+        return calib_hash
@@ -0,0 +1,264 @@
+"""Seekable playback of TriCamera logs.
+
+:class:`PlaybackEngine` plays back the frames of a log in real time (or scaled by a
+speed factor).  Frames are read, demosaiced and stacked by a pool of worker threads
+which read ahead of the current position, so the display loop only has to show the
+finished images.  If decoding can't keep up with the requested speed, frames are
+dropped instead of slowing down playback.  Since the logs are accessed by index, the
+engine can seek to any frame or timestamp.
+
+The logs are accessed through :class:`BinaryLogSource` or :class:`HDF5LogSource`, see
+:func:`open_log_source`.
+
+Example:
+
+.. code-block:: python
+
+    with PlaybackEngine(open_log_source("camera_data.dat"), speed=2.0) as engine:
+        while (frame := engine.next_frame()) is not None:
+            index, image = frame
+            ...
+            time.sleep(engine.time_until_next())
+"""
+
+from __future__ import annotations
+
+import concurrent.futures
+import os
+import pathlib
+import time
+import typing
+
+import h5py
+import numpy as np
+
+from . import hdf5, utils
+from .log_timestamps import HDF5_SUFFIXES, read_log_timestamps
+from .py_tricamera_types import LogReader, get_log_observation_range
+
+
+class BinaryLogSource:
+    """Random access to the frames of a binary log.
+
+    The whole log is loaded into memory.  Frames are copied from there with the GIL
+    released, so they can be read in parallel by multiple threads.
+    """
+
+    def __init__(self, filename: str | os.PathLike) -> None:
+        self._log_reader = LogReader(str(filename))
+        #: Camera timestamps of shape (N, 3).
+        self.timestamps = read_log_timestamps(filename).camera_timestamps
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def read(self, index: int) -> np.ndarray:
+        """Get the raw images of the frame with the given index, shape (3, H, W)."""
+        images, _ = get_log_observation_range(self._log_reader, index, index + 1)
+        return images[0]
+
+    def close(self) -> None:
+        """Release the log."""
+        self._log_reader = None
+
+
+class HDF5LogSource:
+    """Random access to the frames of a TriCamera HDF5 file."""
+
+    def __init__(self, filename: str | os.PathLike) -> None:
+        self._h5 = h5py.File(filename, "r")
+        hdf5.verify_tricamera_hdf5(self._h5, supported_formats=(1, 2))
+        self._images = self._h5["images"]
+        #: Camera timestamps of shape (N, 3).
+        self.timestamps = self._h5["timestamps"][()]
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def read(self, index: int) -> np.ndarray:
+        """Get the raw images of the frame with the given index, shape (3, H, W)."""
+        return self._images[index]
+
+    def close(self) -> None:
+        """Close the file."""
+        self._h5.close()
+
+
+LogSource = typing.Union[BinaryLogSource, HDF5LogSource]
+
+
+def open_log_source(filename: str | os.PathLike) -> LogSource:
+    """Open a binary or HDF5 log (depending on the file suffix)."""
+    if pathlib.Path(filename).suffix in HDF5_SUFFIXES:
+        return HDF5LogSource(filename)
+    return BinaryLogSource(filename)
+
+
+class PlaybackEngine:
+    """Plays back the frames of a log with background decoding.
+
+    The engine keeps a playback clock that maps wall time to log time (scaled by
+    :attr:`speed`).  :meth:`next_frame` returns the newest frame that is due according
+    to this clock, dropping frames that are already overdue.  The clock is restarted
+    on seeks and when resuming after a pause.
+
+    The frames in ``[position, position + read_ahead)`` are decoded in the background.
+    When seeking, pending frames outside of this window are discarded.
+
+    Can be used as context manager to shut down the workers and close the source at
+    the end.
+    """
+
+    def __init__(
+        self,
+        source: LogSource,
+        speed: float = 1.0,
+        read_ahead: int = 16,
+        num_workers: typing.Optional[int] = None,
+        process: typing.Optional[typing.Callable[[np.ndarray], np.ndarray]] = None,
+    ) -> None:
+        """
+        Args:
+            source: Source of the frames.
+            speed: Playback speed factor.
+            read_ahead: Maximum number of frames that are decoded ahead of the current
+                position.  Decoded frames are kept in memory until they are shown.
+            num_workers: Number of decoding threads.  Default: see
+                :class:`concurrent.futures.ThreadPoolExecutor`.
+            process: Optional function that is applied to each decoded image in the
+                worker threads (e.g. to add annotations).
+        """
+        if speed <= 0:
+            msg = "speed must be positive."
+            raise ValueError(msg)
+        if read_ahead < 1:
+            msg = "read_ahead must be at least 1."
+            raise ValueError(msg)
+
+        self.source = source
+        self.speed = speed
+        self.read_ahead = read_ahead
+        self.process = process
+
+        #: Index of the next frame to be returned by :meth:`next_frame`.
+        self.position = 0
+        #: Index of the frame that was returned last by :meth:`next_frame`.
+        self.current: typing.Optional[int] = None
+        #: Number of frames that were dropped because they were overdue.
+        self.num_dropped = 0
+
+        # playback time must not go backwards, even if the timestamps do
+        self._stamps = np.maximum.accumulate(source.timestamps[:, 0])
+        self._paused = False
+        self._executor = concurrent.futures.ThreadPoolExecutor(num_workers)
+        self._pending: dict[int, concurrent.futures.Future] = {}
+        self._restart_clock()
+
+    def __enter__(self) -> PlaybackEngine:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._stamps)
+
+    def close(self) -> None:
+        """Stop the workers and close the source."""
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        self._pending.clear()
+        self.source.close()
+
+    @property
+    def paused(self) -> bool:
+        """Whether playback is paused.  While paused, no frames are dropped."""
+        return self._paused
+
+    @paused.setter
+    def paused(self, paused: bool) -> None:
+        if self._paused and not paused:
+            self._restart_clock()
+        self._paused = paused
+
+    def seek(self, index: int) -> None:
+        """Continue playback at the given frame (clipped to the valid range)."""
+        if len(self) == 0:
+            return
+        self.position = int(np.clip(index, 0, len(self) - 1))
+        self._restart_clock()
+        self._schedule()
+
+    def seek_timestamp(self, timestamp: float) -> None:
+        """Continue playback at the first frame with a timestamp >= ``timestamp``.
+
+        Args:
+            timestamp: Camera timestamp (of the first camera).
+        """
+        self.seek(int(np.searchsorted(self._stamps, timestamp)))
+
+    def step(self, num_frames: int) -> None:
+        """Seek relative to the frame that was shown last."""
+        reference = self.current if self.current is not None else self.position
+        self.seek(reference + num_frames)
+
+    def next_frame(self) -> typing.Optional[tuple[int, np.ndarray]]:
+        """Get the next frame.
+
+        When not paused, the newest frame that is due is returned and overdue frames
+        before it are dropped.  This blocks until the frame is decoded but does not
+        wait until it is due (use :meth:`time_until_next` for this).
+
+        Returns:
+            Tuple (index, image) or None if the end of the log is reached.  The image
+            has the images of all cameras stacked horizontally.
+        """
+        if self.position >= len(self):
+            return None
+
+        if not self._paused:
+            log_time = self._t0_log + (time.monotonic() - self._t0_wall) * self.speed
+            due = int(np.searchsorted(self._stamps, log_time, side="right")) - 1
+            due = min(due, len(self) - 1)
+            if due > self.position:
+                self.num_dropped += due - self.position
+                self.position = due
+
+        index = self.position
+        self._schedule()
+        image = self._pending.pop(index).result()
+
+        self.current = index
+        self.position = index + 1
+        self._schedule()
+
+        return index, image
+
+    def time_until_next(self) -> float:
+        """Wall time in seconds until the next frame is due (0 if paused or at end)."""
+        if self._paused or self.position >= len(self):
+            return 0.0
+        log_delay = self._stamps[self.position] - self._t0_log
+        wall_time = self._t0_wall + log_delay / self.speed
+        return max(0.0, wall_time - time.monotonic())
+
+    def _restart_clock(self) -> None:
+        self._t0_wall = time.monotonic()
+        self._t0_log = (
+            self._stamps[min(self.position, len(self) - 1)] if len(self) else 0.0
+        )
+
+    def _schedule(self) -> None:
+        """Update the read-ahead window to start at the current position."""
+        window = range(self.position, min(self.position + self.read_ahead, len(self)))
+        for index in list(self._pending):
+            if index not in window:
+                self._pending.pop(index).cancel()
+        for index in window:
+            if index not in self._pending:
+                self._pending[index] = self._executor.submit(self._decode, index)
+
+    def _decode(self, index: int) -> np.ndarray:
+        image = np.hstack([utils.convert_image(img) for img in self.source.read(index)])
+        if self.process is not None:
+            image = self.process(image)
+        return image
@@ -0,0 +1,74 @@
+"""Fast access to the timestamps of TriCamera logs.
+
+Many tools only need the timestamps of a log (e.g. to determine the frame rate or to
+analyse the timing).  :func:`read_log_timestamps` reads them without loading the
+images, which is much faster and needs much less memory than loading the whole log.
+"""
+
+from __future__ import annotations
+
+import os
+import pathlib
+import typing
+
+import h5py
+import numpy as np
+
+from .hdf5 import verify_tricamera_hdf5
+from .py_tricamera_types import read_log_timestamps as _read_binary_log_timestamps
+
+#: File suffixes of HDF5 logs.
+HDF5_SUFFIXES = (".hdf5", ".h5")
+
+
+class LogTimestamps(typing.NamedTuple):
+    """Timestamps of a TriCamera log."""
+
+    #: Timestamps of the cameras, shape (N, 3).
+    camera_timestamps: np.ndarray
+    #: Timestamps of when the observations were added to the sensor data, shape (N,).
+    sensor_data_timestamps: np.ndarray
+
+
+def read_log_timestamps(filename: str | os.PathLike) -> LogTimestamps:
+    """Read only the timestamps of a TriCamera log.
+
+    Supports HDF5 logs (identified by the file suffix, see :data:`HDF5_SUFFIXES`) and
+    binary logs.  For HDF5 logs only the timestamp datasets are read.  For binary logs
+    the image data is skipped (if the log is not compressed, it is not even read from
+    disk; compressed logs still need to be decompressed completely, which is slower).
+
+    Args:
+        filename: Path to the log file.
+
+    Returns:
+        The camera and sensor data timestamps.
+    """
+    filename = pathlib.Path(filename)
+    if filename.suffix in HDF5_SUFFIXES:
+        with h5py.File(filename, "r") as h5:
+            verify_tricamera_hdf5(h5, supported_formats=(1, 2))
+            camera_timestamps = h5["timestamps"][()]
+            if "sensor_data_timestamps" in h5:
+                sensor_data_timestamps = h5["sensor_data_timestamps"][()]
+            else:
+                # not included in files of format version 1
+                sensor_data_timestamps = np.full(len(camera_timestamps), np.nan)
+        return LogTimestamps(camera_timestamps, sensor_data_timestamps)
+
+    return LogTimestamps(*_read_binary_log_timestamps(str(filename)))
+
+
+def get_frame_interval(camera_timestamps: np.ndarray, camera: int = 0) -> float:
+    """Average interval between frames in seconds.
+
+    Args:
+        camera_timestamps: Camera timestamps of shape (N, 3) with N > 1.
+        camera: Index of the camera whose timestamps are used.
+    """
+    if len(camera_timestamps) < 2:
+        msg = "At least two frames are needed to determine the frame interval."
+        raise ValueError(msg)
+
+    duration = camera_timestamps[-1, camera] - camera_timestamps[0, camera]
+    return float(duration / (len(camera_timestamps) - 1))
@@ -0,0 +1,228 @@
+"""Analysis of the frame timing of TriCamera logs.
+
+:func:`analyze_timing` computes timing health metrics from the timestamps of a log:
+
+- percentiles of the intervals between frames and the jitter (per camera),
+- dropped frames, based on the nominal frame rate,
+- duplicate/stalled frames (the camera timestamp did not advance),
+- skew between the cameras (difference of their timestamps within one observation),
+- publish latency (time from capturing the images until the observation was added to
+  the sensor data time series).
+
+All computations are vectorized over the timestamp arrays, so this is fast even for
+long logs.  The result is a JSON-serializable dictionary (see :func:`to_json`).  All
+times are in seconds.
+"""
+
+from __future__ import annotations
+
+import itertools
+import json
+import math
+import os
+import pathlib
+import typing
+
+import h5py
+import numpy as np
+
+from . import CAMERA_NAMES
+from .log_timestamps import HDF5_SUFFIXES, read_log_timestamps
+
+#: Percentiles that are reported for all distributions.
+PERCENTILES = (1, 5, 50, 95, 99)
+
+#: Intervals longer than this factor times the nominal interval are counted as drops.
+DROP_FACTOR = 1.5
+
+
+def _distribution(values: np.ndarray) -> dict[str, typing.Any]:
+    """Summarize values along the first axis.
+
+    Args:
+        values: Array of shape (N,) or (N, M).  The statistics are computed for each
+            column separately.
+
+    Returns:
+        Dictionary with mean, std, min, max and the :data:`PERCENTILES` ("p50", ...).
+        The values are floats for 1-dimensional input and lists of length M
+        otherwise.
+    """
+    if len(values) == 0:
+        return {}
+
+    percentiles = np.percentile(values, PERCENTILES, axis=0)
+    summary = {
+        "mean": values.mean(axis=0),
+        "std": values.std(axis=0),
+        "min": values.min(axis=0),
+        "max": values.max(axis=0),
+        **{f"p{p}": v for p, v in zip(PERCENTILES, percentiles)},
+    }
+    return {key: value.tolist() for key, value in summary.items()}
+
+
+def _longest_runs(mask: np.ndarray) -> np.ndarray:
+    """Length of the longest run of consecutive True values in each column."""
+    # pad with False so that every run has a start and an end
+    padded = np.zeros((mask.shape[0] + 2, mask.shape[1]), dtype=np.int8)
+    padded[1:-1] = mask
+    edges = np.diff(padded, axis=0)
+    longest = np.zeros(mask.shape[1], dtype=int)
+    for col in range(mask.shape[1]):
+        starts = np.flatnonzero(edges[:, col] == 1)
+        ends = np.flatnonzero(edges[:, col] == -1)
+        if len(starts):
+            longest[col] = (ends - starts).max()
+    return longest
+
+
+def analyze_timing(
+    camera_timestamps: np.ndarray,
+    sensor_data_timestamps: typing.Optional[np.ndarray] = None,
+    frame_rate_fps: typing.Optional[float] = None,
+) -> dict[str, typing.Any]:
+    """Compute timing health metrics of a log.
+
+    Args:
+        camera_timestamps: Camera timestamps of shape (N, 3).
+        sensor_data_timestamps: Time series timestamps of shape (N,).  NaN values
+            (e.g. in old HDF5 files) are ignored.  If not set, no publish latency is
+            computed.
+        frame_rate_fps: Nominal frame rate of the cameras.  If not set, the median
+            frame interval is used as nominal interval.
+
+    Returns:
+        JSON-serializable dictionary with the metrics.  Per-camera values are lists in
+        the order of :data:`~trifinger_cameras.CAMERA_NAMES`.
+    """
+    camera_timestamps = np.asarray(camera_timestamps, dtype=np.float64)
+    n_frames = len(camera_timestamps)
+    report: dict[str, typing.Any] = {
+        "num_frames": n_frames,
+        "cameras": list(CAMERA_NAMES),
+    }
+    if n_frames < 2:
+        return report
+
+    intervals = np.diff(camera_timestamps, axis=0)
+
+    if frame_rate_fps:
+        nominal_interval = 1.0 / frame_rate_fps
+        report["frame_rate_source"] = "nominal"
+    else:
+        nominal_interval = float(np.median(intervals[:, 0]))
+        report["frame_rate_source"] = "median_interval"
+    report["frame_rate_fps"] = 1.0 / nominal_interval if nominal_interval else None
+    report["duration"] = (camera_timestamps[-1] - camera_timestamps[0]).tolist()
+    report["interval"] = _distribution(intervals)
+
+    # A frame whose timestamp did not advance is a duplicate of the previous one (the
+    # camera did not deliver a new image).  Consecutive duplicates are a stall.
+    duplicates = intervals <= 0
+    report["num_duplicates"] = np.count_nonzero(duplicates, axis=0).tolist()
+    report["longest_stall"] = _longest_runs(duplicates).tolist()
+
+    # an interval spanning k nominal intervals means k - 1 frames were dropped
+    if nominal_interval:
+        drops = intervals > DROP_FACTOR * nominal_interval
+        dropped_frames = np.where(drops, np.rint(intervals / nominal_interval) - 1, 0)
+        report["num_drop_events"] = np.count_nonzero(drops, axis=0).tolist()
+        report["num_dropped_frames"] = dropped_frames.sum(axis=0).astype(int).tolist()
+
+        # jitter: deviation from the nominal interval of the regular frames
+        regular = ~(drops | duplicates)
+        deviation = np.where(regular, intervals - nominal_interval, 0)
+        n_regular = np.count_nonzero(regular, axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            jitter = np.sqrt((deviation**2).sum(axis=0) / n_regular)
+        report["jitter_rms"] = jitter.tolist()
+
+    pairs = list(itertools.combinations(range(len(CAMERA_NAMES)), 2))
+    first, second = zip(*pairs)
+    skew = np.abs(
+        camera_timestamps[:, list(first)] - camera_timestamps[:, list(second)]
+    )
+    report["skew"] = {
+        "pairs": [f"{CAMERA_NAMES[a]}-{CAMERA_NAMES[b]}" for a, b in pairs],
+        **_distribution(skew),
+    }
+    report["skew_max"] = _distribution(np.ptp(camera_timestamps, axis=1))
+
+    if sensor_data_timestamps is not None:
+        # the observation can only be published once all cameras captured their image
+        latency = np.asarray(sensor_data_timestamps) - camera_timestamps.max(axis=1)
+        report["publish_latency"] = _distribution(latency[~np.isnan(latency)])
+
+    return report
+
+
+def read_frame_rate(filename: str | os.PathLike) -> typing.Optional[float]:
+    """Read the nominal frame rate from a log.
+
+    Only HDF5 logs contain the frame rate, for binary logs None is returned.  None is
+    also returned if the frame rate is unknown, i.e. if it is missing (e.g. in files
+    converted without ``--frame-rate``) or not a positive number.
+    """
+    filename = pathlib.Path(filename)
+    if filename.suffix not in HDF5_SUFFIXES:
+        return None
+
+    with h5py.File(filename, "r") as h5:
+        group = h5.get(f"camera_info/{CAMERA_NAMES[0]}")
+        if group is None or "frame_rate_fps" not in group.attrs:
+            return None
+        frame_rate_fps = float(group.attrs["frame_rate_fps"])
+
+    # NaN is not positive either
+    if not frame_rate_fps > 0:
+        return None
+    return frame_rate_fps
+
+
+def analyze_log_timing(
+    filename: str | os.PathLike, frame_rate_fps: typing.Optional[float] = None
+) -> dict[str, typing.Any]:
+    """Compute the timing health metrics of a log file.
+
+    Only the timestamps are read from the file, see
+    :func:`~trifinger_cameras.log_timestamps.read_log_timestamps`.
+
+    Args:
+        filename: Path to a binary or HDF5 log.
+        frame_rate_fps: Nominal frame rate.  If not set, it is read from the log (only
+            possible for HDF5 logs), otherwise the median frame interval is used.
+
+    Returns:
+        The metrics as returned by :func:`analyze_timing`, with an additional entry
+        "path".
+    """
+    if frame_rate_fps is None:
+        frame_rate_fps = read_frame_rate(filename)
+    camera_timestamps, sensor_data_timestamps = read_log_timestamps(filename)
+    return {
+        "path": str(filename),
+        **analyze_timing(camera_timestamps, sensor_data_timestamps, frame_rate_fps),
+    }
+
+
+def _replace_nan(value: typing.Any) -> typing.Any:
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    if isinstance(value, dict):
+        return {k: _replace_nan(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_replace_nan(v) for v in value]
+    return value
+
+
+def to_json(report: typing.Mapping[str, typing.Any], **kwargs: typing.Any) -> str:
+    """Serialize a timing report to JSON.
+
+    Non-finite values (which are not valid JSON) are replaced by null.
+
+    Args:
+        report: Report as returned by :func:`analyze_timing`.
+        **kwargs: Passed to :func:`json.dumps`.
+    """
+    return json.dumps(_replace_nan(report), **kwargs)
@@ -0,0 +1,419 @@
+"""Render the simulated TriFinger cameras in parallel worker processes.
+
+PyBullet renders the three camera views of :class:`trifinger_simulation.camera.
+TriFingerCameras` serially in one client, which limits the achievable frame rate of
+the simulated cameras.  :class:`MultiProcessTriFingerCameras` provides the same
+interface but renders each camera in a separate worker process.
+
+Each worker connects to its own PyBullet client (in ``DIRECT`` mode) in which the
+visual shapes of the main simulation are mirrored.  Before each frame, the visual
+shapes of the main simulation are read again and their world poses and colours are
+written to a shared memory buffer, from which the workers update their mirrored scene.
+The rendered Bayer images are returned through a second shared memory buffer.
+
+If the visual shapes change in any other way (e.g. bodies are added or removed), the
+workers are restarted with the new scene.
+
+Only geometry and colour of the visual shapes are mirrored.  Textures that are part of
+mesh files (e.g. referenced by the material file of an OBJ mesh) are loaded by the
+workers as well, other textures (set in URDF files or with
+``changeVisualShape(textureUniqueId=...)``) are not supported.  The workers fail with an
+error if a shape that is textured in the main simulation is not textured in the
+mirrored scene.  Note, however, that PyBullet does not report the textures which are
+not part of the mesh, so those are silently missing in the rendered images.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import multiprocessing.connection
+import typing
+from multiprocessing import shared_memory
+
+import numpy as np
+import pybullet
+
+#: Size of a pose in the state buffer (position + quaternion).
+_POSE_SIZE = 7
+#: Size of the state of one visual shape in the state buffer (pose + RGBA colour).
+_STATE_SIZE = _POSE_SIZE + 4
+
+# commands sent to the workers
+_CMD_RENDER = "render"
+_CMD_STOP = "stop"
+
+
+class VisualShape(typing.NamedTuple):
+    """Description of a visual shape as returned by ``getVisualShapeData``."""
+
+    body_id: int
+    link_index: int
+    geometry_type: int
+    dimensions: tuple[float, ...]
+    mesh_file: str
+    local_position: tuple[float, float, float]
+    local_orientation: tuple[float, float, float, float]
+    rgba_color: tuple[float, float, float, float]
+    has_texture: bool
+
+
+def get_visual_shapes(client_id: int = 0) -> list[VisualShape]:
+    """Get the visual shapes of all bodies in the given PyBullet client.
+
+    Args:
+        client_id: ID of the PyBullet client.
+
+    Returns:
+        List of all visual shapes (in the order of body and link indices).
+    """
+    shapes = []
+    for i in range(pybullet.getNumBodies(physicsClientId=client_id)):
+        body_id = pybullet.getBodyUniqueId(i, physicsClientId=client_id)
+        for data in pybullet.getVisualShapeData(
+            body_id,
+            flags=pybullet.VISUAL_SHAPE_DATA_TEXTURE_UNIQUE_IDS,
+            physicsClientId=client_id,
+        ):
+            mesh_file = data[4]
+            if isinstance(mesh_file, bytes):
+                mesh_file = mesh_file.decode()
+            shapes.append(
+                VisualShape(
+                    body_id=data[0],
+                    link_index=data[1],
+                    geometry_type=data[2],
+                    dimensions=tuple(data[3]),
+                    mesh_file=mesh_file,
+                    local_position=tuple(data[5]),
+                    local_orientation=tuple(data[6]),
+                    rgba_color=tuple(data[7]),
+                    has_texture=data[8] >= 0,
+                )
+            )
+    return shapes
+
+
+def get_visual_shape_poses(
+    shapes: typing.Sequence[VisualShape], out: np.ndarray, client_id: int = 0
+) -> None:
+    """Write the world poses of the links of the given visual shapes to ``out``.
+
+    Args:
+        shapes: Visual shapes as returned by :func:`get_visual_shapes`.
+        out: Array of shape ``(len(shapes), 7)`` to which the poses (position,
+            quaternion) are written.
+        client_id: ID of the PyBullet client.
+    """
+    for i, shape in enumerate(shapes):
+        # The local frames of the visual shapes are relative to the URDF link
+        # frames, so get the world poses of those.
+        if shape.link_index == -1:
+            # for the base, only the pose of the inertial frame is provided, so
+            # the link frame needs to be computed from it
+            com_position, com_orientation = pybullet.getBasePositionAndOrientation(
+                shape.body_id, physicsClientId=client_id
+            )
+            inertial_position, inertial_orientation = pybullet.getDynamicsInfo(
+                shape.body_id, -1, physicsClientId=client_id
+            )[3:5]
+            position, orientation = pybullet.multiplyTransforms(
+                com_position,
+                com_orientation,
+                *pybullet.invertTransform(inertial_position, inertial_orientation),
+            )
+        else:
+            position, orientation = pybullet.getLinkState(
+                shape.body_id,
+                shape.link_index,
+                computeForwardKinematics=True,
+                physicsClientId=client_id,
+            )[4:6]
+        out[i, :3] = position
+        out[i, 3:] = orientation
+
+
+def _get_structure(shapes: typing.Sequence[VisualShape]) -> list[VisualShape]:
+    """Get the parts of the visual shapes that cannot be updated in the workers."""
+    return [shape._replace(rgba_color=None) for shape in shapes]
+
+
+def _create_mirror_body(shape: VisualShape, client_id: int) -> int:
+    """Create a static body with the given visual shape in the given client."""
+    kwargs: dict[str, typing.Any] = {}
+    if shape.geometry_type == pybullet.GEOM_MESH:
+        kwargs["fileName"] = shape.mesh_file
+        kwargs["meshScale"] = shape.dimensions
+    elif shape.geometry_type == pybullet.GEOM_BOX:
+        kwargs["halfExtents"] = [d / 2 for d in shape.dimensions]
+    elif shape.geometry_type == pybullet.GEOM_SPHERE:
+        kwargs["radius"] = shape.dimensions[0]
+    elif shape.geometry_type in (pybullet.GEOM_CYLINDER, pybullet.GEOM_CAPSULE):
+        kwargs["length"] = shape.dimensions[0]
+        kwargs["radius"] = shape.dimensions[1]
+    elif shape.geometry_type == pybullet.GEOM_PLANE:
+        kwargs["planeNormal"] = [0, 0, 1]
+    else:
+        msg = f"Unsupported visual geometry type {shape.geometry_type}"
+        raise ValueError(msg)
+
+    visual_shape_id = pybullet.createVisualShape(
+        shape.geometry_type,
+        rgbaColor=shape.rgba_color,
+        visualFramePosition=shape.local_position,
+        visualFrameOrientation=shape.local_orientation,
+        physicsClientId=client_id,
+        **kwargs,
+    )
+    body_id = pybullet.createMultiBody(
+        baseMass=0,
+        baseVisualShapeIndex=visual_shape_id,
+        physicsClientId=client_id,
+    )
+
+    if shape.has_texture:
+        texture_id = pybullet.getVisualShapeData(
+            body_id,
+            flags=pybullet.VISUAL_SHAPE_DATA_TEXTURE_UNIQUE_IDS,
+            physicsClientId=client_id,
+        )[0][8]
+        if texture_id < 0:
+            msg = (
+                f"Visual shape of link {shape.link_index} of body {shape.body_id} has"
+                " a texture, which cannot be mirrored."
+            )
+            raise ValueError(msg)
+
+    return body_id
+
+
+def _render_worker(
+    camera_index: int,
+    shapes: list[VisualShape],
+    state_buffer_name: str,
+    image_buffer_name: str,
+    image_shape: tuple[int, int, int],
+    connection: multiprocessing.connection.Connection,
+) -> None:
+    """Main function of the worker processes."""
+    from trifinger_simulation import camera as sim_camera
+
+    client_id = pybullet.connect(pybullet.DIRECT)
+
+    state_shm = shared_memory.SharedMemory(name=state_buffer_name)
+    image_shm = shared_memory.SharedMemory(name=image_buffer_name)
+    state = np.ndarray(
+        (len(shapes), _STATE_SIZE), dtype=np.float64, buffer=state_shm.buf
+    )
+    images = np.ndarray(image_shape, dtype=np.uint8, buffer=image_shm.buf)
+    try:
+        mirror_bodies = [_create_mirror_body(shape, client_id) for shape in shapes]
+        colors = [shape.rgba_color for shape in shapes]
+        camera = sim_camera.TriFingerCameras(pybullet_client_id=client_id).cameras[
+            camera_index
+        ]
+
+        connection.send("ready")
+        while connection.recv() == _CMD_RENDER:
+            for i, (body_id, row) in enumerate(zip(mirror_bodies, state)):
+                pybullet.resetBasePositionAndOrientation(
+                    body_id,
+                    row[:3],
+                    row[3:_POSE_SIZE],
+                    physicsClientId=client_id,
+                )
+                color = tuple(row[_POSE_SIZE:])
+                if color != colors[i]:
+                    pybullet.changeVisualShape(
+                        body_id, -1, rgbaColor=color, physicsClientId=client_id
+                    )
+                    colors[i] = color
+            images[camera_index] = sim_camera.rbg_to_bayer_bg(camera.get_image())
+            connection.send("done")
+    except EOFError:
+        # main process is gone
+        pass
+    except Exception as e:
+        # report the error to the main process instead of only exiting
+        connection.send(("error", f"{type(e).__name__}: {e}"))
+    finally:
+        # views on the buffers need to be deleted before closing them
+        del state, images
+        state_shm.close()
+        image_shm.close()
+        pybullet.disconnect(physicsClientId=client_id)
+
+
+class MultiProcessTriFingerCameras:
+    """Drop-in replacement for ``TriFingerCameras`` with parallel rendering.
+
+    Provides the same ``cameras`` attribute (for accessing camera parameters) and
+    ``get_bayer_images()`` method but renders each camera in a separate worker
+    process.  Call :meth:`close` to stop the workers when the cameras are not
+    needed anymore.
+    """
+
+    def __init__(self, client_id: int = 0, start_method: str = "spawn") -> None:
+        """
+        Args:
+            client_id: ID of the PyBullet client of the main simulation.
+            start_method: Start method used for the worker processes (see
+                :mod:`multiprocessing`).
+        """
+        from trifinger_simulation import camera as sim_camera
+
+        self._client_id = client_id
+        self._mp_context = multiprocessing.get_context(start_method)
+
+        #: Cameras in the main simulation.  They are only used to provide access to
+        #: the camera parameters, rendering happens in the workers.
+        self.cameras = sim_camera.TriFingerCameras(pybullet_client_id=client_id).cameras
+
+        self._image_shape = (
+            len(self.cameras),
+            self.cameras[0].get_height(),
+            self.cameras[0].get_width(),
+        )
+        self._image_shm = shared_memory.SharedMemory(
+            create=True, size=int(np.prod(self._image_shape))
+        )
+        self._images = np.ndarray(
+            self._image_shape, dtype=np.uint8, buffer=self._image_shm.buf
+        )
+
+        self._shapes: list[VisualShape] = []
+        self._state_shm: typing.Optional[shared_memory.SharedMemory] = None
+        self._state: typing.Optional[np.ndarray] = None
+        self._workers: list[
+            tuple[
+                multiprocessing.process.BaseProcess,
+                multiprocessing.connection.Connection,
+            ]
+        ] = []
+
+    def __del__(self) -> None:
+        self.close()
+
+    def _start_workers(self, shapes: list[VisualShape]) -> None:
+        """(Re-)start the workers with the given visual shapes."""
+        self._stop_workers()
+
+        self._shapes = shapes
+
+        # SharedMemory does not support zero size, so allocate at least one row
+        n_rows = max(len(self._shapes), 1)
+        self._state_shm = shared_memory.SharedMemory(
+            create=True, size=n_rows * _STATE_SIZE * np.dtype(np.float64).itemsize
+        )
+        self._state = np.ndarray(
+            (n_rows, _STATE_SIZE), dtype=np.float64, buffer=self._state_shm.buf
+        )
+
+        for i in range(len(self.cameras)):
+            connection, worker_connection = self._mp_context.Pipe()
+            process = self._mp_context.Process(
+                target=_render_worker,
+                args=(
+                    i,
+                    self._shapes,
+                    self._state_shm.name,
+                    self._image_shm.name,
+                    self._image_shape,
+                    worker_connection,
+                ),
+                daemon=True,
+            )
+            process.start()
+            self._workers.append((process, connection))
+
+        try:
+            for process, connection in self._workers:
+                self._expect_reply(process, connection, "ready")
+        except RuntimeError:
+            # stop the remaining workers, so they are started again on the next call
+            self._stop_workers()
+            raise
+
+    @staticmethod
+    def _expect_reply(
+        process: multiprocessing.process.BaseProcess,
+        connection: multiprocessing.connection.Connection,
+        expected_reply: str,
+    ) -> None:
+        try:
+            reply = connection.recv()
+        except EOFError:
+            reply = None
+        if reply != expected_reply:
+            if isinstance(reply, tuple) and reply[0] == "error":
+                msg = f"Render worker {process.name} failed: {reply[1]}"
+            else:
+                process.join(timeout=1)
+                msg = (
+                    f"Render worker {process.name} failed"
+                    f" (exit code {process.exitcode})."
+                )
+            raise RuntimeError(msg)
+
+    def _stop_workers(self) -> None:
+        for process, connection in self._workers:
+            try:
+                connection.send(_CMD_STOP)
+            except (BrokenPipeError, OSError):
+                pass
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+            connection.close()
+        self._workers = []
+
+        if self._state_shm is not None:
+            self._state = None
+            self._state_shm.close()
+            self._state_shm.unlink()
+            self._state_shm = None
+
+    def close(self) -> None:
+        """Stop the worker processes and release the shared memory."""
+        # attributes may not exist if __init__ failed
+        if not hasattr(self, "_image_shm"):
+            return
+
+        self._stop_workers()
+
+        if self._images is not None:
+            self._images = None
+            self._image_shm.close()
+            self._image_shm.unlink()
+
+    def get_bayer_images(self) -> list[np.ndarray]:
+        """Render Bayer images of all cameras in parallel.
+
+        Returns:
+            List of Bayer images (one per camera).  The images are views on the
+            shared image buffer and are only valid until the next call of this
+            method.
+        """
+        if self._images is None:
+            msg = "Cameras have already been closed."
+            raise RuntimeError(msg)
+
+        # Poses and colours are updated through the state buffer, any other change
+        # of the scene requires a restart of the workers.
+        shapes = get_visual_shapes(self._client_id)
+        if not self._workers or _get_structure(shapes) != _get_structure(self._shapes):
+            self._start_workers(shapes)
+        self._shapes = shapes
+
+        assert self._state is not None
+        get_visual_shape_poses(
+            self._shapes, self._state[:, :_POSE_SIZE], self._client_id
+        )
+        for row, shape in zip(self._state, self._shapes):
+            row[_POSE_SIZE:] = shape.rgba_color
+
+        for _, connection in self._workers:
+            connection.send(_CMD_RENDER)
+        for process, connection in self._workers:
+            self._expect_reply(process, connection, "done")
+
+        return list(self._images)
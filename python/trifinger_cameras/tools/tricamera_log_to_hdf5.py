@@ -0,0 +1,449 @@
+"""Convert TriCameraObservation log file to hdf5.
+
+Either converts a single file (``--logfile``, ``--outfile``) or, in batch mode
+(``--input-dir``, ``--output-dir``), all log files in a directory tree.  In batch
+mode, files are converted in parallel and the directory structure is mirrored in the
+output directory.  Batch mode uses the streaming converter
+``tricamera_log_to_hdf5_native``, so memory usage does not depend on the length of the
+logs.  Outputs are first written to temporary files and only renamed once complete, and
+existing valid outputs are skipped, so an interrupted batch conversion can simply be
+restarted.
+"""
+
+import argparse
+import concurrent.futures
+import os
+import pathlib
+import subprocess
+import sys
+import time
+import typing
+
+import h5py
+
+from trifinger_cameras import CAMERA_NAMES, tricamera
+from trifinger_cameras.camera_calibration_file import CameraCalibrationFile
+from trifinger_cameras.hdf5 import verify_tricamera_hdf5, write_tricamera_hdf5
+
+#: Default directory with the calibration files of a TriFinger robot.
+DEFAULT_CALIBRATION_DIR = pathlib.Path("/etc/trifingerpro")
+
+#: Suffix of temporary files, which are renamed once the conversion is complete.
+TMP_SUFFIX = ".part"
+
+
+class ConversionResult(typing.NamedTuple):
+    """Statistics of a converted file."""
+
+    n_frames: int
+    input_bytes: int
+
+
+def load_camera_params(
+    camera_info_files: typing.Sequence[pathlib.Path],
+) -> list[CameraCalibrationFile]:
+    """Load the calibration files and verify that they are in the expected order.
+
+    Raises:
+        ValueError: If a file does not exist or the cameras are not in the order of
+            :data:`~trifinger_cameras.CAMERA_NAMES`.
+    """
+    camera_params = []
+    for calib_file in camera_info_files:
+        if not calib_file.is_file():
+            msg = f"Calibration file {calib_file} does not exist."
+            raise ValueError(msg)
+        camera_params.append(CameraCalibrationFile(calib_file))
+
+    # Verify camera names match expected order
+    for param, expected_name in zip(camera_params, CAMERA_NAMES, strict=True):
+        if param["camera_name"] != expected_name:
+            msg = f"Expected camera {expected_name} but got {param['camera_name']}"
+            raise ValueError(msg)
+
+    return camera_params
+
+
+def convert_log(
+    logfile: pathlib.Path,
+    outfile: pathlib.Path,
+    camera_info_files: typing.Sequence[pathlib.Path],
+    frame_rate_fps: float | None = None,
+) -> ConversionResult:
+    """Convert a single log file to HDF5.
+
+    The output is first written to a temporary file next to ``outfile``, which is
+    renamed once it is complete.  So ``outfile`` either does not exist or is complete,
+    even if the conversion is interrupted.
+
+    The log does not contain the frame rate of the cameras, so it is only stored in the
+    HDF5 file if ``frame_rate_fps`` is set.
+
+    Raises:
+        ValueError: If the log is empty or doesn't match the calibration files.
+    """
+    camera_params = load_camera_params(camera_info_files)
+
+    log_reader = tricamera.LogReader(str(logfile))
+
+    n_frames = len(log_reader.data)
+    if n_frames == 0:
+        msg = "No frames found in log file."
+        raise ValueError(msg)
+
+    img_shape = log_reader.data[0].cameras[0].image.shape
+
+    # sanity check that the image size matches with camera info files
+    for i, params in enumerate(camera_params):
+        if (
+            params["image_width"] != img_shape[1]
+            or params["image_height"] != img_shape[0]
+        ):
+            msg = (
+                f"Image size mismatch for camera {CAMERA_NAMES[i]}:"
+                f" expected {img_shape[1]}x{img_shape[0]} (based on camera info) but"
+                f" got {params['image_width']}x{params['image_height']}"
+            )
+            raise ValueError(msg)
+
+    tmp_file = get_tmp_path(outfile)
+    try:
+        with h5py.File(tmp_file, "w") as h5:
+            write_tricamera_hdf5(
+                h5,
+                camera_params,
+                n_frames,
+                zip(log_reader.data, log_reader.timestamps, strict=True),
+                frame_rate_fps,
+            )
+        # atomic, so outfile never exists in an incomplete state
+        os.replace(tmp_file, outfile)
+    except BaseException:
+        tmp_file.unlink(missing_ok=True)
+        raise
+
+    return ConversionResult(n_frames, logfile.stat().st_size)
+
+
+def get_tmp_path(outfile: pathlib.Path) -> pathlib.Path:
+    """Get the path of the temporary file that is written before ``outfile``."""
+    return outfile.with_name(outfile.name + TMP_SUFFIX)
+
+
+def get_num_converted_frames(outfile: pathlib.Path) -> int | None:
+    """Get the number of frames in ``outfile`` if it is a valid TriCamera HDF5 file.
+
+    Returns:
+        The number of frames or None if ``outfile`` does not exist or is not a valid
+        TriCamera HDF5 file.
+    """
+    if not outfile.is_file():
+        return None
+
+    try:
+        with h5py.File(outfile, "r") as h5:
+            verify_tricamera_hdf5(h5, {2})
+            return h5["images"].shape[0]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def is_converted(outfile: pathlib.Path) -> bool:
+    """Check if ``outfile`` is a valid TriCamera HDF5 file."""
+    return get_num_converted_frames(outfile) is not None
+
+
+def get_output_path(
+    logfile: pathlib.Path, input_dir: pathlib.Path, output_dir: pathlib.Path
+) -> pathlib.Path:
+    """Get the output file of ``logfile``, mirroring the structure of ``input_dir``."""
+    return output_dir / logfile.relative_to(input_dir).with_suffix(".hdf5")
+
+
+def find_conversion_tasks(
+    input_dir: pathlib.Path, output_dir: pathlib.Path, pattern: str
+) -> tuple[list[tuple[pathlib.Path, pathlib.Path]], int]:
+    """Find the log files in ``input_dir`` that are not converted yet.
+
+    Returns:
+        Tuple (todo, n_skipped) with the pairs (logfile, outfile) that need to be
+        converted and the number of files that are already converted.
+    """
+    todo = []
+    n_skipped = 0
+    for logfile in sorted(input_dir.rglob(pattern)):
+        if not logfile.is_file():
+            continue
+        outfile = get_output_path(logfile, input_dir, output_dir)
+        if is_converted(outfile):
+            n_skipped += 1
+        else:
+            todo.append((logfile, outfile))
+
+    return todo, n_skipped
+
+
+def convert_log_native(
+    native_converter: pathlib.Path,
+    logfile: pathlib.Path,
+    outfile: pathlib.Path,
+    camera_info_files: typing.Sequence[pathlib.Path],
+    num_threads: int,
+    frame_rate_fps: float | None = None,
+) -> ConversionResult:
+    """Convert a single log file to HDF5 using ``tricamera_log_to_hdf5_native``.
+
+    Other than :func:`convert_log`, this does not load the whole log into memory.
+    Like :func:`convert_log`, the output is first written to a temporary file, so
+    ``outfile`` either does not exist or is complete.
+
+    Args:
+        native_converter: Path to the ``tricamera_log_to_hdf5_native`` executable.
+        logfile: Log file that is converted.
+        outfile: Path of the HDF5 file that is written.
+        camera_info_files: Paths to the three camera calibration files.
+        num_threads: Number of threads used by the converter for compression.
+        frame_rate_fps: Frame rate of the cameras, which is stored in the HDF5 file.
+            If not set, the file does not contain a frame rate.
+
+    Raises:
+        RuntimeError: If the conversion fails.
+    """
+    tmp_file = get_tmp_path(outfile)
+    # left behind if a previous conversion was killed
+    tmp_file.unlink(missing_ok=True)
+
+    cmd = [
+        native_converter,
+        "--logfile",
+        logfile,
+        "--outfile",
+        tmp_file,
+        "--camera-info",
+        *camera_info_files,
+        "--threads",
+        str(num_threads),
+    ]
+    if frame_rate_fps is not None:
+        cmd += ["--frame-rate", str(frame_rate_fps)]
+
+    try:
+        result = subprocess.run(
+            cmd,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            text=True,
+            check=False,
+        )
+        if result.returncode != 0:
+            msg = result.stderr.strip() or f"Exit code {result.returncode}"
+            raise RuntimeError(msg)
+
+        n_frames = get_num_converted_frames(tmp_file)
+        if n_frames is None:
+            msg = "Converter did not write a valid HDF5 file."
+            raise RuntimeError(msg)
+
+        # atomic, so outfile never exists in an incomplete state
+        os.replace(tmp_file, outfile)
+    except BaseException:
+        tmp_file.unlink(missing_ok=True)
+        raise
+
+    return ConversionResult(n_frames, logfile.stat().st_size)
+
+
+def convert_batch(
+    native_converter: pathlib.Path,
+    input_dir: pathlib.Path,
+    output_dir: pathlib.Path,
+    pattern: str,
+    camera_info_files: typing.Sequence[pathlib.Path],
+    jobs: int | None,
+    frame_rate_fps: float | None = None,
+) -> int:
+    """Convert all log files in ``input_dir`` that are not converted yet.
+
+    Each file is converted by a separate ``tricamera_log_to_hdf5_native`` process (see
+    :func:`convert_log_native`), of which ``jobs`` run in parallel.  The available CPU
+    cores are split between them for compression.  ``frame_rate_fps`` is stored in all
+    files (if set).
+
+    Returns:
+        Number of files that failed to convert.
+    """
+    todo, n_skipped = find_conversion_tasks(input_dir, output_dir, pattern)
+
+    print(f"{len(todo)} files to convert, {n_skipped} already converted.")
+
+    num_cpus = os.cpu_count() or 1
+    jobs = jobs or num_cpus
+    num_threads = max(1, num_cpus // jobs)
+
+    n_frames = 0
+    input_bytes = 0
+    n_failed = 0
+    start_time = time.monotonic()
+    # the work is done in the converter processes, so threads are enough here
+    with concurrent.futures.ThreadPoolExecutor(max_workers=jobs) as executor:
+        futures = {}
+        for logfile, outfile in todo:
+            outfile.parent.mkdir(parents=True, exist_ok=True)
+            future = executor.submit(
+                convert_log_native,
+                native_converter,
+                logfile,
+                outfile,
+                camera_info_files,
+                num_threads,
+                frame_rate_fps,
+            )
+            futures[future] = logfile
+
+        for i, future in enumerate(concurrent.futures.as_completed(futures), 1):
+            logfile = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                n_failed += 1
+                print(f"[{i}/{len(todo)}] FAILED {logfile}: {e}", file=sys.stderr)
+            else:
+                n_frames += result.n_frames
+                input_bytes += result.input_bytes
+                print(f"[{i}/{len(todo)}] {logfile} ({result.n_frames} frames)")
+
+    duration = time.monotonic() - start_time
+    if todo:
+        print(
+            f"Converted {len(todo) - n_failed} files ({n_frames} frames,"
+            f" {input_bytes / 1e6:.1f} MB) in {duration:.1f} s:"
+            f" {n_frames / duration:.1f} frames/s,"
+            f" {input_bytes / 1e6 / duration:.1f} MB/s."
+        )
+    if n_failed:
+        print(f"{n_failed} files failed to convert.", file=sys.stderr)
+
+    return n_failed
+
+
+def main(native_converter: pathlib.Path) -> int:
+    """Main entry point of the ``tricamera_log_to_hdf5`` script.
+
+    Args:
+        native_converter: Path to the ``tricamera_log_to_hdf5_native`` executable,
+            which is used in batch mode.
+    """
+    argparser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    input_group = argparser.add_mutually_exclusive_group(required=True)
+    input_group.add_argument(
+        "--logfile",
+        "-l",
+        type=pathlib.Path,
+        help="Path to the log file.",
+    )
+    input_group.add_argument(
+        "--input-dir",
+        type=pathlib.Path,
+        help="Batch mode: Convert all log files in this directory (recursively).",
+    )
+    argparser.add_argument(
+        "--outfile",
+        "-o",
+        type=pathlib.Path,
+        help="Path to the output hdf5 file (required with --logfile).",
+    )
+    argparser.add_argument(
+        "--output-dir",
+        type=pathlib.Path,
+        help="Batch mode: Directory to which the HDF5 files are written (required"
+        " with --input-dir).",
+    )
+    argparser.add_argument(
+        "--pattern",
+        type=str,
+        default="*.dat",
+        help="Batch mode: Glob pattern of the log files.  Default: '%(default)s'",
+    )
+    argparser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        help="Batch mode: Number of files converted in parallel.  Default: number of"
+        " CPU cores.",
+    )
+    # Add arguments for calibration files
+    argparser.add_argument(
+        "--camera-info",
+        "-c",
+        type=pathlib.Path,
+        nargs=3,
+        help=f"""Paths to the three camera calibration YAML files.  Default:
+            {{camera_name}}_cropped.yml in {DEFAULT_CALIBRATION_DIR}.
+        """,
+    )
+    argparser.add_argument(
+        "--frame-rate",
+        type=float,
+        help="""Frame rate of the cameras in fps.  It is not included in the log, so it
+            is only stored in the HDF5 file if set.
+        """,
+    )
+    args = argparser.parse_args()
+
+    if args.frame_rate is not None and not args.frame_rate > 0:
+        argparser.error("--frame-rate must be positive.")
+
+    if args.camera_info is None:
+        args.camera_info = [
+            DEFAULT_CALIBRATION_DIR / f"{name}_cropped.yml" for name in CAMERA_NAMES
+        ]
+
+    try:
+        # load once here, so errors are reported before starting the conversion
+        load_camera_params(args.camera_info)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+
+    if args.input_dir is not None:
+        if args.output_dir is None:
+            argparser.error("--output-dir is required with --input-dir.")
+        if not args.input_dir.is_dir():
+            print("Input directory does not exist.", file=sys.stderr)
+            return 1
+
+        if not native_converter.is_file():
+            print(f"Converter {native_converter} does not exist.", file=sys.stderr)
+            return 1
+
+        n_failed = convert_batch(
+            native_converter,
+            args.input_dir,
+            args.output_dir,
+            args.pattern,
+            args.camera_info,
+            args.jobs,
+            args.frame_rate,
+        )
+        return 1 if n_failed else 0
+
+    if args.outfile is None:
+        argparser.error("--outfile is required with --logfile.")
+
+    if not args.logfile.is_file():
+        print("Log file does not exist.", file=sys.stderr)
+        return 1
+
+    if args.outfile.exists():
+        print("Output file already exists.  Exiting.", file=sys.stderr)
+        return 1
+
+    try:
+        convert_log(args.logfile, args.outfile, args.camera_info, args.frame_rate)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+
+    return 0
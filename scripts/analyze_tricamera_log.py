@@ -1,15 +1,19 @@
 #!/usr/bin/env python3
 """
-Analyze a TriCameraObservation log file.
+Analyze the timing of a TriCameraObservation log file (binary or HDF5).
+
+Only the timestamps are read from the log, so this is fast even for large logs.  With
+``--json``, the timing health metrics of :mod:`trifinger_cameras.log_timing` are printed
+as JSON instead.
 """
 
 import argparse
-import cv2
+import time
+
 import numpy as np
-import matplotlib.pyplot as plt
 
-import trifinger_cameras
-from trifinger_cameras import utils
+from trifinger_cameras.log_timestamps import get_frame_interval, read_log_timestamps
+from trifinger_cameras.log_timing import analyze_log_timing, to_json
 
 
 def main():
@@ -19,42 +23,68 @@ def main():
         type=str,
         help="""Path to the log file.""",
     )
+    argparser.add_argument(
+        "--no-plot",
+        action="store_true",
+        help="Only print the statistics, don't show plots.",
+    )
+    argparser.add_argument(
+        "--json",
+        action="store_true",
+        help="""Print the timing metrics (intervals, dropped and duplicate frames,
+            camera skew, publish latency) as JSON and exit.
+        """,
+    )
+    argparser.add_argument(
+        "--frame-rate",
+        type=float,
+        help="""Nominal frame rate for the detection of dropped frames (only used with
+            --json).  Default: Frame rate stored in the log (HDF5 only) or the median
+            frame interval.
+        """,
+    )
     args = argparser.parse_args()
 
-    log_reader = trifinger_cameras.tricamera.LogReader(args.filename)
+    if args.json:
+        print(to_json(analyze_log_timing(args.filename, args.frame_rate), indent=2))
+        return
+
+    t_start = time.monotonic()
+    camera_timestamps, _ = read_log_timestamps(args.filename)
+    t_end = time.monotonic()
+    print("Time for reading timestamps: {:.3f} s".format(t_end - t_start))
 
     # determine rate based on time stamps
-    start_time = log_reader.data[0].cameras[0].timestamp
-    end_time = log_reader.data[-1].cameras[0].timestamp
-    duration = end_time - start_time
-    interval = duration / len(log_reader.data)
+    duration = camera_timestamps[-1, 0] - camera_timestamps[0, 0]
     # convert to ms
-    interval = int(interval * 1000)
+    interval = int(get_frame_interval(camera_timestamps) * 1000)
 
     print(
         "Loaded {} frames at an average interval of {} ms ({:.1f} fps)".format(
-            len(log_reader.data), interval, 1000 / interval
+            len(camera_timestamps), interval, 1000 / interval
         )
     )
     print("Total duration: {:.1f} seconds".format(duration))
 
-    stamps = [
-        np.array([observation.cameras[c].timestamp for observation in log_reader.data])
-        for c in range(3)
-    ]
+    stamps = camera_timestamps.T
+
+    if not args.no_plot:
+        # only import when needed, so the statistics can be printed without it
+        import matplotlib.pyplot as plt
 
-    fig, axes = plt.subplots(2, 3)
+        fig, axes = plt.subplots(2, 3)
 
-    for i in range(3):
-        axes[0, i].plot(stamps[i])
-        axes[0, i].set_title("camera {}".format(i))
+        for i in range(3):
+            axes[0, i].plot(stamps[i])
+            axes[0, i].set_title("camera {}".format(i))
 
     for i, (a, b) in enumerate(((0, 1), (0, 2), (1, 2))):
         # convert diffs to miliseconds
         diffs = (stamps[a] - stamps[b]) * 1000
-        axes[1, i].plot(diffs)
-        axes[1, i].set_title("diff {} - {}".format(a, b))
-        axes[1, i].set_ylabel("Milliseconds")
+        if not args.no_plot:
+            axes[1, i].plot(diffs)
+            axes[1, i].set_title("diff {} - {}".format(a, b))
+            axes[1, i].set_ylabel("Milliseconds")
 
         diffs = np.abs(diffs)
         print("Time differences {} - {}".format(a, b))
@@ -62,7 +92,8 @@ def main():
         print("\tmin: {:.4f} ms".format(diffs.min()))
         print("\tmax: {:.4f} ms".format(diffs.max()))
 
-    plt.show()
+    if not args.no_plot:
+        plt.show()
 
 
 if __name__ == "__main__":
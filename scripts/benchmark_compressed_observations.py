@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""Benchmark compressed against raw TriCamera observations.
+
+Replays the frames of a TriCamera log file and
+
+1. compresses them the same way as the ``CompressingTriCameraDriver`` does and reports
+   the achieved compression ratios and the time needed for compression and
+   decompression,
+2. measures the end-to-end transport through shared memory for raw and compressed
+   observations: a producer (like the back end) compresses (if applicable) and appends
+   each frame to multi-process sensor data and several consumers (like front ends in
+   other processes) read it from shared memory and decode the images.
+
+Note that the serialized size of compressed observations is determined by the buffer
+capacity (see ``compressed_capacity_ratio`` in the configuration), not by the actual
+size of the compressed images.  The amount of data copied to and from shared memory
+is therefore only reduced if the capacity is reduced accordingly.  Use the ratios
+reported by this script to choose a suitable value.  The image size of the log needs
+to match the configured image size for the transport benchmark.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import pathlib
+import sys
+import time
+import types
+import typing
+
+import numpy as np
+
+import trifinger_cameras
+
+
+def analyze_compression(observations: list) -> tuple[np.ndarray, int]:
+    """Print compression ratio and timing of compressing the observations.
+
+    Returns:
+        Tuple (ratios, raw_size) with the compressed size of each image relative to
+        the raw image and the size of a raw image in bytes.
+    """
+    image = observations[0].cameras[0].image
+    raw_size = image.shape[0] * image.shape[1]
+    # Use the raw image size as capacity, so that all images can be represented
+    # (images that do not compress are stored raw).
+    compressed = [
+        trifinger_cameras.compressed_tricamera.CompressedCameraObservation(raw_size)
+        for _ in range(3)
+    ]
+
+    compress_durations = []
+    decompress_durations = []
+    ratios = []
+    num_raw_fallback = 0
+    for observation in observations:
+        t_start = time.perf_counter()
+        for camera, camera_observation in zip(compressed, observation.cameras):
+            camera.compress(camera_observation)
+        compress_durations.append(time.perf_counter() - t_start)
+
+        t_start = time.perf_counter()
+        decompressed = [camera.get_image() for camera in compressed]
+        decompress_durations.append(time.perf_counter() - t_start)
+
+        for camera_observation, camera, image in zip(
+            observation.cameras, compressed, decompressed
+        ):
+            if not np.array_equal(camera_observation.image, image):
+                msg = "Decompressed image differs from original."
+                raise RuntimeError(msg)
+            if camera.data_size == raw_size:
+                num_raw_fallback += 1
+            ratios.append(camera.data_size / raw_size)
+
+    ratios = np.array(ratios)
+    compress_ms = np.array(compress_durations) * 1000
+    decompress_ms = np.array(decompress_durations) * 1000
+
+    print(
+        f"Frames: {len(observations)}  (image size: {image.shape[1]}x{image.shape[0]})"
+    )
+    print()
+    print("Compressed size relative to raw image:")
+    print(f"\tmean: {ratios.mean():.3f}")
+    print(f"\tmin:  {ratios.min():.3f}")
+    print(f"\tmax:  {ratios.max():.3f}")
+    print(f"\tuncompressible images: {num_raw_fallback}")
+    print()
+    print("Time per observation (three images, sequentially):")
+    print(
+        f"\tcompression:   {compress_ms.mean():.2f} ms"
+        f" (max {compress_ms.max():.2f} ms)"
+    )
+    print(
+        f"\tdecompression: {decompress_ms.mean():.2f} ms"
+        f" (max {decompress_ms.max():.2f} ms)"
+    )
+    print()
+
+    return ratios, raw_size
+
+
+def benchmark_transport(
+    name: str,
+    camera_module: types.ModuleType,
+    observations: list,
+    encode: typing.Callable[[typing.Any], typing.Any],
+    decode: typing.Callable[[typing.Any], list[np.ndarray]],
+    num_consumers: int,
+    history_length: int,
+) -> dict[str, np.ndarray]:
+    """Measure the transport of the observations through shared memory.
+
+    Args:
+        name: Name of the transport (used for the shared memory ID).
+        camera_module: Module with the bindings of the observation type.
+        observations: Observations that are transported.
+        encode: Converts an observation from the log to the transported type.
+        decode: Gets the images from a transported observation.
+        num_consumers: Number of consumers reading each observation.
+        history_length: Length of the time series in shared memory.
+
+    Returns:
+        Durations (in seconds) per frame of the producer ("producer") and summed
+        over all consumers ("consumers").
+    """
+    shared_memory_id = f"benchmark_{name}_{os.getpid()}"
+    producer_data = camera_module.MultiProcessData(
+        shared_memory_id, True, history_length
+    )
+    consumers = [
+        camera_module.Frontend(camera_module.MultiProcessData(shared_memory_id, False))
+        for _ in range(num_consumers)
+    ]
+
+    producer_durations = []
+    consumer_durations = []
+    for t, observation in enumerate(observations):
+        t_start = time.perf_counter()
+        camera_module.append_observation(producer_data, encode(observation))
+        producer_durations.append(time.perf_counter() - t_start)
+
+        t_start = time.perf_counter()
+        for frontend in consumers:
+            decode(frontend.get_observation(t))
+        consumer_durations.append(time.perf_counter() - t_start)
+
+    return {
+        "producer": np.array(producer_durations),
+        "consumers": np.array(consumer_durations),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "logfile", type=pathlib.Path, help="TriCamera log file used as input."
+    )
+    parser.add_argument(
+        "--history-length",
+        type=int,
+        default=100,
+        help="Length of the time series in shared memory.  Default: %(default)s.",
+    )
+    parser.add_argument(
+        "--consumers",
+        type=int,
+        default=3,
+        help="Number of consumers in the transport benchmark.  Default: %(default)s.",
+    )
+    parser.add_argument(
+        "--max-frames",
+        type=int,
+        help="Only use the given number of frames from the log.",
+    )
+    args = parser.parse_args()
+
+    log_reader = trifinger_cameras.tricamera.LogReader(str(args.logfile))
+    observations = log_reader.data[: args.max_frames]
+    if not observations:
+        print("Log file does not contain any frames.", file=sys.stderr)
+        return 1
+
+    try:
+        ratios, raw_size = analyze_compression(observations)
+    except RuntimeError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 1
+
+    compressed_module = trifinger_cameras.compressed_tricamera
+    capacity = compressed_module.CompressedCameraObservation.get_default_capacity()
+    # suggest a capacity with some margin above the largest observed size
+    suggested_ratio = min(1.0, np.ceil(ratios.max() * 1.1 * 100) / 100)
+    if ratios.max() * raw_size > capacity:
+        print(
+            f"ERROR: The configured capacity ratio {capacity / raw_size:.2f} is too"
+            " small for some of the images (images are not stored lossy)."
+            f"  Suggested compressed_capacity_ratio: {suggested_ratio:.2f}",
+            file=sys.stderr,
+        )
+        return 1
+
+    results = {
+        "raw": benchmark_transport(
+            "raw",
+            trifinger_cameras.tricamera,
+            observations,
+            encode=lambda observation: observation,
+            decode=lambda observation: [
+                np.asarray(camera.image) for camera in observation.cameras
+            ],
+            num_consumers=args.consumers,
+            history_length=args.history_length,
+        ),
+        "compressed": benchmark_transport(
+            "compressed",
+            compressed_module,
+            observations,
+            encode=compressed_module.CompressedTriCameraObservation,
+            decode=lambda observation: [
+                camera.get_image() for camera in observation.cameras
+            ],
+            num_consumers=args.consumers,
+            history_length=args.history_length,
+        ),
+    }
+
+    mib = 1024 * 1024
+    frame_bytes = {"raw": 3 * raw_size, "compressed": 3 * capacity}
+    print(
+        f"End-to-end transport through shared memory ({args.consumers} consumers,"
+        f" configured capacity ratio {capacity / raw_size:.2f}):"
+    )
+    for name, durations in results.items():
+        producer_ms = durations["producer"] * 1000
+        consumer_ms = durations["consumers"] * 1000 / args.consumers
+        total_ms = (durations["producer"] + durations["consumers"]) * 1000
+        print(f"\t{name}:")
+        print(f"\t\tproducer (encode + append): {producer_ms.mean():.2f} ms")
+        print(f"\t\tper consumer (read + decode): {consumer_ms.mean():.2f} ms")
+        print(f"\t\ttotal per frame: {total_ms.mean():.2f} ms")
+        print(
+            f"\t\tshared memory for {args.history_length} frames:"
+            f" {args.history_length * frame_bytes[name] / mib:.1f} MiB"
+        )
+    print()
+    print(f"Suggested compressed_capacity_ratio: {suggested_ratio:.2f}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""Benchmark the rendering of the simulated TriFinger cameras.
+
+Renders frames of the simulated TriFinger platform (robot, stage and cube) with
+``trifinger_simulation.camera.TriFingerCameras`` (all cameras serially in the main
+process) and with ``MultiProcessTriFingerCameras`` (one worker process per camera, see
+the ``multi_process_rendering`` option of the ``PyBulletTriCameraDriver``) and reports
+the achieved frame rates.  The robot is moved between frames, so the poses of the
+mirrored scene are updated for each frame like in the driver.
+
+With three cameras, the multi-process rendering can be up to three times as fast,
+given that at least three CPU cores are available.  Before the measurement, the images
+of both variants are compared to verify that the mirrored scene is complete (single
+pixels may differ due to rounding, e.g. of scaled meshes).
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from trifinger_simulation import camera as sim_camera
+from trifinger_simulation import trifinger_platform
+
+from trifinger_cameras import pybullet_render_workers
+
+
+def measure_fps(cameras, platform, num_frames: int) -> float:
+    """Render the given number of frames and return the achieved frame rate."""
+    # render once before the measurement (starts the workers if applicable)
+    cameras.get_bayer_images()
+
+    t_start = time.perf_counter()
+    for i in range(num_frames):
+        angle = 0.5 * np.sin(i * 0.1)
+        platform.simfinger.reset_finger_positions_and_velocities(
+            [0.0, 0.9 + angle, -1.7 - angle] * 3
+        )
+        cameras.get_bayer_images()
+    return num_frames / (time.perf_counter() - t_start)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "--frames",
+        type=int,
+        default=100,
+        help="Number of frames rendered per variant.  Default: %(default)s",
+    )
+    args = parser.parse_args()
+
+    platform = trifinger_platform.TriFingerPlatform(visualization=False)
+    client_id = platform.simfinger._pybullet_client_id
+
+    single_process_cameras = sim_camera.TriFingerCameras(pybullet_client_id=client_id)
+    multi_process_cameras = pybullet_render_workers.MultiProcessTriFingerCameras(
+        client_id
+    )
+    try:
+        differing_pixels = [
+            np.mean(expected != image)
+            for expected, image in zip(
+                single_process_cameras.get_bayer_images(),
+                multi_process_cameras.get_bayer_images(),
+            )
+        ]
+
+        single_process_fps = measure_fps(single_process_cameras, platform, args.frames)
+        multi_process_fps = measure_fps(multi_process_cameras, platform, args.frames)
+    finally:
+        multi_process_cameras.close()
+
+    print(
+        "Pixels differing from single-process rendering:"
+        f" {max(differing_pixels) * 100:.3f} %"
+    )
+    print(f"Rendered frames per variant: {args.frames}")
+    print(f"\tsingle process: {single_process_fps:.1f} fps")
+    print(f"\tworker processes: {multi_process_fps:.1f} fps")
+    print(f"\tspeed-up: {multi_process_fps / single_process_fps:.2f}x")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""Show lag and drop statistics of all camera data consumers.
+
+Lists the statistics published by consumers that access the camera data through
+``trifinger_cameras.consumer_stats.MonitoredFrontend`` and updates them live.
+"""
+
+import argparse
+import sys
+import time
+
+import tabulate
+
+from trifinger_cameras import consumer_stats
+
+COLUMNS = (
+    ("stream", "Stream"),
+    ("consumer", "Consumer"),
+    ("pid", "PID"),
+    ("newest_timeindex", "Newest t"),
+    ("consumed_timeindex", "Consumed t"),
+    ("lag", "Lag"),
+    ("frames_consumed", "Consumed"),
+    ("frames_skipped", "Skipped"),
+    ("overrun_events", "Overruns"),
+    ("age", "Last update [s]"),
+)
+
+
+def print_stats(stats: list) -> None:
+    now = time.time()
+    rows = []
+    for s in stats:
+        s["age"] = f"{now - s['update_time']:.1f}"
+        if not s["alive"]:
+            s["consumer"] += " (dead)"
+        rows.append([s[key] for key, _ in COLUMNS])
+
+    print(tabulate.tabulate(rows, headers=[header for _, header in COLUMNS]))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=1.0,
+        help="Update interval in seconds.  Default: %(default)s.",
+    )
+    parser.add_argument(
+        "--once", action="store_true", help="Print the statistics once and exit."
+    )
+    parser.add_argument(
+        "--cleanup",
+        action="store_true",
+        help="Remove statistics of consumers that are not running anymore.",
+    )
+    args = parser.parse_args()
+
+    if not consumer_stats.STATS_DIRECTORY.exists():
+        print("No consumer statistics found.", file=sys.stderr)
+        return 1
+
+    try:
+        while True:
+            stats = consumer_stats.read_published_stats()
+            if args.cleanup:
+                for s in stats:
+                    if not s["alive"]:
+                        s["file"].unlink(missing_ok=True)
+                stats = [s for s in stats if s["alive"]]
+
+            if not args.once:
+                # clear screen
+                print("\033[2J\033[H", end="")
+            print_stats(stats)
+
+            if args.once:
+                break
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        pass
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
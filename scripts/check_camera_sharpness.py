@@ -171,8 +171,20 @@ def main() -> None:
     )
 
     rate_ms = int(1000 / args.update_freq)
+    t = -1
     while True:
-        observation = camera_frontend.get_latest_observation()
+        # wait for a new frame, so the same frame is not processed repeatedly if
+        # the camera is slower than the update frequency
+        t_new = trifinger_cameras.camera.wait_for_new_observation(
+            camera_data, t, timeout_s=0.1
+        )
+        if t_new is None:
+            # keep the GUI responsive while waiting
+            if cv2.waitKey(1) in [ord("q"), 27]:  # 27 = ESC
+                break
+            continue
+        t = t_new
+        observation = camera_frontend.get_observation(t)
         image = utils.convert_image(observation.image)
 
         edges_mean, edges = utils.check_image_sharpness(
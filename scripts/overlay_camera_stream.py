@@ -36,15 +36,23 @@ def main():
     )
     camera_frontend = trifinger_cameras.camera.Frontend(camera_data)
 
+    t = -1
     while True:
-        observation = camera_frontend.get_latest_observation()
-        image = utils.convert_image(observation.image)
+        # only process new frames (with a timeout to keep the GUI responsive)
+        t_new = trifinger_cameras.camera.wait_for_new_observation(
+            camera_data, t, timeout_s=0.1
+        )
+        if t_new is not None:
+            t = t_new
+            observation = camera_frontend.get_observation(t)
+            image = utils.convert_image(observation.image)
 
-        image = cv2.addWeighted(image, 1 - alpha, overlay_image, alpha, 0)
+            image = cv2.addWeighted(image, 1 - alpha, overlay_image, alpha, 0)
+
+            cv2.imshow("Camera", image)
 
-        cv2.imshow("Camera", image)
         # stop if either "q" or ESC is pressed
-        if cv2.waitKey(10) in [ord("q"), 27]:  # 27 = ESC
+        if cv2.waitKey(1) in [ord("q"), 27]:  # 27 = ESC
             break
 
 
@@ -11,6 +11,7 @@ be changed to using a single camera either via Pylon or OpenCV with the
 
 import argparse
 import os
+import time
 
 import cv2
 
@@ -124,6 +125,7 @@ def main():
     camera_backend = camera_module.Backend(camera_driver, camera_data)
     camera_frontend = camera_module.Frontend(camera_data)
 
+    t = -1
     while True:
         sample_name = image_saver.next()
         if image_saver.exists():
@@ -131,18 +133,24 @@ def main():
             continue
 
         if args.trigger_interval:
-            interval_ms = 10
-            steps = int(args.trigger_interval * 1000 / interval_ms)
-            for i in range(steps):
-                observation = camera_frontend.get_latest_observation()
-                if args.driver == "tri":
-                    for i, name in enumerate(camera_names):
-                        image = utils.convert_image(observation.cameras[i].image)
-                        cv2.imshow(name, image)
-                else:
-                    image = utils.convert_image(observation.image)
-                    cv2.imshow(args.camera_id, image)
-                cv2.waitKey(interval_ms)
+            end_time = time.monotonic() + args.trigger_interval
+            while time.monotonic() < end_time:
+                # only show new frames (with a timeout to keep the GUI
+                # responsive)
+                t_new = camera_module.wait_for_new_observation(
+                    camera_data, t, timeout_s=0.1
+                )
+                if t_new is not None:
+                    t = t_new
+                    observation = camera_frontend.get_observation(t)
+                    if args.driver == "tri":
+                        for i, name in enumerate(camera_names):
+                            image = utils.convert_image(observation.cameras[i].image)
+                            cv2.imshow(name, image)
+                    else:
+                        image = utils.convert_image(observation.image)
+                        cv2.imshow(args.camera_id, image)
+                cv2.waitKey(1)
             print("Record sample {}".format(sample_name))
 
         else:
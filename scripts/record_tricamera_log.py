@@ -2,6 +2,7 @@
 """Run the TriCamera backend and logger to record data."""
 
 import argparse
+import glob
 import logging
 import pathlib
 import sys
@@ -10,6 +11,174 @@ import time
 import signal_handler
 import trifinger_cameras
 
+#: Fill level of the logger buffer at which a warning is printed.
+BUFFER_WARNING_LEVEL = 0.9
+
+
+def parse_size(value: str) -> int:
+    """Parse a size in bytes with optional suffix K, M or G (e.g. "4G")."""
+    units = {"K": 1024, "M": 1024**2, "G": 1024**3}
+    number = value.strip().upper().removesuffix("B")
+    try:
+        if number and number[-1] in units:
+            return int(float(number[:-1]) * units[number[-1]])
+        return int(number)
+    except ValueError:
+        msg = f"Invalid size '{value}'.  Expected e.g. 500M or 4G."
+        raise argparse.ArgumentTypeError(msg) from None
+
+
+class BufferUsageReporter:
+    """Periodically print the buffer usage of the logger and warn when it fills up."""
+
+    def __init__(self, camera_logger, interval_s: float) -> None:
+        self.camera_logger = camera_logger
+        self.interval_s = interval_s
+        self.reset()
+
+    def reset(self) -> None:
+        """Reset for a new recording."""
+        self._next_report = time.monotonic() + self.interval_s
+        self._warned_fill_level = False
+        self._warned_dropped = False
+
+    def update(self) -> None:
+        """Check the buffer usage and print it if the interval has passed."""
+        usage = self.camera_logger.get_buffer_usage()
+
+        if usage.frames_dropped and not self._warned_dropped:
+            logging.warning(
+                "Logger buffer is full, frames are dropped!  Stop the recording to"
+                " save the data."
+            )
+            self._warned_dropped = True
+        elif usage.fill_level >= BUFFER_WARNING_LEVEL and not self._warned_fill_level:
+            logging.warning(
+                "Logger buffer is %d %% full.  Frames will be dropped once it is"
+                " full.",
+                usage.fill_level * 100,
+            )
+            self._warned_fill_level = True
+
+        if self.interval_s > 0 and time.monotonic() >= self._next_report:
+            self._next_report += self.interval_s
+            logging.info(
+                "Buffer: %d/%d frames (%d %%), %.1f/%.1f MB used, %d frames dropped",
+                usage.num_frames,
+                usage.capacity_frames,
+                usage.fill_level * 100,
+                usage.bytes_used / 1024**2,
+                usage.bytes_capacity / 1024**2,
+                usage.frames_dropped,
+            )
+
+
+def get_numbered_filename(output_path: pathlib.Path, number: int) -> pathlib.Path:
+    """Get the name of the file with the given number (``<stem>_NNNN<suffix>``)."""
+    return output_path.with_name(f"{output_path.stem}_{number:04d}{output_path.suffix}")
+
+
+def find_numbered_files(output_path: pathlib.Path) -> list[pathlib.Path]:
+    """Find existing files that are named like numbered output files.
+
+    Episodes and segments are written to ``<stem>_NNNN<suffix>``, so these are the
+    files that would be overwritten, not ``output_path`` itself.
+    """
+    pattern = glob.escape(output_path.stem) + "_[0-9][0-9][0-9][0-9]"
+    pattern += glob.escape(output_path.suffix)
+    return sorted(output_path.parent.glob(pattern))
+
+
+def wait_for_save(save_handle) -> None:
+    """Wait until a log file is saved, printing the progress."""
+    while not save_handle.wait(timeout_s=2.0):
+        logging.info(
+            "Saving %s: %d %%", save_handle.filename, save_handle.progress * 100
+        )
+    # raise errors that occurred while saving
+    save_handle.get()
+
+
+def record_episodes(
+    camera_logger,
+    output_path: pathlib.Path,
+    episode_length: float,
+    usage_reporter: BufferUsageReporter,
+) -> None:
+    """Record episodes of the given length until SIGINT is received.
+
+    Each episode is saved in the background while the next one is recorded.
+    Episodes without any frames (e.g. if recording is stopped before the first frame
+    arrives) are not saved.
+    """
+    save_handles = []
+    episode = 0
+    logging.info("Start recording episodes.  Press Ctrl+C to stop.")
+    try:
+        while not signal_handler.has_received_sigint():
+            camera_logger.start()
+            usage_reporter.reset()
+            end_time = time.monotonic() + episode_length
+            while (
+                time.monotonic() < end_time and not signal_handler.has_received_sigint()
+            ):
+                time.sleep(min(0.1, max(0, end_time - time.monotonic())))
+                usage_reporter.update()
+
+            camera_logger.stop()
+            if camera_logger.get_buffer_usage().num_frames == 0:
+                logging.info("Episode %d is empty, skip saving it.", episode)
+                continue
+
+            filename = get_numbered_filename(output_path, episode)
+            logging.info("Save episode %d to %s", episode, filename)
+            save_handles.append(camera_logger.stop_and_save_hdf5_async(str(filename)))
+            episode += 1
+    finally:
+        # make sure episodes that are already saving are written completely, even
+        # if an error occurred
+        for save_handle in save_handles:
+            wait_for_save(save_handle)
+
+
+def record_segments(
+    camera_data,
+    output_path: pathlib.Path,
+    segment_seconds: float,
+    segment_max_bytes: int,
+) -> None:
+    """Record segments until SIGINT is received."""
+    segmented_logger = trifinger_cameras.tricamera.TriCameraSegmentedLogger(
+        camera_data, output_path, segment_seconds, segment_max_bytes
+    )
+    segmented_logger.start()
+    logging.info(
+        "Start segmented camera logging (manifest: %s).  Press Ctrl+C to stop.",
+        segmented_logger.get_manifest_path(),
+    )
+
+    num_reported_segments = 0
+    while not signal_handler.has_received_sigint():
+        time.sleep(1)
+        segments = segmented_logger.get_segments()
+        for segment in segments[num_reported_segments:]:
+            logging.info(
+                "Segment %s written (%d frames).", segment.filename, segment.num_frames
+            )
+        num_reported_segments = len(segments)
+
+    logging.info("Stop logging and write remaining segments...")
+    segmented_logger.stop()
+
+    num_dropped = segmented_logger.get_num_dropped_frames()
+    if num_dropped:
+        logging.warning("%d frames were dropped during recording.", num_dropped)
+    logging.info(
+        "Recorded %d segments.  Manifest: %s",
+        len(segmented_logger.get_segments()),
+        segmented_logger.get_manifest_path(),
+    )
+
 
 def main() -> int:
     parser = argparse.ArgumentParser(description=__doc__)
@@ -25,9 +194,55 @@ def main() -> int:
         default=60,
         help="Buffer size of the logger in seconds. Default: %(default)s",
     )
+    parser.add_argument(
+        "--memory-budget",
+        type=parse_size,
+        metavar="SIZE",
+        help="""Size the logger buffer by memory instead of duration (e.g. 4G).
+            Overrides --buffer-size.
+        """,
+    )
+    parser.add_argument(
+        "--status-interval",
+        type=float,
+        default=10.0,
+        metavar="SECONDS",
+        help="""Interval in which the buffer usage is printed (0 to disable).
+            Default: %(default)s
+        """,
+    )
     parser.add_argument(
         "--force", "-f", action="store_true", help="Overwrite existing files."
     )
+    parser.add_argument(
+        "--episode-length",
+        type=float,
+        metavar="SECONDS",
+        help="""Record consecutive episodes of the given length until Ctrl+C is
+            pressed.  Each episode is saved to a separate file (the episode number
+            is appended to the file name) in the background, while the next one is
+            already recorded.  Only supported for HDF5 output.
+        """,
+    )
+    parser.add_argument(
+        "--segment-seconds",
+        type=float,
+        metavar="SECONDS",
+        help="""Split the recording into segments of at most the given duration.
+            Each segment is written to a separate file (the segment number is
+            appended to the file name) and a manifest listing the segments is
+            written.  The logger buffer size does not apply in this case, recording
+            continues until Ctrl+C is pressed.  Only supported for HDF5 output.
+        """,
+    )
+    parser.add_argument(
+        "--segment-max-bytes",
+        type=parse_size,
+        metavar="SIZE",
+        help="""Split the recording into segments with at most the given size of
+            (uncompressed) image data.  Can be combined with --segment-seconds.
+        """,
+    )
     parser.add_argument(
         "--multi-process",
         action="store_true",
@@ -47,10 +262,38 @@ def main() -> int:
 
     camera_names = ["camera60", "camera180", "camera300"]
 
-    if not args.force and args.output_path.exists():
-        logging.fatal("%s already exists.  Use --force to overwrite", args.output_path)
+    save_hdf5 = args.output_path.suffix in (".hdf5", ".h5")
+    if args.episode_length is not None and not save_hdf5:
+        logging.fatal("--episode-length is only supported for HDF5 output.")
+        return 1
+
+    segmented = args.segment_seconds is not None or args.segment_max_bytes is not None
+    if segmented and not save_hdf5:
+        logging.fatal("Segmented recording is only supported for HDF5 output.")
+        return 1
+    if segmented and args.episode_length is not None:
+        logging.fatal("--episode-length cannot be combined with segmented recording.")
+        return 1
+
+    if args.episode_length is not None:
+        existing_files = find_numbered_files(args.output_path)
+    elif segmented:
+        manifest_path = args.output_path.with_name(
+            f"{args.output_path.stem}_manifest.json"
+        )
+        existing_files = find_numbered_files(args.output_path)
+        if manifest_path.exists():
+            existing_files.append(manifest_path)
+    else:
+        existing_files = [args.output_path] if args.output_path.exists() else []
+    if not args.force and existing_files:
+        logging.fatal(
+            "%s already exists.  Use --force to overwrite",
+            ", ".join(map(str, existing_files)),
+        )
         return 1
 
+    camera_backend = None
     if args.multi_process:
         camera_data = trifinger_cameras.tricamera.MultiProcessData("tricamera", False)
     else:
@@ -61,24 +304,70 @@ def main() -> int:
     camera_frontend = trifinger_cameras.tricamera.Frontend(camera_data)
     camera_info = camera_frontend.get_sensor_info()
 
-    log_size = int(camera_info.camera[0].frame_rate_fps * args.buffer_size)
-
-    camera_logger = trifinger_cameras.tricamera.TriCameraLogger(camera_data, log_size)
-    camera_logger.start()
-    logging.info("Start camera logging.  Press Ctrl+C to stop and save.")
-
     signal_handler.init()
-    while not signal_handler.has_received_sigint():
-        time.sleep(1)
 
-    if args.output_path.suffix in (".hdf5", ".h5"):
-        logging.info("Save recorded camera data to HDF5 file %s", args.output_path)
-        camera_logger.stop_and_save_hdf5(str(args.output_path))
+    if segmented:
+        record_segments(
+            camera_data,
+            args.output_path,
+            args.segment_seconds or 0,
+            args.segment_max_bytes or 0,
+        )
+        if camera_backend:
+            camera_backend.shutdown()
+        return 0
+
+    frame_rate = camera_info.camera[0].frame_rate_fps
+    TriCameraLogger = trifinger_cameras.tricamera.TriCameraLogger
+    if args.memory_budget is not None:
+        camera_logger = TriCameraLogger.from_memory_budget(
+            camera_data, args.memory_budget
+        )
     else:
-        logging.info("Save recorded camera data to file %s", args.output_path)
-        camera_logger.stop_and_save(str(args.output_path))
+        log_size = int(frame_rate * args.buffer_size)
+        camera_logger = TriCameraLogger(camera_data, log_size)
+
+    usage = camera_logger.get_buffer_usage()
+    buffer_duration = usage.capacity_frames / frame_rate
+    logging.info(
+        "Logger buffer: %d frames (%.1f s), needs %.1f MB of memory.",
+        usage.capacity_frames,
+        buffer_duration,
+        usage.bytes_capacity / 1024**2,
+    )
+
+    if args.episode_length is not None and args.episode_length > buffer_duration:
+        logging.fatal("Logger buffer is shorter than --episode-length.")
+        return 1
+
+    usage_reporter = BufferUsageReporter(camera_logger, args.status_interval)
+
+    try:
+        if args.episode_length is not None:
+            record_episodes(
+                camera_logger, args.output_path, args.episode_length, usage_reporter
+            )
+        else:
+            camera_logger.start()
+            logging.info("Start camera logging.  Press Ctrl+C to stop and save.")
+
+            while not signal_handler.has_received_sigint():
+                time.sleep(1)
+                usage_reporter.update()
 
-    camera_backend.shutdown()
+            if save_hdf5:
+                logging.info(
+                    "Save recorded camera data to HDF5 file %s", args.output_path
+                )
+                wait_for_save(
+                    camera_logger.stop_and_save_hdf5_async(str(args.output_path))
+                )
+            else:
+                logging.info("Save recorded camera data to file %s", args.output_path)
+                camera_logger.stop_and_save(str(args.output_path))
+    finally:
+        if camera_backend:
+            camera_backend.shutdown()
 
     return 0
 
@@ -25,6 +25,13 @@ def parse_arguments() -> argparse.Namespace:
             to the DeviceUserId, otherwise it is the index of the device.
         """,
     )
+    parser.add_argument(
+        "--background-capture",
+        action="store_true",
+        help="""Only for OpenCV: Read frames from the device in a background thread
+            and always provide the newest one.
+        """,
+    )
     args = parser.parse_args()
 
     # === configure logging
@@ -47,11 +54,30 @@ def main() -> int:
             camera_driver = trifinger_cameras.camera.PylonDriver(args.camera_id)
         else:
             camera_id = int(args.camera_id) if args.camera_id else 0
-            camera_driver = trifinger_cameras.camera.OpenCVDriver(camera_id)
+            camera_driver = trifinger_cameras.camera.OpenCVDriver(
+                camera_id, background_capture=args.background_capture
+            )
     except Exception as e:
         logging.error("Failed to initialise driver: %s", e)
         return 1
 
+    # Observations in multi-process data have a fixed size, which needs to match
+    # with the size of the camera images (OpenCVDriver automatically resizes the
+    # images to the observation size).
+    if args.pylon:
+        image_size = trifinger_cameras.camera.CameraObservation.get_default_image_size()
+        info = camera_driver.get_sensor_info()
+        if (info.image_width, info.image_height) != image_size:
+            logging.error(
+                "Image size of the camera (%dx%d) does not match with the"
+                " configured observation image size (%dx%d).  Set it in the"
+                " [camera_observation] section of the configuration file.",
+                info.image_width,
+                info.image_height,
+                *image_size,
+            )
+            return 1
+
     logging.info("Start camera backend")
 
     CAMERA_TIME_SERIES_LENGTH = 1000
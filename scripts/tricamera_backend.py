@@ -28,11 +28,30 @@ def parse_arguments() -> argparse.Namespace:
         type=pathlib.Path,
         help="Parameter file for camera180.",
     )
+    parser.add_argument(
+        "--compressed",
+        action="store_true",
+        help="""Provide observations with losslessly compressed images (see
+            trifinger_cameras.compressed_tricamera).  They are published with
+            shared memory ID "tricamera_compressed" instead of "tricamera".
+        """,
+    )
+    parser.add_argument(
+        "--preview",
+        action="store_true",
+        help="""Additionally publish low-resolution colour previews of the images
+            (with shared memory ID "tricamera_preview").  Not supported in
+            combination with --compressed.
+        """,
+    )
     parser.add_argument(
         "--verbose", "-v", action="store_true", help="Enable verbose output."
     )
     args = parser.parse_args()
 
+    if args.compressed and args.preview:
+        parser.error("--preview cannot be used in combination with --compressed.")
+
     # === configure logging
 
     log_handler = logging.StreamHandler(sys.stdout)
@@ -58,13 +77,43 @@ def main() -> int:
         logging.error("Failed to initialise driver: %s", e)
         return 1
 
+    # Observations in multi-process data have a fixed size, which needs to match
+    # with the size of the camera images.
+    image_size = trifinger_cameras.camera.CameraObservation.get_default_image_size()
+    for info in camera_driver.get_sensor_info().camera:
+        if (info.image_width, info.image_height) != image_size:
+            logging.error(
+                "Image size of the cameras (%dx%d) does not match with the"
+                " configured observation image size (%dx%d).  Set it in the"
+                " [camera_observation] section of the configuration file.",
+                info.image_width,
+                info.image_height,
+                *image_size,
+            )
+            return 1
+
     logging.info("Start camera backend")
 
     CAMERA_TIME_SERIES_LENGTH = 100
-    camera_data = trifinger_cameras.tricamera.MultiProcessData(
-        "tricamera", True, CAMERA_TIME_SERIES_LENGTH
+    if args.compressed:
+        camera_module = trifinger_cameras.compressed_tricamera
+        camera_driver = camera_module.CompressingTriCameraDriver(camera_driver)
+        shared_memory_id = "tricamera_compressed"
+    else:
+        camera_module = trifinger_cameras.tricamera
+        shared_memory_id = "tricamera"
+    camera_data = camera_module.MultiProcessData(
+        shared_memory_id, True, CAMERA_TIME_SERIES_LENGTH
     )
-    camera_backend = trifinger_cameras.tricamera.Backend(camera_driver, camera_data)
+    camera_backend = camera_module.Backend(camera_driver, camera_data)
+
+    if args.preview:
+        preview_module = trifinger_cameras.tricamera_preview
+        preview_driver = preview_module.TriCameraPreviewDriver(camera_data)
+        preview_data = preview_module.MultiProcessData(
+            "tricamera_preview", True, CAMERA_TIME_SERIES_LENGTH
+        )
+        preview_backend = preview_module.Backend(preview_driver, preview_data)
 
     logging.info("Camera backend ready.")
 
@@ -72,6 +121,9 @@ def main() -> int:
     while not signal_handler.has_received_sigint():
         time.sleep(1)
 
+    # shut down the preview first, as it depends on the frames of the main backend
+    if args.preview:
+        preview_backend.shutdown()
     camera_backend.shutdown()
 
     return 0
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""Keep the last seconds of TriCamera data in memory and save them on keypress.
+
+Connects to a running TriCamera backend (see ``tricamera_backend``) and
+continuously records its observations into a ring buffer.  Each time Enter is
+pressed, the observations from ``--pre`` seconds before until ``--post`` seconds
+after the keypress are saved to a new HDF5 file in the output directory.  Stop with
+Ctrl+C (or Ctrl+D).
+"""
+
+import argparse
+import datetime
+import logging
+import pathlib
+import sys
+
+import trifinger_cameras
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "output_dir",
+        type=pathlib.Path,
+        help="Directory to which the dumps are written.",
+    )
+    parser.add_argument(
+        "--buffer-duration",
+        type=float,
+        default=30.0,
+        metavar="SECONDS",
+        help="Duration of the ring buffer.  Default: %(default)s",
+    )
+    parser.add_argument(
+        "--pre",
+        type=float,
+        default=10.0,
+        metavar="SECONDS",
+        help="Duration before the keypress that is saved.  Default: %(default)s",
+    )
+    parser.add_argument(
+        "--post",
+        type=float,
+        default=5.0,
+        metavar="SECONDS",
+        help="Duration after the keypress that is saved.  Default: %(default)s",
+    )
+    parser.add_argument(
+        "--shared-memory-id",
+        type=str,
+        default="tricamera",
+        help="Shared memory ID of the camera data.  Default: %(default)s",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="[%(asctime)s] [%(name)s | %(levelname)s] %(message)s",
+    )
+
+    if args.pre > args.buffer_duration:
+        logging.fatal("--pre must not be longer than --buffer-duration.")
+        return 1
+
+    args.output_dir.mkdir(parents=True, exist_ok=True)
+
+    camera_data = trifinger_cameras.tricamera.MultiProcessData(
+        args.shared_memory_id, False
+    )
+    recorder = trifinger_cameras.tricamera.TriCameraFlightRecorder(
+        camera_data, args.buffer_duration
+    )
+
+    logging.info("Recording.  Press Enter to save a dump, Ctrl+C to stop.")
+    try:
+        for _ in sys.stdin:
+            timestamp = datetime.datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+            filename = args.output_dir / f"tricamera_dump_{timestamp}.hdf5"
+            recorder.trigger_dump(str(filename), args.pre, args.post)
+            logging.info("Dump triggered, saving to %s", filename)
+    except KeyboardInterrupt:
+        pass
+
+    logging.info("Wait for pending dumps to be written...")
+    # also saves dumps that still wait for data after the trigger
+    del recorder
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
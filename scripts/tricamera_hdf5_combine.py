@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""Combine several TriCamera HDF5 files into one virtual HDF5 file.
+
+The virtual file contains the observations of all input files as if they were recorded
+into a single file, without copying the data (it is read from the input files on
+access).  See :func:`trifinger_cameras.hdf5.create_tricamera_vds` for details.
+"""
+
+import argparse
+import pathlib
+import sys
+
+from trifinger_cameras.hdf5 import create_tricamera_vds
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "output_file",
+        type=pathlib.Path,
+        help="Path of the virtual HDF5 file that is created.",
+    )
+    parser.add_argument(
+        "input",
+        type=pathlib.Path,
+        nargs="+",
+        help="""TriCamera HDF5 files that are combined (in the given order).  For
+            directories, all *.hdf5 files in them are added (sorted by name).
+        """,
+    )
+    parser.add_argument(
+        "--absolute-paths",
+        action="store_true",
+        help="""Reference the input files with absolute paths.  By default, paths
+            relative to the output file are used, so the files can be moved together.
+        """,
+    )
+    parser.add_argument(
+        "--force",
+        "-f",
+        action="store_true",
+        help="Overwrite the output file if it already exists.",
+    )
+    args = parser.parse_args()
+
+    if args.output_file.exists() and not args.force:
+        print("Output file already exists.  Use --force to overwrite.", file=sys.stderr)
+        return 1
+
+    input_files = []
+    for path in args.input:
+        if path.is_dir():
+            input_files.extend(sorted(path.glob("*.hdf5")))
+        else:
+            input_files.append(path)
+
+    # don't include the output in itself when combining a whole directory
+    input_files = [f for f in input_files if f.resolve() != args.output_file.resolve()]
+
+    try:
+        create_tricamera_vds(
+            args.output_file, input_files, relative_paths=not args.absolute_paths
+        )
+    except (OSError, ValueError) as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        return 1
+
+    print(f"Combined {len(input_files)} files into {args.output_file}.")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""Index TriCamera logs in a SQLite catalog and query it.
+
+Examples:
+
+    # index (or update the index of) all logs in a directory tree
+    tricamera_log_catalog index /data/logs
+
+    # all logs of a calibration within a time range with at least 9.5 fps
+    tricamera_log_catalog query --calibration 3fa2 --since 2024-01-01 \\
+        --until 2024-02-01 --min-fps 9.5
+
+    # timing health metrics of all logs since 2024-01-01 as JSON lines
+    tricamera_log_catalog timing --since 2024-01-01 > timing.jsonl
+"""
+
+import argparse
+import concurrent.futures
+import datetime
+import pathlib
+import sys
+
+from trifinger_cameras.log_catalog import LogCatalog, calibration_hash_from_files
+from trifinger_cameras.log_timing import analyze_log_timing, to_json
+
+#: Default location of the catalog database.
+DEFAULT_DB = pathlib.Path("~/.cache/trifinger_cameras/log_catalog.sqlite")
+
+
+def format_time(timestamp: float | None) -> str:
+    if timestamp is None:
+        return "-"
+    return datetime.datetime.fromtimestamp(timestamp).isoformat(sep=" ")[:19]
+
+
+def cmd_index(catalog: LogCatalog, args: argparse.Namespace) -> int:
+    for root in args.root:
+        stats = catalog.index(
+            root,
+            binary_pattern=args.binary_pattern,
+            binary_calibration_files=args.camera_info,
+            progress=(lambda path: print(f"Indexing {path}")) if args.verbose else None,
+        )
+        print(
+            f"{root}: {stats.indexed} indexed, {stats.unchanged} unchanged,"
+            f" {stats.failed} failed, {stats.removed} removed."
+        )
+    return 0
+
+
+def query(catalog: LogCatalog, args: argparse.Namespace) -> list[dict]:
+    """Query the catalog with the arguments added by :func:`add_query_arguments`."""
+    calibration = args.calibration
+    if args.calibration_files:
+        calibration = calibration_hash_from_files(args.calibration_files)
+
+    return catalog.query(
+        calibration=calibration,
+        since=args.since,
+        until=args.until,
+        min_fps=args.min_fps,
+        min_duration=args.min_duration,
+        log_format=args.format,
+    )
+
+
+def cmd_query(catalog: LogCatalog, args: argparse.Namespace) -> int:
+    logs = query(catalog, args)
+
+    if args.paths_only:
+        for log in logs:
+            print(log["path"])
+        return 0
+
+    for log in logs:
+        fps = f"{log['fps']:.2f}" if log["fps"] is not None else "-"
+        duration = f"{log['duration']:.1f}" if log["duration"] is not None else "-"
+        print(
+            f"{format_time(log['start_time'])}  {duration:>8} s  {fps:>6} fps"
+            f"  {log['num_frames']:>7} frames  {(log['calibration_hash'] or '-')[:8]}"
+            f"  {log['path']}"
+        )
+    print(f"{len(logs)} logs found.", file=sys.stderr)
+    return 0
+
+
+def cmd_timing(catalog: LogCatalog, args: argparse.Namespace) -> int:
+    paths = [log["path"] for log in query(catalog, args)]
+    n_failed = 0
+    with concurrent.futures.ProcessPoolExecutor(args.jobs) as executor:
+        futures = [
+            executor.submit(analyze_log_timing, path, args.frame_rate) for path in paths
+        ]
+        # print in the order of the query, one JSON object per line
+        for path, future in zip(paths, futures):
+            try:
+                print(to_json(future.result()), flush=True)
+            except Exception as e:
+                print(f"{path}: {e}", file=sys.stderr)
+                n_failed += 1
+
+    print(f"{len(paths) - n_failed} logs analyzed.", file=sys.stderr)
+    return 1 if n_failed else 0
+
+
+def add_query_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the arguments for filtering the logs of the catalog."""
+    calib_group = parser.add_mutually_exclusive_group()
+    calib_group.add_argument(
+        "--calibration", type=str, help="Calibration hash (or a prefix of it)."
+    )
+    calib_group.add_argument(
+        "--calibration-files",
+        type=pathlib.Path,
+        nargs=3,
+        help="Camera calibration files of the calibration.",
+    )
+    parser.add_argument(
+        "--since",
+        type=datetime.datetime.fromisoformat,
+        help="Only logs started at or after this time (ISO format, local time).",
+    )
+    parser.add_argument(
+        "--until",
+        type=datetime.datetime.fromisoformat,
+        help="Only logs started before this time (ISO format, local time).",
+    )
+    parser.add_argument("--min-fps", type=float, help="Minimum frame rate.")
+    parser.add_argument(
+        "--min-duration", type=float, help="Minimum duration in seconds."
+    )
+    parser.add_argument(
+        "--format", choices=("hdf5", "binary"), help="Only logs of this format."
+    )
+
+
+def cmd_calibrations(catalog: LogCatalog, args: argparse.Namespace) -> int:
+    for calib in catalog.calibrations():
+        print(
+            f"{calib['hash'] or '(none)':<64}  {calib['num_logs']:>6} logs"
+            f"  {format_time(calib['first_start_time'])}"
+            f" - {format_time(calib['last_start_time'])}"
+        )
+    return 0
+
+
+def cmd_errors(catalog: LogCatalog, args: argparse.Namespace) -> int:
+    for error in catalog.errors():
+        print(f"{error['path']}: {error['message']}")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "--db",
+        type=pathlib.Path,
+        default=DEFAULT_DB,
+        help="Path to the catalog database.  Default: %(default)s",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    index_parser = subparsers.add_parser(
+        "index", help="Add new and modified logs to the catalog."
+    )
+    index_parser.set_defaults(func=cmd_index)
+    index_parser.add_argument(
+        "root", type=pathlib.Path, nargs="+", help="Directories that are scanned."
+    )
+    index_parser.add_argument(
+        "--binary-pattern",
+        type=str,
+        default="*.dat",
+        help="Glob pattern of binary log files.  Default: '%(default)s'",
+    )
+    index_parser.add_argument(
+        "--camera-info",
+        "-c",
+        type=pathlib.Path,
+        nargs=3,
+        help="""Camera calibration files that are associated with the binary logs
+            (which don't include the calibration).
+        """,
+    )
+    index_parser.add_argument(
+        "--verbose", "-v", action="store_true", help="Print each indexed file."
+    )
+
+    query_parser = subparsers.add_parser(
+        "query", help="List logs matching all given criteria."
+    )
+    query_parser.set_defaults(func=cmd_query)
+    add_query_arguments(query_parser)
+    query_parser.add_argument(
+        "--paths-only", action="store_true", help="Only print the paths."
+    )
+
+    timing_parser = subparsers.add_parser(
+        "timing",
+        help="""Print the timing health metrics of the matching logs (one JSON object
+            per line).
+        """,
+    )
+    timing_parser.set_defaults(func=cmd_timing)
+    add_query_arguments(timing_parser)
+    timing_parser.add_argument(
+        "--frame-rate",
+        type=float,
+        help="""Nominal frame rate for the detection of dropped frames.  Default:
+            Frame rate stored in the log (HDF5 only) or the median frame interval.
+        """,
+    )
+    timing_parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        help="Number of logs that are analyzed in parallel.  Default: number of CPUs.",
+    )
+
+    calib_parser = subparsers.add_parser(
+        "calibrations", help="List the calibrations in the catalog."
+    )
+    calib_parser.set_defaults(func=cmd_calibrations)
+
+    errors_parser = subparsers.add_parser(
+        "errors", help="List files that could not be indexed."
+    )
+    errors_parser.set_defaults(func=cmd_errors)
+
+    args = parser.parse_args()
+
+    db_path = args.db.expanduser()
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    with LogCatalog(db_path) as catalog:
+        return args.func(catalog, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,6 +8,7 @@ import cv2
 
 import trifinger_cameras
 from trifinger_cameras import utils
+from trifinger_cameras.log_timestamps import get_frame_interval, read_log_timestamps
 
 
 def main():
@@ -31,8 +32,6 @@ def main():
     )
     args = argparser.parse_args()
 
-    log_reader = trifinger_cameras.tricamera.LogReader(args.logfile)
-
     if args.camera == "camera60":
         camera_idx = 0
     elif args.camera == "camera180":
@@ -40,29 +39,28 @@ def main():
     else:
         camera_idx = 2
 
-    first_obs = log_reader.data[0].cameras[camera_idx]
-    last_obs = log_reader.data[-1].cameras[camera_idx]
-
     # determine rate based on time stamps
-    start_time = first_obs.timestamp
-    end_time = last_obs.timestamp
-    interval = (end_time - start_time) / len(log_reader.data)
+    camera_timestamps, _ = read_log_timestamps(args.logfile)
+    interval = get_frame_interval(camera_timestamps, camera_idx)
     fps = 1 / interval
     # convert to ms
     interval = int(interval * 1000)
 
+    log_reader = trifinger_cameras.tricamera.LogReader(args.logfile)
+    observations = log_reader.data
+
     # Define the codec and create VideoWriter object
-    first_img = utils.convert_image(first_obs.image)
+    first_img = utils.convert_image(observations[0].cameras[camera_idx].image)
     fourcc = cv2.VideoWriter_fourcc(*"XVID")
     writer = cv2.VideoWriter(args.outfile, fourcc, fps, first_img.shape[:2])
 
     print(
         "Loaded {} frames at an average interval of {} ms ({:.1f} fps)".format(
-            len(log_reader.data), interval, 1000 / interval
+            len(observations), interval, 1000 / interval
         )
     )
 
-    for observation in log_reader.data:
+    for observation in observations:
         image = utils.convert_image(observation.cameras[camera_idx].image)
         writer.write(image)
 
@@ -1,101 +1,13 @@
 #!/usr/bin/env python3
 """Convert TriCameraObservation log file to hdf5."""
 
-import argparse
 import pathlib
 import sys
 
-import h5py
-
-from trifinger_cameras import CAMERA_NAMES, tricamera
-from trifinger_cameras.camera_calibration_file import CameraCalibrationFile
-from trifinger_cameras.hdf5 import write_tricamera_hdf5
-
-
-def main() -> int:
-    """Main entry point of the script."""
-    argparser = argparse.ArgumentParser(description=__doc__)
-    argparser.add_argument(
-        "--logfile",
-        "-l",
-        type=pathlib.Path,
-        required=True,
-        help="Path to the log file.",
-    )
-    argparser.add_argument(
-        "--outfile",
-        "-o",
-        type=pathlib.Path,
-        required=True,
-        help="Path to the output hdf5 file.",
-    )
-    # Add arguments for calibration files
-    argparser.add_argument(
-        "--camera-info",
-        "-c",
-        type=pathlib.Path,
-        nargs=3,
-        required=True,
-        help="Paths to the three camera calibration YAML files.",
-    )
-    args = argparser.parse_args()
-
-    if not args.logfile.is_file():
-        print("Log file does not exist.", file=sys.stderr)
-        return 1
-
-    if args.outfile.exists():
-        print("Output file already exists.  Exiting.", file=sys.stderr)
-        return 1
-
-    # Load calibration files
-    camera_params = []
-    for calib_file in args.camera_info:
-        if not calib_file.is_file():
-            print(f"Calibration file {calib_file} does not exist.", file=sys.stderr)
-            return 1
-        camera_params.append(CameraCalibrationFile(calib_file))
-
-    # Verify camera names match expected order
-    for param, expected_name in zip(camera_params, CAMERA_NAMES, strict=True):
-        if param["camera_name"] != expected_name:
-            print(
-                f"Expected camera {expected_name} but got {param['camera_name']}",
-                file=sys.stderr,
-            )
-            return 1
-
-    log_reader = tricamera.LogReader(str(args.logfile))
-
-    n_frames = len(log_reader.data)
-    assert n_frames > 0, "No frames found in log file."
-
-    img_shape = log_reader.data[0].cameras[0].image.shape
-
-    # sanity check that the image size matches with camera info files
-    for i, params in enumerate(camera_params):
-        if (
-            params["image_width"] != img_shape[1]
-            or params["image_height"] != img_shape[0]
-        ):
-            print(
-                f"Image size mismatch for camera {CAMERA_NAMES[i]}:"
-                f" expected {img_shape[1]}x{img_shape[0]} (based on camera info) but"
-                f" got {params['image_width']}x{params['image_height']}",
-                file=sys.stderr,
-            )
-            return 1
-
-    with h5py.File(args.outfile, "w") as h5:
-        write_tricamera_hdf5(
-            h5,
-            camera_params,
-            n_frames,
-            zip(log_reader.data, log_reader.timestamps, strict=True),
-        )
-
-    return 0
-
+from trifinger_cameras.tools.tricamera_log_to_hdf5 import main
 
 if __name__ == "__main__":
-    sys.exit(main())
+    # the native converter is installed in the same directory as this script
+    sys.exit(
+        main(pathlib.Path(__file__).resolve().with_name("tricamera_log_to_hdf5_native"))
+    )
@@ -1,68 +1,29 @@
 #!/usr/bin/env python3
-"""Play back TriCameraObservations from a log file."""
+"""Play back TriCameraObservations from a log file (binary or HDF5).
+
+Keys:
+    space:  pause/resume
+    d / a:  one frame forward/back
+    D / A:  100 frames forward/back
+    t:      jump to a time (entered in the terminal, in seconds since the start)
+    q, ESC: quit
+"""
 
 from __future__ import annotations
 
 import argparse
 import pathlib
 import time
-from typing import Generator
 
 import cv2
 import numpy as np
 
 import trifinger_cameras
-from trifinger_cameras import hdf5, utils
-
-
-def read_sensor_log(filename: pathlib.Path) -> Generator[tuple[int, np.ndarray]]:
-    t_start = time.monotonic()
-    log_reader = trifinger_cameras.tricamera.LogReader(str(filename))
-    t_end = time.monotonic()
-    print("Time for reading log file: {:.3f} s".format(t_end - t_start))
-
-    # determine rate based on time stamps
-    start_time = log_reader.data[0].cameras[0].timestamp
-    end_time = log_reader.data[-1].cameras[0].timestamp
-    interval = (end_time - start_time) / len(log_reader.data)
-    # convert to ms
-    interval = int(interval * 1000)
-
-    print(
-        "Loaded {} frames at an average interval of {} ms ({:.1f} fps)".format(
-            len(log_reader.data), interval, 1000 / interval
-        )
-    )
-
-    for observation in log_reader.data:
-        img = np.hstack(
-            [
-                utils.convert_image(observation.cameras[0].image),
-                utils.convert_image(observation.cameras[1].image),
-                utils.convert_image(observation.cameras[2].image),
-            ]
-        )
-        yield interval, img
-
-
-def read_hdf5(filename: pathlib.Path) -> Generator[tuple[int, np.ndarray]]:
-    import h5py
-
-    with h5py.File(filename, "r") as h5:
-        hdf5.verify_tricamera_hdf5(h5, supported_formats=(1, 2))
-
-        timestamps = h5["timestamps"]
-        # determine rate based on first and last time stamp
-        interval = int((timestamps[-1][0] - timestamps[0][0]) / len(timestamps) * 1000)
-        print(
-            "Loaded {} frames at an average interval of {} ms ({:.1f} fps)".format(
-                len(h5["images"]), interval, 1000 / interval
-            )
-        )
+from trifinger_cameras.log_playback import PlaybackEngine, open_log_source
+from trifinger_cameras.log_timestamps import get_frame_interval
 
-        for images in h5["images"]:
-            img = np.hstack([utils.convert_image(img) for img in images])
-            yield interval, img
+#: Frame steps of the seek keys.
+SEEK_KEYS = {ord("d"): 1, ord("a"): -1, ord("D"): 100, ord("A"): -100}
 
 
 def indicate_clipping(image: np.ndarray) -> np.ndarray:
@@ -76,14 +37,33 @@ def indicate_clipping(image: np.ndarray) -> np.ndarray:
     return image
 
 
+def ask_time(engine: PlaybackEngine) -> None:
+    """Ask for a time in the terminal and seek to it."""
+    start = engine.source.timestamps[0, 0]
+    duration = engine.source.timestamps[-1, 0] - start
+    try:
+        seconds = float(input(f"Jump to time [0 - {duration:.1f} s]: "))
+    except ValueError:
+        print("Invalid time.")
+        return
+    engine.seek_timestamp(start + seconds)
+
+
 def main() -> None:
-    parser = argparse.ArgumentParser(description=__doc__)
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
     parser.add_argument(
         "filename",
         type=pathlib.Path,
         help="""Path to the log file.""",
     )
-    parser.add_argument("--speed", type=float, default=1.0, help="Playback speed.")
+    parser.add_argument(
+        "--speed",
+        type=float,
+        default=1.0,
+        help="""Playback speed.  If decoding can't keep up, frames are dropped.""",
+    )
     parser.add_argument(
         "--skip", type=int, default=0, metavar="n", help="Skip the first n frames."
     )
@@ -92,38 +72,86 @@ def main() -> None:
         action="store_true",
         help="Visualize clipped pixels by setting them to pure red.",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Number of threads for decoding the images.  Default: number of CPUs.",
+    )
+    parser.add_argument(
+        "--read-ahead",
+        type=int,
+        default=16,
+        metavar="n",
+        help="Number of frames that are decoded ahead.  Default: %(default)d.",
+    )
     args = parser.parse_args()
 
     window_title = " | ".join(trifinger_cameras.CAMERA_NAMES)
-    read_func = (
-        read_hdf5 if args.filename.suffix in (".h5", ".hdf5") else read_sensor_log
-    )
 
     try:
-        frame_number = 0
-        for interval, image in read_func(args.filename):
-            frame_number += 1
-            if frame_number <= args.skip:
-                continue
-
-            if args.indicate_clipping:
-                image = indicate_clipping(image)
-
-            cv2.putText(
-                image,
-                f"Frame {frame_number}",
-                (10, image.shape[0] - 10),
-                cv2.FONT_HERSHEY_SIMPLEX,
-                1,
-                (255, 255, 255),
-            )
+        t_start = time.monotonic()
+        source = open_log_source(args.filename)
+        t_end = time.monotonic()
+        print("Time for reading log file: {:.3f} s".format(t_end - t_start))
 
-            cv2.imshow(window_title, image)
+        # convert to ms
+        interval = int(get_frame_interval(source.timestamps) * 1000)
+        print(
+            "Loaded {} frames at an average interval of {} ms ({:.1f} fps)".format(
+                len(source), interval, 1000 / interval
+            )
+        )
 
-            scaled_interval = int(interval / args.speed)
-            # stop if either "q" or ESC is pressed
-            if cv2.waitKey(max(scaled_interval, 1)) in [ord("q"), 27]:  # 27 = ESC
-                break
+        with PlaybackEngine(
+            source,
+            speed=args.speed,
+            read_ahead=args.read_ahead,
+            num_workers=args.workers,
+            process=indicate_clipping if args.indicate_clipping else None,
+        ) as engine:
+            engine.seek(args.skip)
+            show_next = True
+            while True:
+                if show_next:
+                    frame = engine.next_frame()
+                    if frame is None:
+                        break
+                    index, image = frame
+
+                    status = f"Frame {index + 1}"
+                    if engine.paused:
+                        status += " (paused)"
+                    if engine.num_dropped:
+                        status += f"  dropped: {engine.num_dropped}"
+                    cv2.putText(
+                        image,
+                        status,
+                        (10, image.shape[0] - 10),
+                        cv2.FONT_HERSHEY_SIMPLEX,
+                        1,
+                        (255, 255, 255),
+                    )
+                    cv2.imshow(window_title, image)
+
+                # while paused, only poll the keyboard
+                wait_ms = 50 if engine.paused else int(engine.time_until_next() * 1000)
+                key = cv2.waitKey(max(wait_ms, 1))
+
+                show_next = not engine.paused
+                # stop if either "q" or ESC is pressed
+                if key in [ord("q"), 27]:  # 27 = ESC
+                    break
+                elif key == ord(" "):
+                    engine.paused = not engine.paused
+                    # redraw to update the status
+                    engine.step(0)
+                    show_next = True
+                elif key in SEEK_KEYS:
+                    engine.step(SEEK_KEYS[key])
+                    show_next = True
+                elif key == ord("t"):
+                    ask_time(engine)
+                    show_next = True
     except Exception as e:
         print("Error:", e)
 
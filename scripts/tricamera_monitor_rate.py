@@ -12,6 +12,7 @@ import logging
 import tqdm
 
 import trifinger_cameras
+from trifinger_cameras import consumer_stats
 
 
 def main() -> None:
@@ -56,7 +57,10 @@ def main() -> None:
         )
 
     logging.debug("Start front end")
-    camera_frontend = trifinger_cameras.tricamera.Frontend(camera_data)
+    # publish lag/drop statistics (can be shown with `camera_consumer_stats`)
+    camera_frontend = consumer_stats.MonitoredFrontend(
+        trifinger_cameras.tricamera, camera_data, "tricamera"
+    )
     observations_timestamps_list = []
 
     # use tqdm to display the frame rate
@@ -7,4 +7,46 @@
 
 #include <trifinger_cameras/camera_observation.hpp>
 
-// nothing here, the file is just needed to compile the library
+#include <atomic>
+#include <mutex>
+
+#include <trifinger_cameras/settings.hpp>
+
+namespace trifinger_cameras
+{
+namespace
+{
+std::once_flag default_image_size_loaded;
+std::atomic<int> default_image_width;
+std::atomic<int> default_image_height;
+
+void load_default_image_size()
+{
+    std::call_once(default_image_size_loaded,
+                   []()
+                   {
+                       auto cfg = Settings().get_camera_observation_settings();
+                       default_image_width = cfg->image_width;
+                       default_image_height = cfg->image_height;
+                   });
+}
+}  // namespace
+
+cv::Size CameraObservation::get_default_image_size()
+{
+    load_default_image_size();
+    return cv::Size(default_image_width, default_image_height);
+}
+
+void CameraObservation::set_default_image_size(const cv::Size& size)
+{
+    // make sure the values are not overwritten by a later lazy loading (but
+    // don't load the config file, as it is not needed)
+    std::call_once(default_image_size_loaded,
+                   []()
+                   {
+                   });
+    default_image_width = size.width;
+    default_image_height = size.height;
+}
+}  // namespace trifinger_cameras
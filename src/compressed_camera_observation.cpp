@@ -0,0 +1,165 @@
+/**
+ * @file
+ * @brief Camera observations with losslessly compressed images.
+ * @copyright 2020, Max Planck Gesellschaft. All rights reserved.
+ * @license BSD 3-clause
+ */
+#include <trifinger_cameras/compressed_camera_observation.hpp>
+
+#include <cmath>
+#include <cstring>
+#include <mutex>
+#include <stdexcept>
+
+#include <fmt/format.h>
+#include <opencv2/imgcodecs.hpp>
+
+#include <trifinger_cameras/settings.hpp>
+
+namespace trifinger_cameras
+{
+CompressedCameraObservation::CompressedCameraObservation()
+    : CompressedCameraObservation(get_default_capacity())
+{
+}
+
+CompressedCameraObservation::CompressedCameraObservation(size_t capacity)
+    : data(capacity)
+{
+}
+
+CompressedCameraObservation::CompressedCameraObservation(
+    const CameraObservation& observation)
+    : CompressedCameraObservation()
+{
+    compress(observation);
+}
+
+size_t CompressedCameraObservation::get_default_capacity()
+{
+    static std::once_flag capacity_ratio_loaded;
+    static float capacity_ratio;
+    std::call_once(capacity_ratio_loaded,
+                   []()
+                   {
+                       capacity_ratio = Settings()
+                                            .get_camera_observation_settings()
+                                            ->compressed_capacity_ratio;
+                   });
+
+    cv::Size image_size = CameraObservation::get_default_image_size();
+    return std::ceil(capacity_ratio * image_size.area());
+}
+
+void CompressedCameraObservation::compress(const CameraObservation& observation)
+{
+    const cv::Mat& image = observation.image;
+
+    if (image.type() != CV_8UC1)
+    {
+        throw std::invalid_argument(
+            "Only single-channel 8-bit images can be compressed.");
+    }
+
+    // use the fastest compression level, the aim is to reduce the amount of
+    // data that needs to be copied, not to get the smallest possible files
+    static const std::vector<int> png_params = {cv::IMWRITE_PNG_COMPRESSION, 1};
+    std::vector<uint8_t> png;
+    cv::imencode(".png", image, png, png_params);
+
+    // images are never stored lossy, so fail if neither the compressed nor the
+    // raw image fits
+    const size_t raw_size = image.total();
+    if (png.size() > data.size() && raw_size > data.size())
+    {
+        throw std::length_error(fmt::format(
+            "Image does not fit into the buffer of the compressed observation "
+            "(capacity: {} bytes, compressed: {} bytes, raw: {} bytes).  "
+            "Increase compressed_capacity_ratio.",
+            data.size(),
+            png.size(),
+            raw_size));
+    }
+
+    timestamp = observation.timestamp;
+    image_width = image.cols;
+    image_height = image.rows;
+
+    if (png.size() <= data.size())
+    {
+        encoding = Encoding::PNG;
+        data_size = png.size();
+        std::memcpy(data.data(), png.data(), data_size);
+        return;
+    }
+
+    // the compressed image does not fit, so store the raw image instead
+    encoding = Encoding::RAW;
+    data_size = raw_size;
+    if (image.isContinuous())
+    {
+        std::memcpy(data.data(), image.data, raw_size);
+    }
+    else
+    {
+        cv::Mat raw(image.rows, image.cols, CV_8UC1, data.data());
+        image.copyTo(raw);
+    }
+}
+
+cv::Mat CompressedCameraObservation::decompress() const
+{
+    if (data_size == 0)
+    {
+        // nothing compressed yet
+        return cv::Mat();
+    }
+
+    // const_cast is okay here as the data is not modified
+    cv::Mat encoded(1,
+                    static_cast<int>(data_size),
+                    CV_8UC1,
+                    const_cast<uint8_t*>(data.data()));
+
+    switch (encoding)
+    {
+        case Encoding::RAW:
+            return encoded.reshape(1, image_height).clone();
+        case Encoding::PNG:
+            return cv::imdecode(encoded, cv::IMREAD_UNCHANGED);
+    }
+
+    throw std::runtime_error("Unknown image encoding.");
+}
+
+CameraObservation CompressedCameraObservation::to_camera_observation() const
+{
+    // don't use default constructor to avoid allocating an image that is
+    // directly replaced anyway
+    CameraObservation observation(CameraObservation::NoImageAllocation{});
+    observation.image = decompress();
+    observation.timestamp = timestamp;
+    return observation;
+}
+
+CompressedTriCameraObservation::CompressedTriCameraObservation(
+    const TriCameraObservation& observation)
+{
+    for (size_t i = 0; i < cameras.size(); i++)
+    {
+        cameras[i].compress(observation.cameras[i]);
+    }
+}
+
+TriCameraObservation CompressedTriCameraObservation::decompress() const
+{
+    // use empty images to avoid allocating images that are directly replaced
+    TriCameraObservation observation(CameraObservation::NoImageAllocation{});
+    for (size_t i = 0; i < cameras.size(); i++)
+    {
+        observation.cameras[i] = cameras[i].to_camera_observation();
+    }
+    return observation;
+}
+
+}  // namespace trifinger_cameras
@@ -0,0 +1,45 @@
+/**
+ * @file
+ * @brief Wrapper around a TriCamera driver that compresses the observations.
+ * @copyright 2020, Max Planck Gesellschaft. All rights reserved.
+ * @license BSD 3-clause
+ */
+#include <trifinger_cameras/compressing_tricamera_driver.hpp>
+
+#include <future>
+
+namespace trifinger_cameras
+{
+CompressingTriCameraDriver::CompressingTriCameraDriver(
+    std::shared_ptr<WrappedDriver> driver)
+    : driver_(driver)
+{
+}
+
+TriCameraInfo CompressingTriCameraDriver::get_sensor_info()
+{
+    return driver_->get_sensor_info();
+}
+
+CompressedTriCameraObservation CompressingTriCameraDriver::get_observation()
+{
+    TriCameraObservation observation = driver_->get_observation();
+    CompressedTriCameraObservation compressed;
+
+    // compress the images of the first two cameras in separate threads and the
+    // last one in this thread
+    auto compress = [&](size_t i)
+    {
+        compressed.cameras[i].compress(observation.cameras[i]);
+    };
+    auto future_0 = std::async(std::launch::async, compress, 0);
+    auto future_1 = std::async(std::launch::async, compress, 1);
+    compress(2);
+    // get() rethrows exceptions of the threads
+    future_0.get();
+    future_1.get();
+
+    return compressed;
+}
+
+}  // namespace trifinger_cameras
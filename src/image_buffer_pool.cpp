@@ -0,0 +1,73 @@
+/**
+ * @file
+ * @brief Pool of recyclable image buffers for camera observations.
+ * @copyright 2020, Max Planck Gesellschaft. All rights reserved.
+ * @license BSD 3-clause
+ */
+#include <trifinger_cameras/image_buffer_pool.hpp>
+
+#include <algorithm>
+
+namespace trifinger_cameras
+{
+ImageBufferPool::ImageBufferPool(size_t max_buffers) : max_buffers_(max_buffers)
+{
+    buffers_.reserve(max_buffers);
+}
+
+cv::Mat ImageBufferPool::acquire(const cv::Size& size, int type)
+{
+    std::lock_guard<std::mutex> lock(mutex_);
+
+    // prefer a free buffer with matching size and type
+    for (const cv::Mat& buffer : buffers_)
+    {
+        if (buffer.size() == size && buffer.type() == type &&
+            is_available(buffer))
+        {
+            return buffer;
+        }
+    }
+
+    cv::Mat new_buffer(size, type);
+
+    if (buffers_.size() < max_buffers_)
+    {
+        buffers_.push_back(new_buffer);
+    }
+    else
+    {
+        // Pool is full.  Replace a free buffer of different size/type if
+        // there is one, so the pool adapts if the image size changes.
+        // Otherwise the new buffer is simply not pooled.
+        auto free_buffer =
+            std::find_if(buffers_.begin(), buffers_.end(), is_available);
+        if (free_buffer != buffers_.end())
+        {
+            *free_buffer = new_buffer;
+        }
+    }
+
+    return new_buffer;
+}
+
+size_t ImageBufferPool::size() const
+{
+    std::lock_guard<std::mutex> lock(mutex_);
+    return buffers_.size();
+}
+
+size_t ImageBufferPool::num_available() const
+{
+    std::lock_guard<std::mutex> lock(mutex_);
+    return std::count_if(buffers_.begin(), buffers_.end(), is_available);
+}
+
+bool ImageBufferPool::is_available(const cv::Mat& buffer)
+{
+    // the reference counter is only modified atomically, so it is safe to read
+    // it here, even if other threads release references at the same time
+    return buffer.u != nullptr && buffer.u->refcount == 1;
+}
+
+}  // namespace trifinger_cameras
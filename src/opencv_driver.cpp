@@ -13,8 +13,22 @@
 
 namespace trifinger_cameras
 {
-OpenCVDriver::OpenCVDriver(int device_id) : video_capture_(device_id)
+OpenCVDriver::OpenCVDriver(int device_id, bool background_capture)
+    : video_capture_(device_id)
 {
+    if (background_capture && video_capture_.isOpened())
+    {
+        capture_thread_ = std::thread(&OpenCVDriver::capture_loop, this);
+    }
+}
+
+OpenCVDriver::~OpenCVDriver()
+{
+    stop_capture_thread_ = true;
+    if (capture_thread_.joinable())
+    {
+        capture_thread_.join();
+    }
 }
 
 CameraObservation OpenCVDriver::get_observation()
@@ -23,31 +37,114 @@ CameraObservation OpenCVDriver::get_observation()
     {
         throw std::runtime_error("Could not access camera stream :(");
     }
+
+    if (!capture_thread_.joinable())
+    {
+        CameraObservation obs(CameraObservation::NoImageAllocation{});
+        if (!read_frame(&obs))
+        {
+            throw std::runtime_error("Failed to read frame from camera.");
+        }
+        return obs;
+    }
+
+    // wait until a frame arrives that is newer than the one returned last time
+    std::unique_lock<std::mutex> lock(capture_mutex_);
+    capture_cond_.wait(lock,
+                       [this]()
+                       {
+                           return capture_count_ >
+                                      last_returned_capture_count_ ||
+                                  capture_failed_;
+                       });
+    if (capture_failed_)
+    {
+        throw std::runtime_error("Failed to read frame from camera.");
+    }
+    last_returned_capture_count_ = capture_count_;
+
+    return capture_ring_[newest_capture_index_];
+}
+
+bool OpenCVDriver::read_frame(CameraObservation* observation)
+{
+    if (!video_capture_.read(capture_buffer_))
+    {
+        return false;
+    }
+    auto current_time = std::chrono::system_clock::now();
+    observation->timestamp =
+        std::chrono::duration<double>(current_time.time_since_epoch()).count();
+
+    // make sure the image have the expected size (i.e. the size of the
+    // default-constructed observation)
+    const cv::Size expected_size = CameraObservation::get_default_image_size();
+
+    // Observations returned earlier may still refer to the previous image
+    // buffer of the observation (get_observation() returns ring slots by
+    // value, which only copies the cv::Mat header), so never write to it.
+    // Drop the reference of the slot first, so that the old buffer can be
+    // recycled by the pool once the consumers released it as well, then use
+    // a buffer that is not referenced anywhere else.
+    observation->image.release();
+    observation->image =
+        image_pool_.acquire(expected_size, capture_buffer_.type());
+
+    if (capture_buffer_.size() != expected_size)
+    {
+        static bool printed_warning = false;
+        if (!printed_warning)
+        {
+            std::cout << "WARNING: Size of captured image does not match "
+                         "with expected observation.  Images are rescaled."
+                      << std::endl;
+            printed_warning = true;
+        }
+        cv::resize(capture_buffer_, observation->image, expected_size);
+    }
     else
     {
-        CameraObservation obs;
+        // copy instead of swapping buffers, so the capture buffer is reused
+        // by the next read
+        capture_buffer_.copyTo(observation->image);
+    }
 
-        video_capture_ >> obs.image;
-        auto current_time = std::chrono::system_clock::now();
-        obs.timestamp =
-            std::chrono::duration<double>(current_time.time_since_epoch())
-                .count();
+    return true;
+}
+
+void OpenCVDriver::capture_loop()
+{
+    while (!stop_capture_thread_)
+    {
+        // Write to the slot after the newest one.  get_observation() only
+        // reads the newest slot (while holding the lock), so this one is not
+        // accessed concurrently.
+        size_t next_index;
+        {
+            std::lock_guard<std::mutex> lock(capture_mutex_);
+            next_index = (newest_capture_index_ + 1) % CAPTURE_RING_SIZE;
+        }
+
+        bool success = read_frame(&capture_ring_[next_index]);
 
-        // make sure the image have the expected size
-        if (obs.image.rows != obs.height || obs.image.cols != obs.width)
         {
-            static bool printed_warning = false;
-            if (!printed_warning)
+            std::lock_guard<std::mutex> lock(capture_mutex_);
+            if (success)
             {
-                std::cout << "WARNING: Size of captured image does not match "
-                             "with expected observation.  Images are rescaled."
-                          << std::endl;
-                printed_warning = true;
+                newest_capture_index_ = next_index;
+                capture_count_++;
+            }
+            else
+            {
+                capture_failed_ = true;
             }
-            cv::resize(obs.image, obs.image, cv::Size(obs.width, obs.height));
         }
+        capture_cond_.notify_all();
 
-        return obs;
+        if (!success)
+        {
+            break;
+        }
     }
 }
 }  // namespace trifinger_cameras
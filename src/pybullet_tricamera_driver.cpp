@@ -8,13 +8,11 @@
 
 #include <chrono>
 #include <cmath>
-#include <thread>
 
 #include <fmt/core.h>
 #include <pybind11/eigen.h>
 #include <pybind11/numpy.h>
 
-#include <pybind11_opencv/cvbind.hpp>
 #include <serialization_utils/cereal_cvmat.hpp>
 
 namespace py = pybind11;
@@ -25,13 +23,21 @@ namespace trifinger_cameras
 {
 constexpr int ROBOT_STEPS_PER_SECOND = 1000;
 
+//! NumPy array type of the rendered Bayer images.
+using BayerImageArray =
+    py::array_t<uint8_t, py::array::c_style | py::array::forcecast>;
+
 PyBulletTriCameraDriver::PyBulletTriCameraDriver(
     robot_interfaces::TriFingerTypes::BaseDataPtr robot_data,
     bool render_images,
     Settings settings)
     : render_images_(render_images),
       robot_data_(robot_data),
-      last_update_robot_time_index_(0)
+      last_update_robot_time_index_(0),
+      robot_stall_timeout_s_(settings.get_pybullet_tricamera_driver_settings()
+                                 ->robot_stall_timeout_s),
+      pipelined_rendering_(settings.get_pybullet_tricamera_driver_settings()
+                               ->pipelined_rendering)
 {
     // compute frame rate in robot steps
     float frame_rate_fps =
@@ -53,14 +59,25 @@ PyBulletTriCameraDriver::PyBulletTriCameraDriver(
 
     if (render_images)
     {
-        // some imports that are needed later for converting images (numpy array
-        // -> cv::Mat)
+        // needed for converting the camera matrices below
         numpy_ = py::module::import("numpy");
 
         // TriFingerCameras gives access to the cameras in simulation
         py::module mod_camera =
             py::module::import("trifinger_simulation.camera");
-        cameras_ = mod_camera.attr("TriFingerCameras")();
+        if (settings.get_pybullet_tricamera_driver_settings()
+                ->multi_process_rendering)
+        {
+            // same interface as TriFingerCameras but rendering the cameras in
+            // parallel in separate processes
+            cameras_ =
+                py::module::import("trifinger_cameras.pybullet_render_workers")
+                    .attr("MultiProcessTriFingerCameras")();
+        }
+        else
+        {
+            cameras_ = mod_camera.attr("TriFingerCameras")();
+        }
 
         // Alternatively, it is also possible to simulate actual cameras based
         // on calibration parameters:
@@ -133,6 +150,37 @@ PyBulletTriCameraDriver::PyBulletTriCameraDriver(
             sensor_info_.camera[i].tf_world_to_camera = rot_x_180 * view_matrix;
         }
     }
+
+    if (pipelined_rendering_)
+    {
+        render_thread_ =
+            std::thread(&PyBulletTriCameraDriver::render_loop, this);
+    }
+}
+
+PyBulletTriCameraDriver::~PyBulletTriCameraDriver()
+{
+    if (render_thread_.joinable())
+    {
+        {
+            std::lock_guard<std::mutex> lock(render_mutex_);
+            stop_render_thread_ = true;
+        }
+        render_cond_.notify_all();
+
+        // The render thread needs the GIL to finish a pending render, so make
+        // sure it is released while joining (the destructor may be called from
+        // Python).
+        if (PyGILState_Check())
+        {
+            py::gil_scoped_release release;
+            render_thread_.join();
+        }
+        else
+        {
+            render_thread_.join();
+        }
+    }
 }
 
 TriCameraInfo PyBulletTriCameraDriver::get_sensor_info()
@@ -140,43 +188,145 @@ TriCameraInfo PyBulletTriCameraDriver::get_sensor_info()
     return sensor_info_;
 }
 
-TriCameraObservation PyBulletTriCameraDriver::get_observation()
+void PyBulletTriCameraDriver::wait_for_robot()
 {
-    time_series::Index robot_t =
-        robot_data_->observation->newest_timeindex(false);
+    auto& robot_observations = robot_data_->observation;
+
+    time_series::Index robot_t = robot_observations->newest_timeindex(false);
     if (robot_t == time_series::EMPTY)
     {
-        // As long as robot backend did not start yet, run at around 10 Hz
-        using namespace std::chrono_literals;
-        std::this_thread::sleep_for(100ms);
+        // As long as the robot backend did not start yet, wait for its first
+        // step but only for the stall timeout, so that camera observations are
+        // still provided at a low rate in the meantime.
+        robot_observations->wait_for_timeindex(0, robot_stall_timeout_s_);
+        return;
+    }
+
+    // Synchronize with robot backend:  To achieve the desired frame rate,
+    // there should be one camera observation every
+    // `frame_rate_in_robot_steps_` robot steps.
+    const time_series::Index target_t =
+        last_update_robot_time_index_ + frame_rate_in_robot_steps_;
+
+    while (!robot_observations->wait_for_timeindex(target_t,
+                                                   robot_stall_timeout_s_))
+    {
+        // If robot t did not increase within the timeout, assume the robot has
+        // stopped.  Stop waiting to avoid a dead-lock.
+        time_series::Index new_robot_t =
+            robot_observations->newest_timeindex(false);
+        if (new_robot_t == robot_t)
+        {
+            if (!robot_stalled_)
+            {
+                fmt::print(stderr,
+                           "WARNING: PyBulletTriCameraDriver: Robot did not "
+                           "make progress for {} s.  Assuming it is stalled.\n",
+                           robot_stall_timeout_s_);
+                robot_stalled_ = true;
+            }
+            last_update_robot_time_index_ = new_robot_t;
+            return;
+        }
+        robot_t = new_robot_t;
+    }
+
+    if (robot_stalled_)
+    {
+        fmt::print(stderr,
+                   "PyBulletTriCameraDriver: Robot is running again.\n");
+        robot_stalled_ = false;
+    }
+
+    // Keep the frames on the grid of `frame_rate_in_robot_steps_`.  Only if
+    // the camera fell behind by more than a full frame (e.g. because rendering
+    // is too slow), resynchronize with the newest robot step instead of trying
+    // to catch up.
+    robot_t = robot_observations->newest_timeindex(false);
+    if (robot_t >= target_t + frame_rate_in_robot_steps_)
+    {
+        last_update_robot_time_index_ = robot_t;
     }
     else
     {
-        // Synchronize with robot backend:  To achieve the desired frame rate,
-        // there should be one camera observation every
-        // `frame_rate_in_robot_steps_` robot steps.
-        while (robot_t <
-               last_update_robot_time_index_ + frame_rate_in_robot_steps_)
+        last_update_robot_time_index_ = target_t;
+    }
+}
+
+TriCameraObservation PyBulletTriCameraDriver::get_observation()
+{
+    if (!pipelined_rendering_)
+    {
+        return acquire_observation();
+    }
+
+    std::unique_lock<std::mutex> lock(render_mutex_);
+    render_cond_.wait(lock,
+                      [this]()
+                      {
+                          return rendered_observation_ || render_exception_;
+                      });
+    if (render_exception_)
+    {
+        std::rethrow_exception(render_exception_);
+    }
+
+    TriCameraObservation observation = std::move(*rendered_observation_);
+    rendered_observation_.reset();
+    lock.unlock();
+    // notify the render thread that it can start with the next frame
+    render_cond_.notify_all();
+
+    return observation;
+}
+
+void PyBulletTriCameraDriver::render_loop()
+{
+    while (!stop_render_thread_)
+    {
+        try
         {
-            using namespace std::chrono_literals;
-            // TODO the sleep here might be problematic if very high frame rate
-            // is required
-            std::this_thread::sleep_for(10ms);
-            auto new_robot_t =
-                robot_data_->observation->newest_timeindex(false);
-
-            // If robot t did not increase, assume the robot has stopped.
-            // Break this loop to avoid a dead-lock.
-            if (new_robot_t == robot_t)
+            TriCameraObservation observation = acquire_observation();
+
+            std::unique_lock<std::mutex> lock(render_mutex_);
+            render_cond_.wait(lock,
+                              [this]()
+                              {
+                                  return !rendered_observation_ ||
+                                         stop_render_thread_;
+                              });
+            if (stop_render_thread_)
             {
                 break;
             }
-            robot_t = new_robot_t;
+            rendered_observation_ = std::move(observation);
         }
-        last_update_robot_time_index_ = robot_t;
+        catch (...)
+        {
+            std::lock_guard<std::mutex> lock(render_mutex_);
+            render_exception_ = std::current_exception();
+            render_cond_.notify_all();
+            break;
+        }
+        render_cond_.notify_all();
     }
+}
+
+TriCameraObservation PyBulletTriCameraDriver::acquire_observation()
+{
+    wait_for_robot();
 
-    trifinger_cameras::TriCameraObservation observation;
+    // Images need to have the size of the rendered images.  If no images are
+    // rendered, sensor_info_ contains no size, so use the default.
+    TriCameraObservation observation(CameraObservation::NoImageAllocation{});
+    for (size_t i = 0; i < 3; i++)
+    {
+        const cv::Size image_size =
+            render_images_ ? cv::Size(sensor_info_.camera[i].image_width,
+                                      sensor_info_.camera[i].image_height)
+                           : CameraObservation::get_default_image_size();
+        observation.cameras[i].image = image_pool_.acquire(image_size, CV_8UC1);
+    }
 
     auto current_time = std::chrono::system_clock::now();
     double timestamp =
@@ -196,13 +346,28 @@ TriCameraObservation PyBulletTriCameraDriver::get_observation()
             py::list images = cameras_.attr("get_bayer_images")();
             for (int i = 0; i < 3; i++)
             {
-                // ensure that the image array is contiguous in memory,
-                // otherwise conversion to cv::Mat would fail
-                auto image = numpy_.attr("ascontiguousarray")(images[i]);
-                cv::Mat image_cv = image.cast<cv::Mat>();
-                // explicitly copy to ensure it is not pointing to some data
-                // that later gets invalid
-                image_cv.copyTo(observation.cameras[i].image);
+                // Access the image through the buffer protocol.  This only
+                // creates a copy if the rendered array is not already a
+                // C-contiguous uint8 array.
+                auto image = BayerImageArray::ensure(images[i]);
+                if (!image || image.ndim() != 2)
+                {
+                    throw std::runtime_error(fmt::format(
+                        "Rendered image of camera {} is not a 2-dimensional "
+                        "uint8 array.",
+                        i));
+                }
+
+                // Wrap the array data without copying and copy it directly
+                // into the image buffer of the observation (which is taken
+                // from the pool with the expected size).  The observation must
+                // not point to the array data, as it gets invalid once the
+                // array is released.
+                cv::Mat image_view(static_cast<int>(image.shape(0)),
+                                   static_cast<int>(image.shape(1)),
+                                   CV_8UC1,
+                                   const_cast<uint8_t*>(image.data()));
+                image_view.copyTo(observation.cameras[i].image);
             }
         }
     }
@@ -225,7 +225,7 @@ CameraInfo PylonDriver::get_sensor_info()
 
 CameraObservation PylonDriver::get_observation()
 {
-    CameraObservation image_frame;
+    CameraObservation image_frame(CameraObservation::NoImageAllocation{});
     Pylon::CGrabResultPtr ptr_grab_result;
 
     try
@@ -242,8 +242,8 @@ CameraObservation PylonDriver::get_observation()
         {
             // ensure that the actual image size matches with the expected
             // one
-            if (ptr_grab_result->GetHeight() != image_frame.height ||
-                ptr_grab_result->GetWidth() != image_frame.width)
+            if (ptr_grab_result->GetHeight() != camera_info_.image_height ||
+                ptr_grab_result->GetWidth() != camera_info_.image_width)
             {
                 throw std::length_error(
                     fmt::format("{}: Size of grabbed frame ({}x{}) does not "
@@ -251,8 +251,8 @@ CameraObservation PylonDriver::get_observation()
                                 device_user_id_,
                                 ptr_grab_result->GetWidth(),
                                 ptr_grab_result->GetHeight(),
-                                image_frame.width * 2,
-                                image_frame.height * 2));
+                                camera_info_.image_width,
+                                camera_info_.image_height));
             }
 
             // NOTE: the cv::Mat points to the memory of pylon_image!
@@ -260,7 +260,11 @@ CameraObservation PylonDriver::get_observation()
                                     ptr_grab_result->GetWidth(),
                                     CV_8UC1,
                                     (uint8_t*)ptr_grab_result->GetBuffer());
-            image_frame.image = image.clone();
+            // The grab buffer is given back to Pylon, so the image needs to be
+            // copied.  Use a recycled buffer as target to avoid allocating a
+            // new one for every frame.
+            image_frame.image = image_pool_.acquire(image.size(), image.type());
+            image.copyTo(image_frame.image);
         }
         else
         {
@@ -11,6 +11,34 @@
 
 namespace trifinger_cameras
 {
+std::shared_ptr<CameraObservationSettings>
+CameraObservationSettings::load_from_toml(const toml::table& config)
+{
+    auto section = config[CONFIG_SECTION];
+    auto cfg = std::make_shared<CameraObservationSettings>();
+
+    cfg->image_width = section["image_width"].value_or(540u);
+    cfg->image_height = section["image_height"].value_or(540u);
+    cfg->compressed_capacity_ratio =
+        section["compressed_capacity_ratio"].value_or(1.0f);
+    cfg->preview_image_width = section["preview_image_width"].value_or(180u);
+    cfg->preview_image_height = section["preview_image_height"].value_or(180u);
+
+    return cfg;
+}
+
+std::ostream& operator<<(std::ostream& os, const CameraObservationSettings& s)
+{
+    os << "CameraObservationSettings:" << std::endl
+       << "\timage_width: " << s.image_width << std::endl
+       << "\timage_height: " << s.image_height << std::endl
+       << "\tcompressed_capacity_ratio: " << s.compressed_capacity_ratio
+       << std::endl
+       << "\tpreview_image_width: " << s.preview_image_width << std::endl
+       << "\tpreview_image_height: " << s.preview_image_height << std::endl;
+    return os;
+}
+
 std::shared_ptr<PylonDriverSettings> PylonDriverSettings::load_from_toml(
     const toml::table& config)
 {
@@ -57,6 +85,32 @@ std::ostream& operator<<(std::ostream& os, const TriCameraDriverSettings& s)
     return os;
 }
 
+std::shared_ptr<PyBulletTriCameraDriverSettings>
+PyBulletTriCameraDriverSettings::load_from_toml(const toml::table& config)
+{
+    auto section = config[CONFIG_SECTION];
+    auto cfg = std::make_shared<PyBulletTriCameraDriverSettings>();
+
+    cfg->robot_stall_timeout_s =
+        section["robot_stall_timeout_s"].value_or(0.1f);
+    cfg->pipelined_rendering = section["pipelined_rendering"].value_or(false);
+    cfg->multi_process_rendering =
+        section["multi_process_rendering"].value_or(false);
+
+    return cfg;
+}
+
+std::ostream& operator<<(std::ostream& os,
+                         const PyBulletTriCameraDriverSettings& s)
+{
+    os << "PyBulletTriCameraDriverSettings:" << std::endl
+       << "\trobot_stall_timeout_s: " << s.robot_stall_timeout_s << std::endl
+       << "\tpipelined_rendering: " << s.pipelined_rendering << std::endl
+       << "\tmulti_process_rendering: " << s.multi_process_rendering
+       << std::endl;
+    return os;
+}
+
 Settings::Settings()
 {
     const char* config_file_path =
@@ -87,6 +141,17 @@ void Settings::parse_file(const std::filesystem::path& file)
             "Failed to parse config file '{}': {}", file.c_str(), e.what()));
     }
 }
+std::shared_ptr<const CameraObservationSettings>
+Settings::get_camera_observation_settings()
+{
+    if (!camera_observation_settings_)
+    {
+        camera_observation_settings_ =
+            CameraObservationSettings::load_from_toml(config_);
+    }
+    return camera_observation_settings_;
+}
+
 std::shared_ptr<const PylonDriverSettings> Settings::get_pylon_driver_settings()
 {
     if (!pylon_driver_settings_)
@@ -107,4 +172,15 @@ Settings::get_tricamera_driver_settings()
     return tricamera_driver_settings_;
 }
 
+std::shared_ptr<const PyBulletTriCameraDriverSettings>
+Settings::get_pybullet_tricamera_driver_settings()
+{
+    if (!pybullet_tricamera_driver_settings_)
+    {
+        pybullet_tricamera_driver_settings_ =
+            PyBulletTriCameraDriverSettings::load_from_toml(config_);
+    }
+    return pybullet_tricamera_driver_settings_;
+}
+
 }  // namespace trifinger_cameras
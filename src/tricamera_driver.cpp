@@ -62,7 +62,8 @@ TriCameraObservation TriCameraDriver::get_observation()
     last_update_time_ += this->rate;
     std::this_thread::sleep_until(last_update_time_);
 
-    TriCameraObservation tricam_obs;
+    // images are replaced by the ones of the cameras, so don't allocate them
+    TriCameraObservation tricam_obs(CameraObservation::NoImageAllocation{});
 
     // TODO: try to grab observations in parallel for better sync
     tricam_obs.cameras[0] = camera1_.get_observation();
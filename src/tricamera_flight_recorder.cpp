@@ -0,0 +1,228 @@
+/**
+ * @file
+ * @brief Continuous recording of TriCamera data with triggered dumps.
+ * @copyright 2020, Max Planck Gesellschaft. All rights reserved.
+ * @license BSD 3-clause
+ */
+#include <trifinger_cameras/tricamera_flight_recorder.hpp>
+
+#include <algorithm>
+#include <chrono>
+#include <stdexcept>
+
+#include <fmt/format.h>
+
+namespace trifinger_cameras
+{
+TriCameraFlightRecorder::TriCameraFlightRecorder(DataPtr sensor_data,
+                                                 double buffer_duration_s)
+    : sensor_data_(sensor_data), buffer_duration_s_(buffer_duration_s)
+{
+    if (buffer_duration_s <= 0)
+    {
+        throw std::invalid_argument("Buffer duration must be positive.");
+    }
+
+    recording_thread_ = std::make_unique<TriCameraRecordingThread>(
+        sensor_data,
+        [this](StampedTriCameraObservation &&observation)
+        {
+            add_observation(std::move(observation));
+        });
+}
+
+TriCameraFlightRecorder::~TriCameraFlightRecorder()
+{
+    recording_thread_->stop();
+
+    // save pending dumps with what was recorded so far
+    {
+        std::lock_guard<std::mutex> lock(buffer_mutex_);
+        for (auto &dump : pending_dumps_)
+        {
+            start_writing(std::move(dump));
+        }
+        pending_dumps_.clear();
+    }
+    pending_dumps_cond_.notify_all();
+
+    wait_for_pending_dumps();
+}
+
+TriCameraLogSaveHandle TriCameraFlightRecorder::trigger_dump(
+    const std::string &filename, double pre_seconds, double post_seconds)
+{
+    if (pre_seconds < 0 || post_seconds < 0)
+    {
+        throw std::invalid_argument(
+            "pre_seconds and post_seconds must not be negative.");
+    }
+    if (pre_seconds > buffer_duration_s_)
+    {
+        throw std::invalid_argument(
+            fmt::format("pre_seconds ({}) is longer than the buffer ({} s).",
+                        pre_seconds,
+                        buffer_duration_s_));
+    }
+
+    // same clock as the camera timestamps
+    const double now = std::chrono::duration<double>(
+                           std::chrono::system_clock::now().time_since_epoch())
+                           .count();
+
+    PendingDump dump;
+    dump.start_time = now - pre_seconds;
+    dump.end_time = now + post_seconds;
+    dump.info = sensor_data_->sensor_info->newest_element();
+    dump.state = std::make_shared<TriCameraLogSaveHandle::State>();
+    dump.state->filename = filename;
+    dump.promise = std::make_shared<std::promise<void>>();
+
+    TriCameraLogSaveHandle handle(dump.state,
+                                  dump.promise->get_future().share());
+
+    std::lock_guard<std::mutex> lock(buffer_mutex_);
+    for (const auto &observation : buffer_)
+    {
+        if (get_camera_timestamp(observation) >= dump.start_time)
+        {
+            dump.observations.push_back(observation);
+        }
+    }
+
+    if (post_seconds == 0)
+    {
+        start_writing(std::move(dump));
+    }
+    else
+    {
+        pending_dumps_.push_back(std::move(dump));
+    }
+
+    return handle;
+}
+
+size_t TriCameraFlightRecorder::get_num_buffered_frames() const
+{
+    std::lock_guard<std::mutex> lock(buffer_mutex_);
+    return buffer_.size();
+}
+
+size_t TriCameraFlightRecorder::get_num_recorded_frames() const
+{
+    return recording_thread_->get_num_recorded_frames();
+}
+
+double TriCameraFlightRecorder::get_buffer_duration() const
+{
+    return buffer_duration_s_;
+}
+
+void TriCameraFlightRecorder::wait_for_pending_dumps()
+{
+    // first wait until all dumps have their observations (when recording
+    // stops, all pending dumps are written)
+    {
+        std::unique_lock<std::mutex> lock(buffer_mutex_);
+        pending_dumps_cond_.wait(lock,
+                                 [this]()
+                                 {
+                                     return pending_dumps_.empty();
+                                 });
+    }
+
+    // don't hold the lock while waiting, so new dumps can be started
+    std::vector<std::future<void>> writes;
+    {
+        std::lock_guard<std::mutex> lock(writes_mutex_);
+        std::swap(writes, writes_);
+    }
+    for (auto &future : writes)
+    {
+        // errors are reported through the handles, so only wait here
+        future.wait();
+    }
+}
+
+void TriCameraFlightRecorder::add_observation(
+    StampedTriCameraObservation &&observation)
+{
+    const double time = get_camera_timestamp(observation);
+
+    std::unique_lock<std::mutex> lock(buffer_mutex_);
+
+    // dumps that are complete with this observation are written, the others
+    // get the observation
+    auto is_complete = [time](const PendingDump &dump)
+    {
+        return time > dump.end_time;
+    };
+    for (auto &dump : pending_dumps_)
+    {
+        if (is_complete(dump))
+        {
+            start_writing(std::move(dump));
+        }
+        else if (time >= dump.start_time)
+        {
+            dump.observations.push_back(observation);
+        }
+    }
+    pending_dumps_.erase(
+        std::remove_if(
+            pending_dumps_.begin(), pending_dumps_.end(), is_complete),
+        pending_dumps_.end());
+
+    buffer_.push_back(std::move(observation));
+    while (get_camera_timestamp(buffer_.front()) < time - buffer_duration_s_)
+    {
+        buffer_.pop_front();
+    }
+
+    lock.unlock();
+    pending_dumps_cond_.notify_all();
+}
+
+void TriCameraFlightRecorder::start_writing(PendingDump &&dump)
+{
+    auto observations =
+        std::make_shared<std::vector<StampedTriCameraObservation>>(
+            std::move(dump.observations));
+    dump.state->num_frames = observations->size();
+
+    std::future<void> future = std::async(
+        std::launch::async,
+        [observations,
+         info = dump.info,
+         state = dump.state,
+         promise = dump.promise]()
+        {
+            try
+            {
+                save_tricamera_observations_hdf5(state->filename,
+                                                 *observations,
+                                                 info,
+                                                 &state->num_frames_written);
+                promise->set_value();
+            }
+            catch (...)
+            {
+                promise->set_exception(std::current_exception());
+            }
+        });
+
+    std::lock_guard<std::mutex> lock(writes_mutex_);
+    // forget about writes that are already finished
+    writes_.erase(
+        std::remove_if(writes_.begin(),
+                       writes_.end(),
+                       [](const std::future<void> &f)
+                       {
+                           return f.wait_for(std::chrono::seconds(0)) ==
+                                  std::future_status::ready;
+                       }),
+        writes_.end());
+    writes_.push_back(std::move(future));
+}
+
+}  // namespace trifinger_cameras
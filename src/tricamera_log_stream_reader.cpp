@@ -0,0 +1,157 @@
+/**
+ * @file
+ * @brief Sequential reader for binary TriCamera log files.
+ * @copyright 2020, Max Planck Gesellschaft. All rights reserved.
+ * @license BSD 3-clause
+ */
+#include <trifinger_cameras/tricamera_log_stream_reader.hpp>
+
+#include <stdexcept>
+
+#include <boost/iostreams/filter/gzip.hpp>
+#include <cereal/types/tuple.hpp>
+#include <fmt/format.h>
+
+namespace trifinger_cameras
+{
+TriCameraLogStreamReader::TriCameraLogStreamReader(const std::string &filename)
+    : file_(filename, std::ios::binary), stream_(&file_)
+{
+    if (!file_)
+    {
+        throw std::runtime_error("Failed to open file " + filename);
+    }
+
+    // also support uncompressed files by checking for the gzip header
+    if (file_.peek() == 0x1f)
+    {
+        is_compressed_ = true;
+        decompressed_.push(boost::iostreams::gzip_decompressor());
+        decompressed_.push(file_);
+        stream_ = &decompressed_;
+    }
+    archive_ = std::make_unique<cereal::BinaryInputArchive>(*stream_);
+
+    std::uint32_t format_version;
+    (*archive_)(format_version);
+    if (format_version != FORMAT_VERSION)
+    {
+        throw std::runtime_error(
+            fmt::format("Unsupported log format version {} (expected {}).",
+                        format_version,
+                        FORMAT_VERSION));
+    }
+
+    (*archive_)(cereal::make_size_tag(num_observations_));
+}
+
+size_t TriCameraLogStreamReader::size() const
+{
+    return num_observations_;
+}
+
+size_t TriCameraLogStreamReader::num_read() const
+{
+    return num_read_;
+}
+
+bool TriCameraLogStreamReader::is_compressed() const
+{
+    return is_compressed_;
+}
+
+StampedTriCameraObservation TriCameraLogStreamReader::read()
+{
+    check_not_at_end();
+
+    StampedTriCameraObservation observation(
+        0.0, TriCameraObservation(CameraObservation::NoImageAllocation()));
+    (*archive_)(observation);
+    num_read_++;
+
+    const cv::Mat &image = std::get<1>(observation).cameras[0].image;
+    image_size_ = {image.cols, image.rows};
+
+    return observation;
+}
+
+TriCameraLogStreamReader::Timestamps TriCameraLogStreamReader::read_timestamps()
+{
+    check_not_at_end();
+
+    Timestamps timestamps;
+    (*archive_)(timestamps.timeseries_timestamp);
+
+    for (size_t i = 0; i < timestamps.camera_timestamps.size(); i++)
+    {
+        // Header of the image as written by the cv::Mat serialization of
+        // serialization_utils, followed by the pixel data (which is the same
+        // for continuous and non-continuous images).
+        int rows, cols, type;
+        bool continuous;
+        (*archive_)(rows, cols, type, continuous);
+        const std::streamoff data_size =
+            static_cast<std::streamoff>(rows) * cols * CV_ELEM_SIZE(type);
+
+        if (is_compressed_)
+        {
+            // needs to be decompressed anyway, so simply discard it
+            stream_->ignore(data_size);
+        }
+        else
+        {
+            stream_->seekg(data_size, std::ios::cur);
+        }
+        if (!*stream_)
+        {
+            throw std::runtime_error(fmt::format(
+                "Unexpected end of file in observation {}.", num_read_));
+        }
+
+        (*archive_)(timestamps.camera_timestamps[i]);
+
+        if (i == 0)
+        {
+            image_size_ = {cols, rows};
+        }
+    }
+
+    num_read_++;
+    return timestamps;
+}
+
+std::array<int, 2> TriCameraLogStreamReader::get_image_size() const
+{
+    return image_size_;
+}
+
+void TriCameraLogStreamReader::check_not_at_end() const
+{
+    if (num_read_ >= num_observations_)
+    {
+        throw std::out_of_range("No more observations in the log.");
+    }
+}
+
+void read_tricamera_log_timestamps(
+    const std::string &filename,
+    std::vector<double> *timeseries_timestamps,
+    std::vector<std::array<double, 3>> *camera_timestamps)
+{
+    TriCameraLogStreamReader reader(filename);
+
+    timeseries_timestamps->clear();
+    camera_timestamps->clear();
+    timeseries_timestamps->reserve(reader.size());
+    camera_timestamps->reserve(reader.size());
+
+    for (size_t i = 0; i < reader.size(); i++)
+    {
+        TriCameraLogStreamReader::Timestamps timestamps =
+            reader.read_timestamps();
+        timeseries_timestamps->push_back(timestamps.timeseries_timestamp);
+        camera_timestamps->push_back(timestamps.camera_timestamps);
+    }
+}
+
+}  // namespace trifinger_cameras
@@ -0,0 +1,263 @@
+/**
+ * @file
+ * @brief Streaming conversion of binary TriCamera logs to HDF5.
+ * @copyright 2020, Max Planck Gesellschaft. All rights reserved.
+ * @license BSD 3-clause
+ */
+#include <trifinger_cameras/tricamera_log_to_hdf5.hpp>
+
+#include <algorithm>
+#include <array>
+#include <deque>
+#include <future>
+#include <stdexcept>
+#include <thread>
+#include <vector>
+
+#include <hdf5.h>
+#include <zlib.h>
+#include <fmt/format.h>
+
+#include <trifinger_cameras/tricamera_log_stream_reader.hpp>
+#include <trifinger_cameras/tricamera_logger.hpp>
+
+namespace trifinger_cameras
+{
+namespace
+{
+constexpr int NUM_CAMERAS = 3;
+const std::array<std::string, NUM_CAMERAS> CAMERA_NAMES = {
+    "camera60", "camera180", "camera300"};
+
+//! Images of one observation, compressed for the HDF5 images dataset.
+struct CompressedChunk
+{
+    std::vector<Bytef> data;
+    std::array<double, NUM_CAMERAS> camera_timestamps;
+    double timeseries_timestamp;
+};
+
+//! Compress the images of the observation into one chunk of the HDF5 file.
+CompressedChunk compress_observation(
+    const StampedTriCameraObservation &stamped_observation,
+    int image_width,
+    int image_height)
+{
+    const auto &[timeseries_timestamp, observation] = stamped_observation;
+    const size_t image_bytes = static_cast<size_t>(image_width) * image_height;
+
+    // the chunk contains the images of all cameras one after another
+    std::vector<Bytef> raw(NUM_CAMERAS * image_bytes);
+    CompressedChunk chunk;
+    chunk.timeseries_timestamp = timeseries_timestamp;
+
+    for (int i_cam = 0; i_cam < NUM_CAMERAS; i_cam++)
+    {
+        const cv::Mat &image = observation.cameras[i_cam].image;
+        if (image.cols != image_width || image.rows != image_height ||
+            image.type() != CV_8UC1)
+        {
+            throw std::runtime_error(fmt::format(
+                "Unexpected image of camera {}: {}x{} (type {}), expected "
+                "{}x{} single-channel 8-bit images.",
+                CAMERA_NAMES[i_cam],
+                image.cols,
+                image.rows,
+                image.type(),
+                image_width,
+                image_height));
+        }
+
+        cv::Mat target(
+            image_height, image_width, CV_8UC1, &raw[i_cam * image_bytes]);
+        image.copyTo(target);
+
+        chunk.camera_timestamps[i_cam] = observation.cameras[i_cam].timestamp;
+    }
+
+    // HDF5's gzip filter uses the zlib format, so compress2() produces chunks
+    // that can be read like the ones written by the filter itself
+    uLongf compressed_size = compressBound(raw.size());
+    chunk.data.resize(compressed_size);
+    int status = compress2(chunk.data.data(),
+                           &compressed_size,
+                           raw.data(),
+                           raw.size(),
+                           TRICAMERA_HDF5_COMPRESSION_LEVEL);
+    if (status != Z_OK)
+    {
+        throw std::runtime_error(
+            fmt::format("Failed to compress images (zlib error {}).", status));
+    }
+    chunk.data.resize(compressed_size);
+
+    return chunk;
+}
+
+//! Write values to the rows [index, index + 1) of a dataset.
+void write_row(hid_t dataset, hsize_t index, const double *values, int rank)
+{
+    std::array<hsize_t, 2> offset = {index, 0};
+    std::array<hsize_t, 2> count = {1, NUM_CAMERAS};
+
+    hid_t file_space = H5Dget_space(dataset);
+    H5Sselect_hyperslab(file_space,
+                        H5S_SELECT_SET,
+                        offset.data(),
+                        nullptr,
+                        count.data(),
+                        nullptr);
+    hid_t mem_space = H5Screate_simple(rank, count.data(), nullptr);
+
+    herr_t status = H5Dwrite(
+        dataset, H5T_NATIVE_DOUBLE, mem_space, file_space, H5P_DEFAULT, values);
+
+    H5Sclose(mem_space);
+    H5Sclose(file_space);
+
+    if (status < 0)
+    {
+        throw std::runtime_error("Failed to write timestamps.");
+    }
+}
+
+//! Write the observation with the given index to the (opened) datasets.
+void write_chunk(hid_t ds_images,
+                 hid_t ds_camera_timestamps,
+                 hid_t ds_timeseries_timestamps,
+                 hsize_t index,
+                 const CompressedChunk &chunk)
+{
+    std::array<hsize_t, 4> offset = {index, 0, 0, 0};
+    if (H5Dwrite_chunk(ds_images,
+                       H5P_DEFAULT,
+                       0,
+                       offset.data(),
+                       chunk.data.size(),
+                       chunk.data.data()) < 0)
+    {
+        throw std::runtime_error(
+            fmt::format("Failed to write images of observation {}.", index));
+    }
+
+    write_row(ds_camera_timestamps, index, chunk.camera_timestamps.data(), 2);
+    write_row(ds_timeseries_timestamps, index, &chunk.timeseries_timestamp, 1);
+}
+
+}  // namespace
+
+void convert_tricamera_log_to_hdf5(
+    const std::string &logfile,
+    const std::string &outfile,
+    const TriCameraInfo &info,
+    unsigned int num_threads,
+    const std::function<void(size_t, size_t)> &progress_callback)
+{
+    TriCameraLogStreamReader reader(logfile);
+    const size_t n_frames = reader.size();
+    if (n_frames == 0)
+    {
+        throw std::runtime_error("No frames found in log file.");
+    }
+
+    const int image_width = info.camera[0].image_width;
+    const int image_height = info.camera[0].image_height;
+
+    // Create the file with all metadata using the same function as the
+    // logger, so the layout is guaranteed to be the same.  The observations
+    // are then written via the HDF5 C API, which allows writing
+    // pre-compressed chunks.
+    create_tricamera_hdf5(
+        outfile, info, static_cast<int>(n_frames), image_width, image_height)
+        ->close();
+
+    hid_t file = H5Fopen(outfile.c_str(), H5F_ACC_RDWR, H5P_DEFAULT);
+    if (file < 0)
+    {
+        throw std::runtime_error("Failed to open " + outfile);
+    }
+    hid_t ds_images =
+        H5Dopen(file, TRICAMERA_HDF5_DS_IMAGES.c_str(), H5P_DEFAULT);
+    hid_t ds_camera_timestamps =
+        H5Dopen(file, TRICAMERA_HDF5_DS_CAMERA_TIMESTAMPS.c_str(), H5P_DEFAULT);
+    hid_t ds_timeseries_timestamps = H5Dopen(
+        file, TRICAMERA_HDF5_DS_TIMESERIES_TIMESTAMPS.c_str(), H5P_DEFAULT);
+
+    if (num_threads == 0)
+    {
+        num_threads = std::max(1u, std::thread::hardware_concurrency());
+    }
+    // Limit the number of observations that are in the pipeline at the same
+    // time, so memory usage stays constant.  A few more than the number of
+    // threads, so the workers don't run idle while the oldest chunk is
+    // written.
+    const size_t max_in_flight = 2 * num_threads;
+
+    std::deque<std::future<CompressedChunk>> in_flight;
+    size_t num_written = 0;
+
+    auto write_oldest = [&]()
+    {
+        CompressedChunk chunk = in_flight.front().get();
+        in_flight.pop_front();
+        write_chunk(ds_images,
+                    ds_camera_timestamps,
+                    ds_timeseries_timestamps,
+                    num_written,
+                    chunk);
+        num_written++;
+
+        if (progress_callback)
+        {
+            progress_callback(num_written, n_frames);
+        }
+    };
+
+    try
+    {
+        for (size_t i = 0; i < n_frames; i++)
+        {
+            if (in_flight.size() >= max_in_flight)
+            {
+                write_oldest();
+            }
+
+            in_flight.push_back(std::async(
+                std::launch::async,
+                [observation = reader.read(), image_width, image_height]()
+                {
+                    return compress_observation(
+                        observation, image_width, image_height);
+                }));
+        }
+        while (!in_flight.empty())
+        {
+            write_oldest();
+        }
+    }
+    catch (...)
+    {
+        // let running workers finish before the datasets are closed
+        for (auto &future : in_flight)
+        {
+            if (future.valid())
+            {
+                future.wait();
+            }
+        }
+        H5Dclose(ds_timeseries_timestamps);
+        H5Dclose(ds_camera_timestamps);
+        H5Dclose(ds_images);
+        H5Fclose(file);
+        throw;
+    }
+
+    H5Dclose(ds_timeseries_timestamps);
+    H5Dclose(ds_camera_timestamps);
+    H5Dclose(ds_images);
+    if (H5Fclose(file) < 0)
+    {
+        throw std::runtime_error("Failed to close " + outfile);
+    }
+}
+}  // namespace trifinger_cameras
@@ -0,0 +1,174 @@
+/**
+ * @file
+ * @brief Convert a TriCamera log file from the binary dump format to HDF5.
+ * @copyright 2020, Max Planck Gesellschaft. All rights reserved.
+ * @license BSD 3-clause
+ *
+ * Other than the Python script ``tricamera_log_to_hdf5`` (when converting a
+ * single file), which loads the whole log into memory, this streams the log
+ * (see convert_tricamera_log_to_hdf5()), so memory usage does not depend on
+ * the length of the log.  The batch mode of the script uses this executable.
+ */
+#include <array>
+#include <filesystem>
+#include <iostream>
+#include <limits>
+#include <string>
+#include <vector>
+
+#include <fmt/format.h>
+
+#include <cli_utils/program_options.hpp>
+
+#include <trifinger_cameras/parse_yml.h>
+#include <trifinger_cameras/tricamera_log_to_hdf5.hpp>
+
+using namespace trifinger_cameras;
+
+class Args : public cli_utils::ProgramOptions
+{
+public:
+    std::string logfile, outfile;
+    std::vector<std::string> camera_info;
+    //! NaN if not set (the frame rate is then not written to the file)
+    float frame_rate_fps = std::numeric_limits<float>::quiet_NaN();
+    unsigned int num_threads = 0;
+
+    std::string help() const override
+    {
+        return R"(Convert a TriCamera log file from the binary dump format to HDF5.
+
+Same as tricamera_log_to_hdf5 but reads the log file one observation at a time
+(so memory usage stays constant, independent of the length of the log) and
+compresses the images in parallel.
+
+Usage:  tricamera_log_to_hdf5_native -l <logfile> -o <outfile> -c <camera60.yml> <camera180.yml> <camera300.yml>
+
+)";
+    }
+
+    // in add_options the arguments are defined
+    void add_options(boost::program_options::options_description &options,
+                     boost::program_options::positional_options_description
+                         &positional) override
+    {
+        namespace po = boost::program_options;
+
+        // The chaining of parentheses calls does not go well with clang-format,
+        // so better disable auto-formatting for this block.
+
+        // clang-format off
+        options.add_options()
+            ("logfile,l",
+             po::value<std::string>(&logfile)->required(),
+             "Path to the log file.")
+            ("outfile,o",
+             po::value<std::string>(&outfile)->required(),
+             "Path to the output HDF5 file.")
+            ("camera-info,c",
+             po::value<std::vector<std::string>>(&camera_info)
+                ->multitoken()->required(),
+             "Paths to the three camera calibration YAML files.")
+            ("frame-rate",
+             po::value<float>(&frame_rate_fps),
+             "Frame rate of the cameras (stored in the HDF5 file, as it is "
+             "not included in the log).  If not set, the HDF5 file does not "
+             "contain a frame rate.")
+            ("threads,j",
+             po::value<unsigned int>(&num_threads),
+             "Number of threads used for compression.  Default: number of "
+             "CPU cores.")
+            ;
+        // clang-format on
+    }
+};
+
+namespace
+{
+constexpr int NUM_CAMERAS = 3;
+const std::array<std::string, NUM_CAMERAS> CAMERA_NAMES = {
+    "camera60", "camera180", "camera300"};
+
+//! Load camera info from the calibration files.
+TriCameraInfo load_camera_info(const std::vector<std::string> &files,
+                               float frame_rate_fps)
+{
+    if (files.size() != NUM_CAMERAS)
+    {
+        throw std::invalid_argument(
+            fmt::format("Expected {} camera info files but got {}.",
+                        NUM_CAMERAS,
+                        files.size()));
+    }
+
+    TriCameraInfo info;
+    for (size_t i = 0; i < NUM_CAMERAS; i++)
+    {
+        std::string camera_name;
+        if (!readCalibrationYml(files[i], camera_name, info.camera[i]))
+        {
+            throw std::runtime_error("Failed to load calibration file " +
+                                     files[i]);
+        }
+        if (camera_name != CAMERA_NAMES[i])
+        {
+            throw std::runtime_error(fmt::format(
+                "Expected camera {} but got {}", CAMERA_NAMES[i], camera_name));
+        }
+        info.camera[i].frame_rate_fps = frame_rate_fps;
+    }
+
+    return info;
+}
+
+}  // namespace
+
+int main(int argc, char *argv[])
+{
+    Args args;
+    if (!args.parse_args(argc, argv))
+    {
+        return 1;
+    }
+
+    if (!std::filesystem::is_regular_file(args.logfile))
+    {
+        std::cerr << "Log file does not exist." << std::endl;
+        return 1;
+    }
+    if (std::filesystem::exists(args.outfile))
+    {
+        std::cerr << "Output file already exists.  Exiting." << std::endl;
+        return 1;
+    }
+
+    try
+    {
+        const TriCameraInfo info =
+            load_camera_info(args.camera_info, args.frame_rate_fps);
+        convert_tricamera_log_to_hdf5(
+            args.logfile,
+            args.outfile,
+            info,
+            args.num_threads,
+            [](size_t num_written, size_t num_frames)
+            {
+                if (num_written % 100 == 0 || num_written == num_frames)
+                {
+                    std::cout << fmt::format(
+                        "\rConverted {} / {} frames", num_written, num_frames);
+                    std::cout.flush();
+                }
+            });
+        std::cout << std::endl;
+    }
+    catch (const std::exception &e)
+    {
+        std::cerr << "ERROR: " << e.what() << std::endl;
+        // do not leave an incomplete file behind
+        std::filesystem::remove(args.outfile);
+        return 1;
+    }
+
+    return 0;
+}
@@ -1,21 +1,43 @@
 #include <trifinger_cameras/tricamera_logger.hpp>
 
+#include <algorithm>
+#include <chrono>
+#include <cmath>
 #include <filesystem>
 
+#include <fmt/format.h>
 #include <opencv2/core/eigen.hpp>
 #include <opencv2/hdf/hdf5.hpp>
 
 namespace trifinger_cameras
 {
-void TriCameraLogger::stop_and_save_hdf5(const std::string &filename)
+namespace
 {
-    stop();
-
-    if (buffer_.empty())
+//! Number of frames that fit in the memory budget.
+size_t get_buffer_limit(TriCameraLogger::DataPtr sensor_data,
+                        TriCameraLogger::MemoryBudget memory_budget)
+{
+    const size_t bytes_per_frame = TriCameraLogger::get_bytes_per_frame(
+        sensor_data->sensor_info->newest_element());
+    const size_t buffer_limit = memory_budget.bytes / bytes_per_frame;
+    if (buffer_limit == 0)
     {
-        throw std::runtime_error("Buffer is empty, nothing to save.");
+        throw std::invalid_argument(fmt::format(
+            "Memory budget of {} bytes is too small for a single frame ({} "
+            "bytes).",
+            memory_budget.bytes,
+            bytes_per_frame));
     }
+    return buffer_limit;
+}
+}  // namespace
 
+cv::Ptr<cv::hdf::HDF5> create_tricamera_hdf5(const std::string &filename,
+                                             const TriCameraInfo &info,
+                                             int num_frames,
+                                             int image_width,
+                                             int image_height)
+{
     // existing files shall be overwritten, so if it already exists, delete the
     // old one
     std::filesystem::remove(filename);
@@ -27,14 +49,6 @@ void TriCameraLogger::stop_and_save_hdf5(const std::string &filename)
     constexpr int FORMAT_VERSION_MINOR = 1;
     constexpr int NUM_CAMERAS = 3;
 
-    const std::string DS_IMAGES = "images";
-    const std::string DS_CAMERA_TIMESTAMPS = "timestamps";
-    const std::string DS_TIMESERIES_TIMESTAMPS = "sensor_data_timestamps";
-
-    // check if buffer is empty
-    int image_width = std::get<1>(buffer_[0]).cameras[0].image.cols;
-    int image_height = std::get<1>(buffer_[0]).cameras[0].image.rows;
-
     h5io->atwrite(TRICAMERA_LOG_MAGIC, "magic");
     h5io->atwrite(FORMAT_VERSION_MAJOR, "format_version");
     h5io->atwrite(FORMAT_VERSION_MINOR, "format_version_minor");
@@ -44,7 +58,6 @@ void TriCameraLogger::stop_and_save_hdf5(const std::string &filename)
 
     // Add camera calibration parameters
     h5io->grcreate("/camera_info");
-    TriCameraInfo info = sensor_data_->sensor_info->newest_element();
 
     const std::array<std::string, 3> CAMERA_NAMES = {
         "camera60", "camera180", "camera300"};
@@ -54,7 +67,13 @@ void TriCameraLogger::stop_and_save_hdf5(const std::string &filename)
         std::string group_name = "/camera_info/" + CAMERA_NAMES[i];
         h5io->grcreate(group_name);
 
-        h5io->atwrite(params.frame_rate_fps, group_name + "/frame_rate_fps");
+        // NaN if the frame rate is unknown (e.g. when converting a log file,
+        // which does not contain it), so it is not written
+        if (!std::isnan(params.frame_rate_fps))
+        {
+            h5io->atwrite(params.frame_rate_fps,
+                          group_name + "/frame_rate_fps");
+        }
 
         // datasets are auto-created when writing, so as long as no special
         // settings like compression are needed, we can skip dscreate() here.
@@ -73,22 +92,53 @@ void TriCameraLogger::stop_and_save_hdf5(const std::string &filename)
         h5io->dswrite(tf_world_to_camera, group_name + "/tf_world_to_camera");
     }
 
-    const int n_frames = static_cast<int>(buffer_.size());
-    constexpr int compression_level = 4;
     std::vector<int> images_size{
-        n_frames, NUM_CAMERAS, image_height, image_width};
+        num_frames, NUM_CAMERAS, image_height, image_width};
     std::vector<int> images_chunks{1, NUM_CAMERAS, image_height, image_width};
-    h5io->dscreate(
-        images_size, CV_8UC1, DS_IMAGES, compression_level, images_chunks);
+    h5io->dscreate(images_size,
+                   CV_8UC1,
+                   TRICAMERA_HDF5_DS_IMAGES,
+                   TRICAMERA_HDF5_COMPRESSION_LEVEL,
+                   images_chunks);
 
     // timestamps from the camera observations (when images were captured)
-    h5io->dscreate(
-        std::vector<int>{n_frames, NUM_CAMERAS}, CV_64F, DS_CAMERA_TIMESTAMPS);
+    h5io->dscreate(std::vector<int>{num_frames, NUM_CAMERAS},
+                   CV_64F,
+                   TRICAMERA_HDF5_DS_CAMERA_TIMESTAMPS);
 
     // timestamps from the time series (when observations were added to the
     // sensor data and thus available to the user)
-    h5io->dscreate(
-        std::vector<int>{n_frames}, CV_64F, DS_TIMESERIES_TIMESTAMPS);
+    h5io->dscreate(std::vector<int>{num_frames},
+                   CV_64F,
+                   TRICAMERA_HDF5_DS_TIMESERIES_TIMESTAMPS);
+
+    return h5io;
+}
+
+void save_tricamera_observations_hdf5(
+    const std::string &filename,
+    const std::vector<StampedTriCameraObservation> &observations,
+    const TriCameraInfo &info,
+    std::atomic<size_t> *num_frames_written)
+{
+    if (observations.empty())
+    {
+        throw std::runtime_error("Buffer is empty, nothing to save.");
+    }
+
+    // The HDF5 library is usually not built thread-safe, so make sure that
+    // files saved in the background are not written at the same time.
+    static std::mutex hdf5_mutex;
+    std::lock_guard<std::mutex> hdf5_lock(hdf5_mutex);
+
+    constexpr int NUM_CAMERAS = 3;
+
+    int image_width = std::get<1>(observations[0]).cameras[0].image.cols;
+    int image_height = std::get<1>(observations[0]).cameras[0].image.rows;
+    const int n_frames = static_cast<int>(observations.size());
+
+    cv::Ptr<cv::hdf::HDF5> h5io = create_tricamera_hdf5(
+        filename, info, n_frames, image_width, image_height);
 
     // Write the observations to the HDF5 file
     for (int i_obs = 0; i_obs < n_frames; ++i_obs)
@@ -104,12 +154,12 @@ void TriCameraLogger::stop_and_save_hdf5(const std::string &filename)
             CV_8UC1);
         cv::Mat camera_timestamps(1, NUM_CAMERAS, CV_64F);
 
-        double timeseries_timestamp = std::get<0>(buffer_[i_obs]);
+        double timeseries_timestamp = std::get<0>(observations[i_obs]);
 
         for (int i_cam = 0; i_cam < NUM_CAMERAS; ++i_cam)
         {
             const CameraObservation &camera =
-                std::get<1>(buffer_[i_obs]).cameras[i_cam];
+                std::get<1>(observations[i_obs]).cameras[i_cam];
 
             // Get slice of `images` to which we can write the single image.
             // The reshape is needed to flatten out the dimensions for n_frames
@@ -126,19 +176,258 @@ void TriCameraLogger::stop_and_save_hdf5(const std::string &filename)
             camera_timestamps.at<double>(0, i_cam) = camera.timestamp;
         }
 
-        h5io->dswrite(images, DS_IMAGES, std::vector<int>{i_obs, 0, 0, 0});
+        h5io->dswrite(
+            images, TRICAMERA_HDF5_DS_IMAGES, std::vector<int>{i_obs, 0, 0, 0});
         h5io->dswrite(camera_timestamps,
-                      DS_CAMERA_TIMESTAMPS,
+                      TRICAMERA_HDF5_DS_CAMERA_TIMESTAMPS,
                       std::vector<int>{i_obs, 0});
 
         // OpenCV's HDF5 interface can only write Mat to datasets, so even
         // scalar values need to be wrapped in a Mat.
         cv::Mat timeseries_timestamp_mat(1, 1, CV_64F, timeseries_timestamp);
         h5io->dswrite(timeseries_timestamp_mat,
-                      DS_TIMESERIES_TIMESTAMPS,
+                      TRICAMERA_HDF5_DS_TIMESERIES_TIMESTAMPS,
                       std::vector<int>{i_obs});
+
+        if (num_frames_written)
+        {
+            *num_frames_written = i_obs + 1;
+        }
     }
 
     h5io->close();
 }
+
+const std::string &TriCameraLogSaveHandle::get_filename() const
+{
+    return state_->filename;
+}
+
+size_t TriCameraLogSaveHandle::get_num_frames() const
+{
+    return state_->num_frames;
+}
+
+size_t TriCameraLogSaveHandle::get_num_frames_written() const
+{
+    return state_->num_frames_written;
+}
+
+double TriCameraLogSaveHandle::get_progress() const
+{
+    const size_t num_frames = state_->num_frames;
+    if (num_frames == 0)
+    {
+        // frames not known yet (or nothing to save)
+        return is_done() ? 1.0 : 0.0;
+    }
+    return static_cast<double>(state_->num_frames_written) /
+           static_cast<double>(num_frames);
+}
+
+bool TriCameraLogSaveHandle::is_done() const
+{
+    return wait(0);
+}
+
+bool TriCameraLogSaveHandle::wait(double timeout_s) const
+{
+    if (timeout_s < 0)
+    {
+        future_.wait();
+        return true;
+    }
+    return future_.wait_for(std::chrono::duration<double>(timeout_s)) ==
+           std::future_status::ready;
+}
+
+void TriCameraLogSaveHandle::get() const
+{
+    future_.get();
+}
+
+TriCameraLogSaveHandle::TriCameraLogSaveHandle(std::shared_ptr<State> state,
+                                               std::shared_future<void> future)
+    : state_(state), future_(future)
+{
+}
+
+TriCameraLogger::TriCameraLogger(DataPtr sensor_data, size_t buffer_limit)
+    : Base(sensor_data, buffer_limit), buffer_limit_(buffer_limit)
+{
+}
+
+TriCameraLogger::TriCameraLogger(DataPtr sensor_data,
+                                 MemoryBudget memory_budget)
+    : TriCameraLogger(sensor_data, get_buffer_limit(sensor_data, memory_budget))
+{
+}
+
+TriCameraLogger::~TriCameraLogger()
+{
+    wait_for_pending_saves();
+}
+
+size_t TriCameraLogger::get_bytes_per_frame(const TriCameraInfo &info)
+{
+    size_t bytes = sizeof(StampedTriCameraObservation);
+    for (const CameraInfo &camera_info : info.camera)
+    {
+        size_t num_pixels = camera_info.image_width * camera_info.image_height;
+        if (num_pixels == 0)
+        {
+            // size unknown (e.g. simulation without rendering), so assume
+            // the default size
+            num_pixels = CameraObservation::get_default_image_size().area();
+        }
+        // images are single-channel 8-bit (Bayer pattern)
+        bytes += num_pixels;
+    }
+    return bytes;
+}
+
+void TriCameraLogger::start()
+{
+    time_series::Index t = sensor_data_->observation->newest_timeindex(false);
+    start_timeindex_ = t == time_series::EMPTY ? 0 : t;
+    stop_timeindex_ = time_series::EMPTY;
+
+    Base::start();
+}
+
+void TriCameraLogger::stop()
+{
+    Base::stop();
+
+    if (start_timeindex_ != time_series::EMPTY &&
+        stop_timeindex_ == time_series::EMPTY)
+    {
+        stop_timeindex_ = sensor_data_->observation->newest_timeindex(false);
+    }
+}
+
+void TriCameraLogger::stop_and_save(const std::string &filename)
+{
+    stop();
+    Base::stop_and_save(filename);
+}
+
+TriCameraLogger::BufferUsage TriCameraLogger::get_buffer_usage() const
+{
+    if (bytes_per_frame_ == 0 && sensor_data_->sensor_info->newest_timeindex(
+                                     false) != time_series::EMPTY)
+    {
+        bytes_per_frame_ =
+            get_bytes_per_frame(sensor_data_->sensor_info->newest_element());
+    }
+
+    // Number of frames that arrived since logging started.  Derived from the
+    // time indices instead of the buffer, as the buffer is modified by the
+    // logging thread.
+    size_t num_frames_seen = 0;
+    const time_series::Index start = start_timeindex_;
+    if (start != time_series::EMPTY)
+    {
+        time_series::Index end = stop_timeindex_;
+        if (end == time_series::EMPTY)
+        {
+            end = sensor_data_->observation->newest_timeindex(false);
+        }
+        num_frames_seen = std::max<time_series::Index>(0, end - start + 1);
+    }
+
+    BufferUsage usage;
+    usage.capacity_frames = buffer_limit_;
+    usage.num_frames = std::min(num_frames_seen, buffer_limit_);
+    usage.frames_dropped = num_frames_seen - usage.num_frames;
+    usage.fill_level =
+        buffer_limit_ == 0
+            ? 1.0
+            : static_cast<double>(usage.num_frames) / buffer_limit_;
+    usage.bytes_used = usage.num_frames * bytes_per_frame_;
+    usage.bytes_capacity = buffer_limit_ * bytes_per_frame_;
+
+    return usage;
+}
+
+void TriCameraLogger::stop_and_save_hdf5(const std::string &filename)
+{
+    stop();
+    TriCameraInfo info = sensor_data_->sensor_info->newest_element();
+
+    save_tricamera_observations_hdf5(filename, buffer_, info);
+}
+
+TriCameraLogSaveHandle TriCameraLogger::stop_and_save_hdf5_async(
+    const std::string &filename)
+{
+    auto observations =
+        std::make_shared<std::vector<StampedTriCameraObservation>>(
+            stop_and_take_buffer());
+    if (observations->empty())
+    {
+        throw std::runtime_error("Buffer is empty, nothing to save.");
+    }
+    // get the info here, so the background thread does not need to access
+    // the sensor data
+    TriCameraInfo info = sensor_data_->sensor_info->newest_element();
+
+    auto state = std::make_shared<TriCameraLogSaveHandle::State>();
+    state->filename = filename;
+    state->num_frames = observations->size();
+
+    std::shared_future<void> future =
+        std::async(std::launch::async,
+                   [observations, info, state]()
+                   {
+                       save_tricamera_observations_hdf5(
+                           state->filename,
+                           *observations,
+                           info,
+                           &state->num_frames_written);
+                   })
+            .share();
+
+    {
+        std::lock_guard<std::mutex> lock(pending_saves_mutex_);
+        // forget about saves that are already finished
+        pending_saves_.erase(
+            std::remove_if(pending_saves_.begin(),
+                           pending_saves_.end(),
+                           [](const std::shared_future<void> &f)
+                           {
+                               return f.wait_for(std::chrono::seconds(0)) ==
+                                      std::future_status::ready;
+                           }),
+            pending_saves_.end());
+        pending_saves_.push_back(future);
+    }
+
+    return TriCameraLogSaveHandle(state, future);
+}
+
+void TriCameraLogger::wait_for_pending_saves()
+{
+    std::lock_guard<std::mutex> lock(pending_saves_mutex_);
+    for (const auto &future : pending_saves_)
+    {
+        // errors are reported through the handles, so only wait here
+        future.wait();
+    }
+    pending_saves_.clear();
+}
+
+std::vector<StampedTriCameraObservation> TriCameraLogger::stop_and_take_buffer()
+{
+    stop();
+
+    std::vector<StampedTriCameraObservation> observations;
+    observations.reserve(buffer_limit_);
+    // swap, so the logger keeps a buffer with the original capacity
+    std::swap(observations, buffer_);
+    // the buffer is empty now
+    start_timeindex_ = time_series::EMPTY;
+
+    return observations;
+}
 }  // namespace trifinger_cameras
@@ -0,0 +1,68 @@
+/**
+ * @file
+ * @brief Driver providing previews of the frames of another TriCamera backend.
+ * @copyright 2020, Max Planck Gesellschaft. All rights reserved.
+ * @license BSD 3-clause
+ */
+#include <trifinger_cameras/tricamera_preview_driver.hpp>
+
+#include <algorithm>
+
+#include <opencv2/imgproc.hpp>
+
+namespace trifinger_cameras
+{
+TriCameraPreviewDriver::TriCameraPreviewDriver(FullDataPtr full_data)
+    : frontend_(full_data)
+{
+}
+
+TriCameraInfo TriCameraPreviewDriver::get_sensor_info()
+{
+    TriCameraInfo info = frontend_.get_sensor_info();
+    const cv::Size preview_size =
+        TriCameraPreviewObservation::get_default_image_size();
+
+    for (auto& camera : info.camera)
+    {
+        const double scale_x =
+            static_cast<double>(preview_size.width) / camera.image_width;
+        const double scale_y =
+            static_cast<double>(preview_size.height) / camera.image_height;
+
+        // scale focal lengths and principal point accordingly
+        camera.camera_matrix.row(0) *= scale_x;
+        camera.camera_matrix.row(1) *= scale_y;
+        camera.image_width = preview_size.width;
+        camera.image_height = preview_size.height;
+    }
+
+    return info;
+}
+
+TriCameraPreviewObservation TriCameraPreviewDriver::get_observation()
+{
+    // use the newest frame but make sure it was not used before (this blocks
+    // until a frame is available)
+    time_series::Index t =
+        std::max(frontend_.get_current_timeindex(), next_timeindex_);
+    TriCameraObservation full_observation = frontend_.get_observation(t);
+    next_timeindex_ = t + 1;
+
+    TriCameraPreviewObservation preview;
+    cv::Mat bgr;
+    for (size_t i = 0; i < preview.cameras.size(); i++)
+    {
+        const CameraObservation& full = full_observation.cameras[i];
+        CameraObservation& camera = preview.cameras[i];
+
+        camera.timestamp = full.timestamp;
+        cv::cvtColor(full.image, bgr, cv::COLOR_BayerBG2BGR);
+        cv::resize(
+            bgr, camera.image, camera.image.size(), 0, 0, cv::INTER_AREA);
+    }
+
+    return preview;
+}
+
+}  // namespace trifinger_cameras
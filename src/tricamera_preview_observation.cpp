@@ -0,0 +1,38 @@
+/**
+ * @file
+ * @brief Observation with low-resolution colour previews of the three cameras.
+ * @copyright 2020, Max Planck Gesellschaft. All rights reserved.
+ * @license BSD 3-clause
+ */
+#include <trifinger_cameras/tricamera_preview_observation.hpp>
+
+#include <mutex>
+
+#include <trifinger_cameras/settings.hpp>
+
+namespace trifinger_cameras
+{
+TriCameraPreviewObservation::TriCameraPreviewObservation()
+{
+    const cv::Size size = get_default_image_size();
+    for (auto& camera : cameras)
+    {
+        camera.image = cv::Mat(size, CV_8UC3);
+    }
+}
+
+cv::Size TriCameraPreviewObservation::get_default_image_size()
+{
+    static std::once_flag size_loaded;
+    static cv::Size size;
+    std::call_once(size_loaded,
+                   []()
+                   {
+                       auto cfg = Settings().get_camera_observation_settings();
+                       size = cv::Size(cfg->preview_image_width,
+                                       cfg->preview_image_height);
+                   });
+    return size;
+}
+
+}  // namespace trifinger_cameras
@@ -0,0 +1,108 @@
+/**
+ * @file
+ * @brief Thread passing all TriCamera observations to a callback.
+ * @copyright 2020, Max Planck Gesellschaft. All rights reserved.
+ * @license BSD 3-clause
+ */
+#include <trifinger_cameras/tricamera_recording_thread.hpp>
+
+#include <optional>
+
+#include <robot_interfaces/sensors/sensor_frontend.hpp>
+
+namespace trifinger_cameras
+{
+double get_camera_timestamp(const StampedTriCameraObservation &observation)
+{
+    return std::get<1>(observation).cameras[0].timestamp;
+}
+
+TriCameraRecordingThread::TriCameraRecordingThread(DataPtr sensor_data,
+                                                   Callback callback)
+    : sensor_data_(sensor_data), callback_(callback)
+{
+    // start with the newest observation
+    time_series::Index start_timeindex =
+        sensor_data_->observation->newest_timeindex(false);
+    if (start_timeindex == time_series::EMPTY)
+    {
+        start_timeindex = 0;
+    }
+
+    thread_ =
+        std::thread(&TriCameraRecordingThread::loop, this, start_timeindex);
+}
+
+TriCameraRecordingThread::~TriCameraRecordingThread()
+{
+    stop();
+}
+
+void TriCameraRecordingThread::stop()
+{
+    stop_thread_ = true;
+    if (thread_.joinable())
+    {
+        thread_.join();
+    }
+}
+
+size_t TriCameraRecordingThread::get_num_recorded_frames() const
+{
+    return num_recorded_frames_;
+}
+
+size_t TriCameraRecordingThread::get_num_dropped_frames() const
+{
+    return num_dropped_frames_;
+}
+
+void TriCameraRecordingThread::loop(time_series::Index start_timeindex)
+{
+    robot_interfaces::SensorFrontend<TriCameraObservation, TriCameraInfo>
+        frontend(sensor_data_);
+
+    time_series::Index t = start_timeindex;
+    while (!stop_thread_)
+    {
+        // use a timeout, so the loop can be stopped if no observations arrive
+        if (!sensor_data_->observation->wait_for_timeindex(t, 0.1))
+        {
+            continue;
+        }
+
+        // if recording is too slow, skip observations that are not in the
+        // time series anymore
+        time_series::Index oldest =
+            sensor_data_->observation->oldest_timeindex(false);
+        if (t < oldest)
+        {
+            num_dropped_frames_ += oldest - t;
+            t = oldest;
+        }
+
+        std::optional<StampedTriCameraObservation> observation;
+        try
+        {
+            observation.emplace(frontend.get_timestamp_ms(t),
+                                frontend.get_observation(t));
+        }
+        catch (const std::exception &)
+        {
+            // The observation may have been overwritten since the check
+            // above, in which case the time series throws.  Skip it like
+            // above instead of letting the exception terminate the thread.
+            if (t >= sensor_data_->observation->oldest_timeindex(false))
+            {
+                throw;
+            }
+            continue;
+        }
+
+        callback_(std::move(*observation));
+        num_recorded_frames_++;
+        t++;
+    }
+}
+
+}  // namespace trifinger_cameras
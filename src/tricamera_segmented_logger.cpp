@@ -0,0 +1,338 @@
+/**
+ * @file
+ * @brief Logger writing TriCamera data to a sequence of HDF5 files.
+ * @copyright 2020, Max Planck Gesellschaft. All rights reserved.
+ * @license BSD 3-clause
+ */
+#include <trifinger_cameras/tricamera_segmented_logger.hpp>
+
+#include <algorithm>
+#include <fstream>
+#include <stdexcept>
+
+#include <fmt/format.h>
+
+namespace trifinger_cameras
+{
+namespace
+{
+//! Size of the image data of an observation in bytes.
+size_t get_image_bytes(const TriCameraObservation &observation)
+{
+    size_t bytes = 0;
+    for (const auto &camera : observation.cameras)
+    {
+        bytes += camera.image.total() * camera.image.elemSize();
+    }
+    return bytes;
+}
+
+//! Escape string for use in JSON.
+std::string json_escape(const std::string &str)
+{
+    std::string escaped;
+    for (char c : str)
+    {
+        if (c == '"' || c == '\\')
+        {
+            escaped += '\\';
+        }
+        escaped += c;
+    }
+    return escaped;
+}
+}  // namespace
+
+TriCameraSegmentedLogger::TriCameraSegmentedLogger(
+    DataPtr sensor_data,
+    const std::filesystem::path &output_path,
+    double segment_seconds,
+    size_t segment_max_bytes,
+    size_t max_pending_segments)
+    : sensor_data_(sensor_data),
+      output_path_(output_path),
+      segment_seconds_(segment_seconds),
+      segment_max_bytes_(segment_max_bytes),
+      max_pending_segments_(max_pending_segments)
+{
+    if (segment_seconds < 0)
+    {
+        throw std::invalid_argument("segment_seconds must not be negative.");
+    }
+    if (max_pending_segments == 0)
+    {
+        throw std::invalid_argument("max_pending_segments must be positive.");
+    }
+}
+
+TriCameraSegmentedLogger::~TriCameraSegmentedLogger()
+{
+    try
+    {
+        stop();
+    }
+    catch (const std::exception &e)
+    {
+        fmt::print(stderr,
+                   "ERROR: TriCameraSegmentedLogger: Failed to write "
+                   "segment: {}\n",
+                   e.what());
+    }
+}
+
+void TriCameraSegmentedLogger::start()
+{
+    if (is_running_)
+    {
+        return;
+    }
+
+    // start a new recording
+    {
+        std::lock_guard<std::mutex> lock(write_mutex_);
+        segments_.clear();
+        write_queue_closed_ = false;
+    }
+    next_segment_index_ = 0;
+
+    // Segments recorded before the write thread runs simply wait in the
+    // queue.  Starting the write thread afterwards makes sure that it sees
+    // the new recording thread (it is used for the manifest).
+    recording_thread_ = std::make_unique<TriCameraRecordingThread>(
+        sensor_data_,
+        [this](StampedTriCameraObservation &&observation)
+        {
+            add_observation(std::move(observation));
+        });
+    write_thread_ = std::thread(&TriCameraSegmentedLogger::write_loop, this);
+    is_running_ = true;
+}
+
+void TriCameraSegmentedLogger::stop()
+{
+    if (!is_running_)
+    {
+        return;
+    }
+    is_running_ = false;
+
+    recording_thread_->stop();
+    if (!current_segment_.observations.empty())
+    {
+        finish_current_segment();
+    }
+
+    {
+        std::lock_guard<std::mutex> lock(write_mutex_);
+        write_queue_closed_ = true;
+    }
+    write_cond_.notify_all();
+    write_thread_.join();
+
+    std::lock_guard<std::mutex> lock(write_mutex_);
+    if (write_exception_)
+    {
+        std::exception_ptr exception = write_exception_;
+        write_exception_ = nullptr;
+        std::rethrow_exception(exception);
+    }
+}
+
+std::vector<TriCameraSegmentedLogger::Segment>
+TriCameraSegmentedLogger::get_segments() const
+{
+    std::lock_guard<std::mutex> lock(write_mutex_);
+    return segments_;
+}
+
+std::filesystem::path TriCameraSegmentedLogger::get_manifest_path() const
+{
+    std::filesystem::path path = output_path_;
+    path.replace_filename(output_path_.stem().string() + "_manifest.json");
+    return path;
+}
+
+size_t TriCameraSegmentedLogger::get_num_recorded_frames() const
+{
+    return recording_thread_ ? recording_thread_->get_num_recorded_frames() : 0;
+}
+
+size_t TriCameraSegmentedLogger::get_num_dropped_frames() const
+{
+    return recording_thread_ ? recording_thread_->get_num_dropped_frames() : 0;
+}
+
+void TriCameraSegmentedLogger::add_observation(
+    StampedTriCameraObservation &&observation)
+{
+    const size_t bytes = get_image_bytes(std::get<1>(observation));
+
+    if (!current_segment_.observations.empty())
+    {
+        const double duration =
+            get_camera_timestamp(observation) -
+            get_camera_timestamp(current_segment_.observations.front());
+        const bool duration_exceeded =
+            segment_seconds_ > 0 && duration >= segment_seconds_;
+        const bool size_exceeded =
+            segment_max_bytes_ > 0 &&
+            current_segment_bytes_ + bytes > segment_max_bytes_;
+
+        if (duration_exceeded || size_exceeded)
+        {
+            finish_current_segment();
+        }
+    }
+
+    if (current_segment_.observations.empty())
+    {
+        current_segment_.index = next_segment_index_++;
+        // get the info here, so each segment has the info that was valid at
+        // the time it was recorded
+        current_segment_.info = sensor_data_->sensor_info->newest_element();
+    }
+
+    current_segment_.observations.push_back(std::move(observation));
+    current_segment_bytes_ += bytes;
+}
+
+void TriCameraSegmentedLogger::finish_current_segment()
+{
+    {
+        std::unique_lock<std::mutex> lock(write_mutex_);
+        // If writing is too slow, this stalls the recording thread, so it
+        // falls behind and drops (and counts) observations instead of using
+        // more and more memory.
+        write_cond_.wait(lock,
+                         [this]()
+                         {
+                             return write_queue_.size() <
+                                    max_pending_segments_;
+                         });
+        write_queue_.push_back(std::move(current_segment_));
+    }
+    write_cond_.notify_all();
+
+    current_segment_ = PendingSegment();
+    current_segment_bytes_ = 0;
+}
+
+void TriCameraSegmentedLogger::write_loop()
+{
+    while (true)
+    {
+        PendingSegment pending;
+        {
+            std::unique_lock<std::mutex> lock(write_mutex_);
+            write_cond_.wait(lock,
+                             [this]()
+                             {
+                                 return !write_queue_.empty() ||
+                                        write_queue_closed_;
+                             });
+            if (write_queue_.empty())
+            {
+                // closed and nothing left to write
+                break;
+            }
+            pending = std::move(write_queue_.front());
+            write_queue_.pop_front();
+        }
+        // wake up the recording thread if it waits for space in the queue
+        write_cond_.notify_all();
+
+        Segment segment;
+        segment.filename = get_segment_path(pending.index);
+        segment.num_frames = pending.observations.size();
+        segment.first_timestamp =
+            get_camera_timestamp(pending.observations.front());
+        segment.last_timestamp =
+            get_camera_timestamp(pending.observations.back());
+
+        try
+        {
+            save_tricamera_observations_hdf5(
+                segment.filename.string(), pending.observations, pending.info);
+
+            std::lock_guard<std::mutex> lock(write_mutex_);
+            segments_.push_back(segment);
+            write_manifest(false);
+        }
+        catch (...)
+        {
+            // keep the first error but continue writing the other segments
+            std::lock_guard<std::mutex> lock(write_mutex_);
+            if (!write_exception_)
+            {
+                write_exception_ = std::current_exception();
+            }
+        }
+    }
+
+    std::lock_guard<std::mutex> lock(write_mutex_);
+    try
+    {
+        write_manifest(true);
+    }
+    catch (...)
+    {
+        if (!write_exception_)
+        {
+            write_exception_ = std::current_exception();
+        }
+    }
+}
+
+std::filesystem::path TriCameraSegmentedLogger::get_segment_path(
+    size_t index) const
+{
+    std::filesystem::path path = output_path_;
+    path.replace_filename(fmt::format("{}_{:04d}{}",
+                                      output_path_.stem().string(),
+                                      index,
+                                      output_path_.extension().string()));
+    return path;
+}
+
+void TriCameraSegmentedLogger::write_manifest(bool complete) const
+{
+    const std::filesystem::path manifest_path = get_manifest_path();
+
+    std::string segments_json;
+    for (size_t i = 0; i < segments_.size(); i++)
+    {
+        const Segment &segment = segments_[i];
+        segments_json += fmt::format(
+            "    {{\"file\": \"{}\", \"num_frames\": {}, "
+            "\"first_timestamp\": {}, \"last_timestamp\": {}}}{}\n",
+            // relative to the manifest
+            json_escape(segment.filename.filename().string()),
+            segment.num_frames,
+            segment.first_timestamp,
+            segment.last_timestamp,
+            i + 1 < segments_.size() ? "," : "");
+    }
+
+    // write to a temporary file first, so the manifest is never incomplete
+    std::filesystem::path tmp_path = manifest_path;
+    tmp_path += ".tmp";
+    {
+        std::ofstream file(tmp_path);
+        file << "{\n"
+             << "  \"complete\": " << (complete ? "true" : "false") << ",\n"
+             << "  \"segment_seconds\": " << segment_seconds_ << ",\n"
+             << "  \"segment_max_bytes\": " << segment_max_bytes_ << ",\n"
+             << "  \"frames_dropped\": " << get_num_dropped_frames() << ",\n"
+             << "  \"segments\": [\n"
+             << segments_json << "  ]\n"
+             << "}\n";
+        if (!file)
+        {
+            throw std::runtime_error("Failed to write manifest " +
+                                     tmp_path.string());
+        }
+    }
+    std::filesystem::rename(tmp_path, manifest_path);
+}
+
+}  // namespace trifinger_cameras
@@ -4,6 +4,7 @@
  * @copyright 2020, Max Planck Gesellschaft. All rights reserved.
  * @license BSD 3-clause
  */
+#include <pybind11/numpy.h>
 #include <pybind11/pybind11.h>
 #include <pybind11/stl/filesystem.h>
 #include <pybind11_opencv/cvbind.hpp>
@@ -18,19 +19,83 @@
 #include <robot_interfaces/sensors/pybind_sensors.hpp>
 #include <robot_interfaces/sensors/sensor_driver.hpp>
 
+#include "sensor_data_bindings.hpp"
+
 using namespace robot_interfaces;
 using namespace trifinger_cameras;
 
+namespace
+{
+//! Get the NumPy dtype corresponding to the depth of the given image.
+pybind11::dtype get_dtype(const cv::Mat& image)
+{
+    switch (image.depth())
+    {
+        case CV_8U:
+            return pybind11::dtype::of<uint8_t>();
+        case CV_8S:
+            return pybind11::dtype::of<int8_t>();
+        case CV_16U:
+            return pybind11::dtype::of<uint16_t>();
+        case CV_16S:
+            return pybind11::dtype::of<int16_t>();
+        case CV_32S:
+            return pybind11::dtype::of<int32_t>();
+        case CV_32F:
+            return pybind11::dtype::of<float>();
+        case CV_64F:
+            return pybind11::dtype::of<double>();
+    }
+    throw std::invalid_argument("Unsupported image depth.");
+}
+
+/**
+ * @brief Get a read-only NumPy view on the data of the given image.
+ *
+ * The view holds a reference to the image data, so it stays valid even if the
+ * image of the observation is replaced or the observation is destroyed.
+ */
+pybind11::array get_image_view(const cv::Mat& image)
+{
+    std::vector<pybind11::ssize_t> shape = {image.rows, image.cols};
+    std::vector<pybind11::ssize_t> strides = {
+        static_cast<pybind11::ssize_t>(image.step[0]),
+        static_cast<pybind11::ssize_t>(image.elemSize())};
+    if (image.channels() > 1)
+    {
+        shape.push_back(image.channels());
+        strides.push_back(image.elemSize1());
+    }
+
+    // The capsule owns a (shallow) copy of the cv::Mat, which keeps the
+    // reference count of the data up as long as the array exists.
+    pybind11::capsule base(new cv::Mat(image),
+                           [](void* mat)
+                           {
+                               delete static_cast<cv::Mat*>(mat);
+                           });
+
+    pybind11::array view(get_dtype(image), shape, strides, image.data, base);
+    view.attr("setflags")(pybind11::arg("write") = false);
+    return view;
+}
+}  // namespace
+
 PYBIND11_MODULE(py_camera_types, m)
 {
     create_sensor_bindings<CameraObservation, CameraInfo>(m);
+    add_wait_bindings<CameraObservation, CameraInfo>(m);
 
     pybind11::class_<OpenCVDriver,
                      std::shared_ptr<OpenCVDriver>,
                      SensorDriver<CameraObservation, CameraInfo>>(
         m, "OpenCVDriver")
-        .def(pybind11::init<int>())
-        .def("get_observation", &OpenCVDriver::get_observation);
+        .def(pybind11::init<int, bool>(),
+             pybind11::arg("device_id"),
+             pybind11::arg("background_capture") = false)
+        .def("get_observation",
+             &OpenCVDriver::get_observation,
+             pybind11::call_guard<pybind11::gil_scoped_release>());
 
 #ifdef Pylon_FOUND
     pybind11::class_<PylonDriver,
@@ -49,7 +114,44 @@ PYBIND11_MODULE(py_camera_types, m)
 
     pybind11::class_<CameraObservation>(m, "CameraObservation")
         .def(pybind11::init<>())
-        .def_readwrite("image", &CameraObservation::image, "The image.")
+        .def(pybind11::init<size_t, size_t>(),
+             pybind11::arg("image_width"),
+             pybind11::arg("image_height"))
+        .def(pybind11::init<const CameraInfo&>(), pybind11::arg("camera_info"))
+        .def_static(
+            "get_default_image_size",
+            []()
+            {
+                cv::Size size = CameraObservation::get_default_image_size();
+                return std::make_tuple(size.width, size.height);
+            },
+            "Get image size (width, height) of default-constructed "
+            "observations.")
+        .def_static(
+            "set_default_image_size",
+            [](int width, int height)
+            {
+                CameraObservation::set_default_image_size(
+                    cv::Size(width, height));
+            },
+            pybind11::arg("image_width"),
+            pybind11::arg("image_height"),
+            "Set image size of default-constructed observations.  Needs to be "
+            "called before creating multi-process data and with the same "
+            "value in all processes accessing the data.")
+        .def_property(
+            "image",
+            [](const CameraObservation& observation)
+            {
+                return get_image_view(observation.image);
+            },
+            [](CameraObservation& observation, const cv::Mat& image)
+            {
+                observation.image = image;
+            },
+            "The image as read-only NumPy array.  This is a view on the image "
+            "data of the observation, i.e. no data is copied on access.  Use "
+            "``image.copy()`` to get a writeable copy.")
         .def_readwrite("timestamp",
                        &CameraObservation::timestamp,
                        "Timestamp when the image was acquired.");
@@ -74,6 +176,17 @@ PYBIND11_MODULE(py_camera_types, m)
                        &CameraInfo::distortion_coefficients)
         .def_readwrite("tf_world_to_camera", &CameraInfo::tf_world_to_camera);
 
+    pybind11::class_<CameraObservationSettings,
+                     std::shared_ptr<CameraObservationSettings>>(
+        m, "CameraObservationSettings")
+        .def_readonly("image_width", &CameraObservationSettings::image_width)
+        .def_readonly("image_height", &CameraObservationSettings::image_height)
+        .def_readonly("compressed_capacity_ratio",
+                      &CameraObservationSettings::compressed_capacity_ratio)
+        .def_readonly("preview_image_width",
+                      &CameraObservationSettings::preview_image_width)
+        .def_readonly("preview_image_height",
+                      &CameraObservationSettings::preview_image_height);
     pybind11::class_<PylonDriverSettings, std::shared_ptr<PylonDriverSettings>>(
         m, "PylonDriverSettings")
         .def_readonly("pylon_settings_file",
@@ -83,9 +196,23 @@ PYBIND11_MODULE(py_camera_types, m)
         m, "TriCameraDriverSettings")
         .def_readonly("frame_rate_fps",
                       &TriCameraDriverSettings::frame_rate_fps);
+    pybind11::class_<PyBulletTriCameraDriverSettings,
+                     std::shared_ptr<PyBulletTriCameraDriverSettings>>(
+        m, "PyBulletTriCameraDriverSettings")
+        .def_readonly("robot_stall_timeout_s",
+                      &PyBulletTriCameraDriverSettings::robot_stall_timeout_s)
+        .def_readonly("pipelined_rendering",
+                      &PyBulletTriCameraDriverSettings::pipelined_rendering)
+        .def_readonly(
+            "multi_process_rendering",
+            &PyBulletTriCameraDriverSettings::multi_process_rendering);
     pybind11::class_<Settings>(m, "Settings")
         .def(pybind11::init<>())
+        .def("get_camera_observation_settings",
+             &Settings::get_camera_observation_settings)
         .def("get_pylon_driver_settings", &Settings::get_pylon_driver_settings)
         .def("get_tricamera_driver_settings",
-             &Settings::get_tricamera_driver_settings);
+             &Settings::get_tricamera_driver_settings)
+        .def("get_pybullet_tricamera_driver_settings",
+             &Settings::get_pybullet_tricamera_driver_settings);
 }
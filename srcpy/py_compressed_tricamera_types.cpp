@@ -0,0 +1,101 @@
+/**
+ * @file
+ * @brief Create bindings for TriCamera sensors with compressed observations.
+ * @copyright 2020, Max Planck Gesellschaft. All rights reserved.
+ * @license BSD 3-clause
+ */
+#include <pybind11/pybind11.h>
+#include <pybind11/stl.h>
+#include <pybind11_opencv/cvbind.hpp>
+
+#include <trifinger_cameras/compressed_camera_observation.hpp>
+#include <trifinger_cameras/compressing_tricamera_driver.hpp>
+
+#include <robot_interfaces/sensors/pybind_sensors.hpp>
+#include <robot_interfaces/sensors/sensor_driver.hpp>
+
+#include "sensor_data_bindings.hpp"
+
+using namespace robot_interfaces;
+using namespace trifinger_cameras;
+
+PYBIND11_MODULE(py_compressed_tricamera_types, m)
+{
+    // make sure the bindings of the uncompressed types are loaded
+    pybind11::module::import("trifinger_cameras.py_camera_types");
+    pybind11::module::import("trifinger_cameras.py_tricamera_types");
+
+    create_sensor_bindings<CompressedTriCameraObservation, TriCameraInfo>(m);
+    add_wait_bindings<CompressedTriCameraObservation, TriCameraInfo>(m);
+
+    pybind11::class_<CompressedCameraObservation> compressed_observation(
+        m,
+        "CompressedCameraObservation",
+        "Camera observation with losslessly compressed image.");
+
+    pybind11::enum_<CompressedCameraObservation::Encoding>(
+        compressed_observation, "Encoding", "Encoding of the image data.")
+        .value("RAW", CompressedCameraObservation::Encoding::RAW)
+        .value("PNG", CompressedCameraObservation::Encoding::PNG);
+
+    compressed_observation.def(pybind11::init<>())
+        .def(pybind11::init<size_t>(), pybind11::arg("capacity"))
+        .def(pybind11::init<const CameraObservation&>(),
+             pybind11::arg("observation"))
+        .def_static("get_default_capacity",
+                    &CompressedCameraObservation::get_default_capacity,
+                    "Get the default capacity (in bytes) of the buffer for the "
+                    "compressed image.")
+        .def_readwrite("timestamp",
+                       &CompressedCameraObservation::timestamp,
+                       "Timestamp when the image was acquired.")
+        .def_readonly("image_width", &CompressedCameraObservation::image_width)
+        .def_readonly("image_height",
+                      &CompressedCameraObservation::image_height)
+        .def_readonly("data_size",
+                      &CompressedCameraObservation::data_size,
+                      "Size of the compressed image in bytes.")
+        .def_readonly("encoding",
+                      &CompressedCameraObservation::encoding,
+                      "Encoding of the image data.")
+        .def("compress",
+             &CompressedCameraObservation::compress,
+             pybind11::arg("observation"),
+             "Compress the given observation.")
+        .def("get_image",
+             &CompressedCameraObservation::decompress,
+             "Decompress and return the image.")
+        .def("to_camera_observation",
+             &CompressedCameraObservation::to_camera_observation,
+             "Get the corresponding uncompressed observation.");
+
+    pybind11::class_<CompressedTriCameraObservation>(
+        m,
+        "CompressedTriCameraObservation",
+        "Observation from the three cameras with compressed images.")
+        .def(pybind11::init<>())
+        .def(pybind11::init<const TriCameraObservation&>(),
+             pybind11::arg("observation"))
+        .def_readwrite(
+            "cameras",
+            &CompressedTriCameraObservation::cameras,
+            "List[CompressedCameraObservation]: List of observations from "
+            "cameras 'camera60', 'camera180' and 'camera300' (in this order).  "
+            "Images are only decompressed when accessed.")
+        .def("decompress",
+             &CompressedTriCameraObservation::decompress,
+             "Get the corresponding uncompressed observation.");
+
+    pybind11::class_<
+        CompressingTriCameraDriver,
+        std::shared_ptr<CompressingTriCameraDriver>,
+        SensorDriver<CompressedTriCameraObservation, TriCameraInfo>>(
+        m, "CompressingTriCameraDriver")
+        .def(pybind11::init<
+                 std::shared_ptr<CompressingTriCameraDriver::WrappedDriver>>(),
+             pybind11::arg("driver"))
+        .def("get_sensor_info", &CompressingTriCameraDriver::get_sensor_info)
+        .def("get_observation",
+             &CompressingTriCameraDriver::get_observation,
+             pybind11::call_guard<pybind11::gil_scoped_release>());
+}
@@ -0,0 +1,61 @@
+/**
+ * @file
+ * @brief Create bindings for the TriCamera preview sensor.
+ * @copyright 2020, Max Planck Gesellschaft. All rights reserved.
+ * @license BSD 3-clause
+ */
+#include <pybind11/pybind11.h>
+#include <pybind11/stl.h>
+
+#include <trifinger_cameras/tricamera_preview_driver.hpp>
+#include <trifinger_cameras/tricamera_preview_observation.hpp>
+
+#include <robot_interfaces/sensors/pybind_sensors.hpp>
+#include <robot_interfaces/sensors/sensor_driver.hpp>
+
+#include "sensor_data_bindings.hpp"
+
+using namespace robot_interfaces;
+using namespace trifinger_cameras;
+
+PYBIND11_MODULE(py_tricamera_preview_types, m)
+{
+    // make sure the bindings of the full-resolution types are loaded
+    pybind11::module::import("trifinger_cameras.py_camera_types");
+    pybind11::module::import("trifinger_cameras.py_tricamera_types");
+
+    create_sensor_bindings<TriCameraPreviewObservation, TriCameraInfo>(m);
+    add_wait_bindings<TriCameraPreviewObservation, TriCameraInfo>(m);
+
+    pybind11::class_<TriCameraPreviewObservation>(
+        m,
+        "TriCameraPreviewObservation",
+        "Downsampled colour (BGR) images of the three cameras.")
+        .def(pybind11::init<>())
+        .def_static(
+            "get_default_image_size",
+            []()
+            {
+                cv::Size size =
+                    TriCameraPreviewObservation::get_default_image_size();
+                return std::make_tuple(size.width, size.height);
+            },
+            "Get image size (width, height) of preview observations.")
+        .def_readwrite(
+            "cameras",
+            &TriCameraPreviewObservation::cameras,
+            "List[~trifinger_cameras.camera.CameraObservation]: List of "
+            "observations from cameras 'camera60', 'camera180' and 'camera300' "
+            "(in this order)");
+
+    pybind11::class_<TriCameraPreviewDriver,
+                     std::shared_ptr<TriCameraPreviewDriver>,
+                     SensorDriver<TriCameraPreviewObservation, TriCameraInfo>>(
+        m, "TriCameraPreviewDriver")
+        .def(pybind11::init<TriCameraPreviewDriver::FullDataPtr>(),
+             pybind11::arg("full_data"))
+        .def("get_sensor_info", &TriCameraPreviewDriver::get_sensor_info)
+        .def("get_observation",
+             &TriCameraPreviewDriver::get_observation,
+             pybind11::call_guard<pybind11::gil_scoped_release>());
+}
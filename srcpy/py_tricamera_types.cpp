@@ -4,24 +4,109 @@
  * @copyright 2020, Max Planck Gesellschaft. All rights reserved.
  * @license BSD 3-clause
  */
+#include <pybind11/numpy.h>
 #include <pybind11/stl/filesystem.h>
 
 #include <trifinger_cameras/pybullet_tricamera_driver.hpp>
+#include <trifinger_cameras/tricamera_flight_recorder.hpp>
+#include <trifinger_cameras/tricamera_log_stream_reader.hpp>
 #include <trifinger_cameras/tricamera_logger.hpp>
 #include <trifinger_cameras/tricamera_observation.hpp>
+#include <trifinger_cameras/tricamera_segmented_logger.hpp>
 #ifdef Pylon_FOUND
 #include <trifinger_cameras/tricamera_driver.hpp>
 #endif
 
 #include <robot_interfaces/sensors/pybind_sensors.hpp>
 #include <robot_interfaces/sensors/sensor_driver.hpp>
+#include <robot_interfaces/sensors/sensor_frontend.hpp>
+#include <robot_interfaces/sensors/sensor_log_reader.hpp>
+
+#include "sensor_data_bindings.hpp"
 
 using namespace robot_interfaces;
 using namespace trifinger_cameras;
 
+namespace
+{
+/**
+ * @brief Copy a range of observations into stacked NumPy arrays.
+ *
+ * @param num_observations Number of observations in the range.
+ * @param get_observation Function returning the i-th observation of the range.
+ *     It is called without holding the GIL.
+ *
+ * @return Tuple of an (N, 3, H, W) uint8 array with the images and an (N, 3)
+ *     array with the timestamps.
+ */
+template <typename GetObservation>
+pybind11::tuple stack_observations(size_t num_observations,
+                                   GetObservation get_observation)
+{
+    typedef pybind11::array_t<uint8_t> ImageArray;
+    typedef pybind11::array_t<double> TimestampArray;
+
+    if (num_observations == 0)
+    {
+        return pybind11::make_tuple(ImageArray({0, 3, 0, 0}),
+                                    TimestampArray({0, 3}));
+    }
+
+    // the first observation determines the image size
+    TriCameraObservation first_observation = [&]()
+    {
+        pybind11::gil_scoped_release release;
+        return get_observation(0);
+    }();
+    const int height = first_observation.cameras[0].image.rows;
+    const int width = first_observation.cameras[0].image.cols;
+    const size_t image_size = static_cast<size_t>(height) * width;
+
+    ImageArray images({num_observations,
+                       size_t(3),
+                       static_cast<size_t>(height),
+                       static_cast<size_t>(width)});
+    TimestampArray timestamps({num_observations, size_t(3)});
+    uint8_t* images_data = images.mutable_data();
+    double* timestamps_data = timestamps.mutable_data();
+
+    {
+        pybind11::gil_scoped_release release;
+
+        for (size_t i = 0; i < num_observations; i++)
+        {
+            TriCameraObservation observation =
+                i == 0 ? std::move(first_observation) : get_observation(i);
+
+            for (size_t c = 0; c < 3; c++)
+            {
+                const size_t index = i * 3 + c;
+                const cv::Mat& image = observation.cameras[c].image;
+                if (image.rows != height || image.cols != width ||
+                    image.type() != CV_8UC1)
+                {
+                    throw std::runtime_error(
+                        "Observations in the range have different image "
+                        "sizes or types.");
+                }
+
+                // copy directly into the output array
+                cv::Mat destination(
+                    height, width, CV_8UC1, images_data + index * image_size);
+                image.copyTo(destination);
+                timestamps_data[index] = observation.cameras[c].timestamp;
+            }
+        }
+    }
+
+    return pybind11::make_tuple(images, timestamps);
+}
+}  // namespace
+
 PYBIND11_MODULE(py_tricamera_types, m)
 {
     create_sensor_bindings<TriCameraObservation, TriCameraInfo>(m);
+    add_wait_bindings<TriCameraObservation, TriCameraInfo>(m);
 
 #ifdef Pylon_FOUND
     pybind11::class_<TriCameraDriver,
@@ -56,6 +141,8 @@ PYBIND11_MODULE(py_tricamera_types, m)
     pybind11::class_<TriCameraObservation>(
         m, "TriCameraObservation", "Observation from the three cameras.")
         .def(pybind11::init<>())
+        .def(pybind11::init<const TriCameraInfo&>(),
+             pybind11::arg("camera_info"))
         .def_readwrite(
             "cameras",
             &TriCameraObservation::cameras,
@@ -74,10 +161,235 @@ PYBIND11_MODULE(py_tricamera_types, m)
         .def("get_sensor_info", &PyBulletTriCameraDriver::get_sensor_info)
         .def("get_observation", &PyBulletTriCameraDriver::get_observation);
 
+    m.def(
+        "get_observation_range",
+        [](SensorFrontend<TriCameraObservation, TriCameraInfo>& frontend,
+           time_series::Index start,
+           time_series::Index stop)
+        {
+            if (stop < start)
+            {
+                throw std::invalid_argument(
+                    "stop must not be less than start.");
+            }
+            return stack_observations(
+                stop - start,
+                [&](size_t i)
+                {
+                    return frontend.get_observation(start + i);
+                });
+        },
+        pybind11::arg("frontend"),
+        pybind11::arg("start"),
+        pybind11::arg("stop"),
+        "Get the observations of the time index range [start, stop) as a "
+        "tuple of stacked arrays: images of shape (N, 3, H, W) and timestamps "
+        "of shape (N, 3).  The data is copied in one pass, without creating an "
+        "observation object for each time step.  Like "
+        "``Frontend.get_observation``, this blocks until the observations are "
+        "available and fails if they are not in the buffer anymore.");
+
+    m.def(
+        "get_log_observation_range",
+        [](const SensorLogReader<TriCameraObservation>& log_reader,
+           size_t start,
+           size_t stop)
+        {
+            if (stop < start || stop > log_reader.data.size())
+            {
+                throw std::out_of_range("Invalid range for the given log.");
+            }
+            return stack_observations(stop - start,
+                                      [&](size_t i)
+                                      {
+                                          return log_reader.data[start + i];
+                                      });
+        },
+        pybind11::arg("log_reader"),
+        pybind11::arg("start"),
+        pybind11::arg("stop"),
+        "Same as :func:`get_observation_range` but for the observations "
+        "[start, stop) of a :class:`LogReader`.  This is much faster than "
+        "accessing them via ``LogReader.data``, which converts the whole list "
+        "of observations on each access.");
+
+    m.def(
+        "read_log_timestamps",
+        [](const std::string& filename)
+        {
+            typedef pybind11::array_t<double> TimestampArray;
+
+            TriCameraLogStreamReader reader(filename);
+            const size_t n = reader.size();
+
+            TimestampArray camera_timestamps({n, size_t(3)});
+            TimestampArray timeseries_timestamps(n);
+            double* camera_data = camera_timestamps.mutable_data();
+            double* timeseries_data = timeseries_timestamps.mutable_data();
+
+            {
+                pybind11::gil_scoped_release release;
+                for (size_t i = 0; i < n; i++)
+                {
+                    TriCameraLogStreamReader::Timestamps timestamps =
+                        reader.read_timestamps();
+                    timeseries_data[i] = timestamps.timeseries_timestamp;
+                    std::copy(timestamps.camera_timestamps.begin(),
+                              timestamps.camera_timestamps.end(),
+                              camera_data + i * 3);
+                }
+            }
+
+            return pybind11::make_tuple(camera_timestamps,
+                                        timeseries_timestamps);
+        },
+        pybind11::arg("filename"),
+        "Read only the timestamps of a binary log file (as written by "
+        ":meth:`TriCameraLogger.stop_and_save`), skipping the images.  Returns "
+        "a tuple of an (N, 3) array with the camera timestamps and an (N,) "
+        "array with the timestamps of when the observations were added to the "
+        "sensor data.  This is much faster than loading the log with "
+        ":class:`LogReader` and needs hardly any memory.");
+
     pybind11::class_<TriCameraLogger,
                      std::shared_ptr<TriCameraLogger>,
-                     SensorLogger<TriCameraObservation, TriCameraInfo>>(
-        m, "TriCameraLogger")
-        .def(pybind11::init<typename TriCameraLogger::DataPtr, size_t>())
-        .def("stop_and_save_hdf5", &TriCameraLogger::stop_and_save_hdf5);
+                     SensorLogger<TriCameraObservation, TriCameraInfo>>
+        tricamera_logger(m, "TriCameraLogger");
+
+    pybind11::class_<TriCameraLogger::BufferUsage>(tricamera_logger,
+                                                   "BufferUsage")
+        .def_readonly("num_frames", &TriCameraLogger::BufferUsage::num_frames)
+        .def_readonly("capacity_frames",
+                      &TriCameraLogger::BufferUsage::capacity_frames)
+        .def_readonly("fill_level", &TriCameraLogger::BufferUsage::fill_level)
+        .def_readonly("bytes_used", &TriCameraLogger::BufferUsage::bytes_used)
+        .def_readonly("bytes_capacity",
+                      &TriCameraLogger::BufferUsage::bytes_capacity)
+        .def_readonly("frames_dropped",
+                      &TriCameraLogger::BufferUsage::frames_dropped);
+
+    tricamera_logger
+        .def(pybind11::init<typename TriCameraLogger::DataPtr, size_t>(),
+             pybind11::arg("sensor_data"),
+             pybind11::arg("buffer_limit"))
+        .def_static(
+            "from_memory_budget",
+            [](typename TriCameraLogger::DataPtr sensor_data,
+               size_t memory_budget_bytes)
+            {
+                return std::make_shared<TriCameraLogger>(
+                    sensor_data,
+                    TriCameraLogger::MemoryBudget{memory_budget_bytes});
+            },
+            pybind11::arg("sensor_data"),
+            pybind11::arg("memory_budget_bytes"),
+            pybind11::call_guard<pybind11::gil_scoped_release>(),
+            "Create logger with a buffer that fits in the given memory budget "
+            "(blocks until the sensor info is available).")
+        .def_static("get_bytes_per_frame",
+                    &TriCameraLogger::get_bytes_per_frame,
+                    pybind11::arg("info"))
+        .def("start", &TriCameraLogger::start)
+        .def("stop",
+             &TriCameraLogger::stop,
+             pybind11::call_guard<pybind11::gil_scoped_release>())
+        .def("stop_and_save",
+             &TriCameraLogger::stop_and_save,
+             pybind11::call_guard<pybind11::gil_scoped_release>())
+        .def("get_buffer_usage", &TriCameraLogger::get_buffer_usage)
+        .def("stop_and_save_hdf5",
+             &TriCameraLogger::stop_and_save_hdf5,
+             pybind11::call_guard<pybind11::gil_scoped_release>())
+        .def("stop_and_save_hdf5_async",
+             &TriCameraLogger::stop_and_save_hdf5_async,
+             pybind11::arg("filename"),
+             pybind11::call_guard<pybind11::gil_scoped_release>(),
+             "Stop logging and save to HDF5 in the background.  Returns a "
+             ":class:`TriCameraLogSaveHandle`.  Logging can be restarted "
+             "right away.")
+        .def("wait_for_pending_saves",
+             &TriCameraLogger::wait_for_pending_saves,
+             pybind11::call_guard<pybind11::gil_scoped_release>());
+
+    pybind11::class_<TriCameraLogSaveHandle>(m, "TriCameraLogSaveHandle")
+        .def_property_readonly("filename",
+                               &TriCameraLogSaveHandle::get_filename)
+        .def_property_readonly("num_frames",
+                               &TriCameraLogSaveHandle::get_num_frames)
+        .def_property_readonly("num_frames_written",
+                               &TriCameraLogSaveHandle::get_num_frames_written)
+        .def_property_readonly("progress",
+                               &TriCameraLogSaveHandle::get_progress)
+        .def("is_done", &TriCameraLogSaveHandle::is_done)
+        .def("wait",
+             &TriCameraLogSaveHandle::wait,
+             pybind11::arg("timeout_s") = -1,
+             pybind11::call_guard<pybind11::gil_scoped_release>(),
+             "Wait until saving is finished (indefinitely if timeout_s is "
+             "negative).  Returns false if the timeout expired.")
+        .def("get",
+             &TriCameraLogSaveHandle::get,
+             pybind11::call_guard<pybind11::gil_scoped_release>(),
+             "Wait until saving is finished and raise errors that occurred.");
+
+    pybind11::class_<TriCameraFlightRecorder,
+                     std::shared_ptr<TriCameraFlightRecorder>>(
+        m, "TriCameraFlightRecorder")
+        .def(pybind11::init<TriCameraFlightRecorder::DataPtr, double>(),
+             pybind11::arg("sensor_data"),
+             pybind11::arg("buffer_duration_s"))
+        .def("trigger_dump",
+             &TriCameraFlightRecorder::trigger_dump,
+             pybind11::arg("filename"),
+             pybind11::arg("pre_seconds"),
+             pybind11::arg("post_seconds"),
+             pybind11::call_guard<pybind11::gil_scoped_release>(),
+             "Save the observations from pre_seconds before until "
+             "post_seconds after now to a HDF5 file (in the background).  "
+             "Returns a :class:`TriCameraLogSaveHandle`.")
+        .def("get_num_buffered_frames",
+             &TriCameraFlightRecorder::get_num_buffered_frames)
+        .def("get_num_recorded_frames",
+             &TriCameraFlightRecorder::get_num_recorded_frames)
+        .def("get_buffer_duration",
+             &TriCameraFlightRecorder::get_buffer_duration)
+        .def("wait_for_pending_dumps",
+             &TriCameraFlightRecorder::wait_for_pending_dumps,
+             pybind11::call_guard<pybind11::gil_scoped_release>());
+
+    pybind11::class_<TriCameraSegmentedLogger,
+                     std::shared_ptr<TriCameraSegmentedLogger>>
+        segmented_logger(m, "TriCameraSegmentedLogger");
+
+    pybind11::class_<TriCameraSegmentedLogger::Segment>(segmented_logger,
+                                                        "Segment")
+        .def_readonly("filename", &TriCameraSegmentedLogger::Segment::filename)
+        .def_readonly("num_frames",
+                      &TriCameraSegmentedLogger::Segment::num_frames)
+        .def_readonly("first_timestamp",
+                      &TriCameraSegmentedLogger::Segment::first_timestamp)
+        .def_readonly("last_timestamp",
+                      &TriCameraSegmentedLogger::Segment::last_timestamp);
+
+    segmented_logger
+        .def(pybind11::init<TriCameraSegmentedLogger::DataPtr,
+                            const std::filesystem::path&,
+                            double,
+                            size_t,
+                            size_t>(),
+             pybind11::arg("sensor_data"),
+             pybind11::arg("output_path"),
+             pybind11::arg("segment_seconds"),
+             pybind11::arg("segment_max_bytes") = 0,
+             pybind11::arg("max_pending_segments") = 2)
+        .def("start", &TriCameraSegmentedLogger::start)
+        .def("stop",
+             &TriCameraSegmentedLogger::stop,
+             pybind11::call_guard<pybind11::gil_scoped_release>())
+        .def("get_segments", &TriCameraSegmentedLogger::get_segments)
+        .def("get_manifest_path", &TriCameraSegmentedLogger::get_manifest_path)
+        .def("get_num_recorded_frames",
+             &TriCameraSegmentedLogger::get_num_recorded_frames)
+        .def("get_num_dropped_frames",
+             &TriCameraSegmentedLogger::get_num_dropped_frames);
 }
@@ -0,0 +1,111 @@
+/**
+ * @file
+ * @brief Additional bindings for sensor data, shared by the sensor modules.
+ * @copyright 2020, Max Planck Gesellschaft. All rights reserved.
+ * @license BSD 3-clause
+ */
+#pragma once
+
+#include <memory>
+#include <optional>
+
+#include <pybind11/pybind11.h>
+#include <pybind11/stl.h>
+
+#include <robot_interfaces/sensors/sensor_data.hpp>
+
+namespace trifinger_cameras
+{
+/**
+ * @brief Add functions for waiting on observations, appending observations
+ * and inspecting the buffer for the given sensor types.
+ *
+ * Unlike the blocking methods of the frontend, they support a timeout and
+ * release the GIL while waiting, so they can be used to wait in a background
+ * thread (e.g. see ``trifinger_cameras.async_frontend``) or in GUI loops.
+ */
+template <typename Observation, typename Info>
+void add_wait_bindings(pybind11::module& m)
+{
+    typedef std::shared_ptr<robot_interfaces::SensorData<Observation, Info>>
+        DataPtr;
+
+    m.def(
+        "wait_for_timeindex",
+        [](DataPtr sensor_data,
+           time_series::Index timeindex,
+           std::optional<double> timeout_s)
+        {
+            // Waiting is done on the condition variable of the time series, so
+            // the thread wakes up as soon as the observation is added.
+            if (timeout_s)
+            {
+                return sensor_data->observation->wait_for_timeindex(timeindex,
+                                                                    *timeout_s);
+            }
+            return sensor_data->observation->wait_for_timeindex(timeindex);
+        },
+        pybind11::arg("sensor_data"),
+        pybind11::arg("timeindex"),
+        pybind11::arg("timeout_s") = std::nullopt,
+        pybind11::call_guard<pybind11::gil_scoped_release>(),
+        "Wait until the observation with the given time index is available in "
+        "the sensor data.  Returns False if the timeout (in seconds, no "
+        "timeout if None) expired before.  The GIL is released while "
+        "waiting.");
+
+    m.def(
+        "wait_for_new_observation",
+        [](DataPtr sensor_data,
+           time_series::Index timeindex,
+           std::optional<double> timeout_s) -> std::optional<time_series::Index>
+        {
+            const bool available =
+                timeout_s ? sensor_data->observation->wait_for_timeindex(
+                                timeindex + 1, *timeout_s)
+                          : sensor_data->observation->wait_for_timeindex(
+                                timeindex + 1);
+            if (!available)
+            {
+                return std::nullopt;
+            }
+            return sensor_data->observation->newest_timeindex(false);
+        },
+        pybind11::arg("sensor_data"),
+        pybind11::arg("timeindex"),
+        pybind11::arg("timeout_s") = std::nullopt,
+        pybind11::call_guard<pybind11::gil_scoped_release>(),
+        "Wait until an observation newer than the given time index is "
+        "available and return the time index of the newest observation (use "
+        "-1 to wait for the first observation).  Returns None if the timeout "
+        "(in seconds, no timeout if None) expired before.  The GIL is "
+        "released while waiting.");
+
+    m.def(
+        "append_observation",
+        [](DataPtr sensor_data, const Observation& observation)
+        {
+            sensor_data->observation->append(observation);
+        },
+        pybind11::arg("sensor_data"),
+        pybind11::arg("observation"),
+        pybind11::call_guard<pybind11::gil_scoped_release>(),
+        "Append an observation to the sensor data (like a back end does).  "
+        "Meant for tests and benchmarks, where no driver is used.  The GIL "
+        "is released while copying.");
+
+    m.def(
+        "get_timeindex_range",
+        [](DataPtr sensor_data)
+        {
+            return std::make_tuple(
+                sensor_data->observation->oldest_timeindex(false),
+                sensor_data->observation->newest_timeindex(false));
+        },
+        pybind11::arg("sensor_data"),
+        "Get the time indices (oldest, newest) of the observations that are "
+        "currently in the buffer of the sensor data (without waiting).  Both "
+        "are -1 if the buffer is empty.");
+}
+
+}  // namespace trifinger_cameras
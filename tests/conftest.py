@@ -0,0 +1,71 @@
+"""Fixtures shared by the Python tests."""
+
+import h5py
+import numpy as np
+import pytest
+
+from trifinger_cameras import CAMERA_NAMES, TRICAMERA_LOG_MAGIC
+
+
+def write_tricamera_hdf5_log(
+    path,
+    timestamps,
+    images=None,
+    *,
+    sensor_data_timestamps=None,
+    camera_matrix=None,
+    image_size=(4, 5),
+    magic=TRICAMERA_LOG_MAGIC,
+):
+    """Write a minimal TriCamera HDF5 log file.
+
+    Args:
+        path: Path of the file.
+        timestamps: Camera timestamps of shape (N, 3) or of shape (N,) to use the same
+            timestamp for all cameras.
+        images: Images of shape (N, 3, height, width).  Default: Black images of size
+            ``image_size`` (height, width).
+        sensor_data_timestamps: Timestamps of the sensor data time series.  Default:
+            The timestamps of the first camera.
+        camera_matrix: Camera matrix of all cameras.  Default: Identity.
+        image_size: Size (height, width) of the default images.
+        magic: Magic byte of the file.
+    """
+    timestamps = np.asarray(timestamps, dtype=np.double)
+    if timestamps.ndim == 1:
+        timestamps = np.repeat(timestamps[:, None], 3, axis=1)
+    n_frames = len(timestamps)
+    if images is None:
+        images = np.zeros((n_frames, 3, *image_size), dtype=np.uint8)
+    if sensor_data_timestamps is None:
+        sensor_data_timestamps = timestamps[:, 0]
+    if camera_matrix is None:
+        camera_matrix = np.eye(3)
+
+    with h5py.File(path, "w") as h5:
+        h5.attrs["magic"] = magic
+        h5.attrs["format_version"] = 2
+        h5.attrs["format_version_minor"] = 1
+        h5.attrs["num_cameras"] = 3
+        h5.attrs["image_width"] = images.shape[3]
+        h5.attrs["image_height"] = images.shape[2]
+
+        for name in CAMERA_NAMES:
+            group = h5.create_group(f"camera_info/{name}")
+            group.attrs["frame_rate_fps"] = 10.0
+            group["camera_matrix"] = camera_matrix
+            group["distortion_coefficients"] = np.zeros((1, 5))
+            group["tf_world_to_camera"] = np.eye(4)
+
+        h5["images"] = images
+        h5["timestamps"] = timestamps
+        h5["sensor_data_timestamps"] = sensor_data_timestamps
+
+
+@pytest.fixture
+def write_hdf5_log():
+    """Function for writing minimal TriCamera HDF5 logs.
+
+    See :func:`write_tricamera_hdf5_log` for the arguments.
+    """
+    return write_tricamera_hdf5_log
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""Tests for AsyncFrontend, mostly using a minimal fake sensor module."""
+
+import asyncio
+import threading
+import types
+
+import pytest
+
+from trifinger_cameras import camera
+from trifinger_cameras.async_frontend import AsyncFrontend
+
+
+class FakeSensorData:
+    """Time series of observations with a condition for waiting."""
+
+    def __init__(self, history_length=1000):
+        self.observations = []
+        self.history_length = history_length
+        self.condition = threading.Condition()
+
+    def append(self, observation):
+        with self.condition:
+            self.observations.append(observation)
+            self.condition.notify_all()
+
+    def get_oldest_timeindex(self):
+        return max(0, len(self.observations) - self.history_length)
+
+
+class FakeFrontend:
+    def __init__(self, sensor_data):
+        self.data = sensor_data
+
+    def get_current_timeindex(self):
+        return len(self.data.observations) - 1
+
+    def get_observation(self, t):
+        if t < self.data.get_oldest_timeindex():
+            msg = "Time index is too old."
+            raise ValueError(msg)
+        return self.data.observations[t]
+
+
+def fake_wait_for_timeindex(sensor_data, timeindex, timeout_s=None):
+    with sensor_data.condition:
+        return sensor_data.condition.wait_for(
+            lambda: len(sensor_data.observations) > timeindex, timeout_s
+        )
+
+
+def fake_get_timeindex_range(sensor_data):
+    if not sensor_data.observations:
+        return -1, -1
+    return sensor_data.get_oldest_timeindex(), len(sensor_data.observations) - 1
+
+
+fake_module = types.SimpleNamespace(
+    Frontend=FakeFrontend,
+    wait_for_timeindex=fake_wait_for_timeindex,
+    get_timeindex_range=fake_get_timeindex_range,
+)
+
+
+def append_later(sensor_data, observations, delay_s=0.05):
+    def run():
+        for observation in observations:
+            threading.Event().wait(delay_s)
+            sensor_data.append(observation)
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread
+
+
+def test_next_observation():
+    data = FakeSensorData()
+    data.append("a")
+    frontend = AsyncFrontend(fake_module, data)
+
+    async def run():
+        thread = append_later(data, ["b", "c"])
+        result = [await frontend.next_observation(timeout_s=5) for _ in range(3)]
+        thread.join()
+        return result
+
+    assert asyncio.run(run()) == [(0, "a"), (1, "b"), (2, "c")]
+    frontend.close()
+
+
+def test_async_iteration():
+    data = FakeSensorData()
+    frontend = AsyncFrontend(fake_module, data)
+
+    async def run():
+        thread = append_later(data, ["a", "b", "c"])
+        result = []
+        async for t, observation in frontend:
+            result.append((t, observation))
+            if t == 2:
+                break
+        thread.join()
+        return result
+
+    assert asyncio.run(run()) == [(0, "a"), (1, "b"), (2, "c")]
+    frontend.close()
+
+
+def test_skip_to_latest():
+    data = FakeSensorData()
+    for observation in ["a", "b", "c"]:
+        data.append(observation)
+    frontend = AsyncFrontend(fake_module, data, skip_to_latest=True)
+
+    async def run():
+        first = await frontend.next_observation(timeout_s=5)
+        data.append("d")
+        data.append("e")
+        second = await frontend.next_observation(timeout_s=5)
+        return first, second
+
+    assert asyncio.run(run()) == ((2, "c"), (4, "e"))
+    frontend.close()
+
+
+def test_overrun():
+    data = FakeSensorData(history_length=3)
+    data.append("a")
+    frontend = AsyncFrontend(fake_module, data)
+
+    async def run():
+        result = [await frontend.next_observation(timeout_s=5)]
+        # the consumer is too slow, so "b" and "c" are overwritten
+        for observation in ["b", "c", "d", "e", "f"]:
+            data.append(observation)
+        result += [await frontend.next_observation(timeout_s=5) for _ in range(3)]
+        return result
+
+    assert asyncio.run(run()) == [(0, "a"), (3, "d"), (4, "e"), (5, "f")]
+    assert frontend.num_overrun_frames == 2
+    frontend.close()
+
+
+def test_overrun_while_reading():
+    data = FakeSensorData(history_length=3)
+    data.append("a")
+    frontend = AsyncFrontend(fake_module, data)
+
+    # the observation is overwritten between checking the buffer and reading it
+    get_observation = frontend.frontend.get_observation
+
+    def get_observation_after_overrun(t):
+        if len(data.observations) == 3:
+            data.append("d")
+            data.append("e")
+        return get_observation(t)
+
+    frontend.frontend.get_observation = get_observation_after_overrun
+
+    async def run():
+        first = await frontend.next_observation(timeout_s=5)
+        data.append("b")
+        data.append("c")
+        second = await frontend.next_observation(timeout_s=5)
+        return first, second
+
+    assert asyncio.run(run()) == ((0, "a"), (2, "c"))
+    assert frontend.num_overrun_frames == 1
+    frontend.close()
+
+
+def test_overrun_with_sensor_data():
+    # use actual sensor data, whose wait_for_timeindex releases the GIL
+    data = camera.SingleProcessData(history_length=5)
+
+    def append(index):
+        observation = camera.CameraObservation(4, 3)
+        observation.timestamp = index
+        camera.append_observation(data, observation)
+
+    append(0)
+    frontend = AsyncFrontend(camera, data)
+
+    async def run():
+        result = [await frontend.next_observation(timeout_s=5)]
+        # observations 1 and 2 are overwritten before they are read
+        for i in range(1, 8):
+            append(i)
+        result += [await frontend.next_observation(timeout_s=5) for _ in range(5)]
+
+        # wait for an observation that is added by another thread
+        def append_later():
+            threading.Event().wait(0.1)
+            append(8)
+
+        thread = threading.Thread(target=append_later)
+        thread.start()
+        result.append(await frontend.next_observation(timeout_s=5))
+        thread.join()
+        return result
+
+    result = asyncio.run(run())
+    assert [t for t, _ in result] == [0, 3, 4, 5, 6, 7, 8]
+    assert [observation.timestamp for _, observation in result] == [0, 3, 4, 5, 6, 7, 8]
+    assert frontend.num_overrun_frames == 2
+    frontend.close()
+
+
+def test_timeout():
+    data = FakeSensorData()
+    frontend = AsyncFrontend(fake_module, data)
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(frontend.next_observation(timeout_s=0.1))
+    frontend.close()
+
+
+def test_multiple_streams_in_one_loop():
+    data = [FakeSensorData() for _ in range(3)]
+    frontends = [AsyncFrontend(fake_module, d) for d in data]
+
+    async def run():
+        threads = [append_later(d, [i]) for i, d in enumerate(data)]
+        result = await asyncio.gather(
+            *(f.next_observation(timeout_s=5) for f in frontends)
+        )
+        for thread in threads:
+            thread.join()
+        return result
+
+    assert asyncio.run(run()) == [(0, 0), (0, 1), (0, 2)]
+    for frontend in frontends:
+        frontend.close()
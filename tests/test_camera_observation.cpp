@@ -6,6 +6,7 @@
 #include <gtest/gtest.h>
 #include <cereal/archives/binary.hpp>
 #include <trifinger_cameras/camera_observation.hpp>
+#include <trifinger_cameras/tricamera_observation.hpp>
 
 TEST(TestCameraObservation, serialization)
 {
@@ -30,6 +31,51 @@ TEST(TestCameraObservation, serialization)
     ASSERT_EQ(obs1.timestamp, obs2.timestamp);
 }
 
+TEST(TestCameraObservation, construct_with_size)
+{
+    trifinger_cameras::CameraObservation obs(320, 240);
+
+    ASSERT_EQ(obs.image.cols, 320);
+    ASSERT_EQ(obs.image.rows, 240);
+    ASSERT_EQ(obs.image.type(), CV_8UC1);
+}
+
+TEST(TestCameraObservation, construct_from_camera_info)
+{
+    trifinger_cameras::TriCameraInfo info;
+    info.camera[0].image_width = 320;
+    info.camera[0].image_height = 240;
+    info.camera[1].image_width = 640;
+    info.camera[1].image_height = 480;
+    info.camera[2].image_width = 100;
+    info.camera[2].image_height = 200;
+
+    trifinger_cameras::TriCameraObservation obs(info);
+
+    for (size_t i = 0; i < 3; i++)
+    {
+        ASSERT_EQ(obs.cameras[i].image.cols, info.camera[i].image_width);
+        ASSERT_EQ(obs.cameras[i].image.rows, info.camera[i].image_height);
+    }
+}
+
+TEST(TestCameraObservation, default_image_size)
+{
+    using trifinger_cameras::CameraObservation;
+
+    ASSERT_EQ(CameraObservation::get_default_image_size(),
+              cv::Size(CameraObservation::width, CameraObservation::height));
+
+    CameraObservation::set_default_image_size(cv::Size(320, 240));
+    CameraObservation obs;
+    ASSERT_EQ(obs.image.cols, 320);
+    ASSERT_EQ(obs.image.rows, 240);
+
+    // reset to not affect other tests
+    CameraObservation::set_default_image_size(
+        cv::Size(CameraObservation::width, CameraObservation::height));
+}
+
 int main(int argc, char **argv)
 {
     testing::InitGoogleTest(&argc, argv);
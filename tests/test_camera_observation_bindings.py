@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+import numpy as np
+import pytest
+
+from trifinger_cameras import camera
+
+
+def test_image_is_readonly_view():
+    observation = camera.CameraObservation(40, 30)
+
+    image = observation.image
+    assert image.shape == (30, 40)
+    assert image.dtype == np.uint8
+    assert not image.flags.writeable
+    assert not image.flags.owndata
+
+    # repeated access returns views on the same data
+    assert np.shares_memory(image, observation.image)
+
+    with pytest.raises(ValueError):
+        image[0, 0] = 42
+
+
+def test_image_copy_is_writeable():
+    observation = camera.CameraObservation(40, 30)
+
+    image = observation.image.copy()
+    image[0, 0] = 42
+    assert image.flags.writeable
+
+
+def test_image_view_outlives_observation():
+    observation = camera.CameraObservation(40, 30)
+    observation.image = np.full((30, 40), 13, dtype=np.uint8)
+
+    image = observation.image
+    # replace the image and destroy the observation, the view must stay valid
+    observation.image = np.zeros((30, 40), dtype=np.uint8)
+    del observation
+
+    np.testing.assert_array_equal(image, np.full((30, 40), 13, dtype=np.uint8))
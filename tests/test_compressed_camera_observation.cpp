@@ -0,0 +1,148 @@
+/**
+ * @file
+ * @brief Tests for CompressedCameraObservation
+ * @copyright Copyright (c) 2020, Max Planck Gesellschaft.
+ */
+#include <gtest/gtest.h>
+#include <cereal/archives/binary.hpp>
+#include <trifinger_cameras/compressed_camera_observation.hpp>
+
+using trifinger_cameras::CameraObservation;
+using trifinger_cameras::CompressedCameraObservation;
+using trifinger_cameras::CompressedTriCameraObservation;
+using trifinger_cameras::TriCameraObservation;
+
+//! Create an observation with a (well compressible) gradient image.
+CameraObservation create_observation(int width, int height)
+{
+    CameraObservation obs(width, height);
+    for (int r = 0; r < height; r++)
+    {
+        for (int c = 0; c < width; c++)
+        {
+            obs.image.at<uint8_t>(r, c) = (r + c) % 256;
+        }
+    }
+    obs.timestamp = 42.0;
+    return obs;
+}
+
+TEST(TestCompressedCameraObservation, compress_decompress)
+{
+    CameraObservation obs = create_observation(100, 80);
+    CompressedCameraObservation compressed(100 * 80);
+    compressed.compress(obs);
+
+    ASSERT_EQ(compressed.encoding, CompressedCameraObservation::Encoding::PNG);
+    ASSERT_LT(compressed.data_size, 100 * 80);
+    ASSERT_EQ(compressed.image_width, 100);
+    ASSERT_EQ(compressed.image_height, 80);
+
+    CameraObservation decompressed = compressed.to_camera_observation();
+    ASSERT_EQ(decompressed.timestamp, obs.timestamp);
+    ASSERT_EQ(decompressed.image.size(), obs.image.size());
+    ASSERT_EQ(decompressed.image.type(), CV_8UC1);
+    ASSERT_EQ(cv::countNonZero(decompressed.image != obs.image), 0);
+}
+
+TEST(TestCompressedCameraObservation, raw_fallback)
+{
+    // random noise does not compress, so the raw image should be stored
+    CameraObservation obs(100, 80);
+    cv::randu(obs.image, 0, 256);
+
+    CompressedCameraObservation compressed(100 * 80);
+    compressed.compress(obs);
+
+    ASSERT_EQ(compressed.encoding, CompressedCameraObservation::Encoding::RAW);
+    ASSERT_EQ(compressed.data_size, 100 * 80);
+    ASSERT_EQ(cv::countNonZero(compressed.decompress() != obs.image), 0);
+}
+
+TEST(TestCompressedCameraObservation, incompressible_does_not_fit)
+{
+    // random noise does not compress and with a capacity ratio of 0.5 the raw
+    // image does not fit either, so compressing it has to fail (images are
+    // never stored lossy)
+    CameraObservation obs(100, 80);
+    cv::randu(obs.image, 0, 256);
+
+    CompressedCameraObservation compressed(100 * 40);
+    compressed.compress(create_observation(100, 80));
+    ASSERT_EQ(compressed.encoding, CompressedCameraObservation::Encoding::PNG);
+    const uint32_t data_size = compressed.data_size;
+
+    ASSERT_THROW(compressed.compress(obs), std::length_error);
+
+    // the previously compressed image is kept
+    ASSERT_EQ(compressed.data_size, data_size);
+    ASSERT_EQ(compressed.timestamp, 42.0);
+    ASSERT_EQ(cv::countNonZero(compressed.decompress() !=
+                               create_observation(100, 80).image),
+              0);
+}
+
+TEST(TestCompressedCameraObservation, serialization)
+{
+    CompressedCameraObservation obs1(100 * 80), obs2(0);
+    obs1.compress(create_observation(100, 80));
+
+    std::stringstream serialized_data;
+    {
+        cereal::BinaryOutputArchive oarchive(serialized_data);
+        oarchive(obs1);
+    }
+    {
+        cereal::BinaryInputArchive iarchive(serialized_data);
+        iarchive(obs2);
+    }
+
+    ASSERT_EQ(obs2.data.size(), obs1.data.size());
+    ASSERT_EQ(obs2.data_size, obs1.data_size);
+    ASSERT_EQ(obs2.timestamp, obs1.timestamp);
+    ASSERT_EQ(cv::countNonZero(obs1.decompress() != obs2.decompress()), 0);
+}
+
+TEST(TestCompressedCameraObservation, serialized_size_is_fixed)
+{
+    // The serialized size must not depend on the image content, otherwise the
+    // observation cannot be used in shared memory time series.
+    CompressedCameraObservation compressible(100 * 80), noise(100 * 80);
+    compressible.compress(create_observation(100, 80));
+    CameraObservation noise_obs(100, 80);
+    cv::randu(noise_obs.image, 0, 256);
+    noise.compress(noise_obs);
+
+    std::stringstream data1, data2;
+    {
+        cereal::BinaryOutputArchive oarchive(data1);
+        oarchive(compressible);
+    }
+    {
+        cereal::BinaryOutputArchive oarchive(data2);
+        oarchive(noise);
+    }
+
+    ASSERT_EQ(data1.str().size(), data2.str().size());
+}
+
+TEST(TestCompressedTriCameraObservation, compress_decompress)
+{
+    TriCameraObservation obs;
+    for (size_t i = 0; i < 3; i++)
+    {
+        obs.cameras[i] = create_observation(100, 80);
+        obs.cameras[i].timestamp = i;
+    }
+
+    CompressedTriCameraObservation compressed(obs);
+    TriCameraObservation decompressed = compressed.decompress();
+
+    for (size_t i = 0; i < 3; i++)
+    {
+        ASSERT_EQ(decompressed.cameras[i].timestamp, i);
+        ASSERT_EQ(cv::countNonZero(decompressed.cameras[i].image !=
+                                   obs.cameras[i].image),
+                  0);
+    }
+}
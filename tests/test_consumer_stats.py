@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""Tests for the consumer statistics, using a minimal fake sensor module."""
+
+import os
+import types
+
+import pytest
+
+from trifinger_cameras import consumer_stats
+
+
+class FakeSensorData:
+    """Ring buffer that only stores the time indices."""
+
+    def __init__(self, history_length):
+        self.history_length = history_length
+        self.newest = -1
+
+    @property
+    def oldest(self):
+        if self.newest < 0:
+            return -1
+        return max(0, self.newest - self.history_length + 1)
+
+
+class FakeFrontend:
+    def __init__(self, sensor_data):
+        self.data = sensor_data
+
+    def get_current_timeindex(self):
+        return self.data.newest
+
+    def get_observation(self, t):
+        if t < self.data.oldest:
+            raise ValueError("too old")
+        return f"observation {t}"
+
+    def get_sensor_info(self):
+        return "info"
+
+
+fake_module = types.SimpleNamespace(
+    Frontend=FakeFrontend,
+    get_timeindex_range=lambda data: (data.oldest, data.newest),
+)
+
+
+@pytest.fixture
+def stats_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(consumer_stats, "STATS_DIRECTORY", tmp_path)
+    return tmp_path
+
+
+def test_forwarding(stats_dir):
+    data = FakeSensorData(10)
+    data.newest = 3
+    frontend = consumer_stats.MonitoredFrontend(fake_module, data, "test")
+
+    assert frontend.get_observation(2) == "observation 2"
+    assert frontend.get_latest_observation() == "observation 3"
+    assert frontend.get_sensor_info() == "info"
+
+
+def test_skipped_and_lag(stats_dir):
+    data = FakeSensorData(10)
+    frontend = consumer_stats.MonitoredFrontend(fake_module, data, "test")
+
+    data.newest = 5
+    frontend.get_observation(0)
+    frontend.get_observation(1)
+    frontend.get_observation(4)
+
+    stats = frontend.stats
+    assert stats["frames_consumed"] == 3
+    assert stats["frames_skipped"] == 2
+    assert stats["consumed_timeindex"] == 4
+    assert stats["newest_timeindex"] == 5
+    assert stats["lag"] == 1
+    assert stats["overrun_events"] == 0
+
+
+def test_overrun(stats_dir):
+    data = FakeSensorData(10)
+    frontend = consumer_stats.MonitoredFrontend(fake_module, data, "test")
+
+    data.newest = 20
+    with pytest.raises(ValueError):
+        frontend.get_observation(5)
+    frontend.get_observation(15)
+
+    assert frontend.stats["overrun_events"] == 1
+
+
+def test_published_stats(stats_dir):
+    data = FakeSensorData(10)
+    frontend1 = consumer_stats.MonitoredFrontend(
+        fake_module, data, "stream1", consumer_name="consumer.a"
+    )
+    frontend2 = consumer_stats.MonitoredFrontend(
+        fake_module, data, "stream2", consumer_name="consumer_b"
+    )
+
+    data.newest = 3
+    frontend1.get_observation(1)
+    frontend1.get_observation(3)
+    frontend2.get_observation(2)
+
+    stats = consumer_stats.read_published_stats(stats_dir)
+    assert len(stats) == 2
+    stats = {s["stream"]: s for s in stats}
+
+    assert stats["stream1"]["consumer"] == "consumer_a"
+    assert stats["stream1"]["frames_consumed"] == 2
+    assert stats["stream1"]["frames_skipped"] == 1
+    assert stats["stream2"]["consumed_timeindex"] == 2
+    assert stats["stream2"]["lag"] == 1
+    assert stats["stream2"]["pid"] == os.getpid()
+    assert stats["stream2"]["alive"]
+
+    frontend1.close()
+    frontend2.close()
+    assert consumer_stats.read_published_stats(stats_dir) == []
+
+
+def test_no_publish(stats_dir):
+    data = FakeSensorData(10)
+    frontend = consumer_stats.MonitoredFrontend(
+        fake_module, data, "test", publish=False
+    )
+    data.newest = 0
+    frontend.get_observation(0)
+
+    assert frontend.stats["frames_consumed"] == 1
+    assert list(stats_dir.iterdir()) == []
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""Tests for the HDF5 utilities."""
+
+import h5py
+import numpy as np
+import pytest
+
+from trifinger_cameras import hdf5
+
+
+def write_log(write_hdf5_log, path, n_frames, first_timestamp, image_size=(4, 5)):
+    """Write a minimal TriCamera HDF5 file with distinguishable data."""
+    height, width = image_size
+    timestamps = first_timestamp + np.arange(n_frames, dtype=np.double)
+    images = (
+        (np.arange(n_frames * 3 * height * width) % 256 + first_timestamp)
+        .astype(np.uint8)
+        .reshape(n_frames, 3, height, width)
+    )
+    write_hdf5_log(
+        path,
+        timestamps,
+        images,
+        sensor_data_timestamps=timestamps + 0.5,
+        camera_matrix=np.eye(3) * first_timestamp,
+    )
+
+
+def test_create_tricamera_vds(tmp_path, write_hdf5_log):
+    (tmp_path / "logs").mkdir()
+    files = [tmp_path / "logs" / f"log{i}.hdf5" for i in range(3)]
+    for path, n_frames, first in zip(files, (3, 5, 2), (0, 100, 200)):
+        write_log(write_hdf5_log, path, n_frames, first)
+
+    vds_file = tmp_path / "combined.hdf5"
+    hdf5.create_tricamera_vds(vds_file, files)
+
+    with h5py.File(vds_file, "r") as vds:
+        hdf5.verify_tricamera_hdf5(vds, (2,))
+        assert vds["images"].shape == (10, 3, 4, 5)
+        np.testing.assert_array_equal(
+            vds["timestamps"][:, 0], [0, 1, 2, 100, 101, 102, 103, 104, 200, 201]
+        )
+        np.testing.assert_array_equal(vds["sensor_data_timestamps"][2:4], [2.5, 100.5])
+        with h5py.File(files[1], "r") as source:
+            np.testing.assert_array_equal(vds["images"][3:8], source["images"][()])
+
+        np.testing.assert_array_equal(vds["source_file_offsets"], [0, 3, 8, 10])
+        assert [f.decode() for f in vds["source_files"]] == [
+            "logs/log0.hdf5",
+            "logs/log1.hdf5",
+            "logs/log2.hdf5",
+        ]
+        camera_matrix = vds["source_camera_info/camera60/camera_matrix"]
+        assert camera_matrix.shape == (3, 3, 3)
+        assert camera_matrix[1, 0, 0] == 100
+        np.testing.assert_array_equal(
+            vds["source_camera_info/camera60/frame_rate_fps"], [10, 10, 10]
+        )
+        # camera info of the first file for compatibility with single logs
+        np.testing.assert_array_equal(vds["camera_info/camera60/camera_matrix"], 0)
+
+        assert hdf5.get_source_file_index(vds, 0) == (0, 0)
+        assert hdf5.get_source_file_index(vds, 3) == (1, 0)
+        assert hdf5.get_source_file_index(vds, 7) == (1, 4)
+        assert hdf5.get_source_file_index(vds, 9) == (2, 1)
+        with pytest.raises(IndexError):
+            hdf5.get_source_file_index(vds, 10)
+
+    # sources are referenced relative to the virtual file, so they can be moved
+    # together
+    moved = tmp_path / "moved"
+    moved.mkdir()
+    (tmp_path / "logs").rename(moved / "logs")
+    vds_file.rename(moved / vds_file.name)
+    with h5py.File(moved / vds_file.name, "r") as vds:
+        assert vds["timestamps"][9, 0] == 201
+
+
+def test_create_tricamera_vds_incompatible(tmp_path, write_hdf5_log):
+    write_log(write_hdf5_log, tmp_path / "a.hdf5", 2, 0, image_size=(4, 5))
+    write_log(write_hdf5_log, tmp_path / "b.hdf5", 2, 0, image_size=(5, 5))
+
+    with pytest.raises(ValueError, match="Shape of images"):
+        hdf5.create_tricamera_vds(
+            tmp_path / "combined.hdf5", [tmp_path / "a.hdf5", tmp_path / "b.hdf5"]
+        )
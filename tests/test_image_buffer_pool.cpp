@@ -0,0 +1,105 @@
+/**
+ * @file
+ * @brief Tests for ImageBufferPool
+ * @copyright Copyright (c) 2020, Max Planck Gesellschaft.
+ */
+#include <gtest/gtest.h>
+#include <trifinger_cameras/camera_observation.hpp>
+#include <trifinger_cameras/image_buffer_pool.hpp>
+#include <trifinger_cameras/tricamera_observation.hpp>
+
+using trifinger_cameras::CameraObservation;
+using trifinger_cameras::ImageBufferPool;
+using trifinger_cameras::TriCameraObservation;
+
+TEST(TestImageBufferPool, acquire_size_and_type)
+{
+    ImageBufferPool pool;
+    cv::Mat image = pool.acquire(cv::Size(40, 30), CV_8UC3);
+
+    ASSERT_EQ(image.cols, 40);
+    ASSERT_EQ(image.rows, 30);
+    ASSERT_EQ(image.type(), CV_8UC3);
+    ASSERT_EQ(pool.size(), 1);
+    ASSERT_EQ(pool.num_available(), 0);
+}
+
+TEST(TestImageBufferPool, reuse_released_buffer)
+{
+    ImageBufferPool pool;
+    uchar* data;
+    {
+        cv::Mat image = pool.acquire(cv::Size(40, 30), CV_8UC1);
+        data = image.data;
+    }
+    ASSERT_EQ(pool.num_available(), 1);
+
+    cv::Mat image = pool.acquire(cv::Size(40, 30), CV_8UC1);
+    ASSERT_EQ(image.data, data);
+    ASSERT_EQ(pool.size(), 1);
+}
+
+TEST(TestImageBufferPool, no_reuse_while_referenced)
+{
+    ImageBufferPool pool;
+
+    CameraObservation obs(CameraObservation::NoImageAllocation{});
+    obs.image = pool.acquire(cv::Size(40, 30), CV_8UC1);
+    // a copy of the observation shares the buffer
+    CameraObservation copy = obs;
+    obs.image = cv::Mat();
+
+    cv::Mat image = pool.acquire(cv::Size(40, 30), CV_8UC1);
+    ASSERT_NE(image.data, copy.image.data);
+    ASSERT_EQ(pool.size(), 2);
+}
+
+TEST(TestImageBufferPool, no_reuse_of_different_size)
+{
+    ImageBufferPool pool;
+    pool.acquire(cv::Size(40, 30), CV_8UC1);
+
+    cv::Mat image = pool.acquire(cv::Size(20, 30), CV_8UC1);
+    ASSERT_EQ(image.cols, 20);
+    ASSERT_EQ(pool.size(), 2);
+
+    image = pool.acquire(cv::Size(40, 30), CV_8UC3);
+    ASSERT_EQ(image.type(), CV_8UC3);
+    ASSERT_EQ(pool.size(), 3);
+}
+
+TEST(TestImageBufferPool, max_buffers)
+{
+    ImageBufferPool pool(2);
+    cv::Mat a = pool.acquire(cv::Size(40, 30), CV_8UC1);
+    cv::Mat b = pool.acquire(cv::Size(40, 30), CV_8UC1);
+    cv::Mat c = pool.acquire(cv::Size(40, 30), CV_8UC1);
+
+    // the third image is allocated but not pooled
+    ASSERT_EQ(c.cols, 40);
+    ASSERT_EQ(pool.size(), 2);
+    ASSERT_NE(c.data, a.data);
+    ASSERT_NE(c.data, b.data);
+
+    // if the pool is full, free buffers of a different size are replaced
+    a.release();
+    cv::Mat d = pool.acquire(cv::Size(20, 10), CV_8UC1);
+    ASSERT_EQ(pool.size(), 2);
+    uchar* data = d.data;
+    d.release();
+    cv::Mat e = pool.acquire(cv::Size(20, 10), CV_8UC1);
+    ASSERT_EQ(e.data, data);
+}
+
+TEST(TestImageBufferPool, no_image_allocation_constructor)
+{
+    CameraObservation obs(CameraObservation::NoImageAllocation{});
+    ASSERT_TRUE(obs.image.empty());
+    ASSERT_EQ(obs.timestamp, 0);
+
+    TriCameraObservation tri_obs(CameraObservation::NoImageAllocation{});
+    for (const auto& camera : tri_obs.cameras)
+    {
+        ASSERT_TRUE(camera.image.empty());
+    }
+}
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""Tests for the log catalog (using HDF5 logs only)."""
+
+import datetime
+import os
+
+import numpy as np
+import pytest
+
+from trifinger_cameras import log_catalog
+
+
+def write_log(write_hdf5_log, path, start_time, n_frames, fps, focal_length=100.0):
+    """Write a minimal TriCamera HDF5 file."""
+    write_hdf5_log(
+        path,
+        start_time + np.arange(n_frames) / fps,
+        camera_matrix=np.eye(3) * focal_length,
+    )
+
+
+@pytest.fixture
+def log_dir(tmp_path, write_hdf5_log):
+    logs = tmp_path / "logs"
+    (logs / "sub").mkdir(parents=True)
+    start = datetime.datetime(2024, 1, 10).timestamp()
+    write_log(write_hdf5_log, logs / "a.hdf5", start, 101, 10.0)
+    write_log(write_hdf5_log, logs / "sub" / "b.hdf5", start + 86400, 51, 5.0)
+    write_log(
+        write_hdf5_log, logs / "c.hdf5", start + 2 * 86400, 11, 10.0, focal_length=200.0
+    )
+    return logs
+
+
+def test_index_and_query(tmp_path, log_dir):
+    with log_catalog.LogCatalog(tmp_path / "catalog.sqlite") as catalog:
+        stats = catalog.index(log_dir)
+        assert stats.indexed == 3
+
+        logs = catalog.query()
+        assert [os.path.basename(log["path"]) for log in logs] == [
+            "a.hdf5",
+            "b.hdf5",
+            "c.hdf5",
+        ]
+        assert logs[0]["num_frames"] == 101
+        assert logs[0]["duration"] == pytest.approx(10.0)
+        assert logs[0]["fps"] == pytest.approx(10.0)
+        assert logs[1]["interval_mean"] == pytest.approx(0.2)
+
+        assert len(catalog.query(min_fps=9.5)) == 2
+        assert len(catalog.query(min_duration=5)) == 2
+        assert len(catalog.query(since=datetime.datetime(2024, 1, 11))) == 2
+        assert len(catalog.query(until=datetime.datetime(2024, 1, 11))) == 1
+
+        calibrations = catalog.calibrations()
+        assert len(calibrations) == 2
+        calib = logs[0]["calibration_hash"]
+        assert logs[1]["calibration_hash"] == calib
+        assert len(catalog.query(calibration=calib[:8], min_fps=9.5)) == 1
+        np.testing.assert_array_equal(
+            catalog.get_calibration(calib)["camera60"]["camera_matrix"],
+            np.eye(3) * 100,
+        )
+
+
+def test_incremental(tmp_path, log_dir, write_hdf5_log):
+    with log_catalog.LogCatalog(tmp_path / "catalog.sqlite") as catalog:
+        catalog.index(log_dir)
+
+        stats = catalog.index(log_dir)
+        assert stats.indexed == 0
+        assert stats.unchanged == 3
+
+        # modified, new, removed and broken files
+        write_log(write_hdf5_log, log_dir / "a.hdf5", 0, 21, 10.0)
+        write_log(write_hdf5_log, log_dir / "d.hdf5", 0, 21, 10.0)
+        (log_dir / "c.hdf5").unlink()
+        (log_dir / "broken.h5").write_bytes(b"not an hdf5 file")
+
+        stats = catalog.index(log_dir)
+        assert stats.indexed == 2
+        assert stats.unchanged == 1
+        assert stats.failed == 1
+        assert stats.removed == 1
+        assert len(catalog.query()) == 3
+        assert len(catalog.errors()) == 1
+
+        # failed files are not retried until they change
+        stats = catalog.index(log_dir)
+        assert stats.failed == 0
+        assert stats.unchanged == 4
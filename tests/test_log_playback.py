@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""Tests for the playback engine of TriCamera logs."""
+
+import numpy as np
+import pytest
+
+from trifinger_cameras import log_playback
+
+
+class FakeSource:
+    """Frame source where all pixels of frame i have the value i."""
+
+    def __init__(self, n_frames: int, fps: float = 10.0) -> None:
+        stamps = np.arange(n_frames) / fps
+        self.timestamps = np.repeat(stamps[:, None], 3, axis=1)
+        self.closed = False
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def read(self, index: int) -> np.ndarray:
+        return np.full((3, 4, 4), index, dtype=np.uint8)
+
+    def close(self) -> None:
+        self.closed = True
+
+
+def test_seek():
+    source = FakeSource(200)
+    with log_playback.PlaybackEngine(source, read_ahead=4, num_workers=2) as engine:
+        engine.paused = True
+
+        for expected in range(3):
+            index, image = engine.next_frame()
+            assert index == expected
+            # images of the three cameras are stacked horizontally
+            assert image.shape == (4, 12, 3)
+            assert np.all(image == expected)
+
+        engine.step(100)
+        assert engine.next_frame()[0] == 102
+        engine.step(-1)
+        assert engine.next_frame()[0] == 101
+        engine.step(-1000)
+        assert engine.next_frame()[0] == 0
+
+        engine.seek_timestamp(15.05)
+        assert engine.next_frame()[0] == 151
+        engine.seek(1000)
+        assert engine.next_frame()[0] == 199
+        assert engine.next_frame() is None
+        assert engine.num_dropped == 0
+
+    assert source.closed
+
+
+def test_drop_frames():
+    # at this speed, all frames are immediately due
+    engine = log_playback.PlaybackEngine(FakeSource(50), speed=1e6)
+    assert engine.next_frame()[0] == 49
+    assert engine.num_dropped == 49
+    assert engine.next_frame() is None
+    engine.close()
+
+    with pytest.raises(ValueError):
+        log_playback.PlaybackEngine(FakeSource(5), speed=0)
+
+
+def test_hdf5_source(tmp_path, write_hdf5_log):
+    filename = tmp_path / "log.hdf5"
+    write_hdf5_log(
+        filename,
+        np.arange(15, dtype=float).reshape(5, 3),
+        np.arange(5, dtype=np.uint8)[:, None, None, None]
+        .repeat(3, axis=1)
+        .repeat(4, axis=2)
+        .repeat(4, axis=3),
+    )
+
+    source = log_playback.open_log_source(filename)
+    assert isinstance(source, log_playback.HDF5LogSource)
+    with log_playback.PlaybackEngine(source) as engine:
+        engine.paused = True
+        engine.seek(3)
+        index, image = engine.next_frame()
+        assert index == 3
+        assert np.all(image == 3)
@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""Tests for reading the timestamps of logs (HDF5 only)."""
+
+import numpy as np
+import pytest
+
+from trifinger_cameras import log_timestamps
+
+
+def test_read_log_timestamps_hdf5(tmp_path, write_hdf5_log):
+    camera_timestamps = np.arange(30, dtype=float).reshape(10, 3)
+    sensor_data_timestamps = np.arange(10, dtype=float) * 100
+
+    filename = tmp_path / "log.hdf5"
+    write_hdf5_log(
+        filename, camera_timestamps, sensor_data_timestamps=sensor_data_timestamps
+    )
+
+    timestamps = log_timestamps.read_log_timestamps(filename)
+    np.testing.assert_array_equal(timestamps.camera_timestamps, camera_timestamps)
+    np.testing.assert_array_equal(
+        timestamps.sensor_data_timestamps, sensor_data_timestamps
+    )
+
+
+def test_get_frame_interval():
+    camera_timestamps = np.array([[0.0, 0.1, 0.2], [1.0, 1.2, 1.4], [2.0, 2.3, 2.6]])
+    assert log_timestamps.get_frame_interval(camera_timestamps) == pytest.approx(1.0)
+    assert log_timestamps.get_frame_interval(
+        camera_timestamps, camera=2
+    ) == pytest.approx(1.2)
+
+    with pytest.raises(ValueError):
+        log_timestamps.get_frame_interval(camera_timestamps[:1])
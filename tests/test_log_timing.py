@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""Tests for the frame timing analysis."""
+
+import json
+
+import h5py
+import numpy as np
+import pytest
+
+from trifinger_cameras import log_timing
+
+
+@pytest.fixture
+def timestamps():
+    n = 100
+    stamps = np.arange(n) * 0.1
+    # camera offsets of 1 and 3 ms
+    camera_timestamps = stamps[:, None] + np.array([0.0, 0.001, 0.003])
+    # two frames dropped after frame 10
+    camera_timestamps[11:] += 0.2
+    # camera 1: stall of three duplicate frames
+    camera_timestamps[50:53, 1] = camera_timestamps[49, 1]
+    sensor_data_timestamps = camera_timestamps.max(axis=1) + 0.005
+    return camera_timestamps, sensor_data_timestamps
+
+
+def test_analyze_timing(timestamps):
+    camera_timestamps, sensor_data_timestamps = timestamps
+    report = log_timing.analyze_timing(
+        camera_timestamps, sensor_data_timestamps, frame_rate_fps=10.0
+    )
+
+    assert report["num_frames"] == 100
+    assert report["frame_rate_source"] == "nominal"
+    # the frames missed during the stall count as dropped
+    assert report["num_drop_events"] == [1, 2, 1]
+    assert report["num_dropped_frames"] == [2, 5, 2]
+    assert report["num_duplicates"] == [0, 3, 0]
+    assert report["longest_stall"] == [0, 3, 0]
+    assert report["interval"]["p50"] == pytest.approx([0.1, 0.1, 0.1])
+    assert report["jitter_rms"] == pytest.approx([0, 0, 0], abs=1e-9)
+
+    assert len(report["skew"]["pairs"]) == 3
+    assert report["skew"]["p50"] == pytest.approx([0.001, 0.003, 0.002])
+    assert report["skew_max"]["min"] == pytest.approx(0.003)
+    assert report["publish_latency"]["mean"] == pytest.approx(0.005)
+
+    # without nominal frame rate, the median interval is used
+    report = log_timing.analyze_timing(camera_timestamps)
+    assert report["frame_rate_source"] == "median_interval"
+    assert report["frame_rate_fps"] == pytest.approx(10.0)
+    assert report["num_dropped_frames"] == [2, 5, 2]
+    assert "publish_latency" not in report
+
+
+def test_to_json():
+    camera_timestamps = np.arange(30, dtype=float).reshape(10, 3)
+    report = log_timing.analyze_timing(
+        camera_timestamps, np.full(10, np.nan), frame_rate_fps=1.0
+    )
+    # no valid latencies and no regular intervals (all are drops)
+    assert report["publish_latency"] == {}
+
+    data = json.loads(log_timing.to_json(report))
+    assert data["num_frames"] == 10
+    assert data["jitter_rms"] == [None, None, None]
+
+    assert log_timing.analyze_timing(camera_timestamps[:1]) == {
+        "num_frames": 1,
+        "cameras": list(log_timing.CAMERA_NAMES),
+    }
+
+
+def test_read_frame_rate(tmp_path, write_hdf5_log):
+    path = tmp_path / "log.hdf5"
+    write_hdf5_log(path, np.arange(10) * 0.1)
+    assert log_timing.read_frame_rate(path) == pytest.approx(10.0)
+    assert log_timing.read_frame_rate(tmp_path / "log.dat") is None
+
+    # unknown frame rate, e.g. of files converted without --frame-rate
+    with h5py.File(path, "a") as h5:
+        h5["camera_info/camera60"].attrs["frame_rate_fps"] = np.nan
+    assert log_timing.read_frame_rate(path) is None
+    with h5py.File(path, "a") as h5:
+        del h5["camera_info/camera60"].attrs["frame_rate_fps"]
+    assert log_timing.read_frame_rate(path) is None
+
+    report = log_timing.analyze_log_timing(path)
+    assert report["frame_rate_source"] == "median_interval"
+    assert report["frame_rate_fps"] == pytest.approx(10.0)
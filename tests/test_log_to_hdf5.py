@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""Tests for the batch mode of tricamera_log_to_hdf5."""
+
+import sys
+
+import h5py
+import numpy as np
+import pytest
+
+from trifinger_cameras import TRICAMERA_LOG_MAGIC, log_timing
+from trifinger_cameras.tools import tricamera_log_to_hdf5
+
+# Stand-in for tricamera_log_to_hdf5_native, which writes a minimal TriCamera HDF5
+# file with one frame per byte of the log file (and the frame rate, if given) or fails if
+# the log contains "fail".
+FAKE_CONVERTER = f"""#!{sys.executable}
+import argparse
+import pathlib
+import sys
+
+import h5py
+import numpy as np
+
+parser = argparse.ArgumentParser()
+parser.add_argument("--logfile", type=pathlib.Path)
+parser.add_argument("--outfile", type=pathlib.Path)
+parser.add_argument("--camera-info", nargs=3)
+parser.add_argument("--threads", type=int)
+parser.add_argument("--frame-rate", type=float)
+args = parser.parse_args()
+
+if args.outfile.exists():
+    sys.exit("Output file already exists.")
+
+content = args.logfile.read_bytes()
+with h5py.File(args.outfile, "w") as h5:
+    h5.attrs["magic"] = {TRICAMERA_LOG_MAGIC}
+    h5.attrs["format_version"] = 2
+    if b"fail" in content:
+        sys.exit("ERROR: broken log")
+    h5["images"] = np.zeros((len(content), 3, 2, 2), dtype=np.uint8)
+    if args.frame_rate is not None:
+        group = h5.create_group("camera_info/camera60")
+        group.attrs["frame_rate_fps"] = args.frame_rate
+"""
+
+
+@pytest.fixture
+def converter(tmp_path):
+    path = tmp_path / "fake_converter"
+    path.write_text(FAKE_CONVERTER)
+    path.chmod(0o755)
+    return path
+
+
+@pytest.fixture
+def log_dir(tmp_path):
+    logs = tmp_path / "logs"
+    (logs / "sub").mkdir(parents=True)
+    (logs / "a.dat").write_bytes(b"123")
+    (logs / "sub" / "b.dat").write_bytes(b"12345")
+    (logs / "sub" / "notes.txt").write_text("not a log")
+    return logs
+
+
+def test_is_converted(tmp_path, write_hdf5_log):
+    path = tmp_path / "log.hdf5"
+    assert not tricamera_log_to_hdf5.is_converted(path)
+
+    path.write_text("garbage")
+    assert not tricamera_log_to_hdf5.is_converted(path)
+
+    write_hdf5_log(path, np.arange(2), magic=42)
+    assert not tricamera_log_to_hdf5.is_converted(path)
+
+    with h5py.File(path, "w") as h5:
+        h5.attrs["magic"] = TRICAMERA_LOG_MAGIC
+        h5.attrs["format_version"] = 2
+    assert not tricamera_log_to_hdf5.is_converted(path)
+
+    write_hdf5_log(path, np.arange(7))
+    assert tricamera_log_to_hdf5.is_converted(path)
+    assert tricamera_log_to_hdf5.get_num_converted_frames(path) == 7
+
+
+def test_find_conversion_tasks(tmp_path, log_dir, write_hdf5_log):
+    out = tmp_path / "out"
+    assert tricamera_log_to_hdf5.get_output_path(
+        log_dir / "sub" / "b.dat", log_dir, out
+    ) == (out / "sub" / "b.hdf5")
+
+    todo, n_skipped = tricamera_log_to_hdf5.find_conversion_tasks(log_dir, out, "*.dat")
+    assert todo == [
+        (log_dir / "a.dat", out / "a.hdf5"),
+        (log_dir / "sub" / "b.dat", out / "sub" / "b.hdf5"),
+    ]
+    assert n_skipped == 0
+
+    # valid outputs are skipped, invalid ones are converted again
+    (out / "sub").mkdir(parents=True)
+    write_hdf5_log(out / "sub" / "b.hdf5", np.arange(2))
+    (out / "a.hdf5").write_text("truncated")
+    todo, n_skipped = tricamera_log_to_hdf5.find_conversion_tasks(log_dir, out, "*.dat")
+    assert todo == [(log_dir / "a.dat", out / "a.hdf5")]
+    assert n_skipped == 1
+
+
+def test_convert_batch(tmp_path, log_dir, converter):
+    out = tmp_path / "out"
+    camera_info = [tmp_path / f"camera{i}.yml" for i in range(3)]
+
+    # leftover of an interrupted conversion
+    (out / "sub").mkdir(parents=True)
+    (out / "sub" / "b.hdf5.part").write_text("incomplete")
+
+    n_failed = tricamera_log_to_hdf5.convert_batch(
+        converter, log_dir, out, "*.dat", camera_info, jobs=2
+    )
+    assert n_failed == 0
+    assert tricamera_log_to_hdf5.get_num_converted_frames(out / "a.hdf5") == 3
+    assert tricamera_log_to_hdf5.get_num_converted_frames(out / "sub" / "b.hdf5") == 5
+    assert sorted(p.name for p in out.rglob("*")) == ["a.hdf5", "b.hdf5", "sub"]
+
+    # converted files are not touched again
+    mtime = (out / "a.hdf5").stat().st_mtime_ns
+    (log_dir / "c.dat").write_bytes(b"12")
+    n_failed = tricamera_log_to_hdf5.convert_batch(
+        converter, log_dir, out, "*.dat", camera_info, jobs=1
+    )
+    assert n_failed == 0
+    assert (out / "a.hdf5").stat().st_mtime_ns == mtime
+    assert tricamera_log_to_hdf5.get_num_converted_frames(out / "c.hdf5") == 2
+
+
+def test_convert_batch_frame_rate(tmp_path, log_dir, converter):
+    camera_info = [tmp_path / f"camera{i}.yml" for i in range(3)]
+
+    # the frame rate is only stored if it is given
+    tricamera_log_to_hdf5.convert_batch(
+        converter, log_dir, tmp_path / "out", "*.dat", camera_info, jobs=1
+    )
+    assert log_timing.read_frame_rate(tmp_path / "out" / "a.hdf5") is None
+
+    tricamera_log_to_hdf5.convert_batch(
+        converter,
+        log_dir,
+        tmp_path / "out_30fps",
+        "*.dat",
+        camera_info,
+        jobs=1,
+        frame_rate_fps=30.0,
+    )
+    assert log_timing.read_frame_rate(tmp_path / "out_30fps" / "a.hdf5") == 30.0
+    assert log_timing.read_frame_rate(tmp_path / "out_30fps" / "sub" / "b.hdf5") == 30.0
+
+
+def test_convert_batch_failure(tmp_path, log_dir, converter, capsys):
+    out = tmp_path / "out"
+    camera_info = [tmp_path / f"camera{i}.yml" for i in range(3)]
+    (log_dir / "a.dat").write_bytes(b"fail")
+
+    n_failed = tricamera_log_to_hdf5.convert_batch(
+        converter, log_dir, out, "*.dat", camera_info, jobs=2
+    )
+    assert n_failed == 1
+    assert "broken log" in capsys.readouterr().err
+    # neither the output nor the incomplete temporary file is left behind
+    assert not (out / "a.hdf5").exists()
+    assert not (out / "a.hdf5.part").exists()
+    assert tricamera_log_to_hdf5.is_converted(out / "sub" / "b.hdf5")
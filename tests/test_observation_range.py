@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""Tests for the bulk retrieval of TriCamera observation ranges."""
+
+import time
+
+import numpy as np
+import pytest
+
+from trifinger_cameras import camera, tricamera
+
+WIDTH = 40
+HEIGHT = 30
+
+
+def make_observation(index, width=WIDTH, height=HEIGHT):
+    """Create an observation whose pixels and timestamps encode index and camera."""
+    cameras = []
+    for i_cam in range(3):
+        camera_observation = camera.CameraObservation(width, height)
+        camera_observation.image = np.full(
+            (height, width), index * 3 + i_cam, dtype=np.uint8
+        )
+        camera_observation.timestamp = index + 0.1 * i_cam
+        cameras.append(camera_observation)
+
+    observation = tricamera.TriCameraObservation()
+    observation.cameras = cameras
+    return observation
+
+
+def check_range(images, timestamps, start, stop):
+    """Check that the stacked arrays contain the observations [start, stop)."""
+    n = stop - start
+    assert images.shape == (n, 3, HEIGHT, WIDTH)
+    assert images.dtype == np.uint8
+    assert timestamps.shape == (n, 3)
+    assert timestamps.dtype == np.double
+
+    indices = np.arange(start, stop)[:, None]
+    expected_pixels = indices * 3 + np.arange(3)
+    for i in range(n):
+        for i_cam in range(3):
+            assert np.all(images[i, i_cam] == expected_pixels[i, i_cam])
+    np.testing.assert_allclose(timestamps, indices + 0.1 * np.arange(3))
+
+
+@pytest.fixture
+def sensor_data():
+    data = tricamera.SingleProcessData(history_length=10)
+    for i in range(5):
+        tricamera.append_observation(data, make_observation(i))
+    return data
+
+
+@pytest.fixture
+def log_reader(tmp_path):
+    data = tricamera.SingleProcessData()
+    logger = tricamera.TriCameraLogger(data, 10)
+    logger.start()
+    for i in range(5):
+        tricamera.append_observation(data, make_observation(i))
+
+    # the logger gets the observations in a background thread
+    for _ in range(200):
+        if logger.get_buffer_usage().num_frames == 5:
+            break
+        time.sleep(0.01)
+    assert logger.get_buffer_usage().num_frames == 5
+
+    filename = tmp_path / "log.dat"
+    logger.stop_and_save(str(filename))
+    return tricamera.LogReader(str(filename))
+
+
+def test_get_observation_range(sensor_data):
+    frontend = tricamera.Frontend(sensor_data)
+
+    images, timestamps = tricamera.get_observation_range(frontend, 1, 4)
+    check_range(images, timestamps, 1, 4)
+
+    # same data as the single observations
+    np.testing.assert_array_equal(
+        images[1, 2], frontend.get_observation(2).cameras[2].image
+    )
+
+
+def test_get_observation_range_empty(sensor_data):
+    frontend = tricamera.Frontend(sensor_data)
+
+    images, timestamps = tricamera.get_observation_range(frontend, 2, 2)
+    assert images.shape == (0, 3, 0, 0)
+    assert images.dtype == np.uint8
+    assert timestamps.shape == (0, 3)
+
+
+def test_get_observation_range_invalid(sensor_data):
+    frontend = tricamera.Frontend(sensor_data)
+
+    with pytest.raises(ValueError, match="stop must not be less than start"):
+        tricamera.get_observation_range(frontend, 3, 2)
+
+
+def test_get_observation_range_different_image_sizes(sensor_data):
+    tricamera.append_observation(sensor_data, make_observation(5, width=20))
+    frontend = tricamera.Frontend(sensor_data)
+
+    with pytest.raises(RuntimeError, match="different image sizes"):
+        tricamera.get_observation_range(frontend, 4, 6)
+
+    # ranges that contain only one of the sizes are fine
+    images, _ = tricamera.get_observation_range(frontend, 5, 6)
+    assert images.shape == (1, 3, HEIGHT, 20)
+
+
+def test_get_log_observation_range(log_reader):
+    images, timestamps = tricamera.get_log_observation_range(log_reader, 0, 5)
+    check_range(images, timestamps, 0, 5)
+
+    images, timestamps = tricamera.get_log_observation_range(log_reader, 3, 5)
+    check_range(images, timestamps, 3, 5)
+
+    images, timestamps = tricamera.get_log_observation_range(log_reader, 5, 5)
+    assert images.shape == (0, 3, 0, 0)
+    assert timestamps.shape == (0, 3)
+
+
+def test_get_log_observation_range_invalid(log_reader):
+    with pytest.raises(IndexError):
+        tricamera.get_log_observation_range(log_reader, 3, 2)
+    with pytest.raises(IndexError):
+        tricamera.get_log_observation_range(log_reader, 0, 6)
+    with pytest.raises(IndexError):
+        tricamera.get_log_observation_range(log_reader, 6, 6)
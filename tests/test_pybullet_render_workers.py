@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+import numpy as np
+import pytest
+
+pybullet = pytest.importorskip("pybullet")
+pybullet_data = pytest.importorskip("pybullet_data")
+
+from trifinger_cameras import pybullet_render_workers  # noqa: E402
+
+# Box which is reported as textured.  Only textures of mesh files are mirrored, so
+# the mirrored box is not textured.
+TEXTURED_BOX = pybullet_render_workers.VisualShape(
+    body_id=0,
+    link_index=-1,
+    geometry_type=pybullet.GEOM_BOX,
+    dimensions=(0.1, 0.1, 0.1),
+    mesh_file="",
+    local_position=(0, 0, 0),
+    local_orientation=(0, 0, 0, 1),
+    rgba_color=(1, 1, 1, 1),
+    has_texture=True,
+)
+
+
+@pytest.fixture
+def clients():
+    main_client = pybullet.connect(pybullet.DIRECT)
+    mirror_client = pybullet.connect(pybullet.DIRECT)
+    yield main_client, mirror_client
+    pybullet.disconnect(physicsClientId=mirror_client)
+    pybullet.disconnect(physicsClientId=main_client)
+
+
+def render(client_id):
+    view_matrix = pybullet.computeViewMatrix([1.5, 1.5, 1], [0.5, 0, 0.5], [0, 0, 1])
+    proj_matrix = pybullet.computeProjectionMatrixFOV(60, 1, 0.1, 10)
+    image = pybullet.getCameraImage(
+        64, 64, view_matrix, proj_matrix, physicsClientId=client_id
+    )[2]
+    return np.asarray(image, dtype=np.uint8).reshape(64, 64, 4)
+
+
+def test_mirrored_scene_renders_identical(clients):
+    main_client, mirror_client = clients
+
+    robot = pybullet.loadURDF(
+        pybullet_data.getDataPath() + "/kuka_iiwa/model.urdf",
+        [0.5, 0, 0],
+        physicsClientId=main_client,
+    )
+    pybullet.resetJointState(robot, 2, 1.0, physicsClientId=main_client)
+    pybullet.resetJointState(robot, 3, -0.5, physicsClientId=main_client)
+
+    shapes = pybullet_render_workers.get_visual_shapes(main_client)
+    assert len(shapes) > 0
+
+    poses = np.zeros((len(shapes), 7))
+    pybullet_render_workers.get_visual_shape_poses(shapes, poses, main_client)
+
+    for shape, pose in zip(shapes, poses):
+        body = pybullet_render_workers._create_mirror_body(shape, mirror_client)
+        pybullet.resetBasePositionAndOrientation(
+            body, pose[:3], pose[3:], physicsClientId=mirror_client
+        )
+
+    np.testing.assert_array_equal(render(main_client), render(mirror_client))
+
+
+def test_textured_shape_that_cannot_be_mirrored(clients):
+    _, mirror_client = clients
+    with pytest.raises(ValueError, match="texture"):
+        pybullet_render_workers._create_mirror_body(TEXTURED_BOX, mirror_client)
+
+
+@pytest.fixture
+def sim_camera():
+    return pytest.importorskip("trifinger_simulation.camera")
+
+
+@pytest.fixture
+def sim_client():
+    client = pybullet.connect(pybullet.DIRECT)
+    yield client
+    pybullet.disconnect(physicsClientId=client)
+
+
+def add_box(client, position, size, color):
+    shape = pybullet.createVisualShape(
+        pybullet.GEOM_BOX,
+        halfExtents=[size / 2] * 3,
+        rgbaColor=color,
+        physicsClientId=client,
+    )
+    return pybullet.createMultiBody(
+        baseVisualShapeIndex=shape, basePosition=position, physicsClientId=client
+    )
+
+
+def assert_same_images(expected_cameras, cameras):
+    expected_images = expected_cameras.get_bayer_images()
+    images = cameras.get_bayer_images()
+    assert len(images) == len(expected_images)
+    for expected, image in zip(expected_images, images):
+        np.testing.assert_array_equal(image, expected)
+
+
+def test_multi_process_cameras(sim_camera, sim_client):
+    box = add_box(sim_client, [0, 0, 0.03], 0.06, [1, 0, 0, 1])
+    # textured mesh
+    pybullet.loadURDF(
+        pybullet_data.getDataPath() + "/sphere2.urdf",
+        [0.08, 0.05, 0.03],
+        globalScaling=0.06,
+        physicsClientId=sim_client,
+    )
+
+    single_process_cameras = sim_camera.TriFingerCameras(pybullet_client_id=sim_client)
+    cameras = pybullet_render_workers.MultiProcessTriFingerCameras(sim_client)
+    try:
+        assert_same_images(single_process_cameras, cameras)
+        workers = list(cameras._workers)
+        assert len(workers) == 3
+
+        # pose and colour changes are applied without restarting the workers
+        pybullet.resetBasePositionAndOrientation(
+            box,
+            [-0.05, 0.02, 0.04],
+            pybullet.getQuaternionFromEuler([0.3, 0, 0.8]),
+            physicsClientId=sim_client,
+        )
+        pybullet.changeVisualShape(
+            box, -1, rgbaColor=[0, 1, 1, 1], physicsClientId=sim_client
+        )
+        assert_same_images(single_process_cameras, cameras)
+        assert cameras._workers == workers
+
+        # replacing a body does not change the number of bodies but still
+        # requires a restart
+        pybullet.removeBody(box, physicsClientId=sim_client)
+        add_box(sim_client, [0, -0.05, 0.02], 0.04, [0.5, 0.5, 0, 1])
+        assert_same_images(single_process_cameras, cameras)
+        assert all(process.exitcode == 0 for process, _ in workers)
+        assert cameras._workers != workers
+        workers = list(cameras._workers)
+    finally:
+        cameras.close()
+
+    for process, _ in workers:
+        assert not process.is_alive()
+        assert process.exitcode == 0
+    with pytest.raises(RuntimeError):
+        cameras.get_bayer_images()
+
+
+def test_multi_process_cameras_worker_failure(sim_camera, sim_client):
+    cameras = pybullet_render_workers.MultiProcessTriFingerCameras(sim_client)
+    try:
+        # the error of the workers is reported in the main process
+        with pytest.raises(RuntimeError, match="texture"):
+            cameras._start_workers([TEXTURED_BOX])
+        assert cameras._workers == []
+
+        # the workers are started again with the actual scene
+        add_box(sim_client, [0, 0, 0.03], 0.06, [1, 0, 0, 1])
+        assert len(cameras.get_bayer_images()) == 3
+    finally:
+        cameras.close()
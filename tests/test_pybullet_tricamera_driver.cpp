@@ -0,0 +1,380 @@
+/**
+ * @file
+ * @brief Tests for the synchronisation of PyBulletTriCameraDriver with the
+ *        robot and its pipelined rendering.
+ * @copyright Copyright (c) 2020, Max Planck Gesellschaft.
+ */
+#include <chrono>
+#include <filesystem>
+#include <fstream>
+#include <future>
+#include <memory>
+#include <thread>
+
+#include <fmt/format.h>
+#include <gtest/gtest.h>
+#include <pybind11/embed.h>
+
+#include <robot_interfaces/finger_types.hpp>
+#include <trifinger_cameras/pybullet_tricamera_driver.hpp>
+
+namespace py = pybind11;
+using namespace trifinger_cameras;
+using namespace std::chrono_literals;
+
+/**
+ * Stand-in for trifinger_simulation.camera.  The images of the n-th rendered
+ * frame have the value n.  The class attributes of TriFingerCameras control
+ * the rendering.
+ */
+static const char* FAKE_CAMERA_MODULE = R"(
+import sys
+import time
+import types
+
+import numpy as np
+
+
+class CalibratedCamera:
+    pass
+
+
+class FakeCamera:
+    _proj_matrix = tuple(np.eye(4).flatten())
+    _view_matrix = tuple(np.eye(4).flatten())
+
+    def get_width(self):
+        return 8
+
+    def get_height(self):
+        return 6
+
+
+class TriFingerCameras:
+    render_duration_s = 0.0
+    fail = False
+    num_started = 0
+    num_rendered = 0
+
+    def __init__(self):
+        self.cameras = [FakeCamera() for _ in range(3)]
+
+    def get_bayer_images(self):
+        cls = TriFingerCameras
+        cls.num_started += 1
+        if cls.fail:
+            raise RuntimeError("rendering failed")
+        time.sleep(cls.render_duration_s)
+        cls.num_rendered += 1
+        return [np.full((6, 8), cls.num_rendered, dtype=np.uint8)] * 3
+
+
+camera = types.ModuleType("trifinger_simulation.camera")
+camera.CalibratedCamera = CalibratedCamera
+camera.TriFingerCameras = TriFingerCameras
+simulation = types.ModuleType("trifinger_simulation")
+simulation.camera = camera
+sys.modules["trifinger_simulation"] = simulation
+sys.modules["trifinger_simulation.camera"] = camera
+)";
+
+class TestPyBulletTriCameraDriver : public ::testing::Test
+{
+protected:
+    //! Time without robot progress after which the robot is stalled.
+    static constexpr double STALL_TIMEOUT_S = 0.5;
+
+    std::shared_ptr<robot_interfaces::TriFingerTypes::SingleProcessData>
+        robot_data;
+    std::unique_ptr<PyBulletTriCameraDriver> driver;
+
+    static void SetUpTestSuite()
+    {
+        if (!Py_IsInitialized())
+        {
+            py::initialize_interpreter();
+        }
+        py::exec(FAKE_CAMERA_MODULE);
+    }
+
+    void SetUp() override
+    {
+        configure_fake_rendering(0.0, false);
+
+        robot_data = std::make_shared<
+            robot_interfaces::TriFingerTypes::SingleProcessData>();
+
+        // The driver acquires the GIL when needed (like when it is used by a
+        // robot backend), so it must not be held by the test.
+        gil_release_ = std::make_unique<py::gil_scoped_release>();
+    }
+
+    void TearDown() override
+    {
+        {
+            // destroyed with the GIL, like when the driver is owned by Python
+            py::gil_scoped_acquire acquire;
+            driver.reset();
+        }
+        gil_release_.reset();
+    }
+
+    /**
+     * @brief Create the driver (10 fps, i.e. one frame every 100 robot steps).
+     *
+     * @param render_images Whether images are rendered.
+     * @param pipelined_rendering Whether images are rendered in the background.
+     */
+    void create_driver(bool render_images = false,
+                       bool pipelined_rendering = false)
+    {
+        const std::filesystem::path config_file =
+            std::filesystem::temp_directory_path() /
+            "test_pybullet_tricamera_driver.toml";
+        {
+            std::ofstream out(config_file);
+            out << fmt::format(
+                "[tricamera_driver]\n"
+                "frame_rate_fps = 10.0\n"
+                "\n"
+                "[pybullet_tricamera_driver]\n"
+                "robot_stall_timeout_s = {}\n"
+                "pipelined_rendering = {}\n",
+                STALL_TIMEOUT_S,
+                pipelined_rendering);
+        }
+        Settings settings(config_file);
+        std::filesystem::remove(config_file);
+
+        driver = std::make_unique<PyBulletTriCameraDriver>(
+            robot_data, render_images, settings);
+    }
+
+    /**
+     * @brief Configure the fake cameras and reset their counters.
+     *
+     * @param render_duration_s Time needed for rendering a frame.
+     * @param fail If true, rendering raises an exception.
+     */
+    static void configure_fake_rendering(double render_duration_s, bool fail)
+    {
+        py::gil_scoped_acquire acquire;
+        py::object cameras = get_fake_cameras();
+        cameras.attr("render_duration_s") = render_duration_s;
+        cameras.attr("fail") = fail;
+        cameras.attr("num_started") = 0;
+        cameras.attr("num_rendered") = 0;
+    }
+
+    //! Number of frames of which the rendering was started.
+    static int get_num_renders_started()
+    {
+        py::gil_scoped_acquire acquire;
+        return get_fake_cameras().attr("num_started").cast<int>();
+    }
+
+    //! Append robot observations until the robot reached time index t.
+    void advance_robot_to(time_series::Index t)
+    {
+        while (robot_data->observation->newest_timeindex(false) < t)
+        {
+            robot_data->observation->append(
+                robot_interfaces::TriFingerTypes::Observation());
+        }
+    }
+
+    //! Get an observation in a separate thread.
+    std::future<TriCameraObservation> get_observation_async()
+    {
+        return std::async(std::launch::async,
+                          [this]() { return driver->get_observation(); });
+    }
+
+private:
+    std::unique_ptr<py::gil_scoped_release> gil_release_;
+
+    static py::object get_fake_cameras()
+    {
+        return py::module::import("trifinger_simulation.camera")
+            .attr("TriFingerCameras");
+    }
+};
+
+//! Time (in seconds) needed for calling the function.
+template <typename F>
+static double measure_duration_s(F function)
+{
+    auto start = std::chrono::steady_clock::now();
+    function();
+    return std::chrono::duration<double>(std::chrono::steady_clock::now() -
+                                         start)
+        .count();
+}
+
+TEST_F(TestPyBulletTriCameraDriver, frame_grid_pacing)
+{
+    create_driver();
+
+    // The first frame is due at robot step 100.  The robot is already a bit
+    // further, but less than a frame, so the frame stays on the grid.
+    advance_robot_to(150);
+    driver->get_observation();
+
+    // so the next frame is due at step 200 (not 250)
+    auto observation = get_observation_async();
+    advance_robot_to(199);
+    ASSERT_EQ(observation.wait_for(100ms), std::future_status::timeout);
+    advance_robot_to(200);
+    ASSERT_EQ(observation.wait_for(1s), std::future_status::ready);
+
+    auto next_observation = get_observation_async();
+    advance_robot_to(299);
+    ASSERT_EQ(next_observation.wait_for(100ms), std::future_status::timeout);
+    advance_robot_to(300);
+    ASSERT_EQ(next_observation.wait_for(1s), std::future_status::ready);
+}
+
+TEST_F(TestPyBulletTriCameraDriver, stall_timeout_and_recovery)
+{
+    create_driver();
+
+    // As long as the robot did not start, observations are provided at the
+    // rate of the stall timeout.
+    double duration_s =
+        measure_duration_s([&]() { driver->get_observation(); });
+    EXPECT_GE(duration_s, STALL_TIMEOUT_S * 0.9);
+    EXPECT_LT(duration_s, STALL_TIMEOUT_S + 1.0);
+
+    // The robot stops before the frame at step 100 is reached.  The driver
+    // must not block forever but return once the stall timeout expired.
+    advance_robot_to(50);
+    duration_s = measure_duration_s([&]() { driver->get_observation(); });
+    EXPECT_GE(duration_s, STALL_TIMEOUT_S * 0.9);
+    EXPECT_LT(duration_s, STALL_TIMEOUT_S + 1.0);
+
+    // When the robot is running again, frames are paced relative to the step
+    // at which the robot stalled (i.e. the next frame is due at step 150).
+    auto observation = get_observation_async();
+    advance_robot_to(149);
+    ASSERT_EQ(observation.wait_for(100ms), std::future_status::timeout);
+    advance_robot_to(150);
+    ASSERT_EQ(observation.wait_for(1s), std::future_status::ready);
+
+    auto next_observation = get_observation_async();
+    advance_robot_to(249);
+    ASSERT_EQ(next_observation.wait_for(100ms), std::future_status::timeout);
+    advance_robot_to(250);
+    ASSERT_EQ(next_observation.wait_for(1s), std::future_status::ready);
+}
+
+TEST_F(TestPyBulletTriCameraDriver, resync_when_robot_jumps_ahead)
+{
+    create_driver();
+
+    advance_robot_to(150);
+    driver->get_observation();  // frame at step 100
+
+    // The robot is more than a full frame ahead of the next frame (due at step
+    // 200), so the driver resynchronises with the newest step instead of
+    // returning the frames at 300 and 400 immediately to catch up.
+    advance_robot_to(420);
+    double duration_s =
+        measure_duration_s([&]() { driver->get_observation(); });
+    EXPECT_LT(duration_s, 0.1);
+
+    auto observation = get_observation_async();
+    advance_robot_to(519);
+    ASSERT_EQ(observation.wait_for(100ms), std::future_status::timeout);
+    advance_robot_to(520);
+    ASSERT_EQ(observation.wait_for(1s), std::future_status::ready);
+}
+
+TEST_F(TestPyBulletTriCameraDriver, pipelined_frames_in_order)
+{
+    create_driver(true, true);
+
+    TriCameraInfo info = driver->get_sensor_info();
+    ASSERT_EQ(info.camera[0].image_width, 8);
+    ASSERT_EQ(info.camera[0].image_height, 6);
+
+    double last_timestamp = 0;
+    for (int i = 1; i <= 5; i++)
+    {
+        advance_robot_to(i * 100);
+        TriCameraObservation observation = driver->get_observation();
+
+        // every rendered frame is returned exactly once, in order
+        for (const CameraObservation& camera : observation.cameras)
+        {
+            ASSERT_EQ(camera.image.cols, 8);
+            ASSERT_EQ(camera.image.rows, 6);
+            ASSERT_EQ(camera.image.at<uint8_t>(0, 0), i) << "frame " << i;
+        }
+        ASSERT_GE(observation.cameras[0].timestamp, last_timestamp);
+        last_timestamp = observation.cameras[0].timestamp;
+    }
+}
+
+TEST_F(TestPyBulletTriCameraDriver, pipelined_render_exception)
+{
+    configure_fake_rendering(0.0, true);
+    create_driver(true, true);
+    advance_robot_to(100);
+
+    // the exception of the render thread is rethrown in the caller
+    ASSERT_THROW(driver->get_observation(), py::error_already_set);
+    // the render thread stopped, so subsequent calls fail as well instead of
+    // blocking forever
+    ASSERT_THROW(driver->get_observation(), py::error_already_set);
+}
+
+TEST_F(TestPyBulletTriCameraDriver, pipelined_destroy_during_render)
+{
+    configure_fake_rendering(0.3, false);
+    create_driver(true, true);
+    advance_robot_to(100);
+
+    ASSERT_TRUE(
+        [&]()
+        {
+            for (int i = 0; i < 200 && get_num_renders_started() == 0; i++)
+            {
+                std::this_thread::sleep_for(10ms);
+            }
+            return get_num_renders_started() > 0;
+        }())
+        << "Rendering did not start.";
+
+    // The render thread needs the GIL to finish the frame, so this dead-locks
+    // if the destructor does not release it while joining.
+    py::gil_scoped_acquire acquire;
+    double duration_s = measure_duration_s([&]() { driver.reset(); });
+    EXPECT_LT(duration_s, 5.0);
+}
+
+TEST_F(TestPyBulletTriCameraDriver, pipelined_destroy_while_waiting)
+{
+    create_driver(true, true);
+
+    // The first frame is handed over, the render thread then waits for the
+    // robot to reach the next frame, which never happens.
+    advance_robot_to(150);
+    driver->get_observation();
+    {
+        py::gil_scoped_acquire acquire;
+        double duration_s = measure_duration_s([&]() { driver.reset(); });
+        EXPECT_LT(duration_s, STALL_TIMEOUT_S + 5.0);
+    }
+
+    // The robot is far ahead, so the render thread renders the next frame
+    // right away and waits for it to be taken (which never happens).
+    create_driver(true, true);
+    advance_robot_to(10000);
+    driver->get_observation();
+    std::this_thread::sleep_for(100ms);
+    {
+        py::gil_scoped_acquire acquire;
+        double duration_s = measure_duration_s([&]() { driver.reset(); });
+        EXPECT_LT(duration_s, 5.0);
+    }
+}
@@ -28,13 +28,26 @@ TEST(TestSettings, load_env_no_file)
     unsetenv(std::string(Settings::ENV_VARIABLE_CONFIG_FILE).c_str());
     Settings s;
 
+    auto camera_observation_settings = s.get_camera_observation_settings();
     auto pylon_driver_settings = s.get_pylon_driver_settings();
     auto tricamera_driver_settings = s.get_tricamera_driver_settings();
+    auto pybullet_driver_settings = s.get_pybullet_tricamera_driver_settings();
+    ASSERT_THAT(camera_observation_settings, NotNull());
     ASSERT_THAT(pylon_driver_settings, NotNull());
     ASSERT_THAT(tricamera_driver_settings, NotNull());
+    ASSERT_THAT(pybullet_driver_settings, NotNull());
+    EXPECT_EQ(camera_observation_settings->image_width, 540);
+    EXPECT_EQ(camera_observation_settings->image_height, 540);
+    EXPECT_FLOAT_EQ(camera_observation_settings->compressed_capacity_ratio,
+                    1.0);
+    EXPECT_EQ(camera_observation_settings->preview_image_width, 180);
+    EXPECT_EQ(camera_observation_settings->preview_image_height, 180);
     EXPECT_TRUE(ends_with(pylon_driver_settings->pylon_settings_file,
                           "config/pylon_camera_settings.txt"));
     EXPECT_FLOAT_EQ(tricamera_driver_settings->frame_rate_fps, 10.);
+    EXPECT_FLOAT_EQ(pybullet_driver_settings->robot_stall_timeout_s, 0.1);
+    EXPECT_FALSE(pybullet_driver_settings->pipelined_rendering);
+    EXPECT_FALSE(pybullet_driver_settings->multi_process_rendering);
 }
 
 TEST(TestSettings, load_env_file_with_full_config)
@@ -42,12 +55,24 @@ TEST(TestSettings, load_env_file_with_full_config)
     std::string tmpfile = std::tmpnam(nullptr);
     std::ofstream out(tmpfile);
     out << R"TOML(
+[camera_observation]
+image_width = 320
+image_height = 240
+compressed_capacity_ratio = 0.6
+preview_image_width = 160
+preview_image_height = 120
+
 [pylon_driver]
 pylon_settings_file = "path/to/file.txt"
 
 [tricamera_driver]
 frame_rate_fps = 42.1
 
+[pybullet_tricamera_driver]
+robot_stall_timeout_s = 0.5
+pipelined_rendering = true
+multi_process_rendering = true
+
 [unrelated_section]
 should_not_harm = true
 )TOML";
@@ -58,12 +83,25 @@ should_not_harm = true
            true);
     Settings s;
 
+    auto camera_observation_settings = s.get_camera_observation_settings();
     auto pylon_driver_settings = s.get_pylon_driver_settings();
     auto tricamera_driver_settings = s.get_tricamera_driver_settings();
+    auto pybullet_driver_settings = s.get_pybullet_tricamera_driver_settings();
+    ASSERT_THAT(camera_observation_settings, NotNull());
     ASSERT_THAT(pylon_driver_settings, NotNull());
     ASSERT_THAT(tricamera_driver_settings, NotNull());
+    ASSERT_THAT(pybullet_driver_settings, NotNull());
+    EXPECT_EQ(camera_observation_settings->image_width, 320);
+    EXPECT_EQ(camera_observation_settings->image_height, 240);
+    EXPECT_FLOAT_EQ(camera_observation_settings->compressed_capacity_ratio,
+                    0.6);
+    EXPECT_EQ(camera_observation_settings->preview_image_width, 160);
+    EXPECT_EQ(camera_observation_settings->preview_image_height, 120);
     EXPECT_EQ(pylon_driver_settings->pylon_settings_file, "path/to/file.txt");
     EXPECT_FLOAT_EQ(tricamera_driver_settings->frame_rate_fps, 42.1);
+    EXPECT_FLOAT_EQ(pybullet_driver_settings->robot_stall_timeout_s, 0.5);
+    EXPECT_TRUE(pybullet_driver_settings->pipelined_rendering);
+    EXPECT_TRUE(pybullet_driver_settings->multi_process_rendering);
 
     std::remove(tmpfile.c_str());
 }
@@ -77,13 +115,26 @@ TEST(TestSettings, load_file_without_config)
 
     Settings s(tmpfile);
 
+    auto camera_observation_settings = s.get_camera_observation_settings();
     auto pylon_driver_settings = s.get_pylon_driver_settings();
     auto tricamera_driver_settings = s.get_tricamera_driver_settings();
+    auto pybullet_driver_settings = s.get_pybullet_tricamera_driver_settings();
+    ASSERT_THAT(camera_observation_settings, NotNull());
     ASSERT_THAT(pylon_driver_settings, NotNull());
     ASSERT_THAT(tricamera_driver_settings, NotNull());
+    ASSERT_THAT(pybullet_driver_settings, NotNull());
+    EXPECT_EQ(camera_observation_settings->image_width, 540);
+    EXPECT_EQ(camera_observation_settings->image_height, 540);
+    EXPECT_FLOAT_EQ(camera_observation_settings->compressed_capacity_ratio,
+                    1.0);
+    EXPECT_EQ(camera_observation_settings->preview_image_width, 180);
+    EXPECT_EQ(camera_observation_settings->preview_image_height, 180);
     EXPECT_TRUE(ends_with(pylon_driver_settings->pylon_settings_file,
                           "config/pylon_camera_settings.txt"));
     EXPECT_FLOAT_EQ(tricamera_driver_settings->frame_rate_fps, 10.0);
+    EXPECT_FLOAT_EQ(pybullet_driver_settings->robot_stall_timeout_s, 0.1);
+    EXPECT_FALSE(pybullet_driver_settings->pipelined_rendering);
+    EXPECT_FALSE(pybullet_driver_settings->multi_process_rendering);
 
     std::remove(tmpfile.c_str());
 }
@@ -93,12 +144,24 @@ TEST(TestSettings, load_file_with_full_config)
     std::string tmpfile = std::tmpnam(nullptr);
     std::ofstream out(tmpfile);
     out << R"TOML(
+[camera_observation]
+image_width = 320
+image_height = 240
+compressed_capacity_ratio = 0.6
+preview_image_width = 160
+preview_image_height = 120
+
 [pylon_driver]
 pylon_settings_file = "path/to/file.txt"
 
 [tricamera_driver]
 frame_rate_fps = 42.1
 
+[pybullet_tricamera_driver]
+robot_stall_timeout_s = 0.5
+pipelined_rendering = true
+multi_process_rendering = true
+
 [unrelated_section]
 should_not_harm = true
 )TOML";
@@ -106,12 +169,25 @@ should_not_harm = true
 
     Settings s(tmpfile);
 
+    auto camera_observation_settings = s.get_camera_observation_settings();
     auto pylon_driver_settings = s.get_pylon_driver_settings();
     auto tricamera_driver_settings = s.get_tricamera_driver_settings();
+    auto pybullet_driver_settings = s.get_pybullet_tricamera_driver_settings();
+    ASSERT_THAT(camera_observation_settings, NotNull());
     ASSERT_THAT(pylon_driver_settings, NotNull());
     ASSERT_THAT(tricamera_driver_settings, NotNull());
+    ASSERT_THAT(pybullet_driver_settings, NotNull());
+    EXPECT_EQ(camera_observation_settings->image_width, 320);
+    EXPECT_EQ(camera_observation_settings->image_height, 240);
+    EXPECT_FLOAT_EQ(camera_observation_settings->compressed_capacity_ratio,
+                    0.6);
+    EXPECT_EQ(camera_observation_settings->preview_image_width, 160);
+    EXPECT_EQ(camera_observation_settings->preview_image_height, 120);
     EXPECT_EQ(pylon_driver_settings->pylon_settings_file, "path/to/file.txt");
     EXPECT_FLOAT_EQ(tricamera_driver_settings->frame_rate_fps, 42.1);
+    EXPECT_FLOAT_EQ(pybullet_driver_settings->robot_stall_timeout_s, 0.5);
+    EXPECT_TRUE(pybullet_driver_settings->pipelined_rendering);
+    EXPECT_TRUE(pybullet_driver_settings->multi_process_rendering);
 
     std::remove(tmpfile.c_str());
 }
@@ -131,12 +207,25 @@ pylon_settings_file = "path/to/file.txt"
 
     Settings s(tmpfile);
 
+    auto camera_observation_settings = s.get_camera_observation_settings();
     auto pylon_driver_settings = s.get_pylon_driver_settings();
     auto tricamera_driver_settings = s.get_tricamera_driver_settings();
+    auto pybullet_driver_settings = s.get_pybullet_tricamera_driver_settings();
+    ASSERT_THAT(camera_observation_settings, NotNull());
     ASSERT_THAT(pylon_driver_settings, NotNull());
     ASSERT_THAT(tricamera_driver_settings, NotNull());
+    ASSERT_THAT(pybullet_driver_settings, NotNull());
+    EXPECT_EQ(camera_observation_settings->image_width, 540);
+    EXPECT_EQ(camera_observation_settings->image_height, 540);
+    EXPECT_FLOAT_EQ(camera_observation_settings->compressed_capacity_ratio,
+                    1.0);
+    EXPECT_EQ(camera_observation_settings->preview_image_width, 180);
+    EXPECT_EQ(camera_observation_settings->preview_image_height, 180);
     EXPECT_EQ(pylon_driver_settings->pylon_settings_file, "path/to/file.txt");
     EXPECT_FLOAT_EQ(tricamera_driver_settings->frame_rate_fps, 10.0);
+    EXPECT_FLOAT_EQ(pybullet_driver_settings->robot_stall_timeout_s, 0.1);
+    EXPECT_FALSE(pybullet_driver_settings->pipelined_rendering);
+    EXPECT_FALSE(pybullet_driver_settings->multi_process_rendering);
 
     std::remove(tmpfile.c_str());
 }
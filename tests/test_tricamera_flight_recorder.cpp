@@ -0,0 +1,116 @@
+/**
+ * @file
+ * @brief Tests for TriCameraFlightRecorder
+ * @copyright Copyright (c) 2020, Max Planck Gesellschaft.
+ */
+#include <filesystem>
+
+#include <gtest/gtest.h>
+#include <trifinger_cameras/tricamera_flight_recorder.hpp>
+
+#include "tricamera_logger_test_helpers.hpp"
+
+using namespace trifinger_cameras;
+using namespace trifinger_cameras::test;
+
+class TestTriCameraFlightRecorder : public TriCameraDataTest
+{
+protected:
+    std::filesystem::path filename;
+
+    void SetUp() override
+    {
+        TriCameraDataTest::SetUp();
+
+        filename = std::filesystem::temp_directory_path() /
+                   "test_tricamera_flight_recorder.hdf5";
+    }
+
+    void TearDown() override
+    {
+        std::filesystem::remove(filename);
+    }
+
+    //! Wait until the recorder processed the given number of observations.
+    ::testing::AssertionResult wait_for_recorder(
+        const TriCameraFlightRecorder &recorder, size_t num_frames)
+    {
+        return wait_until(
+            [&]()
+            {
+                return recorder.get_num_recorded_frames() >= num_frames;
+            },
+            "the recorder to get the observations");
+    }
+};
+
+TEST_F(TestTriCameraFlightRecorder, ring_buffer)
+{
+    TriCameraFlightRecorder recorder(data, 2.0);
+    const double now = get_current_time();
+
+    append_observation(now - 5.0);
+    append_observation(now - 4.0);
+    append_observation(now - 1.5);
+    append_observation(now);
+
+    ASSERT_TRUE(wait_for_recorder(recorder, 4));
+    // observations older than 2 s (relative to the newest) are dropped
+    ASSERT_EQ(recorder.get_num_buffered_frames(), 2);
+}
+
+TEST_F(TestTriCameraFlightRecorder, dump_pre_trigger)
+{
+    TriCameraFlightRecorder recorder(data, 10.0);
+    const double now = get_current_time();
+
+    append_observation(now - 4.0);
+    append_observation(now - 2.0);
+    append_observation(now - 1.0);
+    append_observation(now);
+    ASSERT_TRUE(wait_for_recorder(recorder, 4));
+
+    TriCameraLogSaveHandle handle =
+        recorder.trigger_dump(filename.string(), 2.5, 0.0);
+    handle.get();
+
+    ASSERT_EQ(handle.get_num_frames(), 3);
+    ASSERT_EQ(handle.get_num_frames_written(), 3);
+    ASSERT_DOUBLE_EQ(handle.get_progress(), 1.0);
+    ASSERT_EQ(get_num_frames_in_file(filename), 3);
+}
+
+TEST_F(TestTriCameraFlightRecorder, dump_post_trigger)
+{
+    TriCameraFlightRecorder recorder(data, 10.0);
+    const double now = get_current_time();
+
+    append_observation(now - 1.0);
+    ASSERT_TRUE(wait_for_recorder(recorder, 1));
+
+    TriCameraLogSaveHandle handle =
+        recorder.trigger_dump(filename.string(), 0.0, 1.0);
+
+    append_observation(now + 0.5);
+    ASSERT_TRUE(wait_for_recorder(recorder, 2));
+    // not complete before an observation after the post-trigger duration
+    // arrives
+    ASSERT_FALSE(handle.wait(0.2));
+
+    append_observation(now + 2.0);
+    handle.get();
+
+    ASSERT_EQ(handle.get_num_frames(), 1);
+    ASSERT_EQ(get_num_frames_in_file(filename), 1);
+}
+
+TEST_F(TestTriCameraFlightRecorder, invalid_arguments)
+{
+    TriCameraFlightRecorder recorder(data, 1.0);
+
+    ASSERT_THROW(recorder.trigger_dump(filename.string(), 2.0, 0.0),
+                 std::invalid_argument);
+    ASSERT_THROW(recorder.trigger_dump(filename.string(), -1.0, 0.0),
+                 std::invalid_argument);
+    ASSERT_THROW(TriCameraFlightRecorder(data, 0.0), std::invalid_argument);
+}
@@ -0,0 +1,170 @@
+/**
+ * @file
+ * @brief Tests for TriCameraLogStreamReader
+ * @copyright Copyright (c) 2020, Max Planck Gesellschaft.
+ */
+#include <filesystem>
+#include <fstream>
+#include <vector>
+
+#include <cereal/archives/binary.hpp>
+#include <cereal/types/array.hpp>
+#include <cereal/types/tuple.hpp>
+#include <cereal/types/vector.hpp>
+#include <gtest/gtest.h>
+#include <trifinger_cameras/tricamera_log_stream_reader.hpp>
+
+#include "tricamera_logger_test_helpers.hpp"
+
+using namespace trifinger_cameras;
+using namespace trifinger_cameras::test;
+
+class TestTriCameraLogStreamReader : public TriCameraDataTest
+{
+protected:
+    static constexpr int NUM_FRAMES = 4;
+
+    std::filesystem::path filename;
+
+    void SetUp() override
+    {
+        TriCameraDataTest::SetUp();
+
+        filename = std::filesystem::temp_directory_path() /
+                   "test_tricamera_log_stream_reader.dat";
+    }
+
+    void TearDown() override
+    {
+        std::filesystem::remove(filename);
+    }
+
+    //! Write a gzip-compressed log with the SensorLogger.
+    void write_compressed_log()
+    {
+        InspectableTriCameraLogger logger(data, NUM_FRAMES);
+        logger.start();
+        for (int i = 0; i < NUM_FRAMES; i++)
+        {
+            append_observation(100.0 + i, i + 1);
+        }
+        ASSERT_TRUE(wait_until(
+            [&]()
+            {
+                return logger.get_num_logged_frames() == NUM_FRAMES;
+            },
+            "the logger to get the observations"));
+        logger.stop_and_save(filename.string());
+    }
+
+    /**
+     * @brief Write an uncompressed log.
+     *
+     * The SensorLogger always compresses, so the log is written here in the
+     * same format without the gzip layer.
+     */
+    void write_uncompressed_log()
+    {
+        std::vector<StampedTriCameraObservation> observations;
+        for (int i = 0; i < NUM_FRAMES; i++)
+        {
+            TriCameraObservation observation(info);
+            for (auto &camera : observation.cameras)
+            {
+                camera.image.setTo(i + 1);
+                camera.timestamp = 100.0 + i;
+            }
+            observations.emplace_back(1000.0 + i, observation);
+        }
+
+        std::ofstream file(filename, std::ios::binary);
+        cereal::BinaryOutputArchive archive(file);
+        archive(TriCameraLogStreamReader::FORMAT_VERSION, observations);
+    }
+
+    //! Check that read() and read_timestamps() give the written data.
+    void check_log(bool expect_compressed)
+    {
+        TriCameraLogStreamReader reader(filename.string());
+        TriCameraLogStreamReader timestamps_reader(filename.string());
+
+        ASSERT_EQ(reader.is_compressed(), expect_compressed);
+        ASSERT_EQ(reader.size(), NUM_FRAMES);
+        ASSERT_EQ(timestamps_reader.size(), NUM_FRAMES);
+
+        for (int i = 0; i < NUM_FRAMES; i++)
+        {
+            StampedTriCameraObservation observation = reader.read();
+            TriCameraLogStreamReader::Timestamps timestamps =
+                timestamps_reader.read_timestamps();
+
+            ASSERT_DOUBLE_EQ(timestamps.timeseries_timestamp,
+                             std::get<0>(observation));
+            for (int i_cam = 0; i_cam < 3; i_cam++)
+            {
+                const CameraObservation &camera =
+                    std::get<1>(observation).cameras[i_cam];
+                ASSERT_DOUBLE_EQ(camera.timestamp, 100.0 + i);
+                ASSERT_DOUBLE_EQ(timestamps.camera_timestamps[i_cam],
+                                 100.0 + i);
+
+                ASSERT_EQ(camera.image.cols, 40);
+                ASSERT_EQ(camera.image.rows, 30);
+                ASSERT_EQ(cv::countNonZero(camera.image != i + 1), 0);
+            }
+
+            ASSERT_EQ(reader.num_read(), i + 1);
+            ASSERT_EQ(timestamps_reader.num_read(), i + 1);
+            ASSERT_EQ(reader.get_image_size(), (std::array<int, 2>{40, 30}));
+            ASSERT_EQ(timestamps_reader.get_image_size(),
+                      (std::array<int, 2>{40, 30}));
+        }
+
+        ASSERT_THROW(reader.read(), std::out_of_range);
+        ASSERT_THROW(timestamps_reader.read_timestamps(), std::out_of_range);
+    }
+};
+
+TEST_F(TestTriCameraLogStreamReader, compressed)
+{
+    ASSERT_NO_FATAL_FAILURE(write_compressed_log());
+    check_log(true);
+}
+
+TEST_F(TestTriCameraLogStreamReader, uncompressed)
+{
+    write_uncompressed_log();
+    check_log(false);
+}
+
+TEST_F(TestTriCameraLogStreamReader, read_tricamera_log_timestamps)
+{
+    write_uncompressed_log();
+
+    std::vector<double> timeseries_timestamps;
+    std::vector<std::array<double, 3>> camera_timestamps;
+    read_tricamera_log_timestamps(
+        filename.string(), &timeseries_timestamps, &camera_timestamps);
+
+    ASSERT_EQ(timeseries_timestamps.size(), NUM_FRAMES);
+    ASSERT_EQ(camera_timestamps.size(), NUM_FRAMES);
+    for (int i = 0; i < NUM_FRAMES; i++)
+    {
+        ASSERT_DOUBLE_EQ(timeseries_timestamps[i], 1000.0 + i);
+        ASSERT_DOUBLE_EQ(camera_timestamps[i][2], 100.0 + i);
+    }
+}
+
+TEST_F(TestTriCameraLogStreamReader, invalid_file)
+{
+    ASSERT_THROW(TriCameraLogStreamReader("/nonexistent/log.dat"),
+                 std::runtime_error);
+
+    {
+        std::ofstream file(filename, std::ios::binary);
+        cereal::BinaryOutputArchive archive(file);
+        archive(std::uint32_t(1));
+    }
+    ASSERT_THROW(TriCameraLogStreamReader(filename.string()),
+                 std::runtime_error);
+}
@@ -0,0 +1,145 @@
+/**
+ * @file
+ * @brief Tests for convert_tricamera_log_to_hdf5
+ * @copyright Copyright (c) 2020, Max Planck Gesellschaft.
+ */
+#include <algorithm>
+#include <filesystem>
+#include <string>
+#include <vector>
+
+#include <gtest/gtest.h>
+#include <opencv2/hdf/hdf5.hpp>
+#include <trifinger_cameras/tricamera_log_to_hdf5.hpp>
+
+#include "tricamera_logger_test_helpers.hpp"
+
+using namespace trifinger_cameras;
+using namespace trifinger_cameras::test;
+
+class TestTriCameraLogToHDF5 : public TriCameraDataTest
+{
+protected:
+    static constexpr int NUM_FRAMES = 5;
+
+    std::filesystem::path output_dir;
+    std::filesystem::path log_file, reference_file, converted_file;
+
+    void SetUp() override
+    {
+        TriCameraDataTest::SetUp();
+
+        output_dir = std::filesystem::temp_directory_path() /
+                     "test_tricamera_log_to_hdf5";
+        std::filesystem::create_directories(output_dir);
+        log_file = output_dir / "log.dat";
+        reference_file = output_dir / "reference.hdf5";
+        converted_file = output_dir / "converted.hdf5";
+    }
+
+    void TearDown() override
+    {
+        std::filesystem::remove_all(output_dir);
+    }
+
+    /**
+     * @brief Record the same observations to a binary and a HDF5 log.
+     *
+     * The binary log is written with SensorLogger::stop_and_save, the HDF5
+     * file with TriCameraLogger::stop_and_save_hdf5.  The images are random,
+     * so each camera has different content.
+     */
+    void record_logs()
+    {
+        InspectableTriCameraLogger binary_logger(data, NUM_FRAMES);
+        InspectableTriCameraLogger hdf5_logger(data, NUM_FRAMES);
+        binary_logger.start();
+        hdf5_logger.start();
+
+        cv::RNG rng(42);
+        for (int i = 0; i < NUM_FRAMES; i++)
+        {
+            TriCameraObservation observation(info);
+            for (size_t i_cam = 0; i_cam < observation.cameras.size(); i_cam++)
+            {
+                rng.fill(
+                    observation.cameras[i_cam].image, cv::RNG::UNIFORM, 0, 256);
+                observation.cameras[i_cam].timestamp = 100.0 + i + 0.01 * i_cam;
+            }
+            data->observation->append(observation);
+        }
+
+        ASSERT_TRUE(wait_until(
+            [&]()
+            {
+                return binary_logger.get_num_logged_frames() == NUM_FRAMES &&
+                       hdf5_logger.get_num_logged_frames() == NUM_FRAMES;
+            },
+            "the loggers to get the observations"));
+
+        binary_logger.stop_and_save(log_file.string());
+        hdf5_logger.stop_and_save_hdf5(reference_file.string());
+    }
+
+    //! Check that the dataset is the same in the reference and converted file.
+    void expect_same_dataset(const std::string &dslabel)
+    {
+        cv::Ptr<cv::hdf::HDF5> reference_h5 = cv::hdf::open(reference_file);
+        cv::Ptr<cv::hdf::HDF5> converted_h5 = cv::hdf::open(converted_file);
+
+        EXPECT_EQ(reference_h5->dsgetsize(dslabel),
+                  converted_h5->dsgetsize(dslabel))
+            << dslabel;
+
+        cv::Mat reference, converted;
+        reference_h5->dsread(reference, dslabel);
+        converted_h5->dsread(converted, dslabel);
+        reference_h5->close();
+        converted_h5->close();
+
+        ASSERT_EQ(reference.type(), converted.type()) << dslabel;
+        ASSERT_EQ(reference.total(), converted.total()) << dslabel;
+        EXPECT_TRUE(std::equal(
+            reference.datastart, reference.dataend, converted.datastart))
+            << dslabel << " differs";
+    }
+};
+
+TEST_F(TestTriCameraLogToHDF5, same_as_logger)
+{
+    ASSERT_NO_FATAL_FAILURE(record_logs());
+
+    size_t last_progress = 0;
+    convert_tricamera_log_to_hdf5(log_file.string(),
+                                  converted_file.string(),
+                                  info,
+                                  2,
+                                  [&](size_t num_written, size_t num_frames)
+                                  {
+                                      EXPECT_EQ(num_frames, NUM_FRAMES);
+                                      EXPECT_EQ(num_written, last_progress + 1);
+                                      last_progress = num_written;
+                                  });
+    ASSERT_EQ(last_progress, NUM_FRAMES);
+
+    // The images are read through the gzip filter of the HDF5 library, so
+    // this also checks that the pre-compressed chunks match the chunk layout
+    // and filters of the dataset.
+    expect_same_dataset(TRICAMERA_HDF5_DS_IMAGES);
+    expect_same_dataset(TRICAMERA_HDF5_DS_CAMERA_TIMESTAMPS);
+    expect_same_dataset(TRICAMERA_HDF5_DS_TIMESERIES_TIMESTAMPS);
+}
+
+TEST_F(TestTriCameraLogToHDF5, wrong_image_size)
+{
+    ASSERT_NO_FATAL_FAILURE(record_logs());
+
+    TriCameraInfo wrong_info = info;
+    for (auto &camera_info : wrong_info.camera)
+    {
+        camera_info.image_width = 20;
+    }
+    ASSERT_THROW(convert_tricamera_log_to_hdf5(
+                     log_file.string(), converted_file.string(), wrong_info),
+                 std::runtime_error);
+}
@@ -0,0 +1,183 @@
+/**
+ * @file
+ * @brief Tests for TriCameraLogger
+ * @copyright Copyright (c) 2020, Max Planck Gesellschaft.
+ */
+#include <filesystem>
+#include <string>
+#include <vector>
+
+#include <gtest/gtest.h>
+#include <trifinger_cameras/tricamera_logger.hpp>
+
+#include "tricamera_logger_test_helpers.hpp"
+
+using namespace trifinger_cameras;
+using namespace trifinger_cameras::test;
+
+class TestTriCameraLogger : public TriCameraDataTest
+{
+protected:
+    std::vector<std::filesystem::path> filenames;
+
+    void SetUp() override
+    {
+        TriCameraDataTest::SetUp();
+
+        for (int i = 0; i < 2; i++)
+        {
+            filenames.push_back(
+                std::filesystem::temp_directory_path() /
+                ("test_tricamera_logger_" + std::to_string(i) + ".hdf5"));
+        }
+    }
+
+    void TearDown() override
+    {
+        for (const auto &filename : filenames)
+        {
+            std::filesystem::remove(filename);
+        }
+    }
+
+    void append_observations(int n)
+    {
+        for (int i = 0; i < n; i++)
+        {
+            append_observation(i);
+        }
+    }
+
+    //! Wait until the logger has logged the given number of frames.
+    ::testing::AssertionResult wait_for_logger(
+        const InspectableTriCameraLogger &logger, size_t num_frames)
+    {
+        return wait_until(
+            [&]()
+            {
+                return logger.get_num_logged_frames() >= num_frames;
+            },
+            "the logger to get the observations");
+    }
+};
+
+TEST_F(TestTriCameraLogger, bytes_per_frame)
+{
+    size_t bytes = TriCameraLogger::get_bytes_per_frame(info);
+    ASSERT_GE(bytes, 3 * 40 * 30);
+    // overhead should be small compared to the image data
+    ASSERT_LT(bytes, 3 * 40 * 30 + 1000);
+}
+
+TEST_F(TestTriCameraLogger, memory_budget)
+{
+    size_t bytes_per_frame = TriCameraLogger::get_bytes_per_frame(info);
+    TriCameraLogger logger(
+        data, TriCameraLogger::MemoryBudget{10 * bytes_per_frame + 1});
+
+    auto usage = logger.get_buffer_usage();
+    ASSERT_EQ(usage.capacity_frames, 10);
+    ASSERT_EQ(usage.bytes_capacity, 10 * bytes_per_frame);
+    ASSERT_EQ(usage.num_frames, 0);
+    ASSERT_EQ(usage.bytes_used, 0);
+    ASSERT_EQ(usage.fill_level, 0.0);
+}
+
+TEST_F(TestTriCameraLogger, memory_budget_too_small)
+{
+    ASSERT_THROW(TriCameraLogger(data, TriCameraLogger::MemoryBudget{100}),
+                 std::invalid_argument);
+}
+
+TEST_F(TestTriCameraLogger, buffer_usage)
+{
+    size_t bytes_per_frame = TriCameraLogger::get_bytes_per_frame(info);
+    TriCameraLogger logger(data, 4);
+
+    logger.start();
+    append_observations(2);
+
+    auto usage = logger.get_buffer_usage();
+    ASSERT_EQ(usage.num_frames, 2);
+    ASSERT_DOUBLE_EQ(usage.fill_level, 0.5);
+    ASSERT_EQ(usage.bytes_used, 2 * bytes_per_frame);
+    ASSERT_EQ(usage.frames_dropped, 0);
+
+    append_observations(4);
+    usage = logger.get_buffer_usage();
+    ASSERT_EQ(usage.num_frames, 4);
+    ASSERT_DOUBLE_EQ(usage.fill_level, 1.0);
+    ASSERT_EQ(usage.frames_dropped, 2);
+
+    // frames arriving after stop are not counted
+    logger.stop();
+    append_observations(3);
+    usage = logger.get_buffer_usage();
+    ASSERT_EQ(usage.num_frames, 4);
+    ASSERT_EQ(usage.frames_dropped, 2);
+}
+
+TEST_F(TestTriCameraLogger, stop_and_save_hdf5_async)
+{
+    InspectableTriCameraLogger logger(data, 10);
+
+    logger.start();
+    append_observations(3);
+    ASSERT_TRUE(wait_for_logger(logger, 3));
+
+    TriCameraLogSaveHandle handle =
+        logger.stop_and_save_hdf5_async(filenames[0].string());
+    ASSERT_EQ(handle.get_filename(), filenames[0].string());
+    ASSERT_EQ(handle.get_num_frames(), 3);
+    // the logger gets a fresh buffer right away
+    ASSERT_EQ(logger.get_num_logged_frames(), 0);
+    ASSERT_EQ(logger.get_buffer_usage().num_frames, 0);
+
+    ASSERT_TRUE(handle.wait());
+    ASSERT_TRUE(handle.is_done());
+    ASSERT_NO_THROW(handle.get());
+    ASSERT_EQ(handle.get_num_frames_written(), 3);
+    ASSERT_DOUBLE_EQ(handle.get_progress(), 1.0);
+    ASSERT_EQ(get_num_frames_in_file(filenames[0]), 3);
+}
+
+TEST_F(TestTriCameraLogger, overlapping_async_saves)
+{
+    InspectableTriCameraLogger logger(data, 10);
+
+    // start the next recording while the first one is still being saved
+    logger.start();
+    append_observations(4);
+    ASSERT_TRUE(wait_for_logger(logger, 4));
+    TriCameraLogSaveHandle handle1 =
+        logger.stop_and_save_hdf5_async(filenames[0].string());
+
+    logger.start();
+    append_observations(2);
+    ASSERT_TRUE(wait_for_logger(logger, 2));
+    TriCameraLogSaveHandle handle2 =
+        logger.stop_and_save_hdf5_async(filenames[1].string());
+
+    logger.wait_for_pending_saves();
+    ASSERT_TRUE(handle1.is_done());
+    ASSERT_TRUE(handle2.is_done());
+    handle1.get();
+    handle2.get();
+
+    ASSERT_EQ(get_num_frames_in_file(filenames[0]), 4);
+    // the second recording may start with the newest observation of the first
+    ASSERT_GE(handle2.get_num_frames(), 2);
+    ASSERT_EQ(get_num_frames_in_file(filenames[1]), handle2.get_num_frames());
+
+    // nothing pending anymore
+    logger.wait_for_pending_saves();
+}
+
+TEST_F(TestTriCameraLogger, stop_and_save_hdf5_async_empty)
+{
+    TriCameraLogger logger(data, 10);
+
+    ASSERT_THROW(logger.stop_and_save_hdf5_async(filenames[0].string()),
+                 std::runtime_error);
+    ASSERT_FALSE(std::filesystem::exists(filenames[0]));
+}
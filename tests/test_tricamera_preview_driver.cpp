@@ -0,0 +1,78 @@
+/**
+ * @file
+ * @brief Tests for TriCameraPreviewDriver
+ * @copyright Copyright (c) 2020, Max Planck Gesellschaft.
+ */
+#include <memory>
+
+#include <gtest/gtest.h>
+#include <robot_interfaces/sensors/sensor_data.hpp>
+#include <trifinger_cameras/tricamera_preview_driver.hpp>
+
+using namespace trifinger_cameras;
+
+typedef robot_interfaces::SingleProcessSensorData<TriCameraObservation,
+                                                  TriCameraInfo>
+    FullData;
+
+TEST(TestTriCameraPreviewDriver, get_observation)
+{
+    auto data = std::make_shared<FullData>();
+
+    CameraInfo camera_info;
+    camera_info.image_width = 400;
+    camera_info.image_height = 300;
+    TriCameraObservation obs(
+        TriCameraInfo(camera_info, camera_info, camera_info));
+    for (size_t i = 0; i < 3; i++)
+    {
+        obs.cameras[i].image.setTo(100);
+        obs.cameras[i].timestamp = 42.0 + i;
+    }
+    data->observation->append(obs);
+
+    TriCameraPreviewDriver driver(data);
+    TriCameraPreviewObservation preview = driver.get_observation();
+
+    const cv::Size preview_size =
+        TriCameraPreviewObservation::get_default_image_size();
+    for (size_t i = 0; i < 3; i++)
+    {
+        ASSERT_EQ(preview.cameras[i].timestamp, 42.0 + i);
+        ASSERT_EQ(preview.cameras[i].image.size(), preview_size);
+        ASSERT_EQ(preview.cameras[i].image.type(), CV_8UC3);
+        // uniform Bayer image results in uniform grey image
+        ASSERT_EQ(preview.cameras[i].image.at<cv::Vec3b>(10, 10),
+                  cv::Vec3b(100, 100, 100));
+    }
+}
+
+TEST(TestTriCameraPreviewDriver, get_sensor_info)
+{
+    auto data = std::make_shared<FullData>();
+
+    CameraInfo camera_info;
+    camera_info.image_width = 540;
+    camera_info.image_height = 270;
+    camera_info.camera_matrix << 500, 0, 270, 0, 400, 135, 0, 0, 1;
+    data->sensor_info->append(
+        TriCameraInfo(camera_info, camera_info, camera_info));
+
+    TriCameraPreviewDriver driver(data);
+    TriCameraInfo info = driver.get_sensor_info();
+
+    const cv::Size preview_size =
+        TriCameraPreviewObservation::get_default_image_size();
+    const double scale_x = preview_size.width / 540.0;
+    const double scale_y = preview_size.height / 270.0;
+    for (size_t i = 0; i < 3; i++)
+    {
+        ASSERT_EQ(info.camera[i].image_width, preview_size.width);
+        ASSERT_EQ(info.camera[i].image_height, preview_size.height);
+        ASSERT_DOUBLE_EQ(info.camera[i].camera_matrix(0, 0), 500 * scale_x);
+        ASSERT_DOUBLE_EQ(info.camera[i].camera_matrix(0, 2), 270 * scale_x);
+        ASSERT_DOUBLE_EQ(info.camera[i].camera_matrix(1, 1), 400 * scale_y);
+        ASSERT_DOUBLE_EQ(info.camera[i].camera_matrix(1, 2), 135 * scale_y);
+        ASSERT_DOUBLE_EQ(info.camera[i].camera_matrix(2, 2), 1);
+    }
+}
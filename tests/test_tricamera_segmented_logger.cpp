@@ -0,0 +1,194 @@
+/**
+ * @file
+ * @brief Tests for TriCameraSegmentedLogger
+ * @copyright Copyright (c) 2020, Max Planck Gesellschaft.
+ */
+#include <filesystem>
+#include <fstream>
+#include <sstream>
+
+#include <gtest/gtest.h>
+#include <trifinger_cameras/tricamera_segmented_logger.hpp>
+
+#include "tricamera_logger_test_helpers.hpp"
+
+using namespace trifinger_cameras;
+using namespace trifinger_cameras::test;
+
+class TestTriCameraSegmentedLogger : public TriCameraDataTest
+{
+protected:
+    std::filesystem::path output_dir;
+
+    void SetUp() override
+    {
+        TriCameraDataTest::SetUp();
+
+        output_dir = std::filesystem::temp_directory_path() /
+                     "test_tricamera_segmented_logger";
+        std::filesystem::create_directories(output_dir);
+    }
+
+    void TearDown() override
+    {
+        std::filesystem::remove_all(output_dir);
+    }
+
+    //! Wait until the logger recorded the given number of observations.
+    ::testing::AssertionResult wait_for_logger(
+        const TriCameraSegmentedLogger &logger, size_t num_frames)
+    {
+        return wait_until(
+            [&]()
+            {
+                return logger.get_num_recorded_frames() >= num_frames;
+            },
+            "the logger to get the observations");
+    }
+};
+
+TEST_F(TestTriCameraSegmentedLogger, split_by_duration)
+{
+    TriCameraSegmentedLogger logger(data, output_dir / "log.hdf5", 1.0, 0);
+    logger.start();
+
+    for (double timestamp : {10.0, 10.5, 11.0, 11.9, 12.2})
+    {
+        append_observation(timestamp);
+    }
+    ASSERT_TRUE(wait_for_logger(logger, 5));
+    logger.stop();
+
+    auto segments = logger.get_segments();
+    ASSERT_EQ(segments.size(), 3);
+
+    ASSERT_EQ(segments[0].filename, output_dir / "log_0000.hdf5");
+    ASSERT_EQ(segments[1].filename, output_dir / "log_0001.hdf5");
+    ASSERT_EQ(segments[2].filename, output_dir / "log_0002.hdf5");
+
+    // no frames are lost at the boundaries
+    ASSERT_EQ(segments[0].num_frames, 2);
+    ASSERT_EQ(segments[1].num_frames, 2);
+    ASSERT_EQ(segments[2].num_frames, 1);
+    ASSERT_DOUBLE_EQ(segments[0].first_timestamp, 10.0);
+    ASSERT_DOUBLE_EQ(segments[0].last_timestamp, 10.5);
+    ASSERT_DOUBLE_EQ(segments[1].first_timestamp, 11.0);
+    ASSERT_DOUBLE_EQ(segments[1].last_timestamp, 11.9);
+
+    for (const auto &segment : segments)
+    {
+        ASSERT_EQ(get_num_frames_in_file(segment.filename), segment.num_frames);
+    }
+    ASSERT_EQ(logger.get_num_dropped_frames(), 0);
+}
+
+TEST_F(TestTriCameraSegmentedLogger, split_by_size)
+{
+    // each observation has 3 * 40 * 30 = 3600 bytes of image data
+    TriCameraSegmentedLogger logger(data, output_dir / "log.hdf5", 0, 8000);
+    logger.start();
+
+    for (int i = 0; i < 5; i++)
+    {
+        append_observation(i);
+    }
+    ASSERT_TRUE(wait_for_logger(logger, 5));
+    logger.stop();
+
+    auto segments = logger.get_segments();
+    ASSERT_EQ(segments.size(), 3);
+    ASSERT_EQ(segments[0].num_frames, 2);
+    ASSERT_EQ(segments[1].num_frames, 2);
+    ASSERT_EQ(segments[2].num_frames, 1);
+}
+
+TEST_F(TestTriCameraSegmentedLogger, manifest)
+{
+    TriCameraSegmentedLogger logger(data, output_dir / "log.hdf5", 1.0, 0);
+    ASSERT_EQ(logger.get_manifest_path(), output_dir / "log_manifest.json");
+
+    logger.start();
+    append_observation(10.0);
+    append_observation(11.0);
+    ASSERT_TRUE(wait_for_logger(logger, 2));
+    logger.stop();
+
+    std::ifstream file(logger.get_manifest_path());
+    ASSERT_TRUE(file.good());
+    std::stringstream content;
+    content << file.rdbuf();
+
+    ASSERT_NE(content.str().find("\"complete\": true"), std::string::npos);
+    ASSERT_NE(content.str().find("\"file\": \"log_0000.hdf5\""),
+              std::string::npos);
+    ASSERT_NE(content.str().find("\"file\": \"log_0001.hdf5\""),
+              std::string::npos);
+}
+
+TEST_F(TestTriCameraSegmentedLogger, restart)
+{
+    TriCameraSegmentedLogger logger(data, output_dir / "log.hdf5", 1.0, 0);
+
+    logger.start();
+    append_observation(10.0);
+    append_observation(11.0);
+    append_observation(12.0);
+    ASSERT_TRUE(wait_for_logger(logger, 3));
+    logger.stop();
+    ASSERT_EQ(logger.get_segments().size(), 3);
+
+    // a new recording starts again with the first segment
+    logger.start();
+    ASSERT_TRUE(logger.get_segments().empty());
+    append_observation(12.3);
+    append_observation(12.6);
+    // the newest observation at the time of start is recorded as well
+    ASSERT_TRUE(wait_for_logger(logger, 3));
+    logger.stop();
+
+    auto segments = logger.get_segments();
+    ASSERT_EQ(segments.size(), 1);
+    ASSERT_EQ(segments[0].filename, output_dir / "log_0000.hdf5");
+    ASSERT_EQ(segments[0].num_frames, 3);
+    ASSERT_DOUBLE_EQ(segments[0].first_timestamp, 12.0);
+    ASSERT_EQ(get_num_frames_in_file(segments[0].filename), 3);
+    ASSERT_EQ(logger.get_num_recorded_frames(), 3);
+}
+
+TEST_F(TestTriCameraSegmentedLogger, bounded_write_queue)
+{
+    ASSERT_THROW(
+        TriCameraSegmentedLogger(data, output_dir / "log.hdf5", 1.0, 0, 0),
+        std::invalid_argument);
+
+    // one observation per segment and only one pending segment, so recording
+    // has to wait for the write thread
+    TriCameraSegmentedLogger logger(data, output_dir / "log.hdf5", 0, 3600, 1);
+    logger.start();
+
+    const size_t num_observations = 20;
+    for (size_t i = 0; i < num_observations; i++)
+    {
+        append_observation(i);
+    }
+    ASSERT_TRUE(wait_until(
+        [&]()
+        {
+            return logger.get_num_recorded_frames() +
+                       logger.get_num_dropped_frames() >=
+                   num_observations;
+        },
+        "the logger to get the observations"));
+    logger.stop();
+
+    // every observation is either written or counted as dropped
+    auto segments = logger.get_segments();
+    ASSERT_EQ(segments.size(), logger.get_num_recorded_frames());
+    ASSERT_EQ(logger.get_num_recorded_frames() +
+                  logger.get_num_dropped_frames(),
+              num_observations);
+    for (const auto &segment : segments)
+    {
+        ASSERT_EQ(get_num_frames_in_file(segment.filename), 1);
+    }
+}
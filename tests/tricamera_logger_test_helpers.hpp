@@ -0,0 +1,122 @@
+/**
+ * @file
+ * @brief Shared fixture and helpers for the tests of the TriCamera loggers.
+ * @copyright Copyright (c) 2020, Max Planck Gesellschaft.
+ */
+#pragma once
+
+#include <chrono>
+#include <filesystem>
+#include <functional>
+#include <memory>
+#include <string>
+#include <thread>
+#include <vector>
+
+#include <gtest/gtest.h>
+#include <opencv2/hdf/hdf5.hpp>
+#include <robot_interfaces/sensors/sensor_data.hpp>
+#include <trifinger_cameras/tricamera_logger.hpp>
+
+namespace trifinger_cameras
+{
+namespace test
+{
+typedef robot_interfaces::SingleProcessSensorData<TriCameraObservation,
+                                                  TriCameraInfo>
+    TriCameraData;
+
+//! Logger that gives access to the size of the buffer.
+class InspectableTriCameraLogger : public TriCameraLogger
+{
+public:
+    using TriCameraLogger::TriCameraLogger;
+
+    size_t get_num_logged_frames() const
+    {
+        return buffer_.size();
+    }
+};
+
+//! Current time in the clock of the camera timestamps.
+inline double get_current_time()
+{
+    return std::chrono::duration<double>(
+               std::chrono::system_clock::now().time_since_epoch())
+        .count();
+}
+
+/**
+ * @brief Poll the condition until it is true (for at most 2 seconds).
+ *
+ * Use with ASSERT_TRUE to wait for background threads.
+ *
+ * @param condition Condition that is polled.
+ * @param description Description of the condition for the failure message.
+ */
+inline ::testing::AssertionResult wait_until(
+    const std::function<bool()> &condition, const std::string &description)
+{
+    for (int i = 0; i < 200; i++)
+    {
+        if (condition())
+        {
+            return ::testing::AssertionSuccess();
+        }
+        std::this_thread::sleep_for(std::chrono::milliseconds(10));
+    }
+    return ::testing::AssertionFailure()
+           << "Timeout while waiting for " << description;
+}
+
+//! Number of frames in the given TriCamera HDF5 file.
+inline int get_num_frames_in_file(const std::filesystem::path &filename)
+{
+    cv::Ptr<cv::hdf::HDF5> h5io = cv::hdf::open(filename);
+    std::vector<int> dims = h5io->dsgetsize(TRICAMERA_HDF5_DS_IMAGES);
+    h5io->close();
+    return dims[0];
+}
+
+/**
+ * @brief Fixture providing single-process sensor data with small images.
+ *
+ * The sensor info (40x30 images for all cameras) is already set.
+ */
+class TriCameraDataTest : public ::testing::Test
+{
+protected:
+    std::shared_ptr<TriCameraData> data;
+    TriCameraInfo info;
+
+    void SetUp() override
+    {
+        data = std::make_shared<TriCameraData>();
+
+        CameraInfo camera_info;
+        camera_info.image_width = 40;
+        camera_info.image_height = 30;
+        info = TriCameraInfo(camera_info, camera_info, camera_info);
+        data->sensor_info->append(info);
+    }
+
+    /**
+     * @brief Append an observation to the sensor data.
+     *
+     * @param timestamp Timestamp of all cameras.
+     * @param pixel_value Value of all pixels of the images.
+     */
+    void append_observation(double timestamp, uint8_t pixel_value = 42)
+    {
+        TriCameraObservation observation(info);
+        for (auto &camera : observation.cameras)
+        {
+            camera.image.setTo(pixel_value);
+            camera.timestamp = timestamp;
+        }
+        data->observation->append(observation);
+    }
+};
+
+}  // namespace test
+}  // namespace trifinger_cameras